@@ -1,28 +1,122 @@
+from pathlib import Path
+
 from app.ai.base import AIProvider, AIRecommendation, WorkoutContext
+from app.ai.batching import BatchingProvider
+from app.ai.bulkhead import Bulkhead, BulkheadProvider, BulkheadRejected
 from app.ai.context_builder import build_context
+from app.ai.conversation import ConversationStore
+from app.ai.distilled import DistilledProvider, RegimeRouterProvider
+from app.ai.drain import DrainingProvider
 from app.ai.gemini_provider import GeminiProvider
 from app.ai.ollama_provider import OllamaProvider
 from app.ai.openai_provider import OpenAIProvider
 from app.ai.prompt_builder import PromptBuilder
+from app.ai.recorder import ContextRecorder, RecordingProvider
+from app.ai.retry import RetryingProvider
+from app.ai.tiered import TieredProvider
+from app.ai.usage import QuotaExceeded, UsageMeteringProvider, UsageTracker
 
 from app.config import Settings
 
 
-def get_ai_provider(settings: Settings) -> AIProvider:
+def get_ai_provider(
+    settings: Settings, usage_tracker: UsageTracker | None = None
+) -> DrainingProvider:
+    provider = _get_base_provider(settings)
+    if settings.AI_RETRY_MAX_ATTEMPTS > 1 or settings.AI_REQUEST_DEADLINE_MS > 0:
+        provider = RetryingProvider(
+            provider,
+            provider_name=settings.AI_PROVIDER.lower(),
+            max_attempts=max(1, settings.AI_RETRY_MAX_ATTEMPTS),
+            deadline_seconds=settings.AI_REQUEST_DEADLINE_MS / 1000 or None,
+            base_delay_seconds=settings.AI_RETRY_BASE_DELAY_MS / 1000,
+            max_delay_seconds=settings.AI_RETRY_MAX_DELAY_MS / 1000,
+        )
+    if settings.AI_BATCH_ENABLED:
+        provider = BatchingProvider(
+            provider,
+            max_batch_size=settings.AI_BATCH_MAX_SIZE,
+            max_wait_seconds=settings.AI_BATCH_MAX_WAIT_MS / 1000,
+        )
+    if settings.AI_MAX_CONCURRENT > 0:
+        provider = BulkheadProvider(
+            provider,
+            Bulkhead(
+                max_concurrent=settings.AI_MAX_CONCURRENT,
+                max_queue=settings.AI_MAX_QUEUE,
+                max_wait_seconds=settings.AI_QUEUE_TIMEOUT_MS / 1000,
+            ),
+            batch_bulkhead=Bulkhead(
+                max_concurrent=max(1, settings.AI_PLANNING_MAX_CONCURRENT),
+                max_queue=settings.AI_PLANNING_MAX_QUEUE,
+                max_wait_seconds=settings.AI_PLANNING_QUEUE_TIMEOUT_MS / 1000,
+            ),
+        )
+    if usage_tracker is not None:
+        provider = UsageMeteringProvider(provider, usage_tracker)
+    if (
+        settings.AI_PROVIDER.lower() != "distilled"
+        and settings.AI_DISTILLED_MODEL_PATH
+        and Path(settings.AI_DISTILLED_MODEL_PATH).is_file()
+    ):
+        provider = RegimeRouterProvider(
+            provider,
+            DistilledProvider.from_path(settings.AI_DISTILLED_MODEL_PATH),
+            min_agreement=settings.AI_DISTILLED_MIN_AGREEMENT,
+            min_samples=settings.AI_DISTILLED_MIN_SAMPLES,
+        )
+    if settings.AI_RULE_TIER_ENABLED:
+        provider = TieredProvider(provider, min_confidence=settings.AI_RULE_TIER_MIN_CONFIDENCE)
+    if settings.AI_RECORD_PATH:
+        provider = RecordingProvider(
+            provider,
+            ContextRecorder(settings.AI_RECORD_PATH, sample_rate=settings.AI_RECORD_SAMPLE_RATE),
+        )
+    return DrainingProvider(provider)
+
+
+def _get_base_provider(settings: Settings) -> AIProvider:
     match settings.AI_PROVIDER.lower():
         case "gemini":
             return GeminiProvider(
                 api_key=settings.GEMINI_API_KEY or "",
                 model=settings.GEMINI_MODEL,
+                prompt_format=settings.AI_PROMPT_FORMAT,
+                prompt_token_budget=settings.AI_PROMPT_TOKEN_BUDGET or None,
+                prompt_cache=settings.GEMINI_PROMPT_CACHE,
+                prompt_cache_ttl_seconds=settings.GEMINI_PROMPT_CACHE_TTL_SECONDS,
+                prompt_cache_min_tokens=settings.GEMINI_PROMPT_CACHE_MIN_TOKENS,
+                conversations=(
+                    ConversationStore(
+                        ttl_seconds=settings.AI_CONVERSATION_TTL_MINUTES * 60,
+                        max_turns=settings.AI_CONVERSATION_MAX_TURNS,
+                        max_sessions=settings.AI_CONVERSATION_MAX_SESSIONS,
+                    )
+                    if settings.AI_CONVERSATION_MODE
+                    else None
+                ),
             )
         case "openai":
             return OpenAIProvider()
         case "ollama":
             return OllamaProvider()
+        case "distilled":
+            if not settings.AI_DISTILLED_MODEL_PATH:
+                raise ValueError("AI_PROVIDER=distilled requires AI_DISTILLED_MODEL_PATH")
+            return DistilledProvider.from_path(settings.AI_DISTILLED_MODEL_PATH)
+        case "fake":
+            # Imported here so production starts never load the load-test simulator.
+            from app.ai.fake_llm import FakeLLMConfig
+            from app.ai.fake_provider import FakeProvider
+
+            return FakeProvider(
+                base_url=settings.FAKE_LLM_URL,
+                config=FakeLLMConfig.from_settings(settings),
+            )
         case _:
             raise ValueError(
                 f"Unknown AI_PROVIDER: {settings.AI_PROVIDER!r}. "
-                "Use one of: gemini, openai, ollama"
+                "Use one of: gemini, openai, ollama, fake, distilled"
             )
 
 
@@ -30,7 +124,22 @@ __all__ = [
     "AIProvider",
     "AIRecommendation",
     "WorkoutContext",
+    "BatchingProvider",
+    "Bulkhead",
+    "BulkheadProvider",
+    "BulkheadRejected",
+    "ContextRecorder",
+    "ConversationStore",
+    "DrainingProvider",
     "PromptBuilder",
+    "RecordingProvider",
+    "QuotaExceeded",
+    "RegimeRouterProvider",
+    "RetryingProvider",
+    "TieredProvider",
+    "UsageMeteringProvider",
+    "UsageTracker",
+    "DistilledProvider",
     "GeminiProvider",
     "OllamaProvider",
     "OpenAIProvider",
@@ -1,7 +1,10 @@
 """AI abstraction layer: context, recommendation types, and provider interface."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from typing import Any
 
 
 @dataclass
@@ -20,6 +23,9 @@ class WorkoutContext:
     workout_duration_minutes: int
     seconds_since_last_set: int | None = None
     target_rpe: float | None = None
+    workout_id: str | None = None  # conversation-session key (see app.ai.conversation)
+    exercise_id: str | None = None
+    user_id: str | None = None  # token accounting and quotas (see app.ai.usage)
 
 @dataclass
 class AIRecommendation:
@@ -32,6 +38,36 @@ class AIRecommendation:
     raw_response: str
     latency_ms: int
     model_used: str
+    provider: str | None = None  # recommendations.ai_provider; provider_label(model_used) when None
+    prompt_tokens: int | None = None  # as reported by the provider; None when unknown
+    completion_tokens: int | None = None
+
+
+def provider_label(model_used: str) -> str:
+    """recommendations.ai_provider value for an AI recommendation, derived from its model."""
+    model = model_used.lower()
+    if "gemini" in model:
+        return "gemini"
+    if model.startswith("distilled"):
+        return "distilled"
+    if model.startswith("fake"):
+        return "fake"
+    return "ai"
+
+
+STREAM_EVENT_FIELD = "field"  # a scalar field decoded early (suggested_weight_kg / suggested_reps)
+STREAM_EVENT_EXPLANATION_DELTA = "explanation_delta"  # new explanation text
+STREAM_EVENT_FINAL = "final"  # validated AIRecommendation
+
+
+@dataclass
+class RecommendationStreamEvent:
+    """One event of a streamed recommendation."""
+
+    kind: str
+    field: str | None = None
+    value: Any = None
+    recommendation: AIRecommendation | None = None
 
 
 class AIProvider(ABC):
@@ -42,6 +78,68 @@ class AIProvider(ABC):
         """Return a single set recommendation for the given workout context."""
         ...
 
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """
+        Return one recommendation (or the exception it failed with) per request id.
+
+        Default: independent concurrent calls. Providers that can answer several
+        contexts in one request (see BatchingProvider) override this.
+        """
+        ids = list(contexts)
+        results = await asyncio.gather(
+            *(self.get_recommendation(contexts[i]) for i in ids),
+            return_exceptions=True,
+        )
+        return dict(zip(ids, results))
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        """
+        Stream a recommendation: weight and reps as soon as they are known, then
+        the explanation, then a final event with the validated recommendation.
+
+        Default: one non-streaming call replayed as events. Providers with a
+        streaming API override this to surface fields while generating.
+        """
+        rec = await self.get_recommendation(context)
+        yield RecommendationStreamEvent(STREAM_EVENT_FIELD, "suggested_weight_kg", rec.suggested_weight_kg)
+        yield RecommendationStreamEvent(STREAM_EVENT_FIELD, "suggested_reps", rec.suggested_reps)
+        yield RecommendationStreamEvent(STREAM_EVENT_EXPLANATION_DELTA, "explanation", rec.explanation)
+        yield RecommendationStreamEvent(STREAM_EVENT_FINAL, recommendation=rec)
+
+    def end_session(self, workout_id: str) -> None:
+        """
+        Drop per-workout state (conversation sessions) once the workout has ended.
+
+        Default: forward to the wrapped provider, if any (decorators keep it in .inner).
+        """
+        inner = getattr(self, "inner", None)
+        if isinstance(inner, AIProvider):
+            inner.end_session(workout_id)
+
+    async def warmup(self) -> None:
+        """
+        Open connections ahead of the first request (TLS, HTTP pool) without generating.
+
+        Default: forward to the wrapped provider, if any.
+        """
+        inner = getattr(self, "inner", None)
+        if isinstance(inner, AIProvider):
+            await inner.warmup()
+
+    async def aclose(self) -> None:
+        """
+        Flush buffered work and release connections at shutdown.
+
+        Default: forward to the wrapped provider, if any.
+        """
+        inner = getattr(self, "inner", None)
+        if isinstance(inner, AIProvider):
+            await inner.aclose()
+
     @abstractmethod
     async def health_check(self) -> bool:
         """Return True if the provider is reachable and usable."""
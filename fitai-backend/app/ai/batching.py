@@ -0,0 +1,118 @@
+"""Optional micro-batching layer in front of an AI provider.
+
+Under load many independent recommendation requests arrive within a few hundred
+milliseconds. BatchingProvider collects pending contexts for up to
+max_wait_seconds or max_batch_size items, sends them to the inner provider's
+get_batch_recommendations() as one request keyed by request id, and fans the
+results back out to the waiting callers. A per-item failure is raised only to
+that item's caller, which then falls back to the rule engine on its own.
+"""
+
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from app.ai.base import AIProvider, AIRecommendation, RecommendationStreamEvent, WorkoutContext
+from app.core.metrics import AI_BATCH_QUEUE_DELAY_SECONDS, AI_BATCH_SIZE
+
+
+@dataclass
+class _Pending:
+    request_id: str
+    context: WorkoutContext
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchingProvider(AIProvider):
+    """Wraps a provider and coalesces concurrent get_recommendation calls into batches."""
+
+    def __init__(
+        self,
+        inner: AIProvider,
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: list[_Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._ids = itertools.count(1)
+        self._dispatches: set[asyncio.Task] = set()
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        loop = asyncio.get_running_loop()
+        pending = _Pending(f"r{next(self._ids)}", context, loop.create_future())
+        self._pending.append(pending)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await pending.future
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """Already a batch: sent to the inner provider as is, without queueing."""
+        return await self.inner.get_batch_recommendations(contexts)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._dispatch(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: list[_Pending]) -> None:
+        now = time.perf_counter()
+        AI_BATCH_SIZE.observe(len(batch))
+        for p in batch:
+            AI_BATCH_QUEUE_DELAY_SECONDS.observe(now - p.enqueued_at)
+
+        try:
+            results = await self.inner.get_batch_recommendations(
+                {p.request_id: p.context for p in batch}
+            )
+        except Exception as e:
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+
+        for p in batch:
+            if p.future.done():  # caller gave up (cancelled)
+                continue
+            result = results.get(p.request_id)
+            if result is None:
+                p.future.set_exception(
+                    ValueError(f"No result for batched request {p.request_id}")
+                )
+            elif isinstance(result, BaseException):
+                p.future.set_exception(result)
+            else:
+                p.future.set_result(result)
+
+    def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        """Streams are latency-first; they bypass batching."""
+        return self.inner.stream_recommendation(context)
+
+    async def aclose(self) -> None:
+        """Send whatever is still queued and wait for in-flight batches before closing."""
+        self._flush()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        await self.inner.aclose()
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
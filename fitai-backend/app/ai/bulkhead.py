@@ -0,0 +1,127 @@
+"""Bulkhead / admission control around AI provider calls.
+
+Bounds the number of concurrent provider calls per process and keeps a short
+wait queue in front of them. Calls that cannot be admitted (queue full, or the
+wait exceeded the threshold) raise BulkheadRejected so the caller can shed the
+request straight to the rule engine instead of piling up coroutines on the
+provider client.
+
+Batch calls (next-session planning, run in the background) can be given a
+Bulkhead of their own so they never take the slots of live set requests.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.ai.base import AIProvider, AIRecommendation, RecommendationStreamEvent, WorkoutContext
+from app.core.metrics import AI_INFLIGHT, AI_QUEUE_DEPTH, AI_SHED_TOTAL
+
+REASON_QUEUE_FULL = "queue_full"
+REASON_QUEUE_TIMEOUT = "queue_timeout"
+REASON_SHUTTING_DOWN = "shutting_down"
+
+
+class BulkheadRejected(Exception):
+    """Raised when a call is not admitted; reason is queue_full, queue_timeout or shutting_down."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"AI call rejected by admission control: {reason}")
+        self.reason = reason
+
+
+class Bulkhead:
+    """Concurrency limiter with a bounded, time-limited wait queue."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        max_wait_seconds: float,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max(0, max_queue)
+        self.max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._inflight = 0
+        self._waiting = 0
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def _reject(self, reason: str) -> BulkheadRejected:
+        AI_SHED_TOTAL.labels(reason=reason).inc()
+        return BulkheadRejected(reason)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of the block."""
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                raise self._reject(REASON_QUEUE_FULL)
+            self._waiting += 1
+            AI_QUEUE_DEPTH.inc()
+            try:
+                async with asyncio.timeout(self.max_wait_seconds):
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                raise self._reject(REASON_QUEUE_TIMEOUT) from None
+            finally:
+                self._waiting -= 1
+                AI_QUEUE_DEPTH.dec()
+        else:
+            await self._semaphore.acquire()
+
+        self._inflight += 1
+        AI_INFLIGHT.inc()
+        try:
+            yield
+        finally:
+            self._inflight -= 1
+            AI_INFLIGHT.dec()
+            self._semaphore.release()
+
+
+class BulkheadProvider(AIProvider):
+    """Wraps another provider so every recommendation call goes through a Bulkhead."""
+
+    def __init__(
+        self, inner: AIProvider, bulkhead: Bulkhead, batch_bulkhead: Bulkhead | None = None
+    ) -> None:
+        """
+        Args:
+            inner: Wrapped provider
+            bulkhead: Limiter for single and streamed recommendation calls
+            batch_bulkhead: Limiter for get_batch_recommendations (default: bulkhead)
+        """
+        self.inner = inner
+        self.bulkhead = bulkhead
+        self.batch_bulkhead = batch_bulkhead or bulkhead
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        async with self.bulkhead.slot():
+            return await self.inner.get_recommendation(context)
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """One slot for the whole batch: it is a single call to the inner provider."""
+        async with self.batch_bulkhead.slot():
+            return await self.inner.get_batch_recommendations(contexts)
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        async with self.bulkhead.slot():
+            async for event in self.inner.stream_recommendation(context):
+                yield event
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
@@ -18,6 +18,79 @@ def _epley_1rm(weight_kg: float, reps: int) -> float:
     return weight_kg * (1.0 + reps / 30.0)
 
 
+async def _exercise_history(
+    set_repo: SetRepository,
+    workout_repo: WorkoutRepository,
+    user_id: UUID,
+    exercise_id: UUID,
+    exclude_workout_id: UUID | None,
+) -> tuple[list[dict], float | None, float | None]:
+    """
+    Last 3 sessions of an exercise (newest first), estimated 1RM and max weight ever.
+
+    Sets of exclude_workout_id (the workout in progress) are not counted as a
+    past session but still feed the 1RM estimate.
+    """
+    recent_sets = await set_repo.get_recent_sets_for_exercise(
+        user_id, exercise_id, limit=60
+    )
+    # Group by workout_id; order groups by most recent set (logged_at desc)
+    sets_by_workout: dict[UUID, list[Set]] = {}
+    for s in recent_sets:
+        wid = s.workout_id
+        if wid not in sets_by_workout:
+            sets_by_workout[wid] = []
+        sets_by_workout[wid].append(s)
+    # Most recent workout = first in recent_sets; preserve order of first occurrence
+    seen_order: list[UUID] = []
+    for s in recent_sets:
+        if s.workout_id == exclude_workout_id:
+            continue
+        if s.workout_id not in seen_order:
+            seen_order.append(s.workout_id)
+    last_3_workout_ids = seen_order[:3]
+
+    # Fetch workout rows for dates (single query for up to 3 IDs)
+    recent_sessions: list[dict] = []
+    if last_3_workout_ids:
+        workouts_for_sessions = await workout_repo.get_many_by_id(last_3_workout_ids)
+        workout_dates = {w.id: w.started_at for w in workouts_for_sessions}
+        for wid in last_3_workout_ids:
+            session_sets = sets_by_workout.get(wid, [])
+            if not session_sets:
+                continue
+            started_at = workout_dates.get(wid)
+            date_str = (
+                started_at.strftime("%Y-%m-%d") if started_at else ""
+            )
+            recent_sessions.append(
+                {
+                    "date": date_str,
+                    "sets": [
+                        {
+                            "weight_kg": float(s.weight_kg),
+                            "reps": s.reps,
+                            "rpe": float(s.rpe) if s.rpe is not None else None,
+                        }
+                        for s in session_sets
+                    ],
+                }
+            )
+
+    # Estimated 1RM using Epley from best set across recent history
+    estimated_1rm: float | None = None
+    if recent_sets:
+        best_epley = max(
+            _epley_1rm(float(s.weight_kg), s.reps) for s in recent_sets
+        )
+        estimated_1rm = round(best_epley, 2)
+
+    max_weight_ever = await set_repo.get_max_weight_for_exercise(
+        user_id, exercise_id
+    )
+    return recent_sessions, estimated_1rm, max_weight_ever
+
+
 async def build_context(
     workout_id: UUID,
     exercise_id: UUID,
@@ -63,68 +136,9 @@ async def build_context(
         for s in current_sets
     ]
 
-    # 4. Fetch last 3 workout sessions where this exercise was performed
-    recent_sets = await set_repo.get_recent_sets_for_exercise(
-        user_id, exercise_id, limit=60
-    )
-    # Group by workout_id; order groups by most recent set (logged_at desc)
-    sets_by_workout: dict[UUID, list[Set]] = {}
-    for s in recent_sets:
-        wid = s.workout_id
-        if wid not in sets_by_workout:
-            sets_by_workout[wid] = []
-        sets_by_workout[wid].append(s)
-    # Most recent workout = first in recent_sets; preserve order of first occurrence
-    # Exclude current workout so "recent sessions" are past sessions only
-    seen_order: list[UUID] = []
-    for s in recent_sets:
-        if s.workout_id == workout_id:
-            continue
-        if s.workout_id not in seen_order:
-            seen_order.append(s.workout_id)
-    last_3_workout_ids = seen_order[:3]
-
-    # Fetch workout rows for dates (single query for up to 3 IDs)
-    recent_sessions: list[dict] = []
-    if last_3_workout_ids:
-        workouts_for_sessions = await workout_repo.get_many_by_id(last_3_workout_ids)
-        workout_dates = {w.id: w.started_at for w in workouts_for_sessions}
-        for i, wid in enumerate(last_3_workout_ids):
-            session_sets = sets_by_workout.get(wid, [])
-            if not session_sets:
-                continue
-            started_at = workout_dates.get(wid)
-            date_str = (
-                started_at.strftime("%Y-%m-%d") if started_at else ""
-            )
-            best = max(
-                session_sets,
-                key=lambda s: (float(s.weight_kg), s.reps),
-            )
-            session_summary = {
-                "date": date_str,
-                "sets": [
-                    {
-                        "weight_kg": float(s.weight_kg),
-                        "reps": s.reps,
-                        "rpe": float(s.rpe) if s.rpe is not None else None,
-                    }
-                    for s in session_sets
-                ],
-            }
-            recent_sessions.append(session_summary)
-
-    # 5. Compute estimated_1rm using Epley from best set across recent history
-    estimated_1rm: float | None = None
-    if recent_sets:
-        best_epley = max(
-            _epley_1rm(float(s.weight_kg), s.reps) for s in recent_sets
-        )
-        estimated_1rm = round(best_epley, 2)
-
-    # 6. Fetch max_weight_ever for this user/exercise
-    max_weight_ever = await set_repo.get_max_weight_for_exercise(
-        user_id, exercise_id
+    # 4-6. Last 3 past sessions, estimated 1RM, max weight ever
+    recent_sessions, estimated_1rm, max_weight_ever = await _exercise_history(
+        set_repo, workout_repo, user_id, exercise_id, exclude_workout_id=workout_id
     )
 
     # 7. Count total sets in current workout (all exercises)
@@ -149,4 +163,40 @@ async def build_context(
         max_weight_ever=max_weight_ever,
         total_sets_today=total_sets_today,
         workout_duration_minutes=workout_duration_minutes,
+        workout_id=str(workout_id),
+        exercise_id=str(exercise_id),
+        user_id=str(user_id),
+    )
+
+
+async def build_next_session_context(
+    exercise_id: UUID,
+    user_id: UUID,
+    db: AsyncSession,
+) -> WorkoutContext:
+    """
+    Build a WorkoutContext for the first working set of the next session.
+
+    No sets are logged yet: the last 3 sessions (including one that just ended)
+    carry the history, and fatigue counters start at zero.
+    """
+    exercise = await ExerciseRepository(db).get(exercise_id)
+    if not exercise:
+        raise ValueError(f"Exercise {exercise_id} not found")
+    recent_sessions, estimated_1rm, max_weight_ever = await _exercise_history(
+        SetRepository(db), WorkoutRepository(db), user_id, exercise_id, exclude_workout_id=None
+    )
+    return WorkoutContext(
+        exercise_name=exercise.name,
+        muscle_group=exercise.muscle_group,
+        equipment_type=exercise.equipment_type or "",
+        is_compound=exercise.is_compound,
+        current_session_sets=[],
+        recent_sessions=recent_sessions,
+        estimated_1rm=estimated_1rm,
+        max_weight_ever=max_weight_ever,
+        total_sets_today=0,
+        workout_duration_minutes=0,
+        exercise_id=str(exercise_id),
+        user_id=str(user_id),
     )
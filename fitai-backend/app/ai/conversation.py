@@ -0,0 +1,119 @@
+"""Per-workout conversation sessions: send the exercise history once, then only deltas.
+
+In conversation mode the first recommendation for an exercise in a workout sends
+the full prompt (exercise, 1RM, current sets, last three sessions). Later
+recommendations for the same exercise send only the sets logged since the last
+turn plus today's fatigue counters; the earlier turns are replayed as chat
+history so the model still sees everything.
+
+Sessions are keyed by (workout_id, exercise_id) and live in process memory.
+They are dropped when the workout ends (AIProvider.end_session), after
+ttl_seconds without use, or least-recently-used first beyond max_sessions. A
+session restarts from a full prompt after max_turns follow-ups (bounding the
+replayed history) or when the sets it already sent no longer match the context
+(a set was edited or deleted). Streamed and batched requests stay stateless.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from app.ai.base import WorkoutContext
+
+
+def _set_key(s: dict) -> tuple:
+    return (s.get("set_number"), s.get("weight_kg"), s.get("reps"), s.get("rpe"))
+
+
+@dataclass
+class ConversationTurn:
+    user: str
+    model: str
+
+
+@dataclass
+class ConversationSession:
+    """Chat history for one exercise in one workout."""
+
+    turns: list[ConversationTurn] = field(default_factory=list)
+    sent_sets: list[tuple] = field(default_factory=list)  # _set_key of sets already in history
+    last_used: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def started(self) -> bool:
+        return bool(self.turns)
+
+    def new_sets(self, context: WorkoutContext) -> list[dict] | None:
+        """Sets not yet sent, or None when the history no longer matches the context."""
+        current = context.current_session_sets
+        sent = len(self.sent_sets)
+        if [_set_key(s) for s in current[:sent]] != self.sent_sets:
+            return None
+        return current[sent:]
+
+    def record(self, user: str, model: str, context: WorkoutContext) -> None:
+        """Append a completed turn; the context's sets are now part of the history."""
+        self.turns.append(ConversationTurn(user, model))
+        self.sent_sets = [_set_key(s) for s in context.current_session_sets]
+
+    def reset(self) -> None:
+        self.turns.clear()
+        self.sent_sets.clear()
+
+
+class ConversationStore:
+    """In-memory sessions with end-of-workout, idle-TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 5400,
+        max_turns: int = 12,
+        max_sessions: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions: OrderedDict[tuple[str, str], ConversationSession] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, workout_id: str, exercise_id: str) -> ConversationSession:
+        """Return the live session for (workout, exercise), creating it if needed."""
+        now = self._clock()
+        self.evict_expired(now)
+        key = (workout_id, exercise_id)
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = ConversationSession()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(key)
+        session.last_used = now
+        return session
+
+    def evict_workout(self, workout_id: str) -> int:
+        """Drop every session of a workout. Returns the number dropped."""
+        keys = [key for key in self._sessions if key[0] == workout_id]
+        for key in keys:
+            del self._sessions[key]
+        return len(keys)
+
+    def evict_expired(self, now: float | None = None) -> int:
+        """Drop sessions idle for longer than ttl_seconds. Returns the number dropped."""
+        cutoff = (self._clock() if now is None else now) - self.ttl_seconds
+        dropped = 0
+        # Least recently used first: stop at the first session still in use.
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self._sessions[key]
+            dropped += 1
+        return dropped
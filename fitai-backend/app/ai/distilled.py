@@ -0,0 +1,334 @@
+"""Distilled local recommender: ridge regression trained on stored LLM recommendations.
+
+The model maps a small feature vector of the current session (last set, trend
+against the previous set, fatigue proxies) to two targets relative to the last
+set: log(suggested / last weight) and suggested reps - last reps. It is a few
+dozen floats, stored as an .npz artifact together with its held-out agreement
+against the LLM, overall and per regime (compound/isolation x RPE band).
+
+DistilledProvider serves it as an AIProvider with no I/O. RegimeRouterProvider
+sends contexts whose regime reached the configured held-out agreement to the
+distilled model and everything else to the LLM provider chain.
+
+Train with scripts/train_distilled.py.
+"""
+
+import json
+import math
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.ai.base import AIProvider, AIRecommendation, RecommendationStreamEvent, WorkoutContext
+from app.ai.response_parser import snap_weight
+from app.core.metrics import AI_ROUTED_TOTAL
+
+MODEL_NAME = "distilled-ridge"
+ARTIFACT_VERSION = 1
+
+FEATURE_NAMES: tuple[str, ...] = (
+    "last_rpe",
+    "rpe_missing",
+    "last_reps",
+    "is_compound",
+    "session_sets",
+    "rep_change",
+    "rpe_change",
+    "weight_change_pct",
+    "total_sets_today",
+    "workout_duration_minutes",
+)
+
+# A recommendation "agrees" with the LLM when reps match and weight is within one plate step.
+AGREEMENT_WEIGHT_TOLERANCE_KG = 1.25
+
+_DEFAULT_RPE = 8.0
+_MAX_REPS = 30
+
+
+def rpe_band(rpe: float | None) -> str:
+    if rpe is None:
+        return "none"
+    if rpe < 7.5:
+        return "low"
+    if rpe <= 8.5:
+        return "target"
+    return "high"
+
+
+def regime_of(ctx: WorkoutContext) -> str:
+    """Regime key used for per-regime agreement and routing, e.g. "compound:target"."""
+    last = ctx.current_session_sets[-1] if ctx.current_session_sets else {}
+    kind = "compound" if ctx.is_compound else "isolation"
+    return f"{kind}:{rpe_band(last.get('rpe'))}"
+
+
+def context_features(ctx: WorkoutContext) -> list[float]:
+    """Feature vector (FEATURE_NAMES order). Requires at least one current-session set."""
+    sets = ctx.current_session_sets
+    last = sets[-1]
+    prev = sets[-2] if len(sets) >= 2 else last
+    last_rpe = last.get("rpe")
+    prev_rpe = prev.get("rpe")
+    last_weight = float(last["weight_kg"])
+    prev_weight = float(prev["weight_kg"])
+    return [
+        float(last_rpe) if last_rpe is not None else _DEFAULT_RPE,
+        1.0 if last_rpe is None else 0.0,
+        float(last["reps"]),
+        1.0 if ctx.is_compound else 0.0,
+        float(len(sets)),
+        float(last["reps"] - prev["reps"]),
+        float(last_rpe - prev_rpe) if last_rpe is not None and prev_rpe is not None else 0.0,
+        (last_weight - prev_weight) / prev_weight if prev_weight > 0 else 0.0,
+        float(ctx.total_sets_today),
+        float(min(ctx.workout_duration_minutes, 240)),
+    ]
+
+
+def agrees(weight_a: float, reps_a: int, weight_b: float, reps_b: int) -> bool:
+    return reps_a == reps_b and abs(weight_a - weight_b) <= AGREEMENT_WEIGHT_TOLERANCE_KG
+
+
+@dataclass
+class DistilledModel:
+    """Linear model on raw features: targets = features @ coef + intercept."""
+
+    coef: np.ndarray  # (n_features, 2): [log weight ratio, reps delta]
+    intercept: np.ndarray  # (2,)
+    feature_names: tuple[str, ...] = FEATURE_NAMES
+    metadata: dict = field(default_factory=dict)
+
+    def predict(self, ctx: WorkoutContext) -> tuple[float, int]:
+        last = ctx.current_session_sets[-1]
+        log_ratio, reps_delta = np.asarray(context_features(ctx)) @ self.coef + self.intercept
+        weight = snap_weight(max(0.0, float(last["weight_kg"]) * math.exp(float(log_ratio))))
+        reps = int(min(_MAX_REPS, max(1, round(int(last["reps"]) + float(reps_delta)))))
+        return weight, reps
+
+    def regime_agreement(self, regime: str) -> tuple[float | None, int]:
+        stats = self.metadata.get("regimes", {}).get(regime)
+        if not stats:
+            return None, 0
+        return stats["agreement"], stats["n"]
+
+    def save(self, path: str | Path) -> None:
+        np.savez(
+            path,
+            coef=self.coef,
+            intercept=self.intercept,
+            feature_names=np.array(self.feature_names),
+            metadata=np.array(json.dumps({"version": ARTIFACT_VERSION, **self.metadata})),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "DistilledModel":
+        with np.load(path, allow_pickle=False) as data:
+            feature_names = tuple(str(n) for n in data["feature_names"])
+            if feature_names != FEATURE_NAMES:
+                raise ValueError(
+                    f"Artifact {path} was trained on different features: {feature_names}"
+                )
+            return cls(
+                coef=data["coef"],
+                intercept=data["intercept"],
+                feature_names=feature_names,
+                metadata=json.loads(str(data["metadata"])),
+            )
+
+
+@dataclass
+class TrainingExample:
+    context: WorkoutContext
+    suggested_weight_kg: float
+    suggested_reps: int
+    group: str  # examples sharing a group (workout) are kept on the same side of the split
+
+
+def _targets(example: TrainingExample) -> tuple[float, float]:
+    last = example.context.current_session_sets[-1]
+    last_weight = float(last["weight_kg"])
+    ratio = example.suggested_weight_kg / last_weight if last_weight > 0 else 1.0
+    return math.log(max(ratio, 1e-3)), float(example.suggested_reps - int(last["reps"]))
+
+
+def fit_ridge(x: np.ndarray, y: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """Closed-form ridge on standardized features, folded back to raw-feature coefficients."""
+    mean = x.mean(axis=0)
+    scale = x.std(axis=0)
+    scale[scale == 0] = 1.0
+    xs = (x - mean) / scale
+    y_mean = y.mean(axis=0)
+    gram = xs.T @ xs + alpha * np.eye(xs.shape[1])
+    coef_std = np.linalg.solve(gram, xs.T @ (y - y_mean))
+    coef = coef_std / scale[:, None]
+    intercept = y_mean - mean @ coef
+    return coef, intercept
+
+
+def _is_holdout(group: str, holdout_fraction: float) -> bool:
+    # Stable split independent of PYTHONHASHSEED.
+    return zlib.crc32(group.encode()) % 1000 < holdout_fraction * 1000
+
+
+def evaluate(model: DistilledModel, examples: Sequence[TrainingExample]) -> dict:
+    """Agreement with the LLM overall and per regime."""
+    per_regime: dict[str, list[int]] = {}
+    for ex in examples:
+        weight, reps = model.predict(ex.context)
+        hit = agrees(weight, reps, ex.suggested_weight_kg, ex.suggested_reps)
+        counts = per_regime.setdefault(regime_of(ex.context), [0, 0])
+        counts[0] += int(hit)
+        counts[1] += 1
+    total_hits = sum(h for h, _ in per_regime.values())
+    return {
+        "n": len(examples),
+        "agreement": round(total_hits / len(examples), 4) if examples else None,
+        "regimes": {
+            regime: {"n": n, "agreement": round(hits / n, 4)}
+            for regime, (hits, n) in sorted(per_regime.items())
+        },
+    }
+
+
+def train_distilled(
+    examples: Sequence[TrainingExample],
+    alpha: float = 1.0,
+    holdout_fraction: float = 0.2,
+) -> DistilledModel:
+    """
+    Fit the distilled model and score it on a held-out split of whole workouts.
+
+    Args:
+        examples: LLM recommendations with the context that produced them
+        alpha: Ridge regularization strength
+        holdout_fraction: Fraction of groups held out for the agreement report
+
+    Returns:
+        DistilledModel with held-out agreement in metadata["regimes"]
+
+    Raises:
+        ValueError: If there are no usable training examples
+    """
+    usable = [ex for ex in examples if ex.context.current_session_sets]
+    train = [ex for ex in usable if not _is_holdout(ex.group, holdout_fraction)]
+    holdout = [ex for ex in usable if _is_holdout(ex.group, holdout_fraction)]
+    if not train:
+        raise ValueError("No training examples")
+    x = np.array([context_features(ex.context) for ex in train], dtype=float)
+    y = np.array([_targets(ex) for ex in train], dtype=float)
+    coef, intercept = fit_ridge(x, y, alpha)
+    model = DistilledModel(coef=coef, intercept=intercept)
+    report = evaluate(model, holdout)
+    model.metadata = {
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "alpha": alpha,
+        "n_train": len(train),
+        "n_holdout": report["n"],
+        "holdout_agreement": report["agreement"],
+        "train_agreement": evaluate(model, train)["agreement"],
+        "regimes": report["regimes"],
+    }
+    return model
+
+
+def _confidence(agreement: float | None) -> str:
+    if agreement is None:
+        return "low"
+    if agreement >= 0.9:
+        return "high"
+    if agreement >= 0.75:
+        return "medium"
+    return "low"
+
+
+class DistilledProvider(AIProvider):
+    """Serves a DistilledModel as an AIProvider (pure CPU, microseconds per call)."""
+
+    def __init__(self, model: DistilledModel) -> None:
+        self.model = model
+
+    @classmethod
+    def from_path(cls, path: str | Path) -> "DistilledProvider":
+        return cls(DistilledModel.load(path))
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        if not context.current_session_sets:
+            raise ValueError("Distilled model needs at least one set in the current session")
+        weight, reps = self.model.predict(context)
+        regime = regime_of(context)
+        agreement, n = self.model.regime_agreement(regime)
+        note = (
+            f"held-out agreement {agreement:.0%} on {n} {regime} sets"
+            if agreement is not None
+            else "no held-out data for this regime"
+        )
+        return AIRecommendation(
+            suggested_weight_kg=weight,
+            suggested_reps=reps,
+            explanation=f"Suggested by the distilled model trained on past AI recommendations ({note}).",
+            confidence=_confidence(agreement),
+            raw_response=json.dumps({"suggested_weight_kg": weight, "suggested_reps": reps}),
+            latency_ms=0,
+            model_used=MODEL_NAME,
+        )
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class RegimeRouterProvider(AIProvider):
+    """Routes high-agreement regimes to the distilled model, the rest to the primary provider."""
+
+    def __init__(
+        self,
+        primary: AIProvider,
+        distilled: DistilledProvider,
+        min_agreement: float = 0.9,
+        min_samples: int = 100,
+    ) -> None:
+        self.inner = primary
+        self.distilled = distilled
+        self.min_agreement = min_agreement
+        self.min_samples = min_samples
+
+    def routes_to_distilled(self, context: WorkoutContext) -> bool:
+        if not context.current_session_sets:
+            return False
+        agreement, n = self.distilled.model.regime_agreement(regime_of(context))
+        return agreement is not None and n >= self.min_samples and agreement >= self.min_agreement
+
+    def _pick(self, context: WorkoutContext) -> AIProvider:
+        if self.routes_to_distilled(context):
+            AI_ROUTED_TOTAL.labels(target="distilled").inc()
+            return self.distilled
+        AI_ROUTED_TOTAL.labels(target="primary").inc()
+        return self.inner
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        return await self._pick(context).get_recommendation(context)
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """Each target gets its share of the items as one batch."""
+        picked = {request_id: self._pick(context) for request_id, context in contexts.items()}
+        results: dict[str, AIRecommendation | Exception] = {}
+        for target in (self.distilled, self.inner):
+            share = {i: contexts[i] for i, p in picked.items() if p is target}
+            if share:
+                results.update(await target.get_batch_recommendations(share))
+        return results
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        async for event in self._pick(context).stream_recommendation(context):
+            yield event
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
@@ -0,0 +1,104 @@
+"""Graceful shutdown for the provider chain.
+
+DrainingProvider is the outermost wrapper: it counts recommendation calls in
+flight so the lifespan shutdown can wait for them (with a timeout) instead of
+cancelling them mid-request. Once close() is called new calls are refused with
+BulkheadRejected(shutting_down), which callers already shed to the rule engine.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from app.ai.base import AIProvider, AIRecommendation, RecommendationStreamEvent, WorkoutContext
+from app.ai.bulkhead import REASON_SHUTTING_DOWN, BulkheadRejected
+from app.core.metrics import AI_SHED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingProvider(AIProvider):
+    """Tracks in-flight calls and refuses new ones once closing."""
+
+    def __init__(self, inner: AIProvider) -> None:
+        self.inner = inner
+        self._inflight = 0
+        self._closing = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def closing(self) -> bool:
+        return self._closing
+
+    def _enter(self) -> None:
+        if self._closing:
+            AI_SHED_TOTAL.labels(reason=REASON_SHUTTING_DOWN).inc()
+            raise BulkheadRejected(REASON_SHUTTING_DOWN)
+        self._inflight += 1
+        self._idle.clear()
+
+    def _exit(self) -> None:
+        self._inflight -= 1
+        if self._inflight == 0:
+            self._idle.set()
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        self._enter()
+        try:
+            return await self.inner.get_recommendation(context)
+        finally:
+            self._exit()
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        self._enter()
+        try:
+            return await self.inner.get_batch_recommendations(contexts)
+        finally:
+            self._exit()
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        self._enter()
+        try:
+            async for event in self.inner.stream_recommendation(context):
+                yield event
+        finally:
+            self._exit()
+
+    def close(self) -> None:
+        """Stop admitting calls; the ones already running continue."""
+        self._closing = True
+
+    async def drain(self, timeout_seconds: float) -> bool:
+        """
+        Stop admitting calls and wait for in-flight ones to finish.
+
+        Args:
+            timeout_seconds: Longest time to wait
+
+        Returns:
+            True if every call finished, False if some were still running at the timeout
+        """
+        self.close()
+        try:
+            async with asyncio.timeout(timeout_seconds):
+                await self._idle.wait()
+        except TimeoutError:
+            logger.warning(
+                "Shutdown drain timed out after %gs with %d AI calls in flight",
+                timeout_seconds,
+                self._inflight,
+            )
+            return False
+        return True
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
@@ -0,0 +1,168 @@
+"""Fake LLM for load and capacity testing (no paid provider calls).
+
+FakeLLM simulates a recommendation model with:
+
+- a lognormal latency distribution fitted to a configured p50 and p99
+- a random error rate (503 responses)
+- a token-bucket rate limit (429 responses with Retry-After)
+
+It answers with a schema-valid recommendation computed by the rule engine from
+the last logged set, so downstream parsing, storage and stats see realistic data.
+
+It can be used in-process (FakeProvider without a URL) or served over HTTP so the
+API and the fake run as separate processes/containers:
+
+    uvicorn --factory app.ai.fake_llm:create_app --host 0.0.0.0 --port 8100
+
+The server takes its FAKE_LLM_* settings from app.config (see FakeLLMConfig.from_settings).
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import asdict, dataclass
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.ai.base import WorkoutContext
+from app.config import Settings, get_settings
+from app.services.rule_engine import get_rule_based_recommendation
+
+MODEL_NAME = "fake-llm"
+
+# z-score of the 99th percentile of the standard normal distribution
+_Z99 = 2.3263478740408408
+
+
+@dataclass
+class FakeLLMConfig:
+    p50_ms: float = 600.0
+    p99_ms: float = 2500.0
+    error_rate: float = 0.0
+    rate_limit_rps: float = 0.0  # 0 = unlimited
+    rate_limit_burst: int = 10
+    seed: int | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "FakeLLMConfig":
+        return cls(
+            p50_ms=settings.FAKE_LLM_P50_MS,
+            p99_ms=settings.FAKE_LLM_P99_MS,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            rate_limit_rps=settings.FAKE_LLM_RATE_LIMIT_RPS,
+            rate_limit_burst=settings.FAKE_LLM_RATE_LIMIT_BURST,
+            seed=settings.FAKE_LLM_SEED,
+        )
+
+
+class FakeLLMError(Exception):
+    """Simulated provider failure; status_code/headers mirror an HTTP error response."""
+
+    def __init__(self, status_code: int, message: str, retry_after: float | None = None) -> None:
+        super().__init__(f"{status_code} {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.headers = {"Retry-After": f"{retry_after:.3f}"} if retry_after is not None else {}
+
+
+class FakeLLM:
+    """Latency / error / rate-limit simulator that returns rule-engine recommendations."""
+
+    def __init__(self, config: FakeLLMConfig) -> None:
+        if config.p50_ms <= 0 or config.p99_ms < config.p50_ms:
+            raise ValueError("Need 0 < p50_ms <= p99_ms")
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._mu = math.log(config.p50_ms / 1000)
+        self._sigma = math.log(config.p99_ms / config.p50_ms) / _Z99
+        self._tokens = float(config.rate_limit_burst)
+        self._refilled_at = time.monotonic()
+
+    def sample_latency_seconds(self) -> float:
+        return self._rng.lognormvariate(self._mu, self._sigma)
+
+    def _take_token(self) -> float | None:
+        """Consume one rate-limit token; return seconds until one is available if none is."""
+        rps = self.config.rate_limit_rps
+        if rps <= 0:
+            return None
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.config.rate_limit_burst), self._tokens + (now - self._refilled_at) * rps
+        )
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / rps
+
+    async def complete(self, context: WorkoutContext) -> str:
+        """
+        Simulate one provider call.
+
+        Returns:
+            Raw JSON text of a schema-valid recommendation
+
+        Raises:
+            FakeLLMError: 429 when rate limited, 503 on a simulated failure
+        """
+        wait = self._take_token()
+        if wait is not None:
+            raise FakeLLMError(429, "rate limited", retry_after=wait)
+        await asyncio.sleep(self.sample_latency_seconds())
+        if self._rng.random() < self.config.error_rate:
+            raise FakeLLMError(503, "simulated provider error")
+        return json.dumps(self.recommend(context))
+
+    @staticmethod
+    def recommend(context: WorkoutContext) -> dict:
+        last = context.current_session_sets[-1] if context.current_session_sets else None
+        if last is None:
+            return {
+                "suggested_weight_kg": 20.0,
+                "suggested_reps": 8,
+                "explanation": "No sets logged yet; start light and build up.",
+                "confidence": "low",
+            }
+        weight, reps, explanation = get_rule_based_recommendation(
+            context, float(last["weight_kg"]), int(last["reps"]), last.get("rpe")
+        )
+        return {
+            "suggested_weight_kg": weight,
+            "suggested_reps": reps,
+            "explanation": explanation,
+            "confidence": "medium",
+        }
+
+
+def create_app(config: FakeLLMConfig | None = None) -> FastAPI:
+    """
+    ASGI app exposing FakeLLM at POST /v1/recommend (body: {"context": WorkoutContext}).
+
+    Served with uvicorn --factory; without a config it is built from get_settings().
+    """
+    llm = FakeLLM(config or FakeLLMConfig.from_settings(get_settings()))
+    fake_app = FastAPI(title="FitAI fake LLM", docs_url=None, redoc_url=None)
+
+    @fake_app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok", "config": asdict(llm.config)}
+
+    @fake_app.post("/v1/recommend")
+    async def recommend(body: dict) -> JSONResponse:
+        try:
+            context = WorkoutContext(**body["context"])
+        except (KeyError, TypeError) as e:
+            return JSONResponse({"error": f"invalid context: {e}"}, status_code=400)
+        try:
+            text = await llm.complete(context)
+        except FakeLLMError as e:
+            return JSONResponse(
+                {"error": str(e)}, status_code=e.status_code, headers=e.headers
+            )
+        return JSONResponse({"text": text, "model": MODEL_NAME})
+
+    return fake_app
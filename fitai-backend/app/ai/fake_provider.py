@@ -0,0 +1,78 @@
+"""Fake AI provider for load tests (AI_PROVIDER=fake).
+
+With FAKE_LLM_URL set, calls the fake LLM server (app.ai.fake_llm) over HTTP so
+connection handling and provider latency are exercised like a real remote
+model. Without it, the same simulator runs in-process.
+"""
+
+import time
+from dataclasses import asdict
+
+import httpx
+
+from app.ai.base import AIProvider, AIRecommendation, WorkoutContext
+from app.ai.fake_llm import MODEL_NAME, FakeLLM, FakeLLMConfig
+from app.ai.prompt_builder import PromptBuilder
+from app.ai.response_parser import parse_recommendation
+
+PROVIDER_NAME = "fake"
+
+
+class FakeProvider(AIProvider):
+    """AI provider backed by the fake LLM (remote server or in-process simulator)."""
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        config: FakeLLMConfig | None = None,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        """
+        Args:
+            base_url: Fake LLM server URL (None = simulate in-process)
+            config: Simulator settings for in-process mode
+            timeout_seconds: HTTP timeout for remote mode
+        """
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self._llm = None if self.base_url else FakeLLM(config or FakeLLMConfig())
+        self._client = (
+            httpx.AsyncClient(base_url=self.base_url, timeout=timeout_seconds)
+            if self.base_url
+            else None
+        )
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        start = time.perf_counter()
+        if self._client is not None:
+            response = await self._client.post("/v1/recommend", json={"context": asdict(context)})
+            # HTTPStatusError carries status and Retry-After for RetryingProvider.
+            response.raise_for_status()
+            text = response.json()["text"]
+        else:
+            assert self._llm is not None
+            text = await self._llm.complete(context)
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        rec = parse_recommendation(text, latency_ms, MODEL_NAME, PROVIDER_NAME)
+        # Estimated like a real verbose request so load tests exercise token accounting.
+        rec.prompt_tokens = PromptBuilder.estimate_tokens(
+            PromptBuilder.SYSTEM_PROMPT + PromptBuilder.build_recommendation_prompt(context)
+        )
+        rec.completion_tokens = PromptBuilder.estimate_tokens(text)
+        return rec
+
+    async def warmup(self) -> None:
+        if self._client is not None:
+            await self._client.get("/health")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def health_check(self) -> bool:
+        if self._client is None:
+            return True
+        try:
+            response = await self._client.get("/health")
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
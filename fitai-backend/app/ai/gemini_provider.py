@@ -1,99 +1,360 @@
 """Gemini-backed AI provider for set recommendations."""
 
-import json
 import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
-from app.ai.base import AIProvider, AIRecommendation, WorkoutContext
-from app.ai.prompt_builder import PromptBuilder
+from app.ai.base import (
+    STREAM_EVENT_EXPLANATION_DELTA,
+    STREAM_EVENT_FIELD,
+    STREAM_EVENT_FINAL,
+    AIProvider,
+    AIRecommendation,
+    RecommendationStreamEvent,
+    WorkoutContext,
+)
+from app.ai.conversation import ConversationSession, ConversationStore
+from app.ai.json_stream import EVENT_STRING_DELTA, EVENT_VALUE, IncrementalJSONObjectParser
+from app.ai.prompt_cache import SystemPromptCache
+from app.ai.prompt_builder import PROMPT_FORMAT_VERBOSE, PROMPT_FORMATS, PromptBuilder
+from app.ai.response_parser import (
+    BATCH_RECOMMENDATION_SCHEMA,
+    RECOMMENDATION_SCHEMA,
+    coerce_reps,
+    coerce_weight,
+    parse_batch_recommendations,
+    parse_recommendation,
+)
 
-VALID_CONFIDENCE = frozenset({"high", "medium", "low"})
+PROVIDER_NAME = "gemini"
+
+
+def _with_usage(
+    rec: AIRecommendation, usage: Any, share: int = 1, first: bool = True
+) -> AIRecommendation:
+    """Attach usage_metadata token counts.
+
+    A batch call's counts are split over its ``share`` items with floor division,
+    the remainder going to the ``first`` one, so the items sum to the billed totals.
+    """
+    prompt = getattr(usage, "prompt_token_count", None)
+    completion = getattr(usage, "candidates_token_count", None)
+    if prompt is not None:
+        rec.prompt_tokens = prompt // share + (prompt % share if first else 0)
+    if completion is not None:
+        rec.completion_tokens = completion // share + (completion % share if first else 0)
+    return rec
+
+
+def _is_cache_miss(exc: errors.ClientError) -> bool:
+    """True when a request referencing cached content failed because the cache is gone.
+
+    404, or 400 about the cached content; anything else (429 included) is not a miss.
+    """
+    if exc.code == 404:
+        return True
+    return exc.code == 400 and "cached" in str(exc.message or exc.details).lower()
 
 
 class GeminiProvider(AIProvider):
     """AI provider using Google Gemini (async via client.aio)."""
 
-    def __init__(self, api_key: str, model: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        prompt_format: str = PROMPT_FORMAT_VERBOSE,
+        prompt_token_budget: int | None = None,
+        prompt_cache: bool = False,
+        prompt_cache_ttl_seconds: int = 3600,
+        prompt_cache_min_tokens: int | None = None,
+        conversations: ConversationStore | None = None,
+        client: Any | None = None,
+    ) -> None:
+        """
+        Args:
+            api_key: Gemini API key (ignored when client is given)
+            model: Model name
+            prompt_format: "verbose" or "compact" (see PromptBuilder)
+            prompt_token_budget: Token budget for the compact format
+            prompt_cache: Register the static prefix as provider cached content
+            prompt_cache_ttl_seconds: TTL of the cached prefix (refreshed before expiry)
+            prompt_cache_min_tokens: Smallest prefix worth caching (default: the model's minimum)
+            conversations: Session store enabling conversation mode (history once, then deltas)
+            client: Pre-built genai client (tests / fakes)
+        """
+        if prompt_format not in PROMPT_FORMATS:
+            raise ValueError(
+                f"Unknown prompt format: {prompt_format!r}. Use one of: {sorted(PROMPT_FORMATS)}"
+            )
+        self.prompt_format = prompt_format
+        self.prompt_token_budget = prompt_token_budget
         self._config = types.GenerateContentConfig(
             response_mime_type="application/json",
+            response_schema=RECOMMENDATION_SCHEMA,
+            temperature=0.3,
+            max_output_tokens=512,
+            system_instruction=PromptBuilder.system_prompt_for(prompt_format),
+        )
+        # Used with a cached prefix: no system_instruction (it lives in the cache).
+        self._cached_config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=RECOMMENDATION_SCHEMA,
             temperature=0.3,
             max_output_tokens=512,
-            system_instruction=PromptBuilder.SYSTEM_PROMPT,
         )
         self.model_name = model
-        if api_key and (isinstance(api_key, str) and api_key.strip()):
+        self.conversations = conversations
+        if client is not None:
+            self._client = client
+        elif api_key and (isinstance(api_key, str) and api_key.strip()):
             try:
                 self._client = genai.Client(api_key=api_key)
             except Exception:
                 self._client = None
         else:
             self._client = None
+        self._prompt_cache: SystemPromptCache | None = None
+        if prompt_cache and self._client is not None:
+            self._prompt_cache = SystemPromptCache(
+                self._client,
+                model=model,
+                system_instruction=PromptBuilder.cached_prefix(prompt_format),
+                ttl_seconds=prompt_cache_ttl_seconds,
+                min_tokens=prompt_cache_min_tokens,
+            )
+
+    async def _request(self, contents: Any, config: types.GenerateContentConfig, stream: bool) -> Any:
+        """generate_content, or an opened stream whose first chunk has already arrived.
+
+        The SDK sends a stream request lazily, so the first chunk is pulled here to
+        surface a cache miss before anything is yielded to the caller.
+        """
+        if not stream:
+            return await self._client.aio.models.generate_content(
+                model=self.model_name, contents=contents, config=config
+            )
+        chunks = await self._client.aio.models.generate_content_stream(
+            model=self.model_name, contents=contents, config=config
+        )
+        first = await anext(chunks, None)
+
+        async def replay() -> AsyncIterator[Any]:
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+
+        return replay()
+
+    async def _generate_contents(
+        self,
+        contents: Any,
+        cached_contents: Any = None,
+        stream: bool = False,
+        **config_update: Any,
+    ) -> Any:
+        """generate_content (or stream) with the cached prefix when available, else inline.
+
+        Args:
+            contents: Contents sent with the inline system prompt
+            cached_contents: Contents sent with the cached prefix (defaults to contents)
+            stream: Return an async iterator of chunks instead of one response
+            config_update: Overrides applied to both request configs (schema, token limit)
+        """
+        handle = await self._prompt_cache.get_handle() if self._prompt_cache else None
+        if handle is not None:
+            try:
+                return await self._request(
+                    contents if cached_contents is None else cached_contents,
+                    self._cached_config.model_copy(
+                        update={**config_update, "cached_content": handle}
+                    ),
+                    stream,
+                )
+            except errors.ClientError as exc:
+                if not _is_cache_miss(exc):
+                    raise
+                # Cache expired or was evicted provider-side: drop it and send inline.
+                self._prompt_cache.invalidate()
+        config = self._config.model_copy(update=config_update) if config_update else self._config
+        return await self._request(contents, config, stream)
+
+    async def _generate(self, context: WorkoutContext, stream: bool = False) -> Any:
+        """Call generate_content for one context; the output format lives in the cached prefix."""
+        cached_prompt = None
+        if self._prompt_cache is not None:
+            cached_prompt = PromptBuilder.build_prompt(
+                context,
+                self.prompt_format,
+                self.prompt_token_budget,
+                include_output_format=False,
+            )
+        prompt = PromptBuilder.build_prompt(
+            context, self.prompt_format, self.prompt_token_budget
+        )
+        return await self._generate_contents(prompt, cached_prompt, stream=stream)
+
+    def _session_message(self, session: ConversationSession, context: WorkoutContext) -> str:
+        """Next user message: the full prompt for a new session, else only the delta."""
+        new_sets = session.new_sets(context) if session.started else None
+        follow_ups = len(session.turns) - 1
+        if new_sets is None or follow_ups >= self.conversations.max_turns:
+            session.reset()
+            return PromptBuilder.build_session_intro(
+                context, self.prompt_format, self.prompt_token_budget
+            )
+        return PromptBuilder.build_session_delta(context, new_sets, self.prompt_format)
+
+    async def _get_session_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        """Conversation mode: replay the session history and send only the new message."""
+        session = self.conversations.get(context.workout_id, context.exercise_id)
+        async with session.lock:
+            message = self._session_message(session, context)
+            contents: list[types.Content] = []
+            for turn in session.turns:
+                contents.append(types.Content(role="user", parts=[types.Part(text=turn.user)]))
+                contents.append(types.Content(role="model", parts=[types.Part(text=turn.model)]))
+            contents.append(types.Content(role="user", parts=[types.Part(text=message)]))
+
+            start = time.perf_counter()
+            response = await self._generate_contents(contents)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            text = response.text or ""
+            rec = _with_usage(
+                parse_recommendation(text, latency_ms, self.model_name, PROVIDER_NAME),
+                response.usage_metadata,
+            )
+            # Only valid answers join the history, so a bad reply is never replayed.
+            session.record(message, text, context)
+            return rec
 
     async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
         if self._client is None:
             raise ValueError("Gemini API key not configured")
-        prompt = PromptBuilder.build_recommendation_prompt(context)
+        if self.conversations is not None and context.workout_id and context.exercise_id:
+            return await self._get_session_recommendation(context)
         start = time.perf_counter()
 
-        response = await self._client.aio.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=self._config,
+        response = await self._generate(context)
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        return _with_usage(
+            parse_recommendation(response.text or "", latency_ms, self.model_name, PROVIDER_NAME),
+            response.usage_metadata,
         )
-        if not response.text:
-            raise ValueError("Gemini returned empty response")
 
-        raw_response = response.text
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        """Stream via generate_content_stream, decoding the JSON object incrementally."""
+        if self._client is None:
+            raise ValueError("Gemini API key not configured")
+        start = time.perf_counter()
+        stream = await self._generate(context, stream=True)
+        parser: IncrementalJSONObjectParser | None = IncrementalJSONObjectParser()
+        chunks: list[str] = []
+        usage = None
+        async for chunk in stream:
+            text = chunk.text or ""
+            chunks.append(text)
+            usage = chunk.usage_metadata or usage  # running totals; the last chunk is final
+            if parser is None:
+                continue
+            try:
+                decoded = parser.feed(text)
+            except ValueError:
+                # Not a flat object; stop early events, the final parse reports (or repairs) it.
+                parser = None
+                continue
+            for event in self._stream_events(decoded):
+                yield event
+
         latency_ms = int((time.perf_counter() - start) * 1000)
+        yield RecommendationStreamEvent(
+            STREAM_EVENT_FINAL,
+            recommendation=_with_usage(
+                parse_recommendation("".join(chunks), latency_ms, self.model_name, PROVIDER_NAME),
+                usage,
+            ),
+        )
 
-        try:
-            data: dict[str, Any] = json.loads(raw_response)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Gemini response is not valid JSON: {e}") from e
+    @staticmethod
+    def _stream_events(decoded: list[tuple[str, str, Any]]) -> list[RecommendationStreamEvent]:
+        """Map decoder events to stream events; early fields go through the shared coercion."""
+        events: list[RecommendationStreamEvent] = []
+        for kind, key, value in decoded:
+            try:
+                if kind == EVENT_VALUE and key == "suggested_weight_kg":
+                    events.append(RecommendationStreamEvent(STREAM_EVENT_FIELD, key, coerce_weight(value)))
+                elif kind == EVENT_VALUE and key == "suggested_reps":
+                    events.append(RecommendationStreamEvent(STREAM_EVENT_FIELD, key, coerce_reps(value)))
+                elif kind == EVENT_STRING_DELTA and key == "explanation":
+                    events.append(RecommendationStreamEvent(STREAM_EVENT_EXPLANATION_DELTA, key, value))
+            except ValueError:
+                continue
+        return events
 
-        suggested_weight_kg = data.get("suggested_weight_kg")
-        suggested_reps = data.get("suggested_reps")
-        explanation = data.get("explanation")
-        confidence = data.get("confidence")
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """One generate_content call for several independent contexts, keyed by request id.
 
-        if not isinstance(suggested_weight_kg, (int, float)):
-            raise ValueError(
-                f"Invalid suggested_weight_kg: expected number, got {type(suggested_weight_kg).__name__}"
-            )
-        if not isinstance(suggested_reps, int):
-            raise ValueError(
-                f"Invalid suggested_reps: expected int, got {type(suggested_reps).__name__}"
-            )
-        if not isinstance(explanation, str) or not explanation.strip():
-            raise ValueError(
-                "Invalid explanation: expected non-empty string"
-            )
-        if confidence not in VALID_CONFIDENCE:
-            raise ValueError(
-                f"Invalid confidence: expected one of {sorted(VALID_CONFIDENCE)}, got {confidence!r}"
-            )
+        Items missing from the response or failing validation get a ValueError of
+        their own; a failure of the whole call is raised.
+        """
+        if self._client is None:
+            raise ValueError("Gemini API key not configured")
+        if len(contexts) == 1:
+            ((request_id, ctx),) = contexts.items()
+            return {request_id: await self.get_recommendation(ctx)}
 
-        return AIRecommendation(
-            suggested_weight_kg=float(suggested_weight_kg),
-            suggested_reps=int(suggested_reps),
-            explanation=explanation.strip(),
-            confidence=confidence,
-            raw_response=raw_response,
-            latency_ms=latency_ms,
-            model_used=self.model_name,
+        prompt = PromptBuilder.build_batch_prompt(
+            contexts, self.prompt_format, self.prompt_token_budget
+        )
+        start = time.perf_counter()
+        # The batch prompt states its own output format (and the schema enforces it),
+        # so the cached request sends the same contents as the inline one.
+        response = await self._generate_contents(
+            prompt,
+            response_schema=BATCH_RECOMMENDATION_SCHEMA,
+            max_output_tokens=self._config.max_output_tokens * len(contexts),
+        )
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        results = parse_batch_recommendations(
+            response.text or "", list(contexts), latency_ms, self.model_name, PROVIDER_NAME
         )
+        # Failed items carry no counts, so the billed totals go to the valid ones.
+        valid = [r for r in results.values() if isinstance(r, AIRecommendation)]
+        for i, result in enumerate(valid):
+            _with_usage(result, response.usage_metadata, share=len(valid), first=i == 0)
+        return results
+
+    def end_session(self, workout_id: str) -> None:
+        if self.conversations is not None:
+            self.conversations.evict_workout(workout_id)
+
+    async def warmup(self) -> None:
+        """Open the HTTPS connection with a metadata lookup and register the cached prefix."""
+        if self._client is None:
+            return
+        await self._client.aio.models.get(model=self.model_name)
+        if self._prompt_cache is not None:
+            await self._prompt_cache.refresh()
+
+    async def aclose(self) -> None:
+        """Delete the cached prefix so it stops accruing storage until its TTL."""
+        if self._prompt_cache is not None:
+            await self._prompt_cache.aclose()
 
     async def health_check(self) -> bool:
+        """Check reachability with a model metadata lookup (no generation, no token spend)."""
         if self._client is None:
             return False
         try:
-            await self._client.aio.models.generate_content(
-                model=self.model_name,
-                contents="Reply with OK.",
-            )
+            await self._client.aio.models.get(model=self.model_name)
             return True
         except Exception:
-            return False
\ No newline at end of file
+            return False
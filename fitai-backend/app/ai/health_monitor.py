@@ -0,0 +1,100 @@
+"""Background AI provider health monitor.
+
+Probes the provider on a fixed schedule and caches the last result with a
+timestamp, so health endpoints read cached state instead of calling the
+provider on every load-balancer probe.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.ai.base import AIProvider
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderHealth:
+    """Last known provider health. ok is None until the first probe completes."""
+
+    ok: bool | None
+    checked_at: datetime | None
+    latency_ms: int | None = None
+    error: str | None = None
+
+
+class ProviderHealthMonitor:
+    """Periodically runs provider.health_check() in a background task."""
+
+    def __init__(
+        self,
+        provider: AIProvider,
+        interval_seconds: float,
+        timeout_seconds: float,
+    ) -> None:
+        self.provider = provider
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._state = ProviderHealth(ok=None, checked_at=None)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def state(self) -> ProviderHealth:
+        return self._state
+
+    def is_stale(self, now: datetime | None = None) -> bool:
+        """True if no probe has completed within three intervals."""
+        if self._state.checked_at is None:
+            return True
+        now = now or datetime.now(timezone.utc)
+        age = (now - self._state.checked_at).total_seconds()
+        return age > 3 * self.interval_seconds
+
+    async def probe_once(self) -> ProviderHealth:
+        """Run one probe and cache the result; never raises."""
+        start = time.perf_counter()
+        error: str | None = None
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                ok = await self.provider.health_check()
+            if not ok:
+                error = "provider returned False"
+        except TimeoutError:
+            ok = False
+            error = f"timed out after {self.timeout_seconds:g}s"
+        except Exception as e:
+            ok = False
+            error = str(e) or type(e).__name__
+        if error:
+            logger.warning("AI health probe failed: %s", error)
+        self._state = ProviderHealth(
+            ok=ok,
+            checked_at=datetime.now(timezone.utc),
+            latency_ms=int((time.perf_counter() - start) * 1000),
+            error=error,
+        )
+        return self._state
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background probe loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="ai-health-monitor")
+
+    async def stop(self) -> None:
+        """Cancel the background probe loop and wait for it to exit."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,135 @@
+"""Incremental decoder for a flat JSON object arriving in arbitrary chunks.
+
+Used for streamed provider output: each top-level key/value pair is reported as
+soon as its value is complete, and string values also report decoded text as it
+arrives, so short numeric fields can be surfaced before a long free-text field
+has finished generating. Only flat objects with scalar values are supported.
+"""
+
+import json
+from typing import Any
+
+EVENT_VALUE = "value"  # (EVENT_VALUE, key, decoded value)
+EVENT_STRING_DELTA = "string_delta"  # (EVENT_STRING_DELTA, key, newly decoded text)
+
+_WS = frozenset(" \t\r\n")
+
+
+def _complete_escape_prefix(raw: str) -> str:
+    """Longest prefix of a raw JSON string body that does not end mid-escape."""
+    i = 0
+    last_ok = 0
+    n = len(raw)
+    while i < n:
+        if raw[i] == "\\":
+            if i + 1 >= n:
+                break
+            step = 6 if raw[i + 1] == "u" else 2
+            if i + step > n:
+                break
+            i += step
+        else:
+            i += 1
+        last_ok = i
+    return raw[:last_ok]
+
+
+class IncrementalJSONObjectParser:
+    """Feed chunks with feed(); collect completed pairs from the returned events."""
+
+    def __init__(self) -> None:
+        self._state = "start"
+        self._buf: list[str] = []
+        self._escape = False
+        self._key: str | None = None
+        self._emitted = ""
+        self.values: dict[str, Any] = {}
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> list[tuple[str, str, Any]]:
+        events: list[tuple[str, str, Any]] = []
+        for c in chunk:
+            self._consume(c, events)
+        if self._state == "string_value":
+            self._string_delta(events)
+        return events
+
+    def _consume(self, c: str, events: list[tuple[str, str, Any]]) -> None:
+        state = self._state
+        if state == "start":
+            if c == "{":
+                self._state = "key_or_end"
+            # Anything before the opening brace (e.g. a code fence) is skipped.
+        elif state == "key_or_end":
+            if c == '"':
+                self._buf = []
+                self._state = "key"
+            elif c == "}":
+                self._state = "done"
+            elif c not in _WS:
+                raise ValueError(f"Unexpected {c!r} while expecting a key")
+        elif state in ("key", "string_value"):
+            if self._escape:
+                self._escape = False
+                self._buf.append(c)
+            elif c == "\\":
+                self._escape = True
+                self._buf.append(c)
+            elif c == '"':
+                decoded = json.loads('"' + "".join(self._buf) + '"')
+                if state == "key":
+                    self._key = decoded
+                    self._state = "colon"
+                else:
+                    self._string_delta(events, final=decoded)
+                    self._set_value(decoded, events)
+            else:
+                self._buf.append(c)
+        elif state == "colon":
+            if c == ":":
+                self._state = "value"
+            elif c not in _WS:
+                raise ValueError(f"Unexpected {c!r} while expecting ':'")
+        elif state == "value":
+            if c == '"':
+                self._buf = []
+                self._emitted = ""
+                self._state = "string_value"
+            elif c in "{[":
+                raise ValueError("Nested JSON values are not supported")
+            elif c not in _WS:
+                self._buf = [c]
+                self._state = "scalar_value"
+        elif state == "scalar_value":
+            if c in _WS or c in ",}":
+                self._set_value(json.loads("".join(self._buf)), events)
+                self._consume(c, events)
+            else:
+                self._buf.append(c)
+        elif state == "comma_or_end":
+            if c == ",":
+                self._state = "key_or_end"
+            elif c == "}":
+                self._state = "done"
+            elif c not in _WS:
+                raise ValueError(f"Unexpected {c!r} after value")
+        # state == "done": trailing output is ignored.
+
+    def _set_value(self, value: Any, events: list[tuple[str, str, Any]]) -> None:
+        assert self._key is not None
+        self.values[self._key] = value
+        events.append((EVENT_VALUE, self._key, value))
+        self._state = "comma_or_end"
+
+    def _string_delta(
+        self, events: list[tuple[str, str, Any]], final: str | None = None
+    ) -> None:
+        if final is None:
+            final = json.loads('"' + _complete_escape_prefix("".join(self._buf)) + '"')
+        if final.startswith(self._emitted) and len(final) > len(self._emitted):
+            assert self._key is not None
+            events.append((EVENT_STRING_DELTA, self._key, final[len(self._emitted):]))
+            self._emitted = final
@@ -1,7 +1,19 @@
-"""Prompt building for AI set recommendations."""
+"""Prompt building for AI set recommendations.
+
+Two formats are supported:
+- "verbose": prose lines per set (original format).
+- "compact": CSV-style set history with short headers, trimmed to a token budget
+  by summarizing (then dropping) the oldest sessions first.
+"""
+
+import math
 
 from app.ai.base import WorkoutContext
 
+PROMPT_FORMAT_VERBOSE = "verbose"
+PROMPT_FORMAT_COMPACT = "compact"
+PROMPT_FORMATS = frozenset({PROMPT_FORMAT_VERBOSE, PROMPT_FORMAT_COMPACT})
+
 
 class PromptBuilder:
     """Builds system and user prompts for recommendation requests."""
@@ -32,9 +44,74 @@ class PromptBuilder:
     "- Do not increase weight aggressively if recent sets were near failure.\n"
 )
 
+    COMPACT_SYSTEM_PROMPT: str = (
+    "You are an expert strength coach. Recommend the NEXT SET ONLY for the athlete.\n"
+    "Reply with exactly one JSON object, no markdown. Weights in kg on a 1.25 kg grid, reps integer.\n"
+    "Progress conservatively when fatigue is high or recent sets were near failure.\n"
+    "Input: cur = this session (set,kg,reps,rpe); hist = past sessions, newest first "
+    "(kg x reps @rpe; 'sum' lines are summaries: n sets, top set, mean rpe).\n"
+)
+
+    OUTPUT_FORMAT: str = (
+        "Respond with ONLY a JSON object with exactly these keys (no other keys, no extra text):\n"
+        '  "suggested_weight_kg": <number in kg, e.g. 82.5>,\n'
+        '  "suggested_reps": <integer number of reps>,\n'
+        '  "explanation": "<short reason for this recommendation>",\n'
+        '  "confidence": "<one of: high | medium | low>"'
+    )
+
+    COMPACT_OUTPUT_FORMAT: str = (
+        'JSON: {"suggested_weight_kg":num,"suggested_reps":int,"explanation":str,'
+        '"confidence":"high|medium|low"}'
+    )
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token estimate (~4 characters per token), good enough for budgeting."""
+        return math.ceil(len(text) / 4)
+
     @classmethod
-    def build_recommendation_prompt(cls, ctx: WorkoutContext) -> str:
-        """Build the user prompt for a single set recommendation."""
+    def system_prompt_for(cls, prompt_format: str) -> str:
+        """Return the system prompt matching a prompt format."""
+        if prompt_format == PROMPT_FORMAT_COMPACT:
+            return cls.COMPACT_SYSTEM_PROMPT
+        return cls.SYSTEM_PROMPT
+
+    @classmethod
+    def cached_prefix(cls, prompt_format: str) -> str:
+        """Static prefix for provider-side caching: system prompt plus output format."""
+        if prompt_format == PROMPT_FORMAT_COMPACT:
+            return f"{cls.COMPACT_SYSTEM_PROMPT}\n{cls.COMPACT_OUTPUT_FORMAT}\n"
+        return f"{cls.SYSTEM_PROMPT}\n{cls.OUTPUT_FORMAT}\n"
+
+    @classmethod
+    def build_prompt(
+        cls,
+        ctx: WorkoutContext,
+        prompt_format: str = PROMPT_FORMAT_VERBOSE,
+        token_budget: int | None = None,
+        include_output_format: bool = True,
+    ) -> str:
+        """Build the user prompt in the requested format."""
+        if prompt_format == PROMPT_FORMAT_COMPACT:
+            return cls.build_compact_prompt(
+                ctx, token_budget=token_budget, include_output_format=include_output_format
+            )
+        if prompt_format != PROMPT_FORMAT_VERBOSE:
+            raise ValueError(
+                f"Unknown prompt format: {prompt_format!r}. Use one of: {sorted(PROMPT_FORMATS)}"
+            )
+        return cls.build_recommendation_prompt(ctx, include_output_format=include_output_format)
+
+    @classmethod
+    def build_recommendation_prompt(
+        cls, ctx: WorkoutContext, include_output_format: bool = True
+    ) -> str:
+        """Build the user prompt for a single set recommendation.
+
+        include_output_format=False omits the JSON key spec, for requests whose
+        cached prefix already carries it (see cached_prefix()).
+        """
         lines = [
             "Recommend the next set for this exercise.",
             "",
@@ -75,15 +152,95 @@ class PromptBuilder:
         lines.append(f"Workout duration so far: {ctx.workout_duration_minutes} minutes")
         lines.append("")
 
-        lines.append(
-            "Respond with ONLY a JSON object with exactly these keys (no other keys, no extra text):"
+        if include_output_format:
+            lines.append(cls.OUTPUT_FORMAT)
+        return "\n".join(lines)
+
+    SESSION_NOTE: str = (
+        "Follow-up messages in this conversation only list new sets of this exercise "
+        "and today's fatigue counters; answer each with the same JSON."
+    )
+
+    @classmethod
+    def build_session_intro(
+        cls,
+        ctx: WorkoutContext,
+        prompt_format: str = PROMPT_FORMAT_VERBOSE,
+        token_budget: int | None = None,
+        include_output_format: bool = True,
+    ) -> str:
+        """First message of a conversation session: the full prompt plus the follow-up note."""
+        body = cls.build_prompt(ctx, prompt_format, token_budget, include_output_format)
+        return f"{body}\n{cls.SESSION_NOTE}"
+
+    @classmethod
+    def build_session_delta(
+        cls,
+        ctx: WorkoutContext,
+        new_sets: list[dict],
+        prompt_format: str = PROMPT_FORMAT_VERBOSE,
+    ) -> str:
+        """Follow-up message of a conversation session: new sets and fatigue counters only."""
+        if prompt_format == PROMPT_FORMAT_COMPACT:
+            rest = (
+                f" rest_s={ctx.seconds_since_last_set}"
+                if ctx.seconds_since_last_set is not None
+                else ""
+            )
+            lines = ["new set,kg,reps,rpe" if new_sets else "new none"]
+            for s in new_sets:
+                lines.append(
+                    f"{s.get('set_number', '?')},{cls._num(s.get('weight_kg', '?'))},"
+                    f"{s.get('reps', '?')},{cls._num(s.get('rpe'))}"
+                )
+            lines.append(
+                f"today_sets={ctx.total_sets_today} min={ctx.workout_duration_minutes}{rest}"
+            )
+            lines.append("Next set?")
+            return "\n".join(lines)
+
+        lines = ["New sets:" if new_sets else "No new sets."]
+        if new_sets:
+            lines.append(cls._format_current_sets(new_sets))
+        fatigue = (
+            f"Fatigue: {ctx.total_sets_today} sets today, "
+            f"{ctx.workout_duration_minutes} minutes"
         )
-        lines.append('  "suggested_weight_kg": <number in kg, e.g. 82.5>,')
-        lines.append('  "suggested_reps": <integer number of reps>,')
-        lines.append('  "explanation": "<short reason for this recommendation>",')
-        lines.append('  "confidence": "<one of: high | medium | low>"')
+        if ctx.seconds_since_last_set is not None:
+            fatigue += f", {ctx.seconds_since_last_set} s since last set"
+        lines.append(fatigue)
+        lines.append("Recommend the next set.")
         return "\n".join(lines)
 
+    BATCH_OUTPUT_FORMAT: str = (
+        "Each request above is a different, independent athlete. Recommend the next set "
+        "for EACH request separately.\n"
+        'Respond with ONLY a JSON object: {"recommendations": [ ... ]} containing exactly one '
+        "entry per request, each with exactly these keys:\n"
+        '  "request_id": "<the request id>",\n'
+        '  "suggested_weight_kg": <number in kg, e.g. 82.5>,\n'
+        '  "suggested_reps": <integer number of reps>,\n'
+        '  "explanation": "<short reason for this recommendation>",\n'
+        '  "confidence": "<one of: high | medium | low>"'
+    )
+
+    @classmethod
+    def build_batch_prompt(
+        cls,
+        contexts: dict[str, WorkoutContext],
+        prompt_format: str = PROMPT_FORMAT_VERBOSE,
+        token_budget: int | None = None,
+    ) -> str:
+        """Build one prompt covering several independent contexts, keyed by request id."""
+        blocks = []
+        for request_id, ctx in contexts.items():
+            body = cls.build_prompt(
+                ctx, prompt_format, token_budget, include_output_format=False
+            ).rstrip()
+            blocks.append(f"=== request_id: {request_id} ===\n{body}")
+        blocks.append(cls.BATCH_OUTPUT_FORMAT)
+        return "\n\n".join(blocks)
+
     @staticmethod
     def _format_current_sets(sets: list[dict]) -> str:
         """Format current session sets for the prompt."""
@@ -116,3 +273,107 @@ class PromptBuilder:
                 parts.append(" " + "; ".join(set_strs))
             out.append("".join(parts).strip())
         return "\n".join(out) if out else "  (none)"
+
+    @staticmethod
+    def _num(value: object) -> str:
+        """Format a number without a trailing .0 (60.0 -> 60, 62.5 -> 62.5)."""
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    @classmethod
+    def _compact_set(cls, s: dict) -> str:
+        rpe = s.get("rpe")
+        rpe_str = f"@{cls._num(rpe)}" if rpe is not None else ""
+        return f"{cls._num(s.get('weight_kg', '?'))}x{s.get('reps', '?')}{rpe_str}"
+
+    @classmethod
+    def _compact_summary(cls, sets: list[dict]) -> str:
+        """One-token-cheap summary of a list of sets: count, top set, mean RPE."""
+        if not sets:
+            return "n=0"
+        top = max(sets, key=lambda s: (float(s.get("weight_kg") or 0), s.get("reps") or 0))
+        rpes = [float(s["rpe"]) for s in sets if s.get("rpe") is not None]
+        out = f"n={len(sets)} top={cls._compact_set({**top, 'rpe': None})}"
+        if rpes:
+            out += f" rpe~{sum(rpes) / len(rpes):.1f}"
+        return out
+
+    @classmethod
+    def _compact_session_line(cls, session: dict, summarize: bool) -> str:
+        sets = session.get("sets", [])
+        date = session.get("date", "")
+        if summarize:
+            return f"{date} sum {cls._compact_summary(sets)}"
+        return f"{date} " + ";".join(cls._compact_set(s) for s in sets)
+
+    @classmethod
+    def build_compact_prompt(
+        cls,
+        ctx: WorkoutContext,
+        token_budget: int | None = None,
+        include_output_format: bool = True,
+    ) -> str:
+        """
+        Build a compact, CSV-style user prompt.
+
+        When token_budget is set and the estimate exceeds it, the oldest sessions
+        are summarized one by one, then dropped oldest-first. Current-session sets
+        and the response-format line are always kept.
+        """
+        head = [
+            "Next set?",
+            (
+                f"ex={ctx.exercise_name}|{ctx.muscle_group}|{ctx.equipment_type}|"
+                f"{'compound' if ctx.is_compound else 'isolation'}"
+            ),
+            (
+                f"1rm={cls._num(ctx.estimated_1rm) or 'na'} pb={cls._num(ctx.max_weight_ever) or 'na'} "
+                f"today_sets={ctx.total_sets_today} min={ctx.workout_duration_minutes}"
+            ),
+        ]
+
+        cur = ctx.current_session_sets or []
+        cur_lines: list[str] = []
+        if cur:
+            cur_lines.append("cur set,kg,reps,rpe")
+            for s in cur:
+                cur_lines.append(
+                    f"{s.get('set_number', '?')},{cls._num(s.get('weight_kg', '?'))},"
+                    f"{s.get('reps', '?')},{cls._num(s.get('rpe'))}"
+                )
+        else:
+            cur_lines.append("cur none")
+
+        tail = [cls.COMPACT_OUTPUT_FORMAT] if include_output_format else []
+
+        sessions = list(ctx.recent_sessions or [])
+        summarized = [False] * len(sessions)
+
+        def render() -> str:
+            hist: list[str] = []
+            if sessions:
+                hist.append("hist")
+                hist.extend(
+                    cls._compact_session_line(sess, summarized[i])
+                    for i, sess in enumerate(sessions)
+                )
+            return "\n".join(head + cur_lines + hist + tail)
+
+        prompt = render()
+        if token_budget is None:
+            return prompt
+
+        # Oldest session is last in recent_sessions (newest first).
+        for i in reversed(range(len(sessions))):
+            if cls.estimate_tokens(prompt) <= token_budget:
+                return prompt
+            summarized[i] = True
+            prompt = render()
+        while sessions and cls.estimate_tokens(prompt) > token_budget:
+            sessions.pop()
+            summarized.pop()
+            prompt = render()
+        return prompt
@@ -0,0 +1,180 @@
+"""Provider-side caching of the static prompt prefix (Gemini context caching).
+
+The system prompt and output-format instructions are identical on every call.
+SystemPromptCache registers them once per model as cached content and hands the
+handle name to the provider so requests reference the cache instead of resending
+the prefix.
+
+Registration never runs on the request path: get_handle() returns the current
+handle (or None) immediately and starts a background refresh when the handle is
+missing or close to expiry. A refresh deletes the cache it replaces, and aclose()
+deletes the last one, so stale caches do not keep costing storage until their TTL.
+
+Prefixes below the model's minimum cacheable size are never registered (logged
+once). If the provider cannot create a cache (unsupported model, quota, network),
+the provider sends the prefix inline and registration is retried after a cool-down.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from google.genai import types
+
+from app.ai.prompt_builder import PromptBuilder
+
+logger = logging.getLogger(__name__)
+
+
+# Smallest prefix (tokens) each model family accepts as explicit cached content;
+# other models use DEFAULT_MIN_CACHE_TOKENS.
+MIN_CACHE_TOKENS = {
+    "gemini-2.5-flash": 1024,
+    "gemini-2.5-pro": 4096,
+}
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+
+def min_cache_tokens(model: str) -> int:
+    """Minimum cacheable prefix size for a model name (longest matching family wins)."""
+    for family in sorted(MIN_CACHE_TOKENS, key=len, reverse=True):
+        if model.removeprefix("models/").startswith(family):
+            return MIN_CACHE_TOKENS[family]
+    return DEFAULT_MIN_CACHE_TOKENS
+
+
+class SystemPromptCache:
+    """Cached-content handle for one model + prefix, registered and refreshed in the background."""
+
+    def __init__(
+        self,
+        client: Any,
+        model: str,
+        system_instruction: str,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        retry_after_failure_seconds: int = 600,
+        min_tokens: int | None = None,
+    ) -> None:
+        """
+        Args:
+            client: genai client
+            model: Model name
+            system_instruction: Static prefix to cache
+            ttl_seconds: Cache TTL
+            refresh_margin_seconds: Refresh this long before expiry
+            retry_after_failure_seconds: Cool-down after a failed registration
+            min_tokens: Minimum cacheable prefix size (default: min_cache_tokens(model))
+        """
+        self._client = client
+        self.model = model
+        self.system_instruction = system_instruction
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = min(refresh_margin_seconds, ttl_seconds // 2)
+        self.retry_after_failure_seconds = retry_after_failure_seconds
+        self.min_tokens = min_cache_tokens(model) if min_tokens is None else min_tokens
+        self._name: str | None = None
+        self._expires_at: datetime | None = None
+        self._disabled_until: datetime | None = None
+        self._refresh_task: asyncio.Task | None = None
+        prefix_tokens = PromptBuilder.estimate_tokens(system_instruction)
+        self.cacheable = prefix_tokens >= self.min_tokens
+        if not self.cacheable:
+            logger.info(
+                "Prompt prefix (~%d tokens) is below the %d-token cache minimum for %s; "
+                "sending it inline",
+                prefix_tokens,
+                self.min_tokens,
+                model,
+            )
+
+    @property
+    def name(self) -> str | None:
+        return self._name
+
+    def _is_fresh(self, now: datetime) -> bool:
+        return (
+            self._name is not None
+            and self._expires_at is not None
+            and now < self._expires_at - timedelta(seconds=self.refresh_margin_seconds)
+        )
+
+    def _is_live(self, now: datetime) -> bool:
+        return self._name is not None and self._expires_at is not None and now < self._expires_at
+
+    async def get_handle(self) -> str | None:
+        """
+        Return the live cached-content name, or None to send the prefix inline.
+
+        Never waits on the provider: a missing or nearly expired handle starts a
+        background refresh and the current handle (if still live) is returned.
+        """
+        if not self.cacheable:
+            return None
+        now = datetime.now(timezone.utc)
+        if self._is_fresh(now):
+            return self._name
+        if self._disabled_until is None or now >= self._disabled_until:
+            self._start_refresh()
+        return self._name if self._is_live(now) else None
+
+    def _start_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> str | None:
+        """Register a new cache now (startup warmup, background refresh); returns its name."""
+        if not self.cacheable:
+            return None
+        now = datetime.now(timezone.utc)
+        try:
+            cached = await self._client.aio.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=self.system_instruction,
+                    ttl=f"{self.ttl_seconds}s",
+                    display_name="fitai-system-prompt",
+                ),
+            )
+        except Exception as e:
+            logger.warning(
+                "Prompt cache registration failed for %s; sending prefix inline for %ss: %s",
+                self.model,
+                self.retry_after_failure_seconds,
+                e,
+            )
+            self._disabled_until = now + timedelta(seconds=self.retry_after_failure_seconds)
+            return None
+        expires_at = cached.expire_time or now + timedelta(seconds=self.ttl_seconds)
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        previous, self._name, self._expires_at = self._name, cached.name, expires_at
+        self._disabled_until = None
+        logger.info("Registered prompt cache %s for %s (expires %s)", cached.name, self.model, expires_at)
+        if previous is not None and previous != cached.name:
+            await self._delete(previous)
+        return self._name
+
+    async def _delete(self, name: str) -> None:
+        try:
+            await self._client.aio.caches.delete(name=name)
+        except Exception as e:
+            logger.warning("Could not delete prompt cache %s: %s", name, e)
+
+    def invalidate(self) -> None:
+        """Forget the current handle (e.g. provider reported it missing); it is re-registered in the background."""
+        self._name = None
+        self._expires_at = None
+
+    async def aclose(self) -> None:
+        """Stop a pending refresh and delete the current cache."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        if self._name is not None:
+            await self._delete(self._name)
+            self.invalidate()
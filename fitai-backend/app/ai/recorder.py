@@ -0,0 +1,234 @@
+"""Opt-in recorder of recommendation contexts for offline replay.
+
+The recommendations table stores outcomes only; the WorkoutContext behind each
+one is rebuilt from the database at request time and then lost. With
+AI_RECORD_PATH set, RecordingProvider appends every context together with the
+answer it got (raw provider response, weight, reps, latency) or the error it
+failed with to a local append-only file. scripts/replay_recommendations.py feeds
+that corpus to a provider or the rule engine.
+
+File format: a sequence of frames, each a 4-byte big-endian length followed by
+one zlib-compressed JSON record. Frames are buffered in memory and appended in
+one write, so a crash can at worst leave a truncated last frame, which
+read_records skips. "{pid}" in the path is replaced by the process id so several
+workers do not interleave writes in one file.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.ai.base import (
+    STREAM_EVENT_FINAL,
+    AIProvider,
+    AIRecommendation,
+    RecommendationStreamEvent,
+    WorkoutContext,
+)
+
+logger = logging.getLogger(__name__)
+
+RECORD_VERSION = 1
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def encode_record(record: dict) -> bytes:
+    """One frame: length header + zlib-compressed JSON."""
+    payload = zlib.compress(json.dumps(record, separators=(",", ":"), default=str).encode())
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def read_records(path: str | Path, limit: int | None = None) -> Iterator[dict]:
+    """
+    Iterate the records of a recorder file in write order.
+
+    Args:
+        path: Recorder file
+        limit: Stop after this many records
+
+    Yields:
+        Record dicts ({"context": {...}, "raw_response": ..., "error": ..., ...})
+    """
+    count = 0
+    with open(path, "rb") as f:
+        while limit is None or count < limit:
+            header = f.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            (size,) = _FRAME_HEADER.unpack(header)
+            payload = f.read(size)
+            if len(payload) < size:
+                logger.warning("Truncated last record in %s; ignoring it", path)
+                return
+            yield json.loads(zlib.decompress(payload))
+            count += 1
+
+
+class ContextRecorder:
+    """Buffers encoded records and appends them to the recorder file in batches."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        sample_rate: float = 1.0,
+        flush_every: int = 64,
+        flush_interval_seconds: float = 5.0,
+        rng: random.Random | None = None,
+    ) -> None:
+        """
+        Args:
+            path: Recorder file; "{pid}" is replaced by the process id
+            sample_rate: Fraction of calls recorded (0..1)
+            flush_every: Buffered records that trigger a write
+            flush_interval_seconds: Oldest buffered record age that triggers a write
+            rng: Random source for sampling (tests)
+        """
+        self.path = Path(str(path).replace("{pid}", str(os.getpid())))
+        self.sample_rate = sample_rate
+        self.flush_every = flush_every
+        self.flush_interval_seconds = flush_interval_seconds
+        self._rng = rng or random.Random()
+        self._buffer: list[bytes] = []
+        self._first_buffered_at = 0.0
+        self._write_lock = threading.Lock()
+        self._flushes: set[asyncio.Task] = set()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or self._rng.random() < self.sample_rate
+
+    def record(
+        self,
+        context: WorkoutContext,
+        rec: AIRecommendation | None,
+        latency_ms: int,
+        error: BaseException | None = None,
+    ) -> None:
+        """Buffer one call (the caller decides sampling via sampled())."""
+        self._buffer.append(
+            encode_record(
+                {
+                    "v": RECORD_VERSION,
+                    "recorded_at": datetime.now(timezone.utc).isoformat(),
+                    "context": asdict(context),
+                    "provider": rec.provider if rec else None,
+                    "model_used": rec.model_used if rec else None,
+                    "raw_response": rec.raw_response if rec else None,
+                    "suggested_weight_kg": rec.suggested_weight_kg if rec else None,
+                    "suggested_reps": rec.suggested_reps if rec else None,
+                    "confidence": rec.confidence if rec else None,
+                    "latency_ms": latency_ms,
+                    "error": f"{type(error).__name__}: {error}" if error else None,
+                }
+            )
+        )
+        now = time.monotonic()
+        if len(self._buffer) == 1:
+            self._first_buffered_at = now
+        if (
+            len(self._buffer) >= self.flush_every
+            or now - self._first_buffered_at >= self.flush_interval_seconds
+        ):
+            task = asyncio.get_running_loop().create_task(self.flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    def _write(self, data: bytes) -> None:
+        with self._write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(data)
+
+    async def flush(self) -> None:
+        """Append everything buffered so far (off the event loop); errors only log."""
+        data, self._buffer = b"".join(self._buffer), []
+        if not data:
+            return
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError:
+            logger.exception("Writing recommendation records to %s failed", self.path)
+
+    async def aclose(self) -> None:
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+
+class RecordingProvider(AIProvider):
+    """Records each (sampled) call's context and answer or error, then passes it through."""
+
+    def __init__(self, inner: AIProvider, recorder: ContextRecorder) -> None:
+        self.inner = inner
+        self.recorder = recorder
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        if not self.recorder.sampled():
+            return await self.inner.get_recommendation(context)
+        start = time.perf_counter()
+        try:
+            rec = await self.inner.get_recommendation(context)
+        except Exception as e:
+            self.recorder.record(context, None, int((time.perf_counter() - start) * 1000), e)
+            raise
+        self.recorder.record(context, rec, int((time.perf_counter() - start) * 1000))
+        return rec
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """Sampled per item; every recorded item gets the latency of the whole batch call."""
+        sampled = [request_id for request_id in contexts if self.recorder.sampled()]
+        if not sampled:
+            return await self.inner.get_batch_recommendations(contexts)
+        start = time.perf_counter()
+        try:
+            results = await self.inner.get_batch_recommendations(contexts)
+        except Exception as e:
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            for request_id in sampled:
+                self.recorder.record(contexts[request_id], None, latency_ms, e)
+            raise
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        for request_id in sampled:
+            result = results.get(request_id)
+            if isinstance(result, AIRecommendation):
+                self.recorder.record(contexts[request_id], result, latency_ms)
+            elif isinstance(result, Exception):
+                self.recorder.record(contexts[request_id], None, latency_ms, result)
+        return results
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        if not self.recorder.sampled():
+            async for event in self.inner.stream_recommendation(context):
+                yield event
+            return
+        start = time.perf_counter()
+        try:
+            async for event in self.inner.stream_recommendation(context):
+                if event.kind == STREAM_EVENT_FINAL and event.recommendation is not None:
+                    self.recorder.record(
+                        context, event.recommendation, int((time.perf_counter() - start) * 1000)
+                    )
+                yield event
+        except Exception as e:
+            self.recorder.record(context, None, int((time.perf_counter() - start) * 1000), e)
+            raise
+
+    async def aclose(self) -> None:
+        await self.recorder.aclose()
+        await self.inner.aclose()
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
@@ -0,0 +1,290 @@
+"""Shared parsing and validation of provider recommendation output.
+
+Providers request schema-constrained JSON (RECOMMENDATION_SCHEMA /
+BATCH_RECOMMENDATION_SCHEMA) and hand the raw text to this module. Common
+near-misses are repaired instead of discarding the call:
+
+- Markdown code fences or prose around the JSON object
+- Numbers sent as strings ("62.5", "62.5 kg", "8 reps") and integral floats for reps
+- Weights off the 1.25 kg plate grid (snapped to the nearest step)
+- Confidence with stray case or whitespace ("High ")
+
+Anything that cannot be repaired (missing fields, negative weight, unknown
+confidence) raises ValueError so the caller falls back to the rule engine.
+Every parse is counted in AI_RESPONSE_PARSE_TOTAL by result (ok / repaired / rejected).
+"""
+
+import json
+import math
+import re
+from typing import Any
+
+from app.ai.base import AIRecommendation
+from app.core.metrics import AI_RESPONSE_PARSE_TOTAL
+
+VALID_CONFIDENCE = frozenset({"high", "medium", "low"})
+WEIGHT_STEP_KG = 1.25
+MAX_REPS = 100
+
+PARSE_OK = "ok"
+PARSE_REPAIRED = "repaired"
+PARSE_REJECTED = "rejected"
+
+_RECOMMENDATION_PROPERTIES: dict[str, Any] = {
+    "suggested_weight_kg": {"type": "NUMBER", "minimum": 0},
+    "suggested_reps": {"type": "INTEGER", "minimum": 1, "maximum": MAX_REPS},
+    "explanation": {"type": "STRING"},
+    "confidence": {"type": "STRING", "enum": sorted(VALID_CONFIDENCE)},
+}
+# Field order matters for streaming: numbers first, the long explanation after.
+_RECOMMENDATION_ORDER = ["suggested_weight_kg", "suggested_reps", "explanation", "confidence"]
+
+RECOMMENDATION_SCHEMA: dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": _RECOMMENDATION_PROPERTIES,
+    "required": _RECOMMENDATION_ORDER,
+    "property_ordering": _RECOMMENDATION_ORDER,
+}
+
+BATCH_RECOMMENDATION_SCHEMA: dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "recommendations": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"request_id": {"type": "STRING"}, **_RECOMMENDATION_PROPERTIES},
+                "required": ["request_id", *_RECOMMENDATION_ORDER],
+                "property_ordering": ["request_id", *_RECOMMENDATION_ORDER],
+            },
+        }
+    },
+    "required": ["recommendations"],
+}
+
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*\n?(.*?)\n?\s*```\s*$", re.DOTALL)
+_NUMBER_RE = re.compile(r"^\s*([-+]?\d+(?:[.,]\d+)?)\s*(?:kg|kgs|reps?)?\s*$", re.IGNORECASE)
+
+
+class _Repairs:
+    """Tracks whether any repair was applied while parsing one payload."""
+
+    __slots__ = ("applied",)
+
+    def __init__(self) -> None:
+        self.applied: list[str] = []
+
+    def note(self, what: str) -> None:
+        self.applied.append(what)
+
+
+def _record(result: str, provider: str) -> None:
+    AI_RESPONSE_PARSE_TOTAL.labels(provider=provider, result=result).inc()
+
+
+def snap_weight(weight_kg: float) -> float:
+    """Round to the nearest WEIGHT_STEP_KG."""
+    return round(weight_kg / WEIGHT_STEP_KG) * WEIGHT_STEP_KG
+
+
+def _load_json(text: str, repairs: _Repairs) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    fenced = _FENCE_RE.match(text)
+    if fenced:
+        repairs.note("code_fence")
+        text = fenced.group(1)
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("Response does not contain a JSON object")
+    repairs.note("surrounding_text")
+    try:
+        return json.loads(text[start : end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not valid JSON: {e}") from e
+
+
+def _number(value: Any, name: str, repairs: _Repairs) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid {name}: expected number, got bool")
+    if isinstance(value, (int, float)):
+        result = float(value)
+    elif isinstance(value, str):
+        m = _NUMBER_RE.match(value)
+        if not m:
+            raise ValueError(f"Invalid {name}: expected number, got {value!r}")
+        repairs.note(f"{name}_string")
+        result = float(m.group(1).replace(",", "."))
+    else:
+        raise ValueError(f"Invalid {name}: expected number, got {type(value).__name__}")
+    if not math.isfinite(result):
+        raise ValueError(f"Invalid {name}: not finite")
+    return result
+
+
+def coerce_weight(value: Any, repairs: _Repairs | None = None) -> float:
+    """Parse a suggested weight and snap it to the plate grid."""
+    repairs = repairs or _Repairs()
+    weight = _number(value, "suggested_weight_kg", repairs)
+    if weight < 0:
+        raise ValueError(f"Invalid suggested_weight_kg: negative ({weight})")
+    snapped = snap_weight(weight)
+    if not math.isclose(snapped, weight, abs_tol=1e-9):
+        repairs.note("weight_grid")
+    return snapped
+
+
+def coerce_reps(value: Any, repairs: _Repairs | None = None) -> int:
+    """Parse suggested reps; integral floats and numeric strings are accepted."""
+    repairs = repairs or _Repairs()
+    if isinstance(value, int) and not isinstance(value, bool):
+        reps = value
+    else:
+        number = _number(value, "suggested_reps", repairs)
+        if not number.is_integer():
+            raise ValueError(f"Invalid suggested_reps: expected int, got {value!r}")
+        if not isinstance(value, str):
+            repairs.note("suggested_reps_float")
+        reps = int(number)
+    if not 1 <= reps <= MAX_REPS:
+        raise ValueError(f"Invalid suggested_reps: out of range ({reps})")
+    return reps
+
+
+def _confidence(value: Any, repairs: _Repairs) -> str:
+    if value in VALID_CONFIDENCE:
+        return value
+    if isinstance(value, str) and value.strip().lower() in VALID_CONFIDENCE:
+        repairs.note("confidence_case")
+        return value.strip().lower()
+    raise ValueError(
+        f"Invalid confidence: expected one of {sorted(VALID_CONFIDENCE)}, got {value!r}"
+    )
+
+
+def _build(
+    data: Any, raw_response: str, latency_ms: int, model_used: str, repairs: _Repairs
+) -> AIRecommendation:
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    explanation = data.get("explanation")
+    if not isinstance(explanation, str) or not explanation.strip():
+        raise ValueError("Invalid explanation: expected non-empty string")
+    return AIRecommendation(
+        suggested_weight_kg=coerce_weight(data.get("suggested_weight_kg"), repairs),
+        suggested_reps=coerce_reps(data.get("suggested_reps"), repairs),
+        explanation=explanation.strip(),
+        confidence=_confidence(data.get("confidence"), repairs),
+        raw_response=raw_response,
+        latency_ms=latency_ms,
+        model_used=model_used,
+    )
+
+
+def parse_recommendation_data(
+    data: Any,
+    raw_response: str,
+    latency_ms: int,
+    model_used: str,
+    provider: str,
+) -> AIRecommendation:
+    """
+    Validate (and repair) one already-decoded recommendation object.
+
+    Args:
+        data: Decoded JSON value
+        raw_response: Raw text stored on the recommendation
+        latency_ms: Provider call latency
+        model_used: Model name stored on the recommendation
+        provider: Provider label for metrics
+
+    Returns:
+        AIRecommendation
+
+    Raises:
+        ValueError: If the object cannot be repaired into a valid recommendation
+    """
+    repairs = _Repairs()
+    try:
+        rec = _build(data, raw_response, latency_ms, model_used, repairs)
+    except ValueError:
+        _record(PARSE_REJECTED, provider)
+        raise
+    _record(PARSE_REPAIRED if repairs.applied else PARSE_OK, provider)
+    return rec
+
+
+def parse_recommendation(
+    raw_response: str,
+    latency_ms: int,
+    model_used: str,
+    provider: str,
+) -> AIRecommendation:
+    """
+    Decode and validate a single recommendation from raw provider text.
+
+    Raises:
+        ValueError: If the text is empty, not JSON, or not repairable
+    """
+    repairs = _Repairs()
+    try:
+        if not raw_response or not raw_response.strip():
+            raise ValueError("Provider returned empty response")
+        data = _load_json(raw_response, repairs)
+        rec = _build(data, raw_response, latency_ms, model_used, repairs)
+    except ValueError:
+        _record(PARSE_REJECTED, provider)
+        raise
+    _record(PARSE_REPAIRED if repairs.applied else PARSE_OK, provider)
+    return rec
+
+
+def parse_batch_recommendations(
+    raw_response: str,
+    request_ids: list[str],
+    latency_ms: int,
+    model_used: str,
+    provider: str,
+) -> dict[str, AIRecommendation | Exception]:
+    """
+    Decode a batch response ({"recommendations": [{request_id, ...}, ...]}).
+
+    Items missing from the response or failing validation get a ValueError of
+    their own; a response that is not a decodable batch at all raises.
+
+    Raises:
+        ValueError: If the response has no recommendations array
+    """
+    repairs = _Repairs()
+    try:
+        if not raw_response or not raw_response.strip():
+            raise ValueError("Provider returned empty response")
+        data = _load_json(raw_response, repairs)
+        items = data.get("recommendations") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            raise ValueError("Batch response has no 'recommendations' array")
+    except ValueError:
+        _record(PARSE_REJECTED, provider)
+        raise
+
+    by_id = {str(item.get("request_id")): item for item in items if isinstance(item, dict)}
+    results: dict[str, AIRecommendation | Exception] = {}
+    for request_id in request_ids:
+        item = by_id.get(request_id)
+        if item is None:
+            _record(PARSE_REJECTED, provider)
+            results[request_id] = ValueError(f"Batch response missing request_id {request_id!r}")
+            continue
+        try:
+            results[request_id] = parse_recommendation_data(
+                item, json.dumps(item), latency_ms, model_used, provider
+            )
+        except ValueError as e:
+            results[request_id] = e
+    return results
@@ -0,0 +1,226 @@
+"""Deadline-aware retries for transient provider failures.
+
+RetryingProvider gives each recommendation call a total time budget (the
+request deadline). Every attempt is capped by the budget that is left, so a
+slow provider call cannot run past it. Transient failures (429, 5xx, dropped
+connections) are retried with capped exponential backoff and full jitter. A
+Retry-After hint from the provider is honoured as a lower bound on the wait. A
+retry is skipped when the wait plus a minimum useful attempt time would
+overrun the deadline. In that case the last error is raised and the caller
+falls back to the rule engine.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import timezone
+from typing import TypeVar
+
+import httpx
+
+from app.ai.base import AIProvider, AIRecommendation, RecommendationStreamEvent, WorkoutContext
+from app.core.metrics import AI_RETRIES_TOTAL, AI_RETRY_OUTCOMES_TOTAL
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+OUTCOME_RESCUED = "rescued"  # failed at least once, then succeeded
+OUTCOME_EXHAUSTED = "exhausted"  # ran out of attempts
+OUTCOME_DEADLINE = "deadline"  # not enough budget left for another attempt
+OUTCOME_NOT_RETRYABLE = "not_retryable"  # a retry failed with a non-transient error
+
+_RETRY_DELAY_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)s\s*$")
+
+
+def status_code(exc: BaseException) -> int | None:
+    """HTTP status of a provider error (google.genai APIError.code, httpx/requests response)."""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    code = getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code
+    code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient failures: rate limiting, server errors, dropped connections."""
+    if isinstance(exc, (ConnectionError, httpx.TransportError)):
+        return True
+    return status_code(exc) in RETRYABLE_STATUS
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """
+    Provider-requested wait before retrying, if any.
+
+    Reads a Retry-After header (seconds or HTTP date) from the error or its response,
+    or a google.rpc.RetryInfo retryDelay ("12s") from the error details.
+    """
+    headers = getattr(exc, "headers", None) or getattr(
+        getattr(exc, "response", None), "headers", None
+    )
+    if headers:
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+        except AttributeError:
+            value = None
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+            try:
+                parsed = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None  # malformed hint: fall back to the backoff schedule
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)  # HTTP dates are GMT
+            return max(0.0, parsed.timestamp() - time.time())
+    details = getattr(exc, "details", None)
+    if isinstance(details, dict):
+        for item in details.get("details") or []:
+            if isinstance(item, dict) and "retryDelay" in item:
+                m = _RETRY_DELAY_RE.match(str(item["retryDelay"]))
+                if m:
+                    return float(m.group(1))
+    return None
+
+
+class RetryingProvider(AIProvider):
+    """Wraps a provider with deadline-bounded, jittered retries."""
+
+    def __init__(
+        self,
+        inner: AIProvider,
+        provider_name: str,
+        max_attempts: int = 3,
+        deadline_seconds: float | None = 8.0,
+        base_delay_seconds: float = 0.2,
+        max_delay_seconds: float = 2.0,
+        min_attempt_seconds: float = 0.5,
+        rng: random.Random | None = None,
+    ) -> None:
+        """
+        Args:
+            inner: Provider to call
+            provider_name: Label for retry metrics
+            max_attempts: Total attempts per call, including the first
+            deadline_seconds: Total budget per call across attempts and waits (None = unbounded)
+            base_delay_seconds: Backoff before the first retry (doubled per retry)
+            max_delay_seconds: Backoff cap (Retry-After may exceed it, the deadline may not)
+            min_attempt_seconds: Do not start an attempt with less budget than this
+            rng: Random source for jitter (tests)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        self.inner = inner
+        self.provider_name = provider_name
+        self.max_attempts = max_attempts
+        self.deadline_seconds = deadline_seconds
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.min_attempt_seconds = min_attempt_seconds
+        self._rng = rng or random.Random()
+
+    def _backoff(self, retry: int, exc: BaseException) -> float:
+        """Full-jitter exponential backoff, raised to Retry-After when the provider sent one."""
+        cap = min(self.max_delay_seconds, self.base_delay_seconds * (2**retry))
+        delay = self._rng.uniform(0, cap)
+        hint = retry_after_seconds(exc)
+        return max(delay, hint) if hint is not None else delay
+
+    def _next_delay(
+        self, attempt: int, exc: BaseException, deadline: float | None, now: float
+    ) -> tuple[float | None, str]:
+        """Delay before the next attempt, or (None, outcome) when the call should give up."""
+        if not is_retryable(exc):
+            return None, OUTCOME_NOT_RETRYABLE
+        if attempt >= self.max_attempts:
+            return None, OUTCOME_EXHAUSTED
+        delay = self._backoff(attempt - 1, exc)
+        if deadline is not None and deadline - now - delay < self.min_attempt_seconds:
+            return None, OUTCOME_DEADLINE
+        return delay, ""
+
+    def _record_failure(self, attempt: int, outcome: str) -> None:
+        # Plain non-transient failures never involved the retry policy; skip them.
+        if attempt > 1 or outcome != OUTCOME_NOT_RETRYABLE:
+            AI_RETRY_OUTCOMES_TOTAL.labels(provider=self.provider_name, outcome=outcome).inc()
+
+    async def _call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds if self.deadline_seconds else None
+        attempt = 1
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    result = await fn()
+            except Exception as e:
+                now = loop.time()
+                if isinstance(e, TimeoutError) and deadline is not None and now >= deadline:
+                    # The attempt consumed the rest of the budget.
+                    self._record_failure(attempt, OUTCOME_DEADLINE)
+                    raise
+                delay, outcome = self._next_delay(attempt, e, deadline, now)
+                if delay is None:
+                    self._record_failure(attempt, outcome)
+                    raise
+                logger.warning(
+                    "%s call failed (attempt %d/%d, status %s); retrying in %.2fs",
+                    self.provider_name, attempt, self.max_attempts, status_code(e), delay,
+                )
+                AI_RETRIES_TOTAL.labels(provider=self.provider_name).inc()
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if attempt > 1:
+                AI_RETRY_OUTCOMES_TOTAL.labels(provider=self.provider_name, outcome=OUTCOME_RESCUED).inc()
+            return result
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        return await self._call(lambda: self.inner.get_recommendation(context))
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        return await self._call(lambda: self.inner.get_batch_recommendations(contexts))
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        """Retries only until the first event; after that a failure is final.
+
+        The deadline covers opening the stream, not the whole stream.
+        """
+        async def open_stream() -> tuple[
+            AsyncIterator[RecommendationStreamEvent], RecommendationStreamEvent | None
+        ]:
+            stream = self.inner.stream_recommendation(context)
+            try:
+                return stream, await anext(stream)
+            except StopAsyncIteration:
+                return stream, None
+            except BaseException:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                raise
+
+        stream, first = await self._call(open_stream)
+        if first is None:
+            return
+        yield first
+        async for event in stream:
+            yield event
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
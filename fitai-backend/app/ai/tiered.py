@@ -0,0 +1,98 @@
+"""Rule-first tiering: answer routine sets with the rule engine, ambiguous ones with the LLM.
+
+TieredProvider runs the rule engine on the last logged set and scores how much
+the rules had to intervene (fatigue signals, clamps, the 1RM cap, trend
+suppression; see rule_engine.rule_confidence). When the score reaches
+min_confidence the rule recommendation is returned directly and stored with
+ai_provider="rules". Otherwise the call goes to the inner provider chain; in a
+batch, only the items the rules are unsure about go on, as one batch.
+"""
+
+from collections.abc import AsyncIterator
+
+from app.ai.base import (
+    STREAM_EVENT_EXPLANATION_DELTA,
+    STREAM_EVENT_FIELD,
+    STREAM_EVENT_FINAL,
+    AIProvider,
+    AIRecommendation,
+    RecommendationStreamEvent,
+    WorkoutContext,
+)
+from app.core.metrics import AI_RULE_CONFIDENCE
+from app.services.rule_engine import get_rule_based_recommendation_traced, rule_confidence
+
+PROVIDER_NAME = "rules"
+MODEL_NAME = "rule-based"
+
+
+class TieredProvider(AIProvider):
+    """Rule engine first; the wrapped provider only below min_confidence."""
+
+    def __init__(self, inner: AIProvider, min_confidence: float = 0.75) -> None:
+        self.inner = inner
+        self.min_confidence = min_confidence
+
+    def rule_recommendation(self, context: WorkoutContext) -> AIRecommendation | None:
+        """The rule recommendation if it is confident enough to skip the LLM, else None."""
+        if not context.current_session_sets:
+            return None
+        last = context.current_session_sets[-1]
+        rpe = last.get("rpe")
+        weight, reps, explanation, codes = get_rule_based_recommendation_traced(
+            context,
+            float(last["weight_kg"]),
+            int(last["reps"]),
+            float(rpe) if rpe is not None else None,
+        )
+        confidence = rule_confidence(codes)
+        AI_RULE_CONFIDENCE.observe(confidence)
+        if confidence < self.min_confidence:
+            return None
+        return AIRecommendation(
+            suggested_weight_kg=weight,
+            suggested_reps=reps,
+            explanation=explanation,
+            confidence="high" if confidence >= 0.9 else "medium",
+            raw_response="",
+            latency_ms=0,
+            model_used=MODEL_NAME,
+            provider=PROVIDER_NAME,
+        )
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        rec = self.rule_recommendation(context)
+        if rec is not None:
+            return rec
+        return await self.inner.get_recommendation(context)
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        results: dict[str, AIRecommendation | Exception] = {}
+        uncertain: dict[str, WorkoutContext] = {}
+        for request_id, context in contexts.items():
+            rec = self.rule_recommendation(context)
+            if rec is None:
+                uncertain[request_id] = context
+            else:
+                results[request_id] = rec
+        if uncertain:
+            results.update(await self.inner.get_batch_recommendations(uncertain))
+        return results
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        rec = self.rule_recommendation(context)
+        if rec is None:
+            async for event in self.inner.stream_recommendation(context):
+                yield event
+            return
+        yield RecommendationStreamEvent(STREAM_EVENT_FIELD, "suggested_weight_kg", rec.suggested_weight_kg)
+        yield RecommendationStreamEvent(STREAM_EVENT_FIELD, "suggested_reps", rec.suggested_reps)
+        yield RecommendationStreamEvent(STREAM_EVENT_EXPLANATION_DELTA, "explanation", rec.explanation)
+        yield RecommendationStreamEvent(STREAM_EVENT_FINAL, recommendation=rec)
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
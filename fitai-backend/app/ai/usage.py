@@ -0,0 +1,190 @@
+"""Token accounting and daily quotas for AI provider calls.
+
+UsageTracker keeps today's (UTC) token counters per user and per model in
+process memory: live numbers for the admin usage endpoint and the input for
+quota checks. Persisted per-recommendation counts (recommendations.prompt_tokens
+/ completion_tokens) are the source of truth for history; the in-memory
+counters reset at midnight UTC and are per process, so with several workers a
+quota is enforced per worker.
+
+UsageMeteringProvider wraps the provider chain: before a call it raises
+QuotaExceeded when the user's or the global daily quota is used up (the caller
+answers with the rule engine, as for BulkheadRejected); after a call it records
+the tokens the provider reported.
+"""
+
+from collections.abc import AsyncIterator, Callable
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+
+from app.ai.base import (
+    STREAM_EVENT_FINAL,
+    AIProvider,
+    AIRecommendation,
+    RecommendationStreamEvent,
+    WorkoutContext,
+)
+from app.core.metrics import AI_QUOTA_REJECTED_TOTAL, AI_TOKENS_TOTAL
+
+SCOPE_USER = "user"
+SCOPE_GLOBAL = "global"
+
+
+class QuotaExceeded(Exception):
+    """Raised before a provider call when a daily token quota is used up; scope is user or global."""
+
+    def __init__(self, scope: str) -> None:
+        super().__init__(f"Daily AI token quota reached ({scope})")
+        self.scope = scope
+
+
+@dataclass
+class UsageCounters:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class UsageTracker:
+    """Today's token counters per user and per model, with daily quotas (0 = unlimited)."""
+
+    def __init__(
+        self,
+        user_daily_quota: int = 0,
+        global_daily_quota: int = 0,
+        today: Callable[[], date] = _utc_today,
+    ) -> None:
+        self.user_daily_quota = user_daily_quota
+        self.global_daily_quota = global_daily_quota
+        self._today = today
+        self._day = today()
+        self._users: dict[str, UsageCounters] = {}
+        self._models: dict[str, UsageCounters] = {}
+        self._total = UsageCounters()
+
+    def _roll_over(self) -> None:
+        day = self._today()
+        if day != self._day:
+            self._day = day
+            self._users.clear()
+            self._models.clear()
+            self._total = UsageCounters()
+
+    def record(
+        self, user_id: str | None, model: str, prompt_tokens: int, completion_tokens: int
+    ) -> None:
+        """Count one provider call."""
+        self._roll_over()
+        self._total.add(prompt_tokens, completion_tokens)
+        self._models.setdefault(model, UsageCounters()).add(prompt_tokens, completion_tokens)
+        if user_id is not None:
+            self._users.setdefault(user_id, UsageCounters()).add(prompt_tokens, completion_tokens)
+        AI_TOKENS_TOTAL.labels(model=model, kind="prompt").inc(prompt_tokens)
+        AI_TOKENS_TOTAL.labels(model=model, kind="completion").inc(completion_tokens)
+
+    def user_usage(self, user_id: str) -> UsageCounters:
+        self._roll_over()
+        return self._users.get(user_id, UsageCounters())
+
+    def exceeded_scope(self, user_id: str | None) -> str | None:
+        """SCOPE_USER / SCOPE_GLOBAL if that daily quota is used up, else None."""
+        self._roll_over()
+        if self.global_daily_quota and self._total.total_tokens >= self.global_daily_quota:
+            return SCOPE_GLOBAL
+        if self.user_daily_quota and user_id is not None:
+            used = self._users.get(user_id)
+            if used is not None and used.total_tokens >= self.user_daily_quota:
+                return SCOPE_USER
+        return None
+
+    def snapshot(self, top_users: int = 10) -> dict:
+        """Today's counters: totals, per model, and the heaviest users."""
+        self._roll_over()
+        heaviest = sorted(self._users.items(), key=lambda kv: kv[1].total_tokens, reverse=True)
+        return {
+            "day": self._day.isoformat(),
+            "user_daily_quota": self.user_daily_quota or None,
+            "global_daily_quota": self.global_daily_quota or None,
+            "total": asdict(self._total),
+            "models": {name: asdict(c) for name, c in sorted(self._models.items())},
+            "top_users": [
+                {"user_id": user_id, **asdict(c)} for user_id, c in heaviest[:top_users]
+            ],
+            "users_tracked": len(self._users),
+        }
+
+
+class UsageMeteringProvider(AIProvider):
+    """Enforces daily quotas before and records token usage after each provider call."""
+
+    def __init__(self, inner: AIProvider, tracker: UsageTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def _admit(self, context: WorkoutContext) -> None:
+        scope = self.tracker.exceeded_scope(context.user_id)
+        if scope is not None:
+            AI_QUOTA_REJECTED_TOTAL.labels(scope=scope).inc()
+            raise QuotaExceeded(scope)
+
+    def _record(self, context: WorkoutContext, rec: AIRecommendation) -> None:
+        if rec.prompt_tokens is None and rec.completion_tokens is None:
+            return  # rule tier, distilled model: no provider tokens spent
+        self.tracker.record(
+            context.user_id,
+            rec.model_used,
+            rec.prompt_tokens or 0,
+            rec.completion_tokens or 0,
+        )
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        self._admit(context)
+        rec = await self.inner.get_recommendation(context)
+        self._record(context, rec)
+        return rec
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        """Items over quota get QuotaExceeded; the rest go on as one batch."""
+        results: dict[str, AIRecommendation | Exception] = {}
+        admitted: dict[str, WorkoutContext] = {}
+        for request_id, context in contexts.items():
+            try:
+                self._admit(context)
+            except QuotaExceeded as e:
+                results[request_id] = e
+            else:
+                admitted[request_id] = context
+        if admitted:
+            batch = await self.inner.get_batch_recommendations(admitted)
+            for request_id, result in batch.items():
+                if isinstance(result, AIRecommendation):
+                    self._record(admitted[request_id], result)
+            results.update(batch)
+        return results
+
+    async def stream_recommendation(
+        self, context: WorkoutContext
+    ) -> AsyncIterator[RecommendationStreamEvent]:
+        self._admit(context)
+        async for event in self.inner.stream_recommendation(context):
+            if event.kind == STREAM_EVENT_FINAL and event.recommendation is not None:
+                self._record(context, event.recommendation)
+            yield event
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
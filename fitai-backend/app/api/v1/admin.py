@@ -0,0 +1,24 @@
+"""Admin API routes — require a user listed in ADMIN_EMAILS."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.usage import UsageTracker
+from app.config import get_settings
+from app.db.database import get_db
+from app.dependencies import get_current_admin, get_usage_tracker
+from app.models.user import User
+from app.services import usage_service
+
+router = APIRouter()
+
+
+@router.get("/ai/usage")
+async def get_ai_usage(
+    days: int = Query(7, ge=1, le=90, description="Days of history (UTC, including today)"),
+    _admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    tracker: UsageTracker = Depends(get_usage_tracker),
+) -> dict:
+    """AI token usage and cost: live counters for today plus daily rollups by provider."""
+    return await usage_service.get_usage_report(days, db, tracker, get_settings())
@@ -6,8 +6,11 @@ from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
+from app.dependencies import get_current_user
+from app.models.user import User
 from app.schemas.exercise import ExerciseCreate, ExerciseResponse
-from app.services import exercise_service
+from app.schemas.planned_target import PlannedTargetResponse
+from app.services import exercise_service, planning_service
 
 router = APIRouter()
 
@@ -44,3 +47,16 @@ async def get_exercise(
     """Get an exercise by id."""
     exercise = await exercise_service.get_exercise_or_404(exercise_id, db)
     return ExerciseResponse.model_validate(exercise)
+
+
+@router.get("/{exercise_id}/planned-target", response_model=PlannedTargetResponse)
+async def get_planned_target(
+    exercise_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> PlannedTargetResponse:
+    """Get the current user's planned first-working-set target for this exercise."""
+    target = await planning_service.get_planned_target_or_404(
+        exercise_id, current_user.id, db
+    )
+    return PlannedTargetResponse.model_validate(target)
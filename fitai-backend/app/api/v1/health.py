@@ -1,4 +1,12 @@
-"""Health check endpoint — no authentication required."""
+"""Health check endpoints — no authentication required.
+
+- /health/live: process is up; performs no I/O.
+- /health/ready: DB reachable; AI state is reported from the background monitor.
+- /health: unified status (kept for existing probes); same checks as readiness.
+
+None of these call the AI provider; they read the state cached by
+ProviderHealthMonitor, which probes on its own schedule.
+"""
 
 import logging
 
@@ -7,45 +15,89 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.health_monitor import ProviderHealthMonitor
 from app.db.database import get_db
-from app.dependencies import get_ai_provider
+from app.dependencies import get_health_monitor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/health")
-async def health(
-    db: AsyncSession = Depends(get_db),
-) -> JSONResponse:
-    """
-    Unified health check: DB and AI.
-    Returns 200 if all ok, 503 if any component fails.
-    """
-    db_status = "error"
-    ai_status = "error"
+def _ai_status(monitor: ProviderHealthMonitor) -> dict:
+    state = monitor.state
+    if state.ok is None:
+        status_str = "unknown"
+    elif monitor.is_stale():
+        status_str = "stale"
+    else:
+        status_str = "ok" if state.ok else "error"
+    return {
+        "status": status_str,
+        "checked_at": state.checked_at.isoformat() if state.checked_at else None,
+        "latency_ms": state.latency_ms,
+        "error": state.error,
+    }
+
 
+async def _db_status(db: AsyncSession) -> str:
     try:
         await db.execute(text("SELECT 1"))
-        db_status = "ok"
+        return "ok"
     except Exception as e:
         logger.warning("Health check DB failed: %s", e)
+        return "error"
 
-    try:
-        provider = get_ai_provider()
-        ai_ok = await provider.health_check()
-        ai_status = "ok" if ai_ok else "error"
-        if not ai_ok:
-            logger.warning("Health check AI failed: provider returned False")
-    except Exception as e:
-        logger.warning("Health check AI failed: %s", e)
+
+@router.get("/health/live")
+async def liveness() -> dict:
+    """Liveness probe: the event loop is serving requests. No DB or AI I/O."""
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness(
+    db: AsyncSession = Depends(get_db),
+    monitor: ProviderHealthMonitor = Depends(get_health_monitor),
+) -> JSONResponse:
+    """
+    Readiness probe: 200 when the DB is reachable, 503 otherwise.
+    AI state is informational (the rule engine covers AI outages).
+    """
+    db_status = await _db_status(db)
+    return JSONResponse(
+        content={
+            "status": "ok" if db_status == "ok" else "error",
+            "db": db_status,
+            "ai": _ai_status(monitor),
+        },
+        status_code=200 if db_status == "ok" else 503,
+    )
+
+
+@router.get("/health")
+async def health(
+    db: AsyncSession = Depends(get_db),
+    monitor: ProviderHealthMonitor = Depends(get_health_monitor),
+) -> JSONResponse:
+    """
+    Unified health check: DB (live query) and AI (cached monitor state).
+    Returns 200 if DB ok (degraded if AI not ok), 503 if DB fails.
+    """
+    db_status = await _db_status(db)
+    ai = _ai_status(monitor)
+    ai_status = "ok" if ai["status"] == "ok" else "error"
 
     overall = "ok" if (db_status == "ok" and ai_status == "ok") else "degraded"
     # 503 only when DB fails (app unusable). 200 when DB ok (degraded if AI fails).
     status_code = 503 if db_status != "ok" else 200
 
     return JSONResponse(
-        content={"status": overall, "db": db_status, "ai": ai_status},
+        content={
+            "status": overall,
+            "db": db_status,
+            "ai": ai_status,
+            "ai_checked_at": ai["checked_at"],
+        },
         status_code=status_code,
     )
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from app.api.v1 import auth, exercises, health, sets, users, workouts
+from app.api.v1 import admin, auth, exercises, health, sets, users, workouts
 
 api_router = APIRouter()
 
@@ -12,3 +12,4 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(workouts.router, prefix="/workouts", tags=["workouts"])
 api_router.include_router(exercises.router, prefix="/exercises", tags=["exercises"])
 api_router.include_router(sets.router, tags=["sets"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
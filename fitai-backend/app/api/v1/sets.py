@@ -1,17 +1,19 @@
-"""Set API routes — log set (with AI recommendation), list sets, delete set."""
+"""Set API routes — log set (with AI recommendation), stream recommendation, list sets, delete set."""
 
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.base import AIProvider
 from app.db.database import get_db
-from app.dependencies import get_ai_provider, get_current_user
+from app.dependencies import get_ai_provider, get_current_user, get_session_plan_store
 from app.models.user import User
 from app.schemas.set import SetCreate, SetResponse, SetWithRecommendation
 from app.services import set_service
+from app.services.session_plan import SessionPlanStore
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -28,11 +30,17 @@ async def log_set(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     ai_provider: AIProvider = Depends(get_ai_provider),
+    plan_store: SessionPlanStore | None = Depends(get_session_plan_store),
+    defer_recommendation: bool = Query(
+        False,
+        description="Skip the inline recommendation; stream it from /sets/{set_id}/recommendation/stream",
+    ),
 ) -> SetWithRecommendation:
-    """Log a set for an active workout; returns the set and optional AI recommendation (None if warmup or AI failed)."""
+    """Log a set for an active workout; returns the set and optional AI recommendation (None if warmup or deferred)."""
     try:
         return await set_service.log_set(
-            workout_id, set_in, current_user.id, db, ai_provider
+            workout_id, set_in, current_user.id, db, ai_provider,
+            defer_recommendation=defer_recommendation, plan_store=plan_store,
         )
     except HTTPException:
         raise
@@ -59,6 +67,23 @@ async def list_sets(
     )
 
 
+@router.get("/sets/{set_id}/recommendation/stream")
+async def stream_set_recommendation(
+    set_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
+    plan_store: SessionPlanStore | None = Depends(get_session_plan_store),
+) -> StreamingResponse:
+    """Stream the recommendation for a logged set as Server-Sent Events (weight/reps first, explanation after)."""
+    s = await set_service.get_set_for_recommendation_stream(set_id, current_user.id, db)
+    return StreamingResponse(
+        set_service.stream_recommendation(s, ai_provider, plan_store),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete(
     "/sets/{set_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -1,8 +1,10 @@
 """User API routes — profile and stats; all require authentication."""
 
+from datetime import date
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
@@ -31,6 +33,23 @@ async def get_my_overview_stats(
     return await stats_service.get_user_overview(current_user.id, db)
 
 
+@router.get("/me/stats/volume")
+async def get_my_volume_stats(
+    bucket: Literal["week", "month"] = Query("week", description="Bucket size (weeks start on Monday)"),
+    from_: date | None = Query(
+        None, alias="from", description="First UTC day (default: a year before to)"
+    ),
+    to: date | None = Query(None, description="Last UTC day (default: today)"),
+    group: Literal["muscle_group", "total"] = Query(
+        "muscle_group", description="One series per muscle group, or a single total"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Return working sets, reps and volume per week or month for the current user."""
+    return await stats_service.get_volume_series(current_user.id, bucket, from_, to, group, db)
+
+
 @router.get("/me/stats/{exercise_id}")
 async def get_my_exercise_stats(
     exercise_id: UUID,
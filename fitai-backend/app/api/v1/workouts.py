@@ -2,35 +2,47 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.base import AIProvider
 from app.db.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_ai_provider, get_current_user, get_session_plan_store
 from app.models.user import User
-from app.schemas.workout import WorkoutCreate, WorkoutResponse, WorkoutUpdate
+from app.schemas.planned_target import PlannedTargetResponse
+from app.schemas.workout import (
+    WorkoutCreate,
+    WorkoutResponse,
+    WorkoutStartResponse,
+    WorkoutUpdate,
+)
 from app.schemas.set import WorkoutExerciseGroup
-from app.services import workout_service
+from app.services import planning_service, workout_service
+from app.services.session_plan import SessionPlanStore
 
 router = APIRouter()
 
 
 @router.post(
     "",
-    response_model=WorkoutResponse,
+    response_model=WorkoutStartResponse,
     status_code=status.HTTP_201_CREATED,
 )
 async def start_workout(
     workout_in: WorkoutCreate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> WorkoutResponse:
-    """Start a new workout for the current user."""
+) -> WorkoutStartResponse:
+    """Start a new workout for the current user, with the targets planned for each exercise."""
     workout = await workout_service.start_workout(
         workout_in, current_user.id, db
     )
-    return WorkoutResponse.model_validate(workout)
+    targets = await planning_service.get_planned_targets(current_user.id, db)
+    return WorkoutStartResponse(
+        **WorkoutResponse.model_validate(workout).model_dump(),
+        planned_targets=[PlannedTargetResponse.model_validate(t) for t in targets],
+    )
 
 
 @router.get("", response_model=list[WorkoutResponse])
@@ -63,12 +75,19 @@ async def get_workout(
 @router.post("/{workout_id}/end", response_model=WorkoutResponse)
 async def end_workout(
     workout_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
+    plan_store: SessionPlanStore | None = Depends(get_session_plan_store),
 ) -> WorkoutResponse:
-    """End a workout (sets ended_at to now)."""
+    """
+    End a workout (sets ended_at to now) and drop its AI conversation sessions and session plans.
+
+    Next-session targets are computed in the background after the response.
+    """
     workout = await workout_service.end_workout(
-        workout_id, current_user.id, db
+        workout_id, current_user.id, db, ai_provider, background_tasks, plan_store
     )
     return WorkoutResponse.model_validate(workout)
 
@@ -28,6 +28,21 @@ class Settings(BaseSettings):
 
     GEMINI_API_KEY: Optional[str] = None
     GEMINI_MODEL: str = "gemini-2.0-flash"
+    # Register the static prompt prefix as Gemini cached content (falls back to
+    # inline system_instruction when the model/prefix cannot be cached). The cache
+    # is refreshed in the background and deleted on shutdown.
+    GEMINI_PROMPT_CACHE: bool = False
+    GEMINI_PROMPT_CACHE_TTL_SECONDS: int = 3600
+    # Prefixes below this many tokens are sent inline (unset: the model's minimum).
+    GEMINI_PROMPT_CACHE_MIN_TOKENS: Optional[int] = None
+    # Conversation mode: one chat per (workout, exercise), started with the full
+    # prompt; later sets send only new sets and fatigue counters. Sessions end with
+    # the workout, after AI_CONVERSATION_TTL_MINUTES idle, or restart after
+    # AI_CONVERSATION_MAX_TURNS follow-ups.
+    AI_CONVERSATION_MODE: bool = False
+    AI_CONVERSATION_TTL_MINUTES: int = 90
+    AI_CONVERSATION_MAX_TURNS: int = 12
+    AI_CONVERSATION_MAX_SESSIONS: int = 10000
 
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"
@@ -35,6 +50,105 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: Optional[str] = None
     OLLAMA_MODEL: str = "llama3.2:3b"
 
+    # Fake provider (AI_PROVIDER=fake) for load tests. FAKE_LLM_URL points at the
+    # fake LLM server (uvicorn --factory app.ai.fake_llm:create_app); unset =
+    # simulate in-process. The server reads the same FAKE_LLM_* settings.
+    FAKE_LLM_URL: Optional[str] = None
+    FAKE_LLM_P50_MS: float = 600.0
+    FAKE_LLM_P99_MS: float = 2500.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_RATE_LIMIT_RPS: float = 0.0
+    FAKE_LLM_RATE_LIMIT_BURST: int = 10
+    FAKE_LLM_SEED: Optional[int] = None
+
+    # Rule-first tiering: sets whose rule-engine confidence reaches
+    # AI_RULE_TIER_MIN_CONFIDENCE are answered by the rule engine (ai_provider
+    # "rules"); only the rest reach the LLM. Off by default: enabling it moves
+    # traffic off the LLM, so roll it out through config.
+    AI_RULE_TIER_ENABLED: bool = False
+    AI_RULE_TIER_MIN_CONFIDENCE: float = 0.75
+
+    # Token accounting. Daily token quotas (prompt + completion, UTC day, per
+    # process; 0 = unlimited) send further sets to the rule engine
+    # (ai_provider "quota"). Prices (USD per 1M tokens) are used for the cost
+    # column of GET /api/v1/admin/ai/usage.
+    AI_USER_DAILY_TOKEN_QUOTA: int = 0
+    AI_GLOBAL_DAILY_TOKEN_QUOTA: int = 0
+    AI_PRICE_INPUT_PER_MTOK: float = 0.10
+    AI_PRICE_OUTPUT_PER_MTOK: float = 0.40
+    # Comma-separated emails allowed on /api/v1/admin routes.
+    ADMIN_EMAILS: str = ""
+
+    # Precompute first-working-set targets for the next session of each exercise
+    # in a background job at end_workout (served by start_workout and
+    # GET /exercises/{id}/planned-target). Opt-in: it spends a provider call per
+    # finished workout.
+    AI_PLAN_NEXT_SESSION: bool = False
+
+    # Whole-session plans: after a normally computed recommendation, project the
+    # exercise's remaining sets with the rule engine (each expected at RPE 8 +
+    # AI_SESSION_PLAN_RPE_DRIFT) and serve later sets from the plan (ai_provider
+    # "plan") while the logged sets stay within the tolerances. The plan length
+    # follows the last session of the exercise, else AI_SESSION_PLAN_DEFAULT_SETS.
+    AI_SESSION_PLAN: bool = False
+    AI_SESSION_PLAN_DEFAULT_SETS: int = 4
+    AI_SESSION_PLAN_RPE_DRIFT: float = 0.5
+    AI_SESSION_PLAN_WEIGHT_TOLERANCE_KG: float = 1.25
+    AI_SESSION_PLAN_REPS_TOLERANCE: int = 1
+    AI_SESSION_PLAN_RPE_TOLERANCE: float = 0.5
+
+    # Distilled local model (scripts/train_distilled.py). When the artifact exists,
+    # regimes whose held-out agreement with the LLM is at least
+    # AI_DISTILLED_MIN_AGREEMENT (over >= AI_DISTILLED_MIN_SAMPLES sets) are served
+    # by it instead of the provider. AI_PROVIDER=distilled serves every request.
+    AI_DISTILLED_MODEL_PATH: Optional[str] = None
+    AI_DISTILLED_MIN_AGREEMENT: float = 0.9
+    AI_DISTILLED_MIN_SAMPLES: int = 100
+
+    # Prompt format: "verbose" (prose) or "compact" (CSV-style, token-budgeted).
+    # AI_PROMPT_TOKEN_BUDGET = 0 disables the budget.
+    AI_PROMPT_FORMAT: str = "verbose"
+    AI_PROMPT_TOKEN_BUDGET: int = 400
+
+    # AI admission control (bulkhead). AI_MAX_CONCURRENT = 0 disables the limiter.
+    AI_MAX_CONCURRENT: int = 8
+    AI_MAX_QUEUE: int = 16
+    AI_QUEUE_TIMEOUT_MS: int = 250
+    # Separate limiter for background batch calls (next-session planning), so they
+    # never take the slots of live set requests. Only used when AI_MAX_CONCURRENT > 0.
+    AI_PLANNING_MAX_CONCURRENT: int = 2
+    AI_PLANNING_MAX_QUEUE: int = 32
+    AI_PLANNING_QUEUE_TIMEOUT_MS: int = 10000
+
+    # Retries: total budget per recommendation call (every attempt and backoff
+    # fits inside it; 0 = unbounded) and transient-error retry policy.
+    # AI_RETRY_MAX_ATTEMPTS = 1 disables retries.
+    AI_REQUEST_DEADLINE_MS: int = 8000
+    AI_RETRY_MAX_ATTEMPTS: int = 3
+    AI_RETRY_BASE_DELAY_MS: int = 200
+    AI_RETRY_MAX_DELAY_MS: int = 2000
+
+    # Micro-batching: coalesce concurrent recommendation requests into one provider
+    # call of up to AI_BATCH_MAX_SIZE items, waiting at most AI_BATCH_MAX_WAIT_MS.
+    AI_BATCH_ENABLED: bool = False
+    AI_BATCH_MAX_SIZE: int = 8
+    AI_BATCH_MAX_WAIT_MS: int = 50
+
+    # Background provider health probe (GET /health reads the cached result).
+    AI_HEALTH_CHECK_INTERVAL_SECONDS: int = 60
+    AI_HEALTH_CHECK_TIMEOUT_SECONDS: int = 10
+
+    # Record every recommendation context and answer for offline replay
+    # (scripts/replay_recommendations.py). Empty = off; "{pid}" expands per worker.
+    AI_RECORD_PATH: str = ""
+    AI_RECORD_SAMPLE_RATE: float = 1.0
+
+    # Startup prewarm (DB_POOL_SIZE connections + provider connection, no generation)
+    # and shutdown drain of in-flight AI calls.
+    STARTUP_PREWARM: bool = True
+    STARTUP_PREWARM_TIMEOUT_SECONDS: float = 10.0
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = 20.0
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
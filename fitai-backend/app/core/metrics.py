@@ -0,0 +1,97 @@
+"""Prometheus metrics shared across the app (scraped at GET /metrics)."""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# ── AI bulkhead ──────────────────────────────────────────────────────────────
+AI_INFLIGHT = Gauge(
+    "fitai_ai_inflight_calls",
+    "AI provider calls currently executing.",
+)
+AI_QUEUE_DEPTH = Gauge(
+    "fitai_ai_queue_depth",
+    "AI provider calls waiting for a free bulkhead slot.",
+)
+AI_SHED_TOTAL = Counter(
+    "fitai_ai_shed_total",
+    "AI provider calls shed to the rule engine by admission control.",
+    ["reason"],
+)
+
+# ── AI retries ───────────────────────────────────────────────────────────────
+AI_RETRIES_TOTAL = Counter(
+    "fitai_ai_retries_total",
+    "Provider call retries after a transient failure.",
+    ["provider"],
+)
+AI_RETRY_OUTCOMES_TOTAL = Counter(
+    "fitai_ai_retry_outcomes_total",
+    "Final outcome of provider calls that hit a transient failure "
+    "(rescued, exhausted, deadline, not_retryable). rescued / sum = retry-rescue rate.",
+    ["provider", "outcome"],
+)
+
+# ── AI micro-batching ────────────────────────────────────────────────────────
+AI_BATCH_SIZE = Histogram(
+    "fitai_ai_batch_size",
+    "Number of recommendation requests sent to the provider in one batch.",
+    buckets=(1, 2, 4, 8, 16, 32),
+)
+AI_BATCH_QUEUE_DELAY_SECONDS = Histogram(
+    "fitai_ai_batch_queue_delay_seconds",
+    "Time a recommendation request waited for its batch to be dispatched.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# ── AI response parsing / outcomes ──────────────────────────────────────────
+AI_RESPONSE_PARSE_TOTAL = Counter(
+    "fitai_ai_response_parse_total",
+    "Provider responses parsed, by result (ok, repaired, rejected).",
+    ["provider", "result"],
+)
+RECOMMENDATIONS_TOTAL = Counter(
+    "fitai_recommendations_total",
+    "Stored recommendations by source (ai_provider column: gemini, fallback, shed, ...). "
+    "fallback / (fallback + AI sources) is the fraction of LLM calls that ended in fallback.",
+    ["source"],
+)
+
+# ── Distilled model routing ──────────────────────────────────────────────────
+AI_ROUTED_TOTAL = Counter(
+    "fitai_ai_routed_total",
+    "Recommendation requests by routing target (distilled model or primary provider).",
+    ["target"],
+)
+
+# ── Rule-first tiering ───────────────────────────────────────────────────────
+AI_RULE_CONFIDENCE = Histogram(
+    "fitai_rule_confidence",
+    "Rule-engine confidence per recommendation request (tiering gate input).",
+    buckets=(0.1, 0.25, 0.4, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 1.0),
+)
+
+# ── Next-session planning ────────────────────────────────────────────────────
+PLANNED_TARGETS_TOTAL = Counter(
+    "fitai_planned_targets_total",
+    "Next-session targets computed at end_workout, by source (ai_provider value or fallback).",
+    ["source"],
+)
+
+# ── Whole-session plans ──────────────────────────────────────────────────────
+SESSION_PLAN_TOTAL = Counter(
+    "fitai_session_plan_total",
+    "Logged working sets checked against the session plan, by outcome "
+    "(hit = served from the plan; miss, deviated, stale, exhausted = normal path).",
+    ["outcome"],
+)
+
+# ── Token accounting / quotas ────────────────────────────────────────────────
+AI_TOKENS_TOTAL = Counter(
+    "fitai_ai_tokens_total",
+    "Provider-reported tokens by model and kind (prompt, completion).",
+    ["model", "kind"],
+)
+AI_QUOTA_REJECTED_TOTAL = Counter(
+    "fitai_ai_quota_rejected_total",
+    "Provider calls answered by the rule engine because a daily token quota was used up.",
+    ["scope"],
+)
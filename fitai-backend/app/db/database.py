@@ -1,5 +1,7 @@
 from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
@@ -48,3 +50,16 @@ async def get_db() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionLocal() as session:
         yield session
 
+
+
+async def prewarm_pool(size: int, db_engine: AsyncEngine | None = None) -> int:
+    """Open `size` pooled connections at once (so each is a new one) and return them to the pool.
+
+    Returns the number of connections opened.
+    """
+    db_engine = db_engine or engine
+    async with AsyncExitStack() as stack:
+        for _ in range(size):
+            conn = await stack.enter_async_context(db_engine.connect())
+            await conn.execute(text("SELECT 1"))
+        return size
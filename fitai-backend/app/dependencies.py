@@ -4,27 +4,76 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.ai import AIProvider, get_ai_provider as _get_ai_provider_factory
+from app.ai import DrainingProvider, UsageTracker, get_ai_provider as _get_ai_provider_factory
+from app.ai.health_monitor import ProviderHealthMonitor
 from app.config import get_settings
 from app.core.security import decode_token
 from app.db.database import get_db
 from app.models.user import User
 from app.repositories.user_repo import UserRepository
+from app.services.session_plan import PlanTolerance, SessionPlanStore
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-_ai_provider_cache: AIProvider | None = None
+_ai_provider_cache: DrainingProvider | None = None
+_health_monitor_cache: ProviderHealthMonitor | None = None
+_usage_tracker_cache: UsageTracker | None = None
+_session_plan_store_cache: SessionPlanStore | None = None
 
 
-def get_ai_provider() -> AIProvider:
-    """Return the configured AI provider; caches the instance."""
+def get_usage_tracker() -> UsageTracker:
+    """Return the process-wide AI token usage tracker; caches the instance."""
+    global _usage_tracker_cache
+    if _usage_tracker_cache is None:
+        settings = get_settings()
+        _usage_tracker_cache = UsageTracker(
+            user_daily_quota=settings.AI_USER_DAILY_TOKEN_QUOTA,
+            global_daily_quota=settings.AI_GLOBAL_DAILY_TOKEN_QUOTA,
+        )
+    return _usage_tracker_cache
+
+
+def get_ai_provider() -> DrainingProvider:
+    """Return the configured AI provider chain (outermost: DrainingProvider); caches the instance."""
     global _ai_provider_cache
     if _ai_provider_cache is None:
         settings = get_settings()
-        _ai_provider_cache = _get_ai_provider_factory(settings)
+        _ai_provider_cache = _get_ai_provider_factory(settings, get_usage_tracker())
     return _ai_provider_cache
 
 
+def get_session_plan_store() -> SessionPlanStore | None:
+    """Return the process-wide session plan store (None when AI_SESSION_PLAN is off); caches the instance."""
+    global _session_plan_store_cache
+    settings = get_settings()
+    if not settings.AI_SESSION_PLAN:
+        return None
+    if _session_plan_store_cache is None:
+        _session_plan_store_cache = SessionPlanStore(
+            tolerance=PlanTolerance(
+                weight_kg=settings.AI_SESSION_PLAN_WEIGHT_TOLERANCE_KG,
+                reps=settings.AI_SESSION_PLAN_REPS_TOLERANCE,
+                rpe=settings.AI_SESSION_PLAN_RPE_TOLERANCE,
+            ),
+            default_sets=settings.AI_SESSION_PLAN_DEFAULT_SETS,
+            rpe_drift=settings.AI_SESSION_PLAN_RPE_DRIFT,
+        )
+    return _session_plan_store_cache
+
+
+def get_health_monitor() -> ProviderHealthMonitor:
+    """Return the background AI health monitor for the cached provider; caches the instance."""
+    global _health_monitor_cache
+    if _health_monitor_cache is None:
+        settings = get_settings()
+        _health_monitor_cache = ProviderHealthMonitor(
+            get_ai_provider(),
+            interval_seconds=settings.AI_HEALTH_CHECK_INTERVAL_SECONDS,
+            timeout_seconds=settings.AI_HEALTH_CHECK_TIMEOUT_SECONDS,
+        )
+    return _health_monitor_cache
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
@@ -67,3 +116,19 @@ async def get_current_user(
         raise credentials_exception
 
     return user
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Require the current user to be listed in ADMIN_EMAILS.
+
+    Raises:
+        HTTPException: 403 if the user is not an admin
+    """
+    admins = {e.strip().lower() for e in get_settings().ADMIN_EMAILS.split(",") if e.strip()}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
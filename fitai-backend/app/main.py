@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -6,13 +7,49 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1 import health as health_router
+from app.api.v1 import metrics as metrics_router
 from app.api.v1.router import api_router
-from app.config import get_settings
+from app.config import Settings, get_settings
 from app.core.middleware import RequestLoggingMiddleware, get_cors_origins
+from app.db.database import engine, prewarm_pool
+from app.dependencies import get_ai_provider, get_health_monitor
 
 logger = logging.getLogger(__name__)
 
 
+async def _prewarm(settings: Settings) -> None:
+    """Open DB_POOL_SIZE connections and the provider connection; failures only log."""
+
+    async def db() -> None:
+        n = await prewarm_pool(settings.DB_POOL_SIZE)
+        logger.info("Prewarmed %d DB connections", n)
+
+    async def ai() -> None:
+        await get_ai_provider().warmup()
+        logger.info("Prewarmed AI provider connection")
+
+    results = await asyncio.gather(
+        asyncio.wait_for(db(), settings.STARTUP_PREWARM_TIMEOUT_SECONDS),
+        asyncio.wait_for(ai(), settings.STARTUP_PREWARM_TIMEOUT_SECONDS),
+        return_exceptions=True,
+    )
+    for name, result in zip(("DB pool", "AI provider"), results):
+        if isinstance(result, BaseException):
+            logger.warning("Prewarm of %s failed: %s", name, repr(result))
+
+
+async def _drain(settings: Settings) -> None:
+    """Refuse new AI calls, wait for in-flight ones, flush batches, close connections."""
+    provider = get_ai_provider()
+    if not await provider.drain(settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS):
+        logger.warning("Shutting down with %d AI calls still in flight", provider.inflight)
+    try:
+        await provider.aclose()
+    except Exception:
+        logger.exception("Closing AI provider failed")
+    await engine.dispose()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
@@ -21,8 +58,15 @@ async def lifespan(app: FastAPI):
         settings.ENVIRONMENT,
         settings.AI_PROVIDER,
     )
+    if settings.STARTUP_PREWARM:
+        await _prewarm(settings)
+    health_monitor = get_health_monitor()
+    health_monitor.start()
     yield
-    # Place shutdown logic here (e.g. closing connections).
+    # Uvicorn has stopped accepting connections and finished open requests by now;
+    # drain covers AI calls still running (background tasks, streams).
+    await health_monitor.stop()
+    await _drain(settings)
 
 
 def create_app() -> FastAPI:
@@ -55,6 +99,7 @@ def create_app() -> FastAPI:
 
     app.include_router(api_router, prefix="/api/v1")
     app.include_router(health_router.router)  # GET /health at root
+    app.include_router(metrics_router.router)  # GET /metrics for Prometheus
 
     return app
 
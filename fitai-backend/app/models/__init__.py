@@ -4,6 +4,9 @@ from app.models.exercise import Exercise
 from app.models.workout import Workout
 from app.models.set import Set
 from app.models.recommendation import Recommendation
+from app.models.planned_target import PlannedTarget
+from app.models.user_stats_rollup import UserStatsRollup
+from app.models.training_volume_daily import TrainingVolumeDaily
 
 __all__ = [
     "Base",
@@ -12,4 +15,7 @@ __all__ = [
     "Workout",
     "Set",
     "Recommendation",
+    "PlannedTarget",
+    "UserStatsRollup",
+    "TrainingVolumeDaily",
 ]
@@ -0,0 +1,53 @@
+# Relationship graph (centered on PlannedTarget):
+# User ──< PlannedTarget >── Exercise
+# Workout ──< PlannedTarget (the session it was planned from)
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class PlannedTarget(Base):
+    """First-working-set target for a user's next session of an exercise (one row per pair)."""
+
+    __tablename__ = "planned_targets"
+    __table_args__ = (
+        UniqueConstraint("user_id", "exercise_id", name="uq_planned_targets_user_id_exercise_id"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        server_default=text("gen_random_uuid()"),
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    exercise_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("exercises.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    source_workout_id: Mapped[UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("workouts.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    target_weight_kg: Mapped[float] = mapped_column(Numeric(6, 2), nullable=False)
+    target_reps: Mapped[int] = mapped_column(Integer, nullable=False)
+    explanation: Mapped[str] = mapped_column(Text, nullable=False)
+    confidence: Mapped[str] = mapped_column(String(10), nullable=False)
+    ai_provider: Mapped[str] = mapped_column(String(20), nullable=False)
+    model_used: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Time the target was (re)computed; reset each time a later workout replaces it.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -48,6 +48,8 @@ class Recommendation(Base):
     ai_provider: Mapped[str] = mapped_column(String(20), nullable=False)
     model_used: Mapped[str] = mapped_column(String(50), nullable=False)
     latency_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     was_followed: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,62 @@
+# Relationship graph (centered on TrainingVolumeDaily):
+# User ──< TrainingVolumeDaily
+
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class TrainingVolumeDaily(Base):
+    """
+    Working sets, reps and volume per user, UTC day of logged_at and muscle group.
+
+    Maintained with every set insert and delete (warmups are not counted), so
+    trend charts read at most one small row per day and muscle group.
+    """
+
+    __tablename__ = "training_volume_daily"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "day", "muscle_group", name="uq_training_volume_daily_user_id_day_muscle_group"
+        ),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        server_default=text("gen_random_uuid()"),
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    muscle_group: Mapped[str] = mapped_column(String(50), nullable=False)
+    sets: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    reps: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    volume_kg: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, server_default=text("0"))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,55 @@
+# Relationship graph (centered on UserStatsRollup):
+# User ──1 UserStatsRollup
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class UserStatsRollup(Base):
+    """
+    Per-user overview counters, maintained with every set write and workout end.
+
+    muscle_set_counts maps muscle_group -> sets and exercise_set_counts maps
+    exercise id -> sets (keys at zero are removed). The streak is stored as the
+    run of consecutive workout days (UTC) ending at last_active_date, next to
+    the longest such run.
+    """
+
+    __tablename__ = "user_stats_rollup"
+
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    total_workouts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    total_sets: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    total_volume_kg: Mapped[float] = mapped_column(
+        Numeric(14, 2), nullable=False, server_default=text("0")
+    )
+    muscle_set_counts: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
+    exercise_set_counts: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
+    streak_start_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    last_active_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    longest_streak_days: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -2,9 +2,21 @@
 # User ──< Workout ──< Set
 # Workout ──< Recommendation
 
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func, text
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    cast,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -13,6 +25,15 @@ from app.db.database import Base
 
 class Workout(Base):
     __tablename__ = "workouts"
+    __table_args__ = (
+        # Calendar days with a finished workout, per user (streaks); see ended_day().
+        Index(
+            "ix_workouts_user_id_ended_day",
+            "user_id",
+            text("CAST(timezone('UTC', ended_at) AS DATE)"),
+            postgresql_where=text("ended_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -34,3 +55,9 @@ class Workout(Base):
         nullable=False,
     )
 
+
+
+def ended_day() -> ColumnElement[date]:
+    """UTC calendar day a workout ended on, spelled as ix_workouts_user_id_ended_day indexes it."""
+    # A literal, not a bind parameter: the planner only uses the index on an identical expression.
+    return cast(func.timezone(literal_column("'UTC'"), Workout.ended_at), Date)
@@ -0,0 +1,71 @@
+"""Repository for PlannedTarget model."""
+
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.planned_target import PlannedTarget
+from app.repositories.base import BaseRepository
+
+
+class PlannedTargetRepository(BaseRepository[PlannedTarget]):
+    """Repository for PlannedTarget model."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, PlannedTarget)
+
+    async def upsert(self, obj_in: dict) -> None:
+        """
+        Insert the target for (user_id, exercise_id), replacing any previous one.
+
+        Args:
+            obj_in: Column values; must include user_id and exercise_id
+        """
+        stmt = insert(PlannedTarget).values(**obj_in)
+        updates = {k: stmt.excluded[k] for k in obj_in if k not in ("user_id", "exercise_id")}
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PlannedTarget.user_id, PlannedTarget.exercise_id],
+            set_={**updates, "created_at": func.now()},
+        )
+        await self.session.execute(stmt)
+
+    async def get_for_user(self, user_id: UUID, limit: int = 100) -> list[PlannedTarget]:
+        """
+        Get a user's planned targets, most recently computed first.
+
+        Args:
+            user_id: User UUID
+            limit: Maximum number of targets
+
+        Returns:
+            List of PlannedTarget instances
+        """
+        stmt = (
+            select(PlannedTarget)
+            .where(PlannedTarget.user_id == user_id)
+            .order_by(PlannedTarget.created_at.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_for_user_and_exercise(
+        self, user_id: UUID, exercise_id: UUID
+    ) -> PlannedTarget | None:
+        """
+        Get the planned target for one exercise.
+
+        Args:
+            user_id: User UUID
+            exercise_id: Exercise UUID
+
+        Returns:
+            PlannedTarget instance or None if nothing is planned yet
+        """
+        stmt = select(PlannedTarget).where(
+            PlannedTarget.user_id == user_id, PlannedTarget.exercise_id == exercise_id
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
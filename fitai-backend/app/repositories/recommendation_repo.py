@@ -1,10 +1,16 @@
 """Repository for Recommendation model."""
 
+from collections.abc import Sequence
+from datetime import datetime
 from uuid import UUID
 
+from sqlalchemy import Date, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.exercise import Exercise
 from app.models.recommendation import Recommendation
+from app.models.set import Set
+from app.models.workout import Workout
 from app.repositories.base import BaseRepository
 
 
@@ -13,3 +19,76 @@ class RecommendationRepository(BaseRepository[Recommendation]):
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session, Recommendation)
+
+    async def get_by_set_id(self, set_id: UUID) -> Recommendation | None:
+        """
+        Get the most recent recommendation attached to a set.
+
+        Args:
+            set_id: Set UUID
+
+        Returns:
+            Recommendation instance or None if the set has none yet
+        """
+        stmt = (
+            select(Recommendation)
+            .where(Recommendation.set_id == set_id)
+            .order_by(Recommendation.created_at.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_distillation_rows(
+        self, ai_providers: Sequence[str], limit: int | None = None
+    ) -> list[tuple[Recommendation, Set, datetime, bool]]:
+        """
+        Get provider recommendations together with the set that triggered them.
+
+        Args:
+            ai_providers: ai_provider values to include (e.g. ["gemini"])
+            limit: Maximum number of rows (most recent first); None for all
+
+        Returns:
+            List of (recommendation, triggering set, workout started_at, exercise is_compound)
+        """
+        stmt = (
+            select(Recommendation, Set, Workout.started_at, Exercise.is_compound)
+            .join(Set, Set.id == Recommendation.set_id)
+            .join(Workout, Workout.id == Set.workout_id)
+            .join(Exercise, Exercise.id == Set.exercise_id)
+            .where(Recommendation.ai_provider.in_(list(ai_providers)))
+            .order_by(Recommendation.created_at.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def get_token_usage_by_day(self, since: datetime) -> list[tuple]:
+        """
+        Token totals per UTC day and ai_provider since a point in time.
+
+        Args:
+            since: Lower bound on created_at
+
+        Returns:
+            List of (day, ai_provider, model_used, calls, prompt_tokens, completion_tokens),
+            newest day first
+        """
+        day = cast(func.timezone("UTC", Recommendation.created_at), Date)
+        stmt = (
+            select(
+                day.label("day"),
+                Recommendation.ai_provider,
+                Recommendation.model_used,
+                func.count(Recommendation.id),
+                func.coalesce(func.sum(Recommendation.prompt_tokens), 0),
+                func.coalesce(func.sum(Recommendation.completion_tokens), 0),
+            )
+            .where(Recommendation.created_at >= since)
+            .group_by(day, Recommendation.ai_provider, Recommendation.model_used)
+            .order_by(day.desc(), Recommendation.ai_provider)
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
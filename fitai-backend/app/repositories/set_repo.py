@@ -1,9 +1,12 @@
+from collections.abc import AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.exercise import Exercise
 from app.models.set import Set
+from app.models.workout import Workout
 from app.repositories.base import BaseRepository
 
 
@@ -31,6 +34,26 @@ class SetRepository(BaseRepository[Set]):
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_sets_for_workouts(self, workout_ids: list[UUID]) -> list[Set]:
+        """
+        Get all sets for several workouts in one query.
+
+        Args:
+            workout_ids: Workout UUIDs
+
+        Returns:
+            List of set instances ordered by workout_id then set_number
+        """
+        if not workout_ids:
+            return []
+        stmt = (
+            select(Set)
+            .where(Set.workout_id.in_(workout_ids))
+            .order_by(Set.workout_id, Set.set_number)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_sets_for_workout_and_user(
         self, workout_id: UUID, user_id: UUID
     ) -> list[Set]:
@@ -134,3 +157,51 @@ class SetRepository(BaseRepository[Set]):
         result = await self.session.execute(stmt)
         value = result.scalar()
         return float(value) if value is not None else None
+
+    async def stream_history(
+        self, batch_size: int = 5000, limit: int | None = None
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Stream every set with its workout start and exercise details, in batches.
+
+        Uses a server-side cursor, so memory stays bounded by batch_size however
+        large the table is. Rows are ordered by user, then logged_at, so a reader
+        can replay each user's history in the order it was logged.
+
+        Args:
+            batch_size: Rows fetched per round trip
+            limit: Stop after this many rows (None for all)
+
+        Returns:
+            Async iterator of row batches with id, user_id, workout_id, exercise_id,
+            set_number, weight_kg, reps, rpe, is_warmup, logged_at, started_at,
+            exercise_name, muscle_group, equipment_type, is_compound
+        """
+        stmt = (
+            select(
+                Set.id,
+                Set.user_id,
+                Set.workout_id,
+                Set.exercise_id,
+                Set.set_number,
+                Set.weight_kg,
+                Set.reps,
+                Set.rpe,
+                Set.is_warmup,
+                Set.logged_at,
+                Workout.started_at,
+                Exercise.name.label("exercise_name"),
+                Exercise.muscle_group,
+                Exercise.equipment_type,
+                Exercise.is_compound,
+            )
+            .join(Workout, Workout.id == Set.workout_id)
+            .join(Exercise, Exercise.id == Set.exercise_id)
+            .order_by(Set.user_id, Set.logged_at, Set.set_number, Set.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield list(partition)
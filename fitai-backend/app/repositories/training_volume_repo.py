@@ -0,0 +1,142 @@
+"""Repository for TrainingVolumeDaily: per-day counters maintained on set writes, bucketed reads."""
+
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, literal, literal_column, null, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exercise import Exercise
+from app.models.set import Set
+from app.models.training_volume_daily import TrainingVolumeDaily
+from app.repositories.base import BaseRepository
+
+BUCKETS = ("week", "month")
+
+# UTC calendar day a set was logged on.
+_set_day = cast(func.timezone(literal_column("'UTC'"), Set.logged_at), Date)
+
+
+class TrainingVolumeRepository(BaseRepository[TrainingVolumeDaily]):
+    """Repository for daily training volume per muscle group."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, TrainingVolumeDaily)
+
+    async def add_set(self, set_id: UUID) -> None:
+        """
+        Count a logged set in its day's row (warmups are skipped).
+
+        The set must already be flushed; runs in the caller's transaction.
+
+        Args:
+            set_id: UUID of the new set
+        """
+        source = (
+            select(
+                Set.user_id,
+                _set_day,
+                Exercise.muscle_group,
+                literal(1),
+                Set.reps,
+                Set.weight_kg * Set.reps,
+            )
+            .join(Exercise, Exercise.id == Set.exercise_id)
+            .where(Set.id == set_id, Set.is_warmup.is_(False))
+        )
+        stmt = insert(TrainingVolumeDaily).from_select(
+            ["user_id", "day", "muscle_group", "sets", "reps", "volume_kg"], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                TrainingVolumeDaily.user_id,
+                TrainingVolumeDaily.day,
+                TrainingVolumeDaily.muscle_group,
+            ],
+            set_={
+                "sets": TrainingVolumeDaily.sets + stmt.excluded.sets,
+                "reps": TrainingVolumeDaily.reps + stmt.excluded.reps,
+                "volume_kg": TrainingVolumeDaily.volume_kg + stmt.excluded.volume_kg,
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def remove_set(self, set_id: UUID) -> None:
+        """
+        Uncount a set that is about to be deleted from its day's row.
+
+        Args:
+            set_id: UUID of the set (still present)
+        """
+        stmt = (
+            update(TrainingVolumeDaily)
+            .where(
+                Set.id == set_id,
+                Set.is_warmup.is_(False),
+                Exercise.id == Set.exercise_id,
+                TrainingVolumeDaily.user_id == Set.user_id,
+                TrainingVolumeDaily.day == _set_day,
+                TrainingVolumeDaily.muscle_group == Exercise.muscle_group,
+            )
+            .values(
+                sets=TrainingVolumeDaily.sets - 1,
+                reps=TrainingVolumeDaily.reps - Set.reps,
+                volume_kg=TrainingVolumeDaily.volume_kg - Set.weight_kg * Set.reps,
+                updated_at=func.now(),
+            )
+        )
+        await self.session.execute(stmt)
+
+    async def get_buckets(
+        self,
+        user_id: UUID,
+        bucket: str,
+        start: date,
+        end: date,
+        by_muscle_group: bool = True,
+    ) -> list[tuple]:
+        """
+        Sum the daily rows into weekly or monthly buckets.
+
+        Args:
+            user_id: User UUID
+            bucket: "week" (starting Monday) or "month"
+            start: First day included
+            end: Last day included
+            by_muscle_group: One row per bucket and muscle group, else one per bucket
+
+        Returns:
+            List of (bucket_start, muscle_group or None, sets, reps, volume_kg),
+            oldest bucket first; buckets without working sets are omitted
+
+        Raises:
+            ValueError: If bucket is not one of BUCKETS
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {BUCKETS}, got {bucket!r}")
+        bucket_start = cast(
+            func.date_trunc(literal_column(f"'{bucket}'"), TrainingVolumeDaily.day), Date
+        )
+        group = TrainingVolumeDaily.muscle_group if by_muscle_group else null()
+        keys = [bucket_start, TrainingVolumeDaily.muscle_group] if by_muscle_group else [bucket_start]
+        stmt = (
+            select(
+                bucket_start.label("bucket_start"),
+                group.label("muscle_group"),
+                func.sum(TrainingVolumeDaily.sets),
+                func.sum(TrainingVolumeDaily.reps),
+                func.sum(TrainingVolumeDaily.volume_kg),
+            )
+            .where(
+                TrainingVolumeDaily.user_id == user_id,
+                TrainingVolumeDaily.day >= start,
+                TrainingVolumeDaily.day <= end,
+            )
+            .group_by(*keys)
+            .having(func.sum(TrainingVolumeDaily.sets) > 0)
+            .order_by(*keys)
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
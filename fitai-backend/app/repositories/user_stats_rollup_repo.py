@@ -0,0 +1,451 @@
+"""Repository for UserStatsRollup: incremental maintenance, rebuild from base tables, reads."""
+
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnClause,
+    Date,
+    Integer,
+    Numeric,
+    Row,
+    Select,
+    Text,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import distinct_on, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exercise import Exercise
+from app.models.set import Set
+from app.models.user import User
+from app.models.user_stats_rollup import UserStatsRollup
+from app.models.workout import Workout, ended_day
+from app.repositories.base import BaseRepository
+
+ROLLUP_COLUMNS = (
+    "user_id",
+    "total_workouts",
+    "total_sets",
+    "total_volume_kg",
+    "muscle_set_counts",
+    "exercise_set_counts",
+    "streak_start_date",
+    "last_active_date",
+    "longest_streak_days",
+)
+
+_EMPTY_JSONB: ColumnClause = literal_column("'{}'::jsonb")
+
+
+def _bump(column, key, delta: int):
+    """column with key's counter moved by delta; the key is removed when it reaches zero."""
+    new_count = func.coalesce(cast(column[key].astext, Integer), 0) + delta
+    return case(
+        (new_count <= 0, column.op("-")(key)),
+        else_=column.op("||")(func.jsonb_build_object(key, new_count)),
+    )
+
+
+class UserStatsRollupRepository(BaseRepository[UserStatsRollup]):
+    """Repository for the per-user overview rollup (primary key: user_id)."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, UserStatsRollup)
+
+    async def add_set(
+        self, user_id: UUID, exercise_id: UUID, weight_kg: float, reps: int
+    ) -> None:
+        """
+        Count a newly logged set (creates the user's row on their first set).
+
+        Runs in the caller's transaction, so the rollup commits with the set.
+
+        Args:
+            user_id: Set owner UUID
+            exercise_id: Exercise UUID of the set
+            weight_kg: Logged weight
+            reps: Logged reps
+        """
+        muscle = select(Exercise.muscle_group).where(Exercise.id == exercise_id).scalar_subquery()
+        exercise_key = str(exercise_id)
+        volume = cast(literal(weight_kg), Numeric(6, 2)) * reps
+        stmt = insert(UserStatsRollup).values(
+            user_id=user_id,
+            total_sets=1,
+            total_volume_kg=volume,
+            muscle_set_counts=func.jsonb_build_object(muscle, 1),
+            exercise_set_counts=func.jsonb_build_object(exercise_key, 1),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserStatsRollup.user_id],
+            set_={
+                "total_sets": UserStatsRollup.total_sets + 1,
+                "total_volume_kg": UserStatsRollup.total_volume_kg + volume,
+                "muscle_set_counts": _bump(UserStatsRollup.muscle_set_counts, muscle, 1),
+                "exercise_set_counts": _bump(UserStatsRollup.exercise_set_counts, exercise_key, 1),
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def remove_set(
+        self, user_id: UUID, exercise_id: UUID, weight_kg: float, reps: int
+    ) -> None:
+        """
+        Uncount a set that is being deleted (in the caller's transaction).
+
+        Args:
+            user_id: Set owner UUID
+            exercise_id: Exercise UUID of the set
+            weight_kg: Stored weight of the set
+            reps: Stored reps of the set
+        """
+        muscle = select(Exercise.muscle_group).where(Exercise.id == exercise_id).scalar_subquery()
+        volume = cast(literal(weight_kg), Numeric(6, 2)) * reps
+        stmt = (
+            update(UserStatsRollup)
+            .where(UserStatsRollup.user_id == user_id)
+            .values(
+                total_sets=UserStatsRollup.total_sets - 1,
+                total_volume_kg=UserStatsRollup.total_volume_kg - volume,
+                muscle_set_counts=_bump(UserStatsRollup.muscle_set_counts, muscle, -1),
+                exercise_set_counts=_bump(UserStatsRollup.exercise_set_counts, str(exercise_id), -1),
+                updated_at=func.now(),
+            )
+        )
+        await self.session.execute(stmt)
+
+    async def add_workout_end(self, user_id: UUID, day: date) -> None:
+        """
+        Count a workout that just ended on day and extend or restart the streak.
+
+        A day right after last_active_date extends the streak, a later day starts
+        a new one; an earlier day only counts the workout (rebuild corrects it).
+        The longest streak grows with the current one.
+
+        Args:
+            user_id: Workout owner UUID
+            day: UTC date the workout ended
+        """
+        last = UserStatsRollup.last_active_date
+        start = case(
+            (last.isnot(None) & (literal(day, Date) <= last + 1), UserStatsRollup.streak_start_date),
+            else_=literal(day, Date),
+        )
+        end = func.greatest(last, literal(day, Date))
+        stmt = insert(UserStatsRollup).values(
+            user_id=user_id,
+            total_workouts=1,
+            streak_start_date=day,
+            last_active_date=day,
+            longest_streak_days=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserStatsRollup.user_id],
+            set_={
+                "total_workouts": UserStatsRollup.total_workouts + 1,
+                "streak_start_date": start,
+                "last_active_date": end,
+                "longest_streak_days": func.greatest(
+                    UserStatsRollup.longest_streak_days, end - start + 1
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def rebuild(self, user_id: UUID | None = None) -> int:
+        """
+        Recompute rollup rows from sets, workouts and exercises (backfill and repair).
+
+        Args:
+            user_id: Rebuild one user; None rebuilds every user
+
+        Returns:
+            Number of rows written
+        """
+        stmt = insert(UserStatsRollup).from_select(
+            list(ROLLUP_COLUMNS), rollup_from_base(user_id)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserStatsRollup.user_id],
+            set_={
+                **{c: stmt.excluded[c] for c in ROLLUP_COLUMNS if c != "user_id"},
+                "updated_at": func.now(),
+            },
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount or 0
+
+    async def compute_from_base(self, user_id: UUID) -> Row | None:
+        """
+        What the user's rollup row should hold, computed from the base tables.
+
+        Args:
+            user_id: User UUID
+
+        Returns:
+            Row with the ROLLUP_COLUMNS, or None if the user does not exist
+        """
+        return (await self.session.execute(rollup_from_base(user_id))).one_or_none()
+
+    async def compute_overview(self, user_id: UUID, today: date) -> Row:
+        """
+        The user's overview computed from the base tables, in one round trip.
+
+        Args:
+            user_id: User UUID
+            today: Day the active streak must reach to count
+
+        Returns:
+            Row with total_workouts, total_sets, total_volume_kg, most_trained_muscle,
+            favourite_exercise, active_streak_days, longest_streak_days, streak_start_date
+        """
+        return (await self.session.execute(overview_from_base(user_id, today))).one()
+
+    async def get_overview_row(self, user_id: UUID) -> Row | None:
+        """
+        The user's rollup with the favourite exercise's name, in one primary-key read.
+
+        Args:
+            user_id: User UUID
+
+        Returns:
+            Row with the rollup columns plus favourite_exercise, or None if no rollup exists
+        """
+        counts = func.jsonb_each_text(UserStatsRollup.exercise_set_counts).table_valued(
+            "key", "value"
+        )
+        favourite = (
+            select(Exercise.name)
+            .select_from(counts)
+            .join(Exercise, Exercise.id == cast(counts.c.key, Exercise.id.type))
+            .order_by(cast(counts.c.value, Integer).desc(), Exercise.name)
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = select(
+            *(getattr(UserStatsRollup, c) for c in ROLLUP_COLUMNS),
+            favourite.label("favourite_exercise"),
+        ).where(UserStatsRollup.user_id == user_id)
+        return (await self.session.execute(stmt)).one_or_none()
+
+    async def get_user_ids(self, after: UUID | None = None, limit: int = 1000) -> list[UUID]:
+        """
+        Page through all user ids in id order (for checks over every user).
+
+        Args:
+            after: Return ids greater than this one
+            limit: Page size
+
+        Returns:
+            List of user UUIDs
+        """
+        stmt = select(User.id).order_by(User.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(User.id > after)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+
+def rollup_from_base(user_id: UUID | None = None) -> Select:
+    """
+    SELECT producing ROLLUP_COLUMNS for one user (or all) from the base tables.
+
+    The current streak is the user's last run of consecutive workout days and
+    the longest streak the longest run (see streak_runs).
+    """
+
+    def scoped(stmt, column):
+        return stmt.where(column == user_id) if user_id is not None else stmt
+
+    set_totals = scoped(
+        select(
+            Set.user_id,
+            func.count(Set.id).label("total_sets"),
+            func.sum(Set.weight_kg * Set.reps).label("total_volume_kg"),
+        ).group_by(Set.user_id),
+        Set.user_id,
+    ).cte("set_totals")
+
+    per_muscle = scoped(
+        select(Set.user_id, Exercise.muscle_group.label("key"), func.count(Set.id).label("n"))
+        .join(Exercise, Exercise.id == Set.exercise_id)
+        .group_by(Set.user_id, Exercise.muscle_group),
+        Set.user_id,
+    ).subquery("per_muscle")
+    muscles = (
+        select(per_muscle.c.user_id, func.jsonb_object_agg(per_muscle.c.key, per_muscle.c.n).label("counts"))
+        .group_by(per_muscle.c.user_id)
+        .cte("muscles")
+    )
+
+    per_exercise = scoped(
+        select(
+            Set.user_id,
+            cast(Set.exercise_id, Text).label("key"),
+            func.count(Set.id).label("n"),
+        ).group_by(Set.user_id, Set.exercise_id),
+        Set.user_id,
+    ).subquery("per_exercise")
+    exercises = (
+        select(
+            per_exercise.c.user_id,
+            func.jsonb_object_agg(per_exercise.c.key, per_exercise.c.n).label("counts"),
+        )
+        .group_by(per_exercise.c.user_id)
+        .cte("exercises")
+    )
+
+    ended = Workout.ended_at.isnot(None)
+    workout_totals = scoped(
+        select(Workout.user_id, func.count(Workout.id).label("total_workouts"))
+        .where(ended)
+        .group_by(Workout.user_id),
+        Workout.user_id,
+    ).cte("workout_totals")
+
+    runs = streak_runs(user_id).cte("runs")
+    last_run = (
+        select(runs.c.user_id, runs.c.start_day, runs.c.end_day)
+        .ext(distinct_on(runs.c.user_id))
+        .order_by(runs.c.user_id, runs.c.end_day.desc())
+        .cte("last_run")
+    )
+    longest_run = (
+        select(runs.c.user_id, func.max(runs.c.length).label("length"))
+        .group_by(runs.c.user_id)
+        .cte("longest_run")
+    )
+
+    stmt = (
+        select(
+            User.id.label("user_id"),
+            func.coalesce(workout_totals.c.total_workouts, 0).label("total_workouts"),
+            func.coalesce(set_totals.c.total_sets, 0).label("total_sets"),
+            func.coalesce(set_totals.c.total_volume_kg, 0).label("total_volume_kg"),
+            func.coalesce(muscles.c.counts, _EMPTY_JSONB).label("muscle_set_counts"),
+            func.coalesce(exercises.c.counts, _EMPTY_JSONB).label("exercise_set_counts"),
+            last_run.c.start_day.label("streak_start_date"),
+            last_run.c.end_day.label("last_active_date"),
+            func.coalesce(longest_run.c.length, 0).label("longest_streak_days"),
+        )
+        .outerjoin(set_totals, set_totals.c.user_id == User.id)
+        .outerjoin(muscles, muscles.c.user_id == User.id)
+        .outerjoin(exercises, exercises.c.user_id == User.id)
+        .outerjoin(workout_totals, workout_totals.c.user_id == User.id)
+        .outerjoin(last_run, last_run.c.user_id == User.id)
+        .outerjoin(longest_run, longest_run.c.user_id == User.id)
+    )
+    return scoped(stmt, User.id)
+
+
+def overview_from_base(user_id: UUID, today: date) -> Select:
+    """
+    Single SELECT for one user's overview, computed from sets and workouts.
+
+    per_exercise aggregates the user's sets once (grouped by exercise); totals,
+    the top muscle and the favourite exercise are read from it. Streaks come
+    from the user's runs of consecutive workout days (streak_runs): the active
+    streak is the run ending today (FILTER), 0 if there is none, and the
+    longest is the longest run. Ties on counts go to the first name, as in the rollup.
+
+    Args:
+        user_id: User UUID
+        today: Day the active streak must reach to count
+
+    Returns:
+        SELECT with one row of overview columns
+    """
+    per_exercise = (
+        select(
+            Exercise.name,
+            Exercise.muscle_group,
+            func.count(Set.id).label("n"),
+            func.sum(Set.weight_kg * Set.reps).label("volume"),
+        )
+        .join(Exercise, Set.exercise_id == Exercise.id)
+        .where(Set.user_id == user_id)
+        .group_by(Exercise.id, Exercise.name, Exercise.muscle_group)
+        .cte("per_exercise")
+    )
+    top_muscle = (
+        select(per_exercise.c.muscle_group)
+        .group_by(per_exercise.c.muscle_group)
+        .order_by(func.sum(per_exercise.c.n).desc(), per_exercise.c.muscle_group)
+        .limit(1)
+    )
+    top_exercise = (
+        select(per_exercise.c.name)
+        .order_by(per_exercise.c.n.desc(), per_exercise.c.name)
+        .limit(1)
+    )
+
+    runs = streak_runs(user_id).cte("runs")
+    is_current = runs.c.end_day == today
+    streak = select(
+        func.coalesce(func.max(runs.c.length).filter(is_current), 0).label("active_streak_days"),
+        func.coalesce(func.max(runs.c.length), 0).label("longest_streak_days"),
+        func.max(runs.c.start_day).filter(is_current).label("streak_start_date"),
+    ).cte("streak")
+
+    return select(
+        select(func.count(Workout.id))
+        .where(Workout.user_id == user_id, Workout.ended_at.isnot(None))
+        .scalar_subquery()
+        .label("total_workouts"),
+        select(func.coalesce(func.sum(per_exercise.c.n), 0)).scalar_subquery().label("total_sets"),
+        select(func.coalesce(func.sum(per_exercise.c.volume), 0))
+        .scalar_subquery()
+        .label("total_volume_kg"),
+        top_muscle.scalar_subquery().label("most_trained_muscle"),
+        top_exercise.scalar_subquery().label("favourite_exercise"),
+        streak.c.active_streak_days,
+        streak.c.longest_streak_days,
+        streak.c.streak_start_date,
+    ).select_from(streak)
+
+
+def streak_runs(user_id: UUID | None = None) -> Select:
+    """
+    Runs of consecutive workout days per user: user_id, start_day, end_day, length.
+
+    Gaps-and-islands: over a user's distinct workout days in order, day minus
+    its row number is constant within a run and changes after every gap. The
+    days come from ix_workouts_user_id_ended_day (an index-only scan per user).
+
+    Args:
+        user_id: Only this user's runs; None for every user
+
+    Returns:
+        SELECT with one row per run
+    """
+    workout_days = select(Workout.user_id, ended_day().label("day")).where(
+        Workout.ended_at.isnot(None)
+    )
+    if user_id is not None:
+        workout_days = workout_days.where(Workout.user_id == user_id)
+    days = workout_days.distinct().subquery("days")
+    islands = select(
+        days.c.user_id,
+        days.c.day,
+        (
+            days.c.day
+            - cast(func.row_number().over(partition_by=days.c.user_id, order_by=days.c.day), Integer)
+        ).label("island"),
+    ).subquery("islands")
+    return (
+        select(
+            islands.c.user_id,
+            func.min(islands.c.day).label("start_day"),
+            func.max(islands.c.day).label("end_day"),
+            func.count().label("length"),
+        )
+        .group_by(islands.c.user_id, islands.c.island)
+    )
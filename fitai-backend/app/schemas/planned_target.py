@@ -0,0 +1,21 @@
+"""Schemas for planned next-session targets."""
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class PlannedTargetResponse(BaseModel):
+    """First-working-set target for the next session of an exercise."""
+
+    exercise_id: UUID
+    target_weight_kg: float
+    target_reps: int
+    explanation: str
+    confidence: str
+    model_used: str
+    source_workout_id: UUID | None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
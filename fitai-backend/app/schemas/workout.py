@@ -5,6 +5,8 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
+from app.schemas.planned_target import PlannedTargetResponse
+
 
 class WorkoutCreate(BaseModel):
     """Schema for starting a workout."""
@@ -33,3 +35,9 @@ class WorkoutResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class WorkoutStartResponse(WorkoutResponse):
+    """Started workout plus the targets planned for the user's exercises."""
+
+    planned_targets: list[PlannedTargetResponse] = []
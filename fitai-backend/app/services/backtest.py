@@ -0,0 +1,296 @@
+"""
+Backtest rule engine versions against logged history.
+
+HistoryReplayer turns the rows from SetRepository.stream_history back into
+the WorkoutContext each working set was recommended from. run_chunk runs two
+rule engine modules (loaded from file paths, so an older rule_engine.py can
+be checked out next to the current one) on a chunk of cases in a worker
+process. BacktestSummary merges the per-chunk results into the diff report.
+"""
+
+import heapq
+import importlib.util
+import math
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from app.ai.base import WorkoutContext
+
+# Same window as build_context: last 60 sets of the exercise feed recent_sessions and the 1RM.
+RECENT_SETS_LIMIT = 60
+RECENT_SESSIONS = 3
+CURRENT_RULE_ENGINE = Path(__file__).with_name("rule_engine.py")
+
+# (set_id, WorkoutContext fields, last_weight_kg, last_reps, last_rpe); plain data so it pickles cheaply
+BacktestCase = tuple[str, dict[str, Any], float, int, float | None]
+
+
+@dataclass
+class _ExerciseHistory:
+    recent: deque = field(default_factory=lambda: deque(maxlen=RECENT_SETS_LIMIT))
+    max_weight: float | None = None
+
+
+class HistoryReplayer:
+    """
+    Rebuild each working set's WorkoutContext from rows ordered by user, then logged_at.
+
+    Mirrors app.ai.context_builder.build_context as it ran right after the set
+    was logged: only sets logged up to and including that set are visible, and
+    workout duration runs to the set's logged_at instead of now. State is kept
+    for one user at a time, so memory is bounded by the largest user history.
+    """
+
+    def __init__(self) -> None:
+        self._user_id: Any = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._exercises: dict[Any, _ExerciseHistory] = {}
+        self._sessions: dict[tuple[Any, Any], list[dict]] = {}
+        self._workout_sets: Counter = Counter()
+        self._workout_dates: dict[Any, str] = {}
+
+    def feed(self, row: Any) -> BacktestCase | None:
+        """
+        Add one streamed row to the history.
+
+        Args:
+            row: Row from SetRepository.stream_history
+
+        Returns:
+            The case to backtest, or None for warmup sets (no recommendation is made for them)
+        """
+        if row.user_id != self._user_id:
+            self._reset()
+            self._user_id = row.user_id
+
+        weight = float(row.weight_kg)
+        rpe = float(row.rpe) if row.rpe is not None else None
+        history = self._exercises.setdefault(row.exercise_id, _ExerciseHistory())
+        history.recent.append((row.workout_id, weight, row.reps, rpe))
+        if history.max_weight is None or weight > history.max_weight:
+            history.max_weight = weight
+        session = self._sessions.setdefault((row.workout_id, row.exercise_id), [])
+        session.append(
+            {"weight_kg": weight, "reps": row.reps, "rpe": rpe, "set_number": row.set_number}
+        )
+        self._workout_sets[row.workout_id] += 1
+        if row.workout_id not in self._workout_dates:
+            self._workout_dates[row.workout_id] = (
+                row.started_at.strftime("%Y-%m-%d") if row.started_at else ""
+            )
+
+        if row.is_warmup:
+            return None
+
+        ctx = {
+            "exercise_name": row.exercise_name,
+            "muscle_group": row.muscle_group,
+            "equipment_type": row.equipment_type or "",
+            "is_compound": row.is_compound,
+            "current_session_sets": list(session),
+            "recent_sessions": self._recent_sessions(history, row.workout_id),
+            "estimated_1rm": round(max(w * (1.0 + r / 30.0) for _, w, r, _ in history.recent), 2),
+            "max_weight_ever": history.max_weight,
+            "total_sets_today": self._workout_sets[row.workout_id],
+            "workout_duration_minutes": max(
+                0, int((row.logged_at - row.started_at).total_seconds() / 60)
+            ),
+        }
+        return (str(row.id), ctx, weight, row.reps, rpe)
+
+    def _recent_sessions(self, history: _ExerciseHistory, current_workout: Any) -> list[dict]:
+        by_workout: dict[Any, list[dict]] = {}
+        for workout_id, weight, reps, rpe in reversed(history.recent):
+            if workout_id == current_workout:
+                continue
+            if workout_id not in by_workout:
+                if len(by_workout) == RECENT_SESSIONS:
+                    continue
+                by_workout[workout_id] = []
+            by_workout[workout_id].append({"weight_kg": weight, "reps": reps, "rpe": rpe})
+        return [
+            {"date": self._workout_dates.get(workout_id, ""), "sets": sets}
+            for workout_id, sets in by_workout.items()
+        ]
+
+
+def load_rule_engine(path: str | Path, name: str) -> ModuleType:
+    """
+    Import a rule_engine.py from a file path under a private module name.
+
+    Args:
+        path: File defining get_rule_based_recommendation (e.g. from git show <rev>:...)
+        name: Module name to register it under
+
+    Returns:
+        The loaded module
+
+    Raises:
+        ValueError: If the file does not define get_rule_based_recommendation
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Cannot load rule engine from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not callable(getattr(module, "get_rule_based_recommendation", None)):
+        raise ValueError(f"{path} does not define get_rule_based_recommendation")
+    return module
+
+
+_engines: tuple[ModuleType, ModuleType] | None = None
+
+
+def init_worker(old_path: str, new_path: str) -> None:
+    """ProcessPoolExecutor initializer: load both engines once per worker."""
+    global _engines
+    _engines = (
+        load_rule_engine(old_path, "_backtest_rules_old"),
+        load_rule_engine(new_path, "_backtest_rules_new"),
+    )
+
+
+def _run(engine: ModuleType, ctx: WorkoutContext, case: BacktestCase) -> tuple[float, int, str]:
+    return engine.get_rule_based_recommendation(ctx, case[2], case[3], case[4])
+
+
+@dataclass
+class BacktestSummary:
+    """Mergeable diff counts for old vs new recommendations."""
+
+    max_examples: int = 20
+    sets: int = 0
+    changed: int = 0
+    weight_changed: int = 0
+    reps_changed: int = 0
+    errors: Counter = field(default_factory=Counter)
+    weight_deltas: Counter = field(default_factory=Counter)
+    reps_deltas: Counter = field(default_factory=Counter)
+    examples: list[tuple[float, int, int, dict]] = field(default_factory=list)
+    _seq: int = 0
+
+    def add_example(self, example: dict) -> None:
+        # Keep the largest changes: min-heap on (|weight delta|, |reps delta|).
+        self._seq += 1
+        key = (abs(example["weight_delta_kg"]), abs(example["reps_delta"]), -self._seq, example)
+        if len(self.examples) < self.max_examples:
+            heapq.heappush(self.examples, key)
+        elif key[:3] > self.examples[0][:3]:
+            heapq.heapreplace(self.examples, key)
+
+    def merge(self, other: "BacktestSummary") -> None:
+        self.sets += other.sets
+        self.changed += other.changed
+        self.weight_changed += other.weight_changed
+        self.reps_changed += other.reps_changed
+        self.errors.update(other.errors)
+        self.weight_deltas.update(other.weight_deltas)
+        self.reps_deltas.update(other.reps_deltas)
+        for _, _, _, example in other.examples:
+            self.add_example(example)
+
+    def report(self) -> dict:
+        """The diff report as JSON-serialisable data."""
+        compared = self.sets - sum(self.errors.values())
+        return {
+            "sets": self.sets,
+            "errors": dict(self.errors),
+            "changed_rate": _rate(self.changed, compared),
+            "weight_changed_rate": _rate(self.weight_changed, compared),
+            "reps_changed_rate": _rate(self.reps_changed, compared),
+            "weight_delta_kg": _distribution(self.weight_deltas),
+            "reps_delta": _distribution(self.reps_deltas),
+            "examples": [
+                example for *_, example in sorted(self.examples, key=lambda e: e[:2], reverse=True)
+            ],
+        }
+
+
+def _rate(count: int, total: int) -> float:
+    return round(count / total, 4) if total else 0.0
+
+
+def _distribution(deltas: Counter) -> dict:
+    """Percentiles and a histogram of the non-zero deltas."""
+    total = sum(deltas.values())
+    if not total:
+        return {"changed": 0}
+    ordered = sorted(deltas.items())
+    percentiles = {}
+    for p in (1, 5, 25, 50, 75, 95, 99):
+        rank = max(1, math.ceil(p / 100 * total))
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            if seen >= rank:
+                percentiles[f"p{p}"] = value
+                break
+    return {
+        "changed": total,
+        "mean": round(sum(v * c for v, c in ordered) / total, 3),
+        "up": sum(c for v, c in ordered if v > 0),
+        "down": sum(c for v, c in ordered if v < 0),
+        **percentiles,
+        "histogram": {str(v): c for v, c in ordered},
+    }
+
+
+def run_chunk(cases: list[BacktestCase], max_examples: int = 20) -> BacktestSummary:
+    """
+    Run the worker's old and new engines on a chunk of cases.
+
+    Args:
+        cases: Cases from HistoryReplayer.feed
+        max_examples: Largest changes to keep
+
+    Returns:
+        Summary of this chunk, to be merged by the caller
+
+    Raises:
+        RuntimeError: If init_worker has not run in this process
+    """
+    if _engines is None:
+        raise RuntimeError("init_worker must run before run_chunk")
+    old_engine, new_engine = _engines
+    summary = BacktestSummary(max_examples=max_examples)
+    for case in cases:
+        summary.sets += 1
+        ctx = WorkoutContext(**case[1])
+        try:
+            old = _run(old_engine, ctx, case)
+        except Exception as e:
+            summary.errors[f"old: {type(e).__name__}"] += 1
+            continue
+        try:
+            new = _run(new_engine, ctx, case)
+        except Exception as e:
+            summary.errors[f"new: {type(e).__name__}"] += 1
+            continue
+        weight_delta = round(new[0] - old[0], 2)
+        reps_delta = new[1] - old[1]
+        if not weight_delta and not reps_delta:
+            continue
+        summary.changed += 1
+        if weight_delta:
+            summary.weight_changed += 1
+            summary.weight_deltas[weight_delta] += 1
+        if reps_delta:
+            summary.reps_changed += 1
+            summary.reps_deltas[reps_delta] += 1
+        summary.add_example(
+            {
+                "set_id": case[0],
+                "exercise": ctx.exercise_name,
+                "logged": {"weight_kg": case[2], "reps": case[3], "rpe": case[4]},
+                "old": {"weight_kg": old[0], "reps": old[1], "explanation": old[2]},
+                "new": {"weight_kg": new[0], "reps": new[1], "explanation": new[2]},
+                "weight_delta_kg": weight_delta,
+                "reps_delta": reps_delta,
+            }
+        )
+    return summary
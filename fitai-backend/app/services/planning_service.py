@@ -0,0 +1,171 @@
+"""Planning service — next-session targets precomputed at end_workout (repository layer only)."""
+
+import logging
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.base import AIProvider, AIRecommendation, WorkoutContext, provider_label
+from app.ai.bulkhead import BulkheadRejected
+from app.ai.context_builder import build_next_session_context
+from app.ai.usage import QuotaExceeded
+from app.core.metrics import PLANNED_TARGETS_TOTAL
+from app.db.database import AsyncSessionLocal
+from app.models.planned_target import PlannedTarget
+from app.models.set import Set
+from app.repositories.planned_target_repo import PlannedTargetRepository
+from app.repositories.set_repo import SetRepository
+from app.services.rule_engine import get_rule_based_recommendation
+
+logger = logging.getLogger(__name__)
+
+
+def _rule_based_target(ctx: WorkoutContext, first_set: Set, ai_provider: str) -> dict:
+    """Rule-engine target from the first working set of the session that just ended."""
+    weight, reps, explanation = get_rule_based_recommendation(
+        ctx,
+        float(first_set.weight_kg),
+        first_set.reps,
+        float(first_set.rpe) if first_set.rpe is not None else None,
+    )
+    return {
+        "target_weight_kg": weight,
+        "target_reps": reps,
+        "explanation": f"Based on last session's first working set. {explanation}",
+        "confidence": "low",
+        "ai_provider": ai_provider,
+        "model_used": "rule-based",
+    }
+
+
+def _ai_target(rec: AIRecommendation) -> dict:
+    return {
+        "target_weight_kg": rec.suggested_weight_kg,
+        "target_reps": rec.suggested_reps,
+        "explanation": rec.explanation,
+        "confidence": rec.confidence,
+        "ai_provider": rec.provider or provider_label(rec.model_used),
+        "model_used": rec.model_used,
+    }
+
+
+def _fallback_source(error: Exception | None) -> str:
+    if isinstance(error, BulkheadRejected):
+        return "shed"
+    if isinstance(error, QuotaExceeded):
+        return "quota"
+    return "fallback"
+
+
+async def compute_next_session_targets(
+    workout_id: UUID, user_id: UUID, ai_provider: AIProvider, db: AsyncSession
+) -> int:
+    """
+    Compute and store first-working-set targets for every exercise of a workout.
+
+    All exercises go to the provider chain in one get_batch_recommendations call:
+    each wrapper forwards it as a batch (the rule tier and the distilled router
+    keep the items they answer themselves), it takes one slot of the planning
+    bulkhead rather than live-traffic slots, and Gemini answers it with a single
+    generate_content request. An exercise whose item fails gets the rule-based
+    target from its first working set instead. Targets replace the user's
+    previous ones for those exercises.
+
+    Args:
+        workout_id: Ended workout UUID
+        user_id: Workout owner UUID
+        ai_provider: Provider chain used for the targets
+        db: Database session (committed here)
+
+    Returns:
+        Number of targets stored
+    """
+    first_working: dict[UUID, Set] = {}
+    for s in await SetRepository(db).get_sets_for_workout(workout_id):
+        if not s.is_warmup and s.exercise_id not in first_working:
+            first_working[s.exercise_id] = s
+    if not first_working:
+        return 0
+
+    contexts: dict[str, WorkoutContext] = {}
+    for exercise_id in first_working:
+        try:
+            contexts[str(exercise_id)] = await build_next_session_context(exercise_id, user_id, db)
+        except ValueError:
+            logger.warning("Skipping plan for missing exercise %s", exercise_id)
+    if not contexts:
+        return 0
+    try:
+        results = await ai_provider.get_batch_recommendations(contexts)
+    except Exception as e:
+        results = {key: e for key in contexts}
+
+    repo = PlannedTargetRepository(db)
+    for key, ctx in contexts.items():
+        exercise_id = UUID(key)
+        result = results.get(key)
+        if isinstance(result, AIRecommendation):
+            target = _ai_target(result)
+        else:
+            source = _fallback_source(result)
+            if source == "fallback":
+                logger.warning("AI plan for exercise %s failed: %s", exercise_id, result)
+            target = _rule_based_target(ctx, first_working[exercise_id], source)
+        await repo.upsert({
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "source_workout_id": workout_id,
+            **target,
+        })
+        PLANNED_TARGETS_TOTAL.labels(source=target["ai_provider"]).inc()
+    await db.commit()
+    return len(contexts)
+
+
+async def plan_next_session(
+    workout_id: UUID, user_id: UUID, ai_provider: AIProvider
+) -> None:
+    """
+    Background job enqueued by end_workout: compute_next_session_targets in its own session.
+
+    Runs after the response is sent, so errors are logged rather than raised.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            n = await compute_next_session_targets(workout_id, user_id, ai_provider, db)
+        logger.info("Planned %d next-session targets for workout %s", n, workout_id)
+    except Exception:
+        logger.exception("Next-session planning failed for workout %s", workout_id)
+
+
+async def get_planned_targets(user_id: UUID, db: AsyncSession) -> list[PlannedTarget]:
+    """
+    Get the user's planned targets (one per exercise), most recent first.
+
+    Args:
+        user_id: Current user UUID
+        db: Database session
+
+    Returns:
+        List of PlannedTarget instances
+    """
+    return await PlannedTargetRepository(db).get_for_user(user_id)
+
+
+async def get_planned_target_or_404(
+    exercise_id: UUID, user_id: UUID, db: AsyncSession
+) -> PlannedTarget:
+    """
+    Get the planned target for one exercise.
+
+    Raises:
+        HTTPException: 404 if no target has been planned for this exercise yet
+    """
+    target = await PlannedTargetRepository(db).get_for_user_and_exercise(user_id, exercise_id)
+    if target is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No planned target for this exercise",
+        )
+    return target
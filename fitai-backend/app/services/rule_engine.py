@@ -8,8 +8,11 @@ score >= 2; soft fatigue = 1.
 from __future__ import annotations
 
 import math
+from enum import IntFlag
+from typing import TYPE_CHECKING
 
-from app.ai.base import WorkoutContext
+if TYPE_CHECKING:  # app.ai imports this module (fake LLM, tiering)
+    from app.ai.base import WorkoutContext
 
 # Fatigue signal names for explanation
 SIGNAL_REP_DROP = "Rep drop"
@@ -18,6 +21,48 @@ SIGNAL_EXCESSIVE_VOLUME = "Excessive volume"
 SIGNAL_DURATION = "Duration"
 
 
+class RuleCode(IntFlag):
+    """Rules that fired while computing a recommendation (see get_rule_based_recommendation_traced)."""
+
+    NO_RPE = 1 << 0  # warmup or RPE not provided: load maintained
+    FRESH_STATE = 1 << 1  # first set / fresh state: fatigue and trend rules skipped
+    RPE_OUT_OF_BAND = 1 << 2  # last RPE outside the 7.5–8.5 working band
+    FATIGUE_SOFT = 1 << 3
+    FATIGUE_HARD = 1 << 4  # fixed load reduction
+    INCREASE_CLAMPED = 1 << 5
+    DECREASE_CLAMPED = 1 << 6
+    SOFT_FATIGUE_LIMIT = 1 << 7  # increase limited to 7.5% by soft fatigue
+    MIN_INCREASE = 1 << 8  # minimum increment forced to avoid rounding collapse
+    TREND_SUPPRESSED = 1 << 9  # rule 4: same-exercise drop suppressed the increase
+    PRIOR_BEST = 1 << 10  # rule 5: pushed back toward prior session best
+    ONE_RM_CAP = 1 << 11
+    DEGENERATE = 1 << 12  # RIR model estimate invalid: load maintained
+
+
+# Confidence lost for each rule that fired; a routine set (in-band RPE, no
+# signals, no clamps or caps) scores 1.0.
+RULE_CONFIDENCE_PENALTIES: dict[RuleCode, float] = {
+    RuleCode.NO_RPE: 0.4,
+    RuleCode.RPE_OUT_OF_BAND: 0.15,
+    RuleCode.FATIGUE_SOFT: 0.3,
+    RuleCode.FATIGUE_HARD: 0.5,
+    RuleCode.INCREASE_CLAMPED: 0.25,
+    RuleCode.DECREASE_CLAMPED: 0.25,
+    RuleCode.SOFT_FATIGUE_LIMIT: 0.1,
+    RuleCode.MIN_INCREASE: 0.1,
+    RuleCode.TREND_SUPPRESSED: 0.3,
+    RuleCode.PRIOR_BEST: 0.2,
+    RuleCode.ONE_RM_CAP: 0.3,
+    RuleCode.DEGENERATE: 0.6,
+}
+
+
+def rule_confidence(codes: RuleCode) -> float:
+    """Confidence in [0, 1] that the rule engine alone handles this set well."""
+    penalty = sum(p for code, p in RULE_CONFIDENCE_PENALTIES.items() if code in codes)
+    return max(0.0, round(1.0 - penalty, 4))
+
+
 def _round_weight(weight_kg: float) -> float:
     """Round weight to nearest 1.25 kg. Clamp to >= 0."""
     clamped = max(0.0, weight_kg)
@@ -60,8 +105,21 @@ def get_rule_based_recommendation(
     last_reps: int,
     last_rpe: float | None,
 ) -> tuple[float, int, str]:
+    """Apply rules in strict priority order. Returns (weight, reps, explanation)."""
+    weight, reps, explanation, _ = get_rule_based_recommendation_traced(
+        ctx, last_weight_kg, last_reps, last_rpe
+    )
+    return (weight, reps, explanation)
+
+
+def get_rule_based_recommendation_traced(
+    ctx: WorkoutContext,
+    last_weight_kg: float,
+    last_reps: int,
+    last_rpe: float | None,
+) -> tuple[float, int, str, RuleCode]:
     """
-    Apply rules in strict priority order. Returns (weight, reps, explanation).
+    Apply rules in strict priority order. Returns (weight, reps, explanation, rules fired).
 
     New progression logic:
       - Target RPE is 8, with a working band of 7.5–8.5.
@@ -72,6 +130,7 @@ def get_rule_based_recommendation(
     """
     is_compound = ctx.is_compound
     parts: list[str] = []
+    codes = RuleCode(0)
 
     # Determine whether last set was marked as warmup, if that metadata is present.
     is_warmup = False
@@ -81,19 +140,26 @@ def get_rule_based_recommendation(
 
     # Warmups and unknown RPE: maintain load, no progression logic.
     if last_rpe is None or is_warmup:
+        codes |= RuleCode.NO_RPE
         suggested_weight = _round_training_weight(last_weight_kg, is_compound)
         suggested_reps = last_reps
         parts.append("Warmup or RPE not provided — maintaining load.")
         suggested_weight, cap_parts = _apply_1rm_cap(ctx, suggested_weight)
+        if cap_parts:
+            codes |= RuleCode.ONE_RM_CAP
         parts.extend(cap_parts)
         parts.append(" | Rule-based suggestion.")
-        return (suggested_weight, suggested_reps, " ".join(parts))
+        return (suggested_weight, suggested_reps, " ".join(parts), codes)
 
     # Detect whether we should treat this as a fresh-state projection.
     # In fresh state (e.g. immediately after resume), progression must depend
     # only on the last set itself, not historical fatigue/trend signals.
     current_len = len(ctx.current_session_sets) if ctx.current_session_sets else 0
     is_fresh_state = current_len <= 1 or ctx.total_sets_today == 1
+    if is_fresh_state:
+        codes |= RuleCode.FRESH_STATE
+    if not 7.5 <= float(last_rpe) <= 8.5:
+        codes |= RuleCode.RPE_OUT_OF_BAND
 
     # ── RULE 1: Fatigue detection (signals only; application happens later) ──
     if not is_fresh_state:
@@ -126,6 +192,10 @@ def get_rule_based_recommendation(
         fatigue_count = len(fatigue_signals)
         hard_fatigue = fatigue_count >= 2 and last_rpe is not None and last_rpe >= 8.5
         soft_fatigue = fatigue_count >= 1 and not hard_fatigue
+        if hard_fatigue:
+            codes |= RuleCode.FATIGUE_HARD
+        elif soft_fatigue:
+            codes |= RuleCode.FATIGUE_SOFT
     else:
         fatigue_signals = []
         hard_fatigue = False
@@ -140,6 +210,7 @@ def get_rule_based_recommendation(
     est_failure_reps = last_reps + rir
     if est_failure_reps <= 0:
         # Degenerate case: fall back to maintaining load.
+        codes |= RuleCode.DEGENERATE
         suggested_weight = _round_training_weight(last_weight_kg, is_compound)
         suggested_reps = last_reps
         parts.append(
@@ -147,14 +218,17 @@ def get_rule_based_recommendation(
             "but failure estimate was invalid — maintaining load."
         )
         suggested_weight, cap_parts = _apply_1rm_cap(ctx, suggested_weight)
+        if cap_parts:
+            codes |= RuleCode.ONE_RM_CAP
         parts.extend(cap_parts)
         parts.append(" | Rule-based suggestion.")
-        return (suggested_weight, suggested_reps, " ".join(parts))
+        return (suggested_weight, suggested_reps, " ".join(parts), codes)
 
     desired_failure_reps = last_reps + target_rir
     intensity_ratio = desired_failure_reps / est_failure_reps
     if intensity_ratio <= 0:
         # Degenerate case: fall back to maintaining load.
+        codes |= RuleCode.DEGENERATE
         suggested_weight = _round_training_weight(last_weight_kg, is_compound)
         suggested_reps = last_reps
         parts.append(
@@ -162,9 +236,11 @@ def get_rule_based_recommendation(
             "but intensity ratio was invalid — maintaining load."
         )
         suggested_weight, cap_parts = _apply_1rm_cap(ctx, suggested_weight)
+        if cap_parts:
+            codes |= RuleCode.ONE_RM_CAP
         parts.extend(cap_parts)
         parts.append(" | Rule-based suggestion.")
-        return (suggested_weight, suggested_reps, " ".join(parts))
+        return (suggested_weight, suggested_reps, " ".join(parts), codes)
 
     # Base projection from current RPE toward target RPE 8.
     projected_weight_raw = last_weight_kg / intensity_ratio
@@ -193,6 +269,7 @@ def get_rule_based_recommendation(
 
         if change_pct_raw > max_inc:
             change_pct = max_inc
+            codes |= RuleCode.INCREASE_CLAMPED
             clamp_note = f"Increase clamped to {max_inc * 100:.1f}% for safety."
         else:
             change_pct = change_pct_raw
@@ -201,6 +278,7 @@ def get_rule_based_recommendation(
         max_dec = 0.10
         if change_pct_raw < -max_dec:
             change_pct = -max_dec
+            codes |= RuleCode.DECREASE_CLAMPED
             clamp_note = "Decrease clamped to 10.0% for safety."
         else:
             change_pct = change_pct_raw
@@ -217,6 +295,7 @@ def get_rule_based_recommendation(
     if clamp_note:
         parts.append(clamp_note)
     if increase_limited_by_soft_fatigue and change_pct > 0:
+        codes |= RuleCode.SOFT_FATIGUE_LIMIT
         parts.append("Soft fatigue detected — projected increase limited to 7.5%.")
 
     # ── RULE 3: Apply fatigue after projection (hard fatigue overrides) ──────
@@ -228,9 +307,11 @@ def get_rule_based_recommendation(
         suggested_reps = last_reps
         parts.append(f"{' + '.join(fatigue_signals)}: reducing load by {delta} kg.")
         suggested_weight, cap_parts = _apply_1rm_cap(ctx, suggested_weight)
+        if cap_parts:
+            codes |= RuleCode.ONE_RM_CAP
         parts.extend(cap_parts)
         parts.append(" | Rule-based suggestion.")
-        return (suggested_weight, suggested_reps, " ".join(parts))
+        return (suggested_weight, suggested_reps, " ".join(parts), codes)
 
     # Compute base suggestion from projected weight (already clamped).
     suggested_weight = _round_training_weight(projected_weight, is_compound)
@@ -242,6 +323,7 @@ def get_rule_based_recommendation(
     if last_rpe < 7.5 and projected_weight > last_weight_kg and suggested_weight == rounded_current:
         # Force a minimum increase.
         forced_weight = last_weight_kg + delta
+        codes |= RuleCode.MIN_INCREASE
         suggested_weight = _round_training_weight(forced_weight, is_compound)
         parts.append(f"Minimum +{delta:g}kg applied to ensure meaningful progression.")
 
@@ -268,6 +350,7 @@ def get_rule_based_recommendation(
             if same_weight and rep_dropped and suggested_weight > last_weight_kg:
                 suggested_weight = _round_training_weight(last_weight_kg, is_compound)
                 suggested_reps = last_reps
+                codes |= RuleCode.TREND_SUPPRESSED
                 parts.append(
                     "Same-exercise performance dropped at the same weight with high RPE — "
                     "suppressing further increases."
@@ -292,6 +375,7 @@ def get_rule_based_recommendation(
                 ):
                     target = max(suggested_weight, best_prior_weight)
                     suggested_weight = _round_training_weight(target, is_compound)
+                    codes |= RuleCode.PRIOR_BEST
                     parts.append(
                         "Below prior session best for this exercise at low RPE — "
                         "pushing back toward previous best."
@@ -301,6 +385,8 @@ def get_rule_based_recommendation(
     pre_cap_weight = suggested_weight
     suggested_weight, cap_parts = _apply_1rm_cap(ctx, suggested_weight)
     # If cap applied, append concise, non-contradictory messaging.
+    if cap_parts:
+        codes |= RuleCode.ONE_RM_CAP
     if suggested_weight != pre_cap_weight:
         parts.append(
             f"Projected change to {pre_cap_weight:g}kg was capped at 90% estimated 1RM."
@@ -309,7 +395,7 @@ def get_rule_based_recommendation(
     parts.append(" | Rule-based suggestion.")
     # Final rounding uses compound/isolation increments.
     suggested_weight = _round_training_weight(suggested_weight, is_compound)
-    return (suggested_weight, suggested_reps, " ".join(parts))
+    return (suggested_weight, suggested_reps, " ".join(parts), codes)
 
 
 def get_minimal_fallback(
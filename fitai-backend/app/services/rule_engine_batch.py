@@ -0,0 +1,233 @@
+"""Vectorized rule engine: get_rule_based_recommendation over a whole batch with NumPy.
+
+For backtests over the full set history. Inputs are a structure of arrays
+(RuleBatchInputs): one element per set, with the parts of the WorkoutContext
+the rules read already reduced to numbers. Missing values (no RPE, no 1RM, no
+prior session best) are NaN. The result holds the suggested weights and reps
+and the RuleCode bitmask per set; explanations are not produced.
+
+Every branch of the scalar engine is computed for every element and the
+results are selected with masks, in the same order of operations, so the
+outputs equal the scalar ones exactly (see tests/services/test_rule_engine_batch.py).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.ai.base import WorkoutContext
+from app.services.rule_engine import RuleCode
+
+TARGET_RPE = 8.0
+
+
+@dataclass
+class RuleBatchInputs:
+    """Structure-of-arrays inputs; every array has one element per set."""
+
+    last_weight_kg: np.ndarray  # float64
+    last_reps: np.ndarray  # int64
+    last_rpe: np.ndarray  # float64, NaN = not provided
+    is_warmup: np.ndarray  # bool
+    is_compound: np.ndarray  # bool
+    session_sets: np.ndarray  # int64, len(current_session_sets)
+    total_sets_today: np.ndarray  # int64
+    workout_duration_minutes: np.ndarray  # float64, NaN = unknown
+    prev_reps: np.ndarray  # float64, reps of the previous set in the session; NaN = none
+    prev_weight_kg: np.ndarray  # float64, weight of the previous set; NaN = none
+    same_exercise_as_prev: np.ndarray  # bool, last and previous set share an exercise_id
+    prior_best_weight_kg: np.ndarray  # float64, best same-exercise weight last session; NaN = none
+    estimated_1rm: np.ndarray  # float64, NaN = unknown
+
+    def __len__(self) -> int:
+        return len(self.last_weight_kg)
+
+    @classmethod
+    def from_contexts(
+        cls, items: Iterable[tuple[WorkoutContext, float, int, float | None]]
+    ) -> RuleBatchInputs:
+        """
+        Build inputs from the same arguments get_rule_based_recommendation takes.
+
+        Args:
+            items: (ctx, last_weight_kg, last_reps, last_rpe) per set
+
+        Returns:
+            RuleBatchInputs with one element per item
+        """
+        nan = float("nan")
+        rows = []
+        for ctx, weight, reps, rpe in items:
+            sets = ctx.current_session_sets or []
+            last = sets[-1] if sets else {}
+            prev = sets[-2] if len(sets) >= 2 else {}
+            ex_id = last.get("exercise_id")
+            prior_best = nan
+            if ctx.recent_sessions and sets and ex_id is not None:
+                same = [
+                    s for s in ctx.recent_sessions[0].get("sets", [])
+                    if s.get("exercise_id") == ex_id
+                ]
+                if same:
+                    prior_best = max(float(s.get("weight_kg", 0)) for s in same)
+            rows.append(
+                (
+                    float(weight),
+                    int(reps),
+                    nan if rpe is None else float(rpe),
+                    bool(last.get("is_warmup")),
+                    bool(ctx.is_compound),
+                    len(sets),
+                    ctx.total_sets_today,
+                    nan if ctx.workout_duration_minutes is None else float(ctx.workout_duration_minutes),
+                    nan if prev.get("reps") is None else float(prev["reps"]),
+                    nan if prev.get("weight_kg") is None else float(prev["weight_kg"]),
+                    ex_id is not None and ex_id == prev.get("exercise_id"),
+                    prior_best,
+                    nan if ctx.estimated_1rm is None else float(ctx.estimated_1rm),
+                )
+            )
+        columns = list(zip(*rows)) if rows else [()] * 13
+        dtypes = (
+            np.float64, np.int64, np.float64, bool, bool, np.int64, np.int64,
+            np.float64, np.float64, np.float64, bool, np.float64, np.float64,
+        )
+        return cls(*(np.asarray(col, dtype=dt) for col, dt in zip(columns, dtypes)))
+
+
+@dataclass
+class RuleBatchResult:
+    weight_kg: np.ndarray  # float64
+    reps: np.ndarray  # int64
+    codes: np.ndarray  # int64 RuleCode bitmask
+
+
+def _round_training_weight(weight_kg: np.ndarray, increment: np.ndarray) -> np.ndarray:
+    return np.round(np.maximum(0.0, weight_kg) / increment) * increment
+
+
+def _flag(mask: np.ndarray, code: RuleCode) -> np.ndarray:
+    return np.where(mask, np.int64(code), np.int64(0))
+
+
+def get_rule_based_recommendations_batch(inputs: RuleBatchInputs) -> RuleBatchResult:
+    """
+    Vectorized get_rule_based_recommendation_traced (weight, reps, codes) for a batch.
+
+    Args:
+        inputs: Structure-of-arrays batch
+
+    Returns:
+        RuleBatchResult with one element per input set
+    """
+    w = inputs.last_weight_kg
+    reps = inputs.last_reps
+    rpe = inputs.last_rpe
+    increment = np.where(inputs.is_compound, 5.0, 2.5)  # also the hard-fatigue / minimum delta
+    has_1rm = ~np.isnan(inputs.estimated_1rm)
+    cap = np.floor(0.9 * np.where(has_1rm, inputs.estimated_1rm, 0.0) / 1.25) * 1.25
+
+    def apply_cap(weight: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        capped = has_1rm & (weight > cap)
+        return np.where(capped, np.round(np.maximum(0.0, cap) / 1.25) * 1.25, weight), capped
+
+    no_rpe = np.isnan(rpe) | inputs.is_warmup
+    rpe_v = np.where(no_rpe, TARGET_RPE, rpe)  # placeholder keeps the arithmetic finite
+    maintained = _round_training_weight(w, increment)
+
+    fresh = (inputs.session_sets <= 1) | (inputs.total_sets_today == 1)
+    out_of_band = ~((rpe_v >= 7.5) & (rpe_v <= 8.5))
+
+    # Rule 1: fatigue signals (not in fresh state); duration only when nothing else fired.
+    rep_drop = (inputs.session_sets >= 2) & ~np.isnan(inputs.prev_reps) & (
+        (reps - np.nan_to_num(inputs.prev_reps)) <= -3
+    )
+    signals = rep_drop.astype(np.int64) + (rpe_v >= 9) + (inputs.total_sets_today >= 18)
+    duration = np.nan_to_num(inputs.workout_duration_minutes, nan=0.0) > 120
+    signals = signals + ((signals == 0) & duration)
+    signals = np.where(fresh, 0, signals)
+    hard = (signals >= 2) & (rpe_v >= 8.5)
+    soft = (signals >= 1) & ~hard
+
+    # Rule 2: RIR projection toward RPE 8, with clamps.
+    est_failure = reps + (10.0 - rpe_v)
+    desired_failure = reps + (10.0 - TARGET_RPE)
+    ratio = desired_failure / np.where(est_failure > 0, est_failure, 1.0)
+    degenerate = (est_failure <= 0) | (ratio <= 0)
+    safe_ratio = np.where(degenerate, 1.0, ratio)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected_raw = w / safe_ratio
+        change_raw = np.where(w > 0, (projected_raw - w) / np.where(w > 0, w, 1.0), 0.0)
+
+    deficit = TARGET_RPE - rpe_v
+    max_inc = np.select(
+        [deficit >= 4, deficit >= 3, deficit >= 2, deficit >= 1],
+        [0.225, 0.20, 0.175, 0.15],
+        default=0.10,
+    )
+    soft_limited = soft & (rpe_v >= 8.0)
+    max_inc = np.where(soft_limited, np.minimum(max_inc, 0.075), max_inc)
+    inc_clamped = (change_raw > 0) & (change_raw > max_inc)
+    dec_clamped = (change_raw < 0) & (change_raw < -0.10)
+    change = np.where(inc_clamped, max_inc, np.where(dec_clamped, -0.10, change_raw))
+    change = np.where(change_raw == 0, 0.0, change)
+    projected = w * (1.0 + change)
+    soft_limit_code = soft_limited & (change_raw > 0) & (change > 0)
+
+    # Rule 3: hard fatigue overrides with a fixed reduction.
+    hard_weight = _round_training_weight(np.maximum(0.0, w - increment), increment)
+
+    # Main path: rounding, minimum increase, trend suppression, prior best.
+    suggested = _round_training_weight(projected, increment)
+    min_increase = (rpe_v < 7.5) & (projected > w) & (suggested == maintained)
+    suggested = np.where(min_increase, _round_training_weight(w + increment, increment), suggested)
+
+    trend = (
+        ~fresh
+        & (inputs.session_sets >= 2)
+        & (rpe_v >= 8.5)
+        & inputs.same_exercise_as_prev
+        & (inputs.prev_weight_kg == w)
+        & ~np.isnan(inputs.prev_reps)
+        & (reps < np.trunc(np.nan_to_num(inputs.prev_reps)))
+        & (suggested > w)
+    )
+    suggested = np.where(trend, maintained, suggested)
+
+    best = np.nan_to_num(inputs.prior_best_weight_kg, nan=-np.inf)
+    prior_best = ~fresh & ~np.isnan(inputs.prior_best_weight_kg) & (rpe_v <= 6) & (w < best)
+    suggested = np.where(
+        prior_best, _round_training_weight(np.maximum(suggested, best), increment), suggested
+    )
+
+    main_capped_weight, main_capped = apply_cap(suggested)
+    main_weight = _round_training_weight(main_capped_weight, increment)
+
+    # Early-return paths keep their (capped) weight without the final rounding.
+    early_weight, early_capped = apply_cap(np.where(hard & ~degenerate, hard_weight, maintained))
+
+    main = ~no_rpe & ~degenerate & ~hard
+    weight = np.where(main, main_weight, early_weight)
+    capped = np.where(main, main_capped, early_capped)
+
+    progression = ~no_rpe
+    projected_path = progression & ~degenerate
+    codes = (
+        _flag(no_rpe, RuleCode.NO_RPE)
+        | _flag(progression & fresh, RuleCode.FRESH_STATE)
+        | _flag(progression & out_of_band, RuleCode.RPE_OUT_OF_BAND)
+        | _flag(progression & hard, RuleCode.FATIGUE_HARD)
+        | _flag(progression & soft, RuleCode.FATIGUE_SOFT)
+        | _flag(progression & degenerate, RuleCode.DEGENERATE)
+        | _flag(projected_path & inc_clamped, RuleCode.INCREASE_CLAMPED)
+        | _flag(projected_path & dec_clamped, RuleCode.DECREASE_CLAMPED)
+        | _flag(projected_path & soft_limit_code, RuleCode.SOFT_FATIGUE_LIMIT)
+        | _flag(main & min_increase, RuleCode.MIN_INCREASE)
+        | _flag(main & trend, RuleCode.TREND_SUPPRESSED)
+        | _flag(main & prior_best, RuleCode.PRIOR_BEST)
+        | _flag(capped, RuleCode.ONE_RM_CAP)
+    )
+    return RuleBatchResult(weight_kg=weight, reps=reps.copy(), codes=codes)
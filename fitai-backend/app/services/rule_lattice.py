@@ -0,0 +1,286 @@
+"""Precomputed decision lattice for the rule engine.
+
+The projection part of get_rule_based_recommendation (RIR model, dynamic
+increase cap, decrease clamp, soft-fatigue limit, hard-fatigue override)
+depends only on discrete inputs: RPE (Numeric(3,1), so tenths), integer reps
+and the fatigue level (no signal / one / two or more). Compound vs isolation
+only picks the rounding increment, applied per call. RuleLattice precomputes,
+for every such key, the intensity ratio, the clamp decision with its
+multiplier, and the codes that follow from the key alone.
+get_rule_decision then does a table lookup and the weight arithmetic.
+
+Weight arithmetic is kept in the scalar engine's order (w / ratio, then the
+relative change, then w * (1 + change)) so results are equal bit for bit. The
+clamp decision is stored only where it does not depend on the weight; cells
+whose relative change sits within 1e-9 of a clamp boundary are marked
+CLAMP_EXACT and compare per call. Inputs off the lattice (RPE not on a tenth
+in 0–10, reps outside 0–MAX_REPS) go to the scalar engine.
+
+get_rule_decision returns (weight, reps, codes) without the explanation, for
+callers that only need the decision (see scripts/bench_rule_engine_batch.py).
+"""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from app.services.rule_engine import RuleCode, get_rule_based_recommendation_traced
+
+if TYPE_CHECKING:
+    from app.ai.base import WorkoutContext
+
+MAX_REPS = 50
+RPE_STEPS = 100  # RPE 0.0 .. 10.0 in tenths
+TARGET_RPE = 8.0
+MAX_DECREASE = 0.10
+
+PATH_PROJECT = 0
+PATH_HARD = 1
+PATH_DEGENERATE = 2
+
+CLAMP_NONE = 0
+CLAMP_INCREASE = 1
+CLAMP_DECREASE = 2
+CLAMP_EXACT = 3  # boundary cell: compare per call
+
+_BOUNDARY_EPS = 1e-9
+
+
+class LatticeCell(NamedTuple):
+    path: int
+    codes: int  # RPE_OUT_OF_BAND, fatigue, DEGENERATE, clamp and soft-limit codes known from the key
+    ratio: float  # intensity ratio (desired / estimated failure reps)
+    clamp: int
+    multiplier: float  # 1 + clamped change, used when clamp is CLAMP_INCREASE / CLAMP_DECREASE
+    max_inc: float  # increase cap after the soft-fatigue limit (CLAMP_EXACT cells)
+    soft_limited: bool  # soft-fatigue limit active for this key
+
+
+def _max_increase(rpe: float) -> float:
+    deficit = TARGET_RPE - rpe
+    if deficit >= 4:
+        return 0.225
+    if deficit >= 3:
+        return 0.20
+    if deficit >= 2:
+        return 0.175
+    if deficit >= 1:
+        return 0.15
+    return 0.10
+
+
+def _cell(rpe: float, reps: int, fatigue_level: int) -> LatticeCell:
+    codes = RuleCode(0)
+    if not 7.5 <= rpe <= 8.5:
+        codes |= RuleCode.RPE_OUT_OF_BAND
+    hard = fatigue_level >= 2 and rpe >= 8.5
+    soft = fatigue_level >= 1 and not hard
+    if hard:
+        codes |= RuleCode.FATIGUE_HARD
+    elif soft:
+        codes |= RuleCode.FATIGUE_SOFT
+
+    est_failure = reps + (10.0 - rpe)
+    ratio = (reps + (10.0 - TARGET_RPE)) / est_failure if est_failure > 0 else 0.0
+    if est_failure <= 0 or ratio <= 0:
+        return LatticeCell(
+            PATH_DEGENERATE, int(codes | RuleCode.DEGENERATE), 0.0, CLAMP_NONE, 1.0, 0.0, False
+        )
+
+    change = 1.0 / ratio - 1.0  # weight-free form, only used to classify the clamp
+    max_inc = _max_increase(rpe)
+    soft_limited = soft and rpe >= 8.0
+    if soft_limited:
+        max_inc = min(max_inc, 0.075)
+    near = [0.0, max_inc, -MAX_DECREASE]
+    if ratio != 1.0 and any(abs(change - b) < _BOUNDARY_EPS for b in near):
+        clamp, multiplier = CLAMP_EXACT, 1.0
+    elif ratio < 1.0 and change > max_inc:
+        clamp, multiplier = CLAMP_INCREASE, 1.0 + max_inc
+        codes |= RuleCode.INCREASE_CLAMPED
+    elif ratio > 1.0 and change < -MAX_DECREASE:
+        clamp, multiplier = CLAMP_DECREASE, 1.0 + -MAX_DECREASE
+        codes |= RuleCode.DECREASE_CLAMPED
+    else:
+        clamp, multiplier = CLAMP_NONE, 1.0
+    if soft_limited and ratio < 1.0 and clamp != CLAMP_EXACT:
+        codes |= RuleCode.SOFT_FATIGUE_LIMIT
+    return LatticeCell(
+        PATH_HARD if hard else PATH_PROJECT,
+        int(codes), ratio, clamp, multiplier, max_inc, soft_limited,
+    )
+
+
+class RuleLattice:
+    """Dense table of LatticeCells indexed by (RPE tenth, reps, fatigue level)."""
+
+    def __init__(self) -> None:
+        self._cells: list[LatticeCell] = [
+            _cell(rpe_idx / 10, reps, fatigue_level)
+            for rpe_idx in range(RPE_STEPS + 1)
+            for reps in range(MAX_REPS + 1)
+            for fatigue_level in range(3)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def lookup(self, rpe: float, reps: int, fatigue_level: int) -> LatticeCell | None:
+        """The cell for these inputs, or None if they are off the lattice."""
+        rpe_idx = round(rpe * 10)
+        if not (0 <= rpe_idx <= RPE_STEPS and 0 <= reps <= MAX_REPS) or rpe_idx / 10 != rpe:
+            return None
+        return self._cells[(rpe_idx * (MAX_REPS + 1) + reps) * 3 + fatigue_level]
+
+
+@lru_cache(maxsize=1)
+def get_lattice() -> RuleLattice:
+    """Build the lattice on first use (about 15k cells) and keep it for the process."""
+    return RuleLattice()
+
+
+# Plain ints on the hot path; IntFlag arithmetic costs about a microsecond per operation.
+_DECREASE_CLAMPED = int(RuleCode.DECREASE_CLAMPED)
+_FRESH_STATE = int(RuleCode.FRESH_STATE)
+_INCREASE_CLAMPED = int(RuleCode.INCREASE_CLAMPED)
+_MIN_INCREASE = int(RuleCode.MIN_INCREASE)
+_NO_RPE = int(RuleCode.NO_RPE)
+_ONE_RM_CAP = int(RuleCode.ONE_RM_CAP)
+_PRIOR_BEST = int(RuleCode.PRIOR_BEST)
+_SOFT_FATIGUE_LIMIT = int(RuleCode.SOFT_FATIGUE_LIMIT)
+_TREND_SUPPRESSED = int(RuleCode.TREND_SUPPRESSED)
+_rule_code = lru_cache(maxsize=None)(RuleCode)
+
+
+def _round_training_weight(weight_kg: float, increment: float) -> float:
+    return round(max(0.0, weight_kg) / increment) * increment
+
+
+def _cap(ctx: WorkoutContext, weight: float) -> tuple[float, bool]:
+    if ctx.estimated_1rm is None:
+        return weight, False
+    cap = math.floor(0.9 * ctx.estimated_1rm / 1.25) * 1.25
+    if weight > cap:
+        return round(max(0.0, cap) / 1.25) * 1.25, True
+    return weight, False
+
+
+def _fatigue_level(ctx: WorkoutContext, last_reps: int, last_rpe: float) -> int:
+    sets = ctx.current_session_sets
+    count = 0
+    prev_reps = sets[-2].get("reps")
+    if prev_reps is not None and (last_reps - prev_reps) <= -3:
+        count += 1
+    if last_rpe >= 9:
+        count += 1
+    if ctx.total_sets_today >= 18:
+        count += 1
+    if count == 0 and ctx.workout_duration_minutes is not None and ctx.workout_duration_minutes > 120:
+        count = 1
+    return min(count, 2)
+
+
+def get_rule_decision(
+    ctx: WorkoutContext,
+    last_weight_kg: float,
+    last_reps: int,
+    last_rpe: float | None,
+) -> tuple[float, int, RuleCode]:
+    """
+    Same (weight, reps, codes) as get_rule_based_recommendation_traced, via the lattice.
+
+    Args:
+        ctx: Workout context
+        last_weight_kg: Weight of the set just logged
+        last_reps: Reps of the set just logged
+        last_rpe: RPE of the set just logged (None if not given)
+
+    Returns:
+        (suggested weight, suggested reps, rules fired)
+    """
+    sets = ctx.current_session_sets
+    increment = 5.0 if ctx.is_compound else 2.5
+
+    if last_rpe is None or (sets and sets[-1].get("is_warmup")):
+        weight, capped = _cap(ctx, _round_training_weight(last_weight_kg, increment))
+        return weight, last_reps, _rule_code(_NO_RPE | (_ONE_RM_CAP if capped else 0))
+
+    fresh = (len(sets) if sets else 0) <= 1 or ctx.total_sets_today == 1
+    fatigue_level = 0 if fresh else _fatigue_level(ctx, last_reps, last_rpe)
+    cell = get_lattice().lookup(float(last_rpe), last_reps, fatigue_level)
+    if cell is None:
+        weight, reps, _, traced_codes = get_rule_based_recommendation_traced(
+            ctx, last_weight_kg, last_reps, last_rpe
+        )
+        return weight, reps, traced_codes
+
+    # Plain int bit set until the final _rule_code (cached RuleCode construction).
+    codes: int = cell.codes | (_FRESH_STATE if fresh else 0)
+    if cell.path == PATH_DEGENERATE:
+        weight, capped = _cap(ctx, _round_training_weight(last_weight_kg, increment))
+        return weight, last_reps, _rule_code(codes | (_ONE_RM_CAP if capped else 0))
+
+    # Projection, in the scalar engine's order of operations.
+    w = last_weight_kg
+    if w <= 0 or cell.ratio == 1.0:
+        projected = w * (1.0 + 0.0)
+    elif cell.clamp in (CLAMP_INCREASE, CLAMP_DECREASE):
+        projected = w * cell.multiplier
+    else:
+        change = (w / cell.ratio - w) / w
+        if cell.clamp == CLAMP_EXACT:
+            if change > 0 and change > cell.max_inc:
+                change = cell.max_inc
+                codes |= _INCREASE_CLAMPED
+            elif change < 0 and change < -MAX_DECREASE:
+                change = -MAX_DECREASE
+                codes |= _DECREASE_CLAMPED
+            if cell.soft_limited and change > 0:
+                codes |= _SOFT_FATIGUE_LIMIT
+        projected = w * (1.0 + change)
+    if w <= 0:
+        # Clamp codes in the cell assume w > 0; at w <= 0 the scalar change is 0.
+        codes &= ~(_INCREASE_CLAMPED | _DECREASE_CLAMPED | _SOFT_FATIGUE_LIMIT)
+
+    if cell.path == PATH_HARD:
+        weight = _round_training_weight(max(0.0, w - increment), increment)
+        weight, capped = _cap(ctx, weight)
+        return weight, last_reps, _rule_code(codes | (_ONE_RM_CAP if capped else 0))
+
+    suggested = _round_training_weight(projected, increment)
+    rounded_current = _round_training_weight(w, increment)
+    if last_rpe < 7.5 and projected > w and suggested == rounded_current:
+        suggested = _round_training_weight(w + increment, increment)
+        codes |= _MIN_INCREASE
+
+    if not fresh and last_rpe >= 8.5:
+        current, prev = sets[-1], sets[-2]
+        ex_id = current.get("exercise_id")
+        if ex_id is not None and ex_id == prev.get("exercise_id"):
+            prev_reps = prev.get("reps")
+            prev_weight = prev.get("weight_kg")
+            if (
+                prev_weight is not None
+                and float(prev_weight) == float(w)
+                and prev_reps is not None
+                and last_reps < int(prev_reps)
+                and suggested > w
+            ):
+                suggested = rounded_current
+                codes |= _TREND_SUPPRESSED
+
+    if not fresh and ctx.recent_sessions and last_rpe <= 6:
+        ex_id = sets[-1].get("exercise_id")
+        prior = ctx.recent_sessions[0].get("sets", [])
+        if ex_id is not None and prior:
+            same = [float(s.get("weight_kg", 0)) for s in prior if s.get("exercise_id") == ex_id]
+            if same and w < max(same):
+                suggested = _round_training_weight(max(suggested, max(same)), increment)
+                codes |= _PRIOR_BEST
+
+    suggested, capped = _cap(ctx, suggested)
+    if capped:
+        codes |= _ONE_RM_CAP
+    return _round_training_weight(suggested, increment), last_reps, _rule_code(codes)
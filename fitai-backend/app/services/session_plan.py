@@ -0,0 +1,243 @@
+"""Whole-session lookahead: plan the remaining sets of an exercise and serve them from memory.
+
+After a recommendation is computed the usual way (context + provider chain),
+build_session_plan projects the rest of the exercise with the rule engine: each
+planned set is assumed to be performed as planned at the target RPE plus
+rpe_drift (fatigue that a fresh projection does not foresee), and the rule
+engine's RIR projection from that set gives the next one, so loads step down
+as the session goes on. The plan length follows the last session of the
+exercise (default_sets when there is none).
+
+When the next set is logged and matches the planned set within the weight,
+reps and RPE tolerances, the following planned set is served directly, with no
+context queries and no LLM call. A deviation, a set number the plan did not
+expect (a set was deleted) or the end of the plan drops it, and the set is
+recommended the usual way, which plans again from there.
+
+Plans are keyed by (workout_id, exercise_id) and live in process memory like
+conversation sessions: dropped when the workout ends, after ttl_seconds idle,
+or least-recently-used first beyond max_plans. A miss only costs the normal path.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
+from app.ai.base import WorkoutContext
+from app.core.metrics import SESSION_PLAN_TOTAL
+from app.services.rule_engine import get_rule_based_recommendation
+
+TARGET_RPE = 8.0
+MAX_PLANNED_SETS = 10
+# Assumed rest between planned sets, for the duration fatigue signal.
+REST_MINUTES = 3
+
+PROVIDER_NAME = "plan"
+MODEL_NAME = "rule-based"
+
+
+@dataclass
+class PlannedSet:
+    set_number: int
+    weight_kg: float
+    reps: int
+    expected_rpe: float
+    explanation: str
+
+
+@dataclass
+class SessionPlan:
+    """Remaining sets of one exercise in one workout; cursor is the next set to be logged."""
+
+    sets: list[PlannedSet]
+    cursor: int = 0
+    last_used: float = 0.0
+
+    @property
+    def total_sets(self) -> int:
+        return self.sets[0].set_number - 1 + len(self.sets)
+
+
+@dataclass
+class PlanTolerance:
+    """How far a logged set may deviate from the planned one and keep the plan."""
+
+    weight_kg: float = 1.25
+    reps: int = 1
+    rpe: float = 0.5
+
+    def matches(self, planned: PlannedSet, weight_kg: float, reps: int, rpe: float | None) -> bool:
+        return (
+            rpe is not None
+            and abs(weight_kg - planned.weight_kg) <= self.weight_kg
+            and abs(reps - planned.reps) <= self.reps
+            and abs(rpe - planned.expected_rpe) <= self.rpe
+        )
+
+
+def build_session_plan(
+    ctx: WorkoutContext,
+    next_weight_kg: float,
+    next_reps: int,
+    next_explanation: str,
+    default_sets: int = 4,
+    rpe_drift: float = 0.5,
+) -> SessionPlan:
+    """
+    Plan the remaining sets of the exercise, starting with the recommendation just made.
+
+    Args:
+        ctx: Context the recommendation was computed from (last logged set included)
+        next_weight_kg: Recommended weight for the next set
+        next_reps: Recommended reps for the next set
+        next_explanation: Explanation of that recommendation
+        default_sets: Sets per exercise when there is no previous session
+        rpe_drift: RPE above the target expected for each planned set
+
+    Returns:
+        SessionPlan whose first set is the recommended one
+    """
+    done = len(ctx.current_session_sets)
+    if ctx.recent_sessions and ctx.recent_sessions[0].get("sets"):
+        total = len(ctx.recent_sessions[0]["sets"])
+    else:
+        total = default_sets
+    count = max(1, min(total, MAX_PLANNED_SETS) - done)
+    expected_rpe = min(10.0, (ctx.target_rpe or TARGET_RPE) + rpe_drift)
+
+    sets = [PlannedSet(done + 1, next_weight_kg, next_reps, expected_rpe, next_explanation)]
+    session = list(ctx.current_session_sets)
+    for j in range(1, count):
+        prev = sets[-1]
+        session.append(
+            {
+                "weight_kg": prev.weight_kg,
+                "reps": prev.reps,
+                "rpe": prev.expected_rpe,
+                "set_number": prev.set_number,
+            }
+        )
+        projected = replace(
+            ctx,
+            current_session_sets=list(session),
+            total_sets_today=ctx.total_sets_today + j,
+            workout_duration_minutes=ctx.workout_duration_minutes + j * REST_MINUTES,
+        )
+        weight, reps, explanation = get_rule_based_recommendation(
+            projected, prev.weight_kg, prev.reps, prev.expected_rpe
+        )
+        sets.append(PlannedSet(prev.set_number + 1, weight, reps, expected_rpe, explanation))
+    return SessionPlan(sets=sets)
+
+
+class SessionPlanStore:
+    """In-memory plans with end-of-workout, idle-TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        tolerance: PlanTolerance | None = None,
+        default_sets: int = 4,
+        rpe_drift: float = 0.5,
+        ttl_seconds: float = 5400,
+        max_plans: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tolerance = tolerance or PlanTolerance()
+        self.default_sets = default_sets
+        self.rpe_drift = rpe_drift
+        self.ttl_seconds = ttl_seconds
+        self.max_plans = max_plans
+        self._clock = clock
+        self._plans: OrderedDict[tuple[str, str], SessionPlan] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def take(
+        self,
+        workout_id: str,
+        exercise_id: str,
+        set_number: int,
+        weight_kg: float,
+        reps: int,
+        rpe: float | None,
+    ) -> tuple[PlannedSet, SessionPlan] | None:
+        """
+        Advance the plan past a logged set and return the next planned set.
+
+        Args:
+            workout_id: Workout of the logged set
+            exercise_id: Exercise of the logged set
+            set_number: Set number of the logged set
+            weight_kg: Logged weight
+            reps: Logged reps
+            rpe: Logged RPE (None never matches)
+
+        Returns:
+            (next planned set, plan), or None when there is no usable plan; the
+            plan is dropped unless the logged set matched and another set remains
+        """
+        now = self._clock()
+        self.evict_expired(now)
+        key = (workout_id, exercise_id)
+        plan = self._plans.get(key)
+        if plan is None:
+            SESSION_PLAN_TOTAL.labels(outcome="miss").inc()
+            return None
+        expected = plan.sets[plan.cursor]
+        if expected.set_number != set_number:
+            outcome = "stale"
+        elif not self.tolerance.matches(expected, weight_kg, reps, rpe):
+            outcome = "deviated"
+        elif plan.cursor + 1 >= len(plan.sets):
+            outcome = "exhausted"
+        else:
+            plan.cursor += 1
+            plan.last_used = now
+            self._plans.move_to_end(key)
+            SESSION_PLAN_TOTAL.labels(outcome="hit").inc()
+            return plan.sets[plan.cursor], plan
+        del self._plans[key]
+        SESSION_PLAN_TOTAL.labels(outcome=outcome).inc()
+        return None
+
+    def plan(
+        self,
+        ctx: WorkoutContext,
+        next_weight_kg: float,
+        next_reps: int,
+        next_explanation: str,
+    ) -> SessionPlan | None:
+        """Build and store the plan following a normally computed recommendation."""
+        if not ctx.workout_id or not ctx.exercise_id:
+            return None
+        plan = build_session_plan(
+            ctx, next_weight_kg, next_reps, next_explanation, self.default_sets, self.rpe_drift
+        )
+        plan.last_used = self._clock()
+        key = (ctx.workout_id, ctx.exercise_id)
+        self._plans[key] = plan
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return plan
+
+    def evict_workout(self, workout_id: str) -> int:
+        """Drop every plan of a workout. Returns the number dropped."""
+        keys = [key for key in self._plans if key[0] == workout_id]
+        for key in keys:
+            del self._plans[key]
+        return len(keys)
+
+    def evict_expired(self, now: float | None = None) -> int:
+        """Drop plans idle for longer than ttl_seconds. Returns the number dropped."""
+        cutoff = (self._clock() if now is None else now) - self.ttl_seconds
+        dropped = 0
+        while self._plans:
+            key, plan = next(iter(self._plans.items()))
+            if plan.last_used > cutoff:
+                break
+            del self._plans[key]
+            dropped += 1
+        return dropped
@@ -1,21 +1,40 @@
 """Set service — log set and optional AI recommendation."""
 
+import json
 import logging
+from collections.abc import AsyncIterator
 from uuid import UUID
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai import build_context
-from app.ai.base import AIProvider, AIRecommendation, WorkoutContext
+from app.ai.base import (
+    STREAM_EVENT_EXPLANATION_DELTA,
+    STREAM_EVENT_FIELD,
+    STREAM_EVENT_FINAL,
+    AIProvider,
+    AIRecommendation,
+    WorkoutContext,
+    provider_label,
+)
+from app.ai.bulkhead import BulkheadRejected
+from app.ai.usage import QuotaExceeded
+from app.core.metrics import RECOMMENDATIONS_TOTAL
+from app.db.database import AsyncSessionLocal
 from app.models.set import Set
 from app.models.workout import Workout
 from app.repositories.recommendation_repo import RecommendationRepository
 from app.repositories.set_repo import SetRepository
+from app.repositories.training_volume_repo import TrainingVolumeRepository
+from app.repositories.user_stats_rollup_repo import UserStatsRollupRepository
 from app.repositories.workout_repo import WorkoutRepository
 from app.schemas.recommendation import RecommendationResponse
 from app.schemas.set import SetCreate, SetResponse, SetWithRecommendation
 from app.services.rule_engine import get_minimal_fallback, get_rule_based_recommendation
+from app.services.session_plan import MODEL_NAME as PLAN_MODEL_NAME
+from app.services.session_plan import PROVIDER_NAME as PLAN_PROVIDER_NAME
+from app.services.session_plan import SessionPlanStore
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +50,181 @@ def _ai_rec_to_response(rec: AIRecommendation) -> RecommendationResponse:
     )
 
 
+async def _store_ai(
+    rec_repo: RecommendationRepository,
+    rec: AIRecommendation,
+    exercise_id: UUID,
+    user_id: UUID,
+    workout_id: UUID,
+    set_id: UUID,
+) -> RecommendationResponse:
+    """Store an AI recommendation and return the response."""
+    provider_name = rec.provider or provider_label(rec.model_used)
+    await rec_repo.create({
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "set_id": set_id,
+        "exercise_id": exercise_id,
+        "recommended_weight": rec.suggested_weight_kg,
+        "recommended_reps": rec.suggested_reps,
+        "explanation": rec.explanation,
+        "confidence": rec.confidence,
+        "ai_provider": provider_name,
+        "model_used": rec.model_used,
+        "latency_ms": rec.latency_ms,
+        "prompt_tokens": rec.prompt_tokens,
+        "completion_tokens": rec.completion_tokens,
+    })
+    RECOMMENDATIONS_TOTAL.labels(source=provider_name).inc()
+    return _ai_rec_to_response(rec)
+
+
+async def _store_minimal_fallback(
+    rec_repo: RecommendationRepository,
+    set_in: SetCreate,
+    user_id: UUID,
+    workout_id: UUID,
+    set_id: UUID,
+) -> RecommendationResponse:
+    """Store the context-free fallback (used when build_context fails)."""
+    fallback_weight, fallback_reps, fallback_explanation = get_minimal_fallback(
+        set_in.weight_kg, set_in.reps, set_in.rpe
+    )
+    await rec_repo.create({
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "set_id": set_id,
+        "exercise_id": set_in.exercise_id,
+        "recommended_weight": fallback_weight,
+        "recommended_reps": fallback_reps,
+        "explanation": fallback_explanation,
+        "confidence": "low",
+        "ai_provider": "fallback",
+        "model_used": "rule-based",
+        "latency_ms": 0,
+    })
+    RECOMMENDATIONS_TOTAL.labels(source="fallback").inc()
+    return RecommendationResponse(
+        suggested_weight_kg=fallback_weight,
+        suggested_reps=fallback_reps,
+        explanation=fallback_explanation,
+        confidence="low",
+        model_used="rule-based",
+        latency_ms=0,
+    )
+
+
+async def _store_rule_based(
+    rec_repo: RecommendationRepository,
+    ctx: WorkoutContext,
+    set_in: SetCreate,
+    user_id: UUID,
+    workout_id: UUID,
+    set_id: UUID,
+    ai_provider: str,
+    note: str | None = None,
+) -> RecommendationResponse:
+    """Compute the rule-based recommendation, store it, and return the response.
+
+    ai_provider records why the rule engine answered ("fallback" after an AI error,
+    "shed" when admission control rejected the call); note is prepended to the
+    explanation as a human-readable marker.
+    """
+    weight, reps, explanation = get_rule_based_recommendation(
+        ctx, set_in.weight_kg, set_in.reps, set_in.rpe
+    )
+    if note:
+        explanation = f"{note} {explanation}"
+    await rec_repo.create({
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "set_id": set_id,
+        "exercise_id": set_in.exercise_id,
+        "recommended_weight": weight,
+        "recommended_reps": reps,
+        "explanation": explanation,
+        "confidence": "low",
+        "ai_provider": ai_provider,
+        "model_used": "rule-based",
+        "latency_ms": 0,
+    })
+    RECOMMENDATIONS_TOTAL.labels(source=ai_provider).inc()
+    return RecommendationResponse(
+        suggested_weight_kg=weight,
+        suggested_reps=reps,
+        explanation=explanation,
+        confidence="low",
+        model_used="rule-based",
+        latency_ms=0,
+    )
+
+
+async def _store_planned(
+    rec_repo: RecommendationRepository,
+    plan_store: SessionPlanStore | None,
+    set_in: SetCreate,
+    set_number: int,
+    user_id: UUID,
+    workout_id: UUID,
+    set_id: UUID,
+) -> RecommendationResponse | None:
+    """Serve and store the next set of the session plan if the logged set kept to it, else None."""
+    if plan_store is None:
+        return None
+    taken = plan_store.take(
+        str(workout_id), str(set_in.exercise_id), set_number,
+        set_in.weight_kg, set_in.reps, set_in.rpe,
+    )
+    if taken is None:
+        return None
+    planned, plan = taken
+    explanation = f"Session plan, set {planned.set_number} of {plan.total_sets}. {planned.explanation}"
+    await rec_repo.create({
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "set_id": set_id,
+        "exercise_id": set_in.exercise_id,
+        "recommended_weight": planned.weight_kg,
+        "recommended_reps": planned.reps,
+        "explanation": explanation,
+        "confidence": "medium",
+        "ai_provider": PLAN_PROVIDER_NAME,
+        "model_used": PLAN_MODEL_NAME,
+        "latency_ms": 0,
+    })
+    RECOMMENDATIONS_TOTAL.labels(source=PLAN_PROVIDER_NAME).inc()
+    return RecommendationResponse(
+        suggested_weight_kg=planned.weight_kg,
+        suggested_reps=planned.reps,
+        explanation=explanation,
+        confidence="medium",
+        model_used=PLAN_MODEL_NAME,
+        latency_ms=0,
+    )
+
+
+def _plan_ahead(
+    plan_store: SessionPlanStore | None, ctx: WorkoutContext, response: RecommendationResponse
+) -> None:
+    """Plan the rest of the exercise from a normally computed recommendation."""
+    if plan_store is None:
+        return
+    try:
+        plan_store.plan(
+            ctx, response.suggested_weight_kg, response.suggested_reps, response.explanation
+        )
+    except Exception:
+        logger.exception("Session planning failed")
+
+
 async def log_set(
     workout_id: UUID,
     set_in: SetCreate,
     user_id: UUID,
     db: AsyncSession,
     ai_provider: AIProvider,
+    defer_recommendation: bool = False,
+    plan_store: SessionPlanStore | None = None,
 ) -> SetWithRecommendation:
     """
     Log a set for an active workout and optionally attach an AI recommendation.
@@ -44,9 +232,17 @@ async def log_set(
     - Verifies workout exists and belongs to user (403 if not).
     - Verifies workout is active (400 if ended).
     - Sets set_number as count of existing sets for this exercise in workout + 1.
-    - Creates Set record.
-    - If not warmup: builds context, gets AI recommendation (or rule-based fallback on any error), stores recommendation.
-    - Returns SetWithRecommendation (recommendation None if warmup).
+    - Creates Set record and counts it in the user's stats rollup and daily volume
+      (same transaction).
+    - If not warmup: builds context, gets AI recommendation (or rule-based fallback on any error,
+      when admission control sheds the call, or when a daily token quota is used up),
+      stores recommendation with the provider's token counts.
+    - defer_recommendation skips the recommendation; the client streams it from
+      stream_recommendation (SSE) instead.
+    - With a plan_store, a set that kept to the session plan is answered from the
+      plan without building context or calling the provider; any other
+      recommendation plans the rest of the exercise.
+    - Returns SetWithRecommendation (recommendation None if warmup or deferred).
     """
     workout_repo = WorkoutRepository(db)
     set_repo = SetRepository(db)
@@ -85,13 +281,23 @@ async def log_set(
         "is_warmup": set_in.is_warmup,
     }
     new_set = await set_repo.create(set_data)
+    await UserStatsRollupRepository(db).add_set(
+        user_id, set_in.exercise_id, set_in.weight_kg, set_in.reps
+    )
     await db.flush()
+    await TrainingVolumeRepository(db).add_set(new_set.id)
     await db.refresh(new_set)
     assert isinstance(new_set, Set)
 
     recommendation_response: RecommendationResponse | None = None
 
-    if not set_in.is_warmup:
+    wants_recommendation = not set_in.is_warmup and not defer_recommendation
+    if wants_recommendation:
+        recommendation_response = await _store_planned(
+            rec_repo, plan_store, set_in, set_number, user_id, workout_id, new_set.id
+        )
+
+    if wants_recommendation and recommendation_response is None:
         ctx: WorkoutContext | None = None
         try:
             ctx = await build_context(
@@ -103,72 +309,33 @@ async def log_set(
         if ctx is not None:
             try:
                 rec: AIRecommendation = await ai_provider.get_recommendation(ctx)
-                recommendation_response = _ai_rec_to_response(rec)
-                provider_name = "gemini" if "gemini" in rec.model_used.lower() else "ai"
-                await rec_repo.create({
-                    "user_id": user_id,
-                    "workout_id": workout_id,
-                    "set_id": new_set.id,
-                    "exercise_id": set_in.exercise_id,
-                    "recommended_weight": rec.suggested_weight_kg,
-                    "recommended_reps": rec.suggested_reps,
-                    "explanation": rec.explanation,
-                    "confidence": rec.confidence,
-                    "ai_provider": provider_name,
-                    "model_used": rec.model_used,
-                    "latency_ms": rec.latency_ms,
-                })
+                recommendation_response = await _store_ai(
+                    rec_repo, rec, set_in.exercise_id, user_id, workout_id, new_set.id
+                )
+            except BulkheadRejected as e:
+                logger.warning("AI call shed to rule engine: %s", e.reason)
+                recommendation_response = await _store_rule_based(
+                    rec_repo, ctx, set_in, user_id, workout_id, new_set.id,
+                    ai_provider="shed",
+                    note=f"AI at capacity ({e.reason}).",
+                )
+            except QuotaExceeded as e:
+                recommendation_response = await _store_rule_based(
+                    rec_repo, ctx, set_in, user_id, workout_id, new_set.id,
+                    ai_provider="quota",
+                    note=f"Daily AI quota reached ({e.scope}).",
+                )
             except Exception as e:
                 logger.exception("AI recommendation failed: %s", e)
-                fallback_weight, fallback_reps, fallback_explanation = get_rule_based_recommendation(
-                    ctx, set_in.weight_kg, set_in.reps, set_in.rpe
+                recommendation_response = await _store_rule_based(
+                    rec_repo, ctx, set_in, user_id, workout_id, new_set.id,
+                    ai_provider="fallback",
                 )
-                recommendation_response = RecommendationResponse(
-                    suggested_weight_kg=fallback_weight,
-                    suggested_reps=fallback_reps,
-                    explanation=fallback_explanation,
-                    confidence="low",
-                    model_used="rule-based",
-                    latency_ms=0,
-                )
-                await rec_repo.create({
-                    "user_id": user_id,
-                    "workout_id": workout_id,
-                    "set_id": new_set.id,
-                    "exercise_id": set_in.exercise_id,
-                    "recommended_weight": fallback_weight,
-                    "recommended_reps": fallback_reps,
-                    "explanation": fallback_explanation,
-                    "confidence": "low",
-                    "ai_provider": "fallback",
-                    "model_used": "rule-based",
-                    "latency_ms": 0,
-                })
+            _plan_ahead(plan_store, ctx, recommendation_response)
         else:
-            fallback_weight, fallback_reps, fallback_explanation = get_minimal_fallback(
-                set_in.weight_kg, set_in.reps, set_in.rpe
-            )
-            recommendation_response = RecommendationResponse(
-                suggested_weight_kg=fallback_weight,
-                suggested_reps=fallback_reps,
-                explanation=fallback_explanation,
-                confidence="low",
-                model_used="rule-based",
-                latency_ms=0,
+            recommendation_response = await _store_minimal_fallback(
+                rec_repo, set_in, user_id, workout_id, new_set.id
             )
-            await rec_repo.create({
-                "user_id": user_id,
-                "workout_id": workout_id,
-                "set_id": new_set.id,
-                "exercise_id": set_in.exercise_id,
-                "recommended_weight": fallback_weight,
-                "recommended_reps": fallback_reps,
-                "explanation": fallback_explanation,
-                "confidence": "low",
-                "ai_provider": "fallback",
-                "model_used": "rule-based",
-                "latency_ms": 0,
-            })
 
     await db.commit()
     await db.refresh(new_set)
@@ -179,6 +346,133 @@ async def log_set(
     )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def get_set_for_recommendation_stream(
+    set_id: UUID, user_id: UUID, db: AsyncSession
+) -> Set:
+    """
+    Validate that a recommendation can be streamed for a set.
+
+    Raises:
+        HTTPException: 404 if set not found, 403 if not owned, 400 if warmup
+    """
+    set_repo = SetRepository(db)
+    s = await set_repo.get(set_id)
+    if s is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Set not found",
+        )
+    if s.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to view this set",
+        )
+    if s.is_warmup:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Warmup sets have no recommendation",
+        )
+    return s
+
+
+async def stream_recommendation(
+    s: Set, ai_provider: AIProvider, plan_store: SessionPlanStore | None = None
+) -> AsyncIterator[str]:
+    """
+    Stream the recommendation for a logged set as Server-Sent Events.
+
+    Events:
+      - field: {"suggested_weight_kg": ...} / {"suggested_reps": ...} as soon as decoded
+      - explanation: {"delta": "..."} explanation text as it is generated
+      - done: the stored RecommendationResponse (authoritative; on AI failure this is
+        the rule-based recommendation even if field events were already sent)
+
+    If the set already has a recommendation it is replayed as a single done event;
+    a set that kept to the session plan gets the planned set as a single done event.
+    Uses its own DB session because the response outlives the request's session.
+    """
+    set_in = SetCreate(
+        exercise_id=s.exercise_id,
+        weight_kg=float(s.weight_kg),
+        reps=s.reps,
+        rpe=float(s.rpe) if s.rpe is not None else None,
+        is_warmup=s.is_warmup,
+    )
+    async with AsyncSessionLocal() as db:
+        rec_repo = RecommendationRepository(db)
+        existing = await rec_repo.get_by_set_id(s.id)
+        if existing is not None:
+            yield _sse("done", RecommendationResponse(
+                suggested_weight_kg=float(existing.recommended_weight),
+                suggested_reps=existing.recommended_reps,
+                explanation=existing.explanation,
+                confidence=existing.confidence,
+                model_used=existing.model_used,
+                latency_ms=existing.latency_ms,
+            ).model_dump())
+            return
+
+        planned = await _store_planned(
+            rec_repo, plan_store, set_in, s.set_number, s.user_id, s.workout_id, s.id
+        )
+        if planned is not None:
+            await db.commit()
+            yield _sse("done", planned.model_dump())
+            return
+
+        try:
+            ctx = await build_context(s.workout_id, s.exercise_id, s.user_id, db)
+        except Exception:
+            response = await _store_minimal_fallback(
+                rec_repo, set_in, s.user_id, s.workout_id, s.id
+            )
+            await db.commit()
+            yield _sse("done", response.model_dump())
+            return
+
+        try:
+            rec: AIRecommendation | None = None
+            async for event in ai_provider.stream_recommendation(ctx):
+                if event.kind == STREAM_EVENT_FIELD:
+                    yield _sse("field", {event.field: event.value})
+                elif event.kind == STREAM_EVENT_EXPLANATION_DELTA:
+                    yield _sse("explanation", {"delta": event.value})
+                elif event.kind == STREAM_EVENT_FINAL:
+                    rec = event.recommendation
+            if rec is None:
+                raise ValueError("Provider stream ended without a recommendation")
+            response = await _store_ai(
+                rec_repo, rec, s.exercise_id, s.user_id, s.workout_id, s.id
+            )
+        except BulkheadRejected as e:
+            logger.warning("AI stream shed to rule engine: %s", e.reason)
+            response = await _store_rule_based(
+                rec_repo, ctx, set_in, s.user_id, s.workout_id, s.id,
+                ai_provider="shed",
+                note=f"AI at capacity ({e.reason}).",
+            )
+        except QuotaExceeded as e:
+            response = await _store_rule_based(
+                rec_repo, ctx, set_in, s.user_id, s.workout_id, s.id,
+                ai_provider="quota",
+                note=f"Daily AI quota reached ({e.scope}).",
+            )
+        except Exception as e:
+            logger.exception("AI recommendation stream failed: %s", e)
+            response = await _store_rule_based(
+                rec_repo, ctx, set_in, s.user_id, s.workout_id, s.id,
+                ai_provider="fallback",
+            )
+        _plan_ahead(plan_store, ctx, response)
+        await db.commit()
+        yield _sse("done", response.model_dump())
+
+
 async def get_sets_for_workout(
     workout_id: UUID, user_id: UUID, db: AsyncSession
 ) -> list[SetResponse]:
@@ -203,7 +497,11 @@ async def get_sets_for_workout(
 async def delete_set(
     set_id: UUID, user_id: UUID, db: AsyncSession
 ) -> None:
-    """Delete a set. User must own the set's workout. Returns 204."""
+    """
+    Delete a set and uncount it from the stats rollup and daily volume.
+
+    User must own the set's workout. Returns 204.
+    """
     set_repo = SetRepository(db)
     workout_repo = WorkoutRepository(db)
     s = await set_repo.get(set_id)
@@ -217,5 +515,9 @@ async def delete_set(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not allowed to delete this set",
         )
+    await UserStatsRollupRepository(db).remove_set(
+        s.user_id, s.exercise_id, float(s.weight_kg), s.reps
+    )
+    await TrainingVolumeRepository(db).remove_set(set_id)
     await set_repo.delete(set_id)
     await db.commit()
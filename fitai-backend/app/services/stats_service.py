@@ -1,14 +1,18 @@
 """Stats service — user and exercise aggregations (SQL only, no Python loops over records)."""
 
-from datetime import date, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from uuid import UUID
 
-from sqlalchemy import Date, cast, distinct, func, select
+from fastapi import HTTPException, status
+from sqlalchemy import distinct, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.exercise import Exercise
 from app.models.set import Set
-from app.models.workout import Workout
+from app.repositories.training_volume_repo import TrainingVolumeRepository
+from app.repositories.user_stats_rollup_repo import ROLLUP_COLUMNS, UserStatsRollupRepository
+
+# Default range of the volume series when from is not given.
+VOLUME_DEFAULT_DAYS = 364
 
 
 async def get_exercise_stats(
@@ -91,81 +95,171 @@ async def get_user_overview(
 ) -> dict:
     """
     User overview stats: workouts count, sets count, volume, most trained muscle,
-    favourite exercise, active streak (consecutive days ending today).
+    favourite exercise, active streak (consecutive UTC days ending today) with
+    its start date, and the longest streak.
+
+    Read from the user's stats rollup (one primary-key read); users without a
+    rollup row yet are computed from sets and workouts.
     """
-    # total_workouts: COUNT workouts where ended_at IS NOT NULL
-    workouts_count_row = (
-        await db.execute(
-            select(func.count(Workout.id)).where(
-                Workout.user_id == user_id,
-                Workout.ended_at.isnot(None),
-            )
-        )
-    ).scalar()
-    total_workouts = int(workouts_count_row or 0)
+    row = await UserStatsRollupRepository(db).get_overview_row(user_id)
+    if row is None:
+        return await compute_user_overview(user_id, db)
+    return overview_from_rollup(row, _utc_today())
 
-    # total_sets, total_volume_kg
-    sets_row = (
-        await db.execute(
-            select(
-                func.count(Set.id).label("total_sets"),
-                func.coalesce(func.sum(Set.weight_kg * Set.reps), 0).label("total_volume_kg"),
-            ).where(Set.user_id == user_id)
-        )
-    ).one()
-    total_sets = int(sets_row.total_sets or 0)
-    total_volume_kg = float(sets_row.total_volume_kg or 0)
 
-    # most_trained_muscle: muscle_group with highest set count (join sets -> exercises)
-    muscle_row = (
-        await db.execute(
-            select(Exercise.muscle_group)
-            .select_from(Set)
-            .join(Exercise, Set.exercise_id == Exercise.id)
-            .where(Set.user_id == user_id)
-            .group_by(Exercise.muscle_group)
-            .order_by(func.count(Set.id).desc())
-            .limit(1)
-        )
-    ).one_or_none()
-    most_trained_muscle: str | None = muscle_row[0] if muscle_row else None
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
 
-    # favourite_exercise: exercise name with highest set count
-    fav_row = (
-        await db.execute(
-            select(Exercise.name)
-            .select_from(Set)
-            .join(Exercise, Set.exercise_id == Exercise.id)
-            .where(Set.user_id == user_id)
-            .group_by(Exercise.id, Exercise.name)
-            .order_by(func.count(Set.id).desc())
-            .limit(1)
-        )
-    ).one_or_none()
-    favourite_exercise: str | None = fav_row[0] if fav_row else None
 
-    # active_streak_days: distinct workout dates (ended_at date), then Python streak
-    dates_result = await db.execute(
-        select(cast(Workout.ended_at, Date)).where(
-            Workout.user_id == user_id,
-            Workout.ended_at.isnot(None),
-        )
-    )
-    workout_dates = {r[0] for r in dates_result.all() if r[0] is not None}
+def _iso(day: date | None) -> str | None:
+    return day.isoformat() if day is not None else None
 
-    active_streak_days = 0
-    if workout_dates:
-        today = date.today()
-        d = today
-        while d in workout_dates:
-            active_streak_days += 1
-            d = d - timedelta(days=1)
 
+def overview_from_rollup(row, today: date) -> dict:
+    """
+    Build the overview dict from a get_overview_row row.
+
+    Args:
+        row: Rollup row with favourite_exercise
+        today: Day the active streak must reach to count
+
+    Returns:
+        Overview dict (same keys as compute_user_overview)
+    """
+    muscles = row.muscle_set_counts or {}
+    # Highest count, ties broken by name (as in compute_user_overview).
+    most_trained_muscle = min(muscles, key=lambda m: (-muscles[m], m)) if muscles else None
+    active_streak_days = 0
+    streak_start_date = None
+    if row.last_active_date == today and row.streak_start_date is not None:
+        active_streak_days = (today - row.streak_start_date).days + 1
+        streak_start_date = row.streak_start_date
     return {
-        "total_workouts": total_workouts,
-        "total_sets": total_sets,
-        "total_volume_kg": total_volume_kg,
+        "total_workouts": int(row.total_workouts),
+        "total_sets": int(row.total_sets),
+        "total_volume_kg": float(row.total_volume_kg),
         "most_trained_muscle": most_trained_muscle,
-        "favourite_exercise": favourite_exercise,
+        "favourite_exercise": row.favourite_exercise,
         "active_streak_days": active_streak_days,
+        "longest_streak_days": int(row.longest_streak_days),
+        "streak_start_date": _iso(streak_start_date),
+    }
+
+
+async def check_user_rollup(user_id: UUID, db: AsyncSession) -> dict:
+    """
+    Compare a user's stored rollup with the base tables.
+
+    Checks every rollup counter against a recomputation, and the overview
+    served from the rollup against compute_user_overview.
+
+    Args:
+        user_id: User UUID
+        db: Database session
+
+    Returns:
+        Mismatches as {field: (stored, expected)}; empty when consistent.
+        A missing rollup row is reported as {"row": (None, "missing")}.
+    """
+    repo = UserStatsRollupRepository(db)
+    stored = await repo.get_overview_row(user_id)
+    if stored is None:
+        return {"row": (None, "missing")}
+    expected = await repo.compute_from_base(user_id)
+    mismatches: dict = {}
+    if expected is not None:
+        for field in ROLLUP_COLUMNS:
+            have, want = getattr(stored, field), getattr(expected, field)
+            if field == "total_volume_kg":
+                have, want = float(have), float(want)
+            if have != want:
+                mismatches[field] = (have, want)
+    served = overview_from_rollup(stored, _utc_today())
+    computed = await compute_user_overview(user_id, db)
+    for field, want in computed.items():
+        if served[field] != want:
+            mismatches[f"overview.{field}"] = (served[field], want)
+    return mismatches
+
+
+async def compute_user_overview(
+    user_id: UUID,
+    db: AsyncSession,
+    today: date | None = None,
+) -> dict:
+    """
+    User overview computed from sets and workouts (the rollup's reference), in one round trip.
+
+    Args:
+        user_id: User UUID
+        db: Database session
+        today: Day the active streak must reach (default: today in UTC)
+
+    Returns:
+        Overview dict (see get_user_overview)
+    """
+    row = await UserStatsRollupRepository(db).compute_overview(user_id, today or _utc_today())
+    return {
+        "total_workouts": int(row.total_workouts or 0),
+        "total_sets": int(row.total_sets or 0),
+        "total_volume_kg": float(row.total_volume_kg or 0),
+        "most_trained_muscle": row.most_trained_muscle,
+        "favourite_exercise": row.favourite_exercise,
+        "active_streak_days": int(row.active_streak_days or 0),
+        "longest_streak_days": int(row.longest_streak_days or 0),
+        "streak_start_date": _iso(row.streak_start_date),
+    }
+
+
+async def get_volume_series(
+    user_id: UUID,
+    bucket: str,
+    start: date | None,
+    end: date | None,
+    group: str,
+    db: AsyncSession,
+) -> dict:
+    """
+    Working sets, reps and volume per week or month, from the daily volume table.
+
+    Args:
+        user_id: User UUID
+        bucket: "week" (buckets start on Monday) or "month"
+        start: First UTC day included (default: one year before end)
+        end: Last UTC day included (default: today)
+        group: "muscle_group" for one series per muscle group, "total" for one series
+        db: Database session
+
+    Returns:
+        Dict with bucket, from, to, group and points (oldest first); each point has
+        bucket_start (ISO), muscle_group (None for total), sets, reps, volume_kg
+
+    Raises:
+        HTTPException: 400 if from is after to
+    """
+    end = end or _utc_today()
+    start = start or end - timedelta(days=VOLUME_DEFAULT_DAYS)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from must not be after to",
+        )
+    rows = await TrainingVolumeRepository(db).get_buckets(
+        user_id, bucket, start, end, by_muscle_group=group == "muscle_group"
+    )
+    return {
+        "bucket": bucket,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "group": group,
+        "points": [
+            {
+                "bucket_start": bucket_start.isoformat(),
+                "muscle_group": muscle_group,
+                "sets": int(sets),
+                "reps": int(reps),
+                "volume_kg": float(volume_kg),
+            }
+            for bucket_start, muscle_group, sets, reps, volume_kg in rows
+        ],
     }
@@ -0,0 +1,60 @@
+"""Usage service — AI token and cost rollups for admins (uses repository layer only)."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.usage import UsageTracker
+from app.config import Settings
+from app.repositories.recommendation_repo import RecommendationRepository
+
+
+def token_cost_usd(prompt_tokens: int, completion_tokens: int, settings: Settings) -> float:
+    """Cost of a token count at the configured per-million-token prices."""
+    return round(
+        (
+            prompt_tokens * settings.AI_PRICE_INPUT_PER_MTOK
+            + completion_tokens * settings.AI_PRICE_OUTPUT_PER_MTOK
+        )
+        / 1_000_000,
+        6,
+    )
+
+
+async def get_usage_report(
+    days: int, db: AsyncSession, tracker: UsageTracker, settings: Settings
+) -> dict:
+    """
+    Build the admin AI usage report.
+
+    Args:
+        days: Number of UTC days of persisted history to roll up (including today)
+        db: Database session
+        tracker: Process-wide live usage tracker
+        settings: Prices for the cost columns
+
+    Returns:
+        {"live": today's in-memory counters for this process,
+         "daily": [{day, ai_provider, model_used, calls, prompt_tokens,
+                    completion_tokens, cost_usd}, ...] from stored recommendations}
+    """
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    since = today - timedelta(days=max(1, days) - 1)
+    rows = await RecommendationRepository(db).get_token_usage_by_day(since)
+    daily = [
+        {
+            "day": day.isoformat(),
+            "ai_provider": provider,
+            "model_used": model,
+            "calls": calls,
+            "prompt_tokens": int(prompt),
+            "completion_tokens": int(completion),
+            "cost_usd": token_cost_usd(int(prompt), int(completion), settings),
+        }
+        for day, provider, model, calls, prompt, completion in rows
+    ]
+    live = tracker.snapshot()
+    live["total"]["cost_usd"] = token_cost_usd(
+        live["total"]["prompt_tokens"], live["total"]["completion_tokens"], settings
+    )
+    return {"live": live, "daily": daily}
@@ -3,16 +3,21 @@
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.base import AIProvider
+from app.config import get_settings
 from app.models.workout import Workout
 from app.models.exercise import Exercise
 from app.repositories.workout_repo import WorkoutRepository
 from app.repositories.set_repo import SetRepository
+from app.repositories.user_stats_rollup_repo import UserStatsRollupRepository
 from app.schemas.set import WorkoutExerciseGroup, WorkoutExerciseSetItem
 from app.schemas.workout import WorkoutCreate, WorkoutUpdate
+from app.services import planning_service
+from app.services.session_plan import SessionPlanStore
 
 
 async def start_workout(
@@ -44,15 +49,29 @@ async def start_workout(
 
 
 async def end_workout(
-    workout_id: UUID, user_id: UUID, db: AsyncSession
+    workout_id: UUID,
+    user_id: UUID,
+    db: AsyncSession,
+    ai_provider: AIProvider | None = None,
+    background_tasks: BackgroundTasks | None = None,
+    plan_store: SessionPlanStore | None = None,
 ) -> Workout:
     """
-    End a workout by setting ended_at to now.
+    End a workout by setting ended_at to now and drop its session plans.
+
+    The first end of a workout is counted in the user's stats rollup (workouts
+    and streak) in the same transaction; ending it again only moves ended_at.
+
+    With background_tasks and ai_provider given (and AI_PLAN_NEXT_SESSION on),
+    enqueues planning_service.plan_next_session to precompute next-session targets.
 
     Args:
         workout_id: Workout UUID
         user_id: Current user UUID (must own the workout)
         db: Database session
+        ai_provider: Provider whose per-workout sessions are dropped and that plans targets
+        background_tasks: Request background tasks for the planning job
+        plan_store: Session plan store whose plans for this workout are dropped
 
     Returns:
         Updated Workout instance
@@ -72,10 +91,21 @@ async def end_workout(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not allowed to modify this workout",
         )
+    first_end = workout.ended_at is None
     now = datetime.now(timezone.utc)
     await repo.update(workout_id, {"ended_at": now})
+    if first_end:
+        await UserStatsRollupRepository(db).add_workout_end(user_id, now.date())
     await db.commit()
     await db.refresh(workout)
+    if plan_store is not None:
+        plan_store.evict_workout(str(workout_id))
+    if ai_provider is not None:
+        ai_provider.end_session(str(workout_id))
+        if background_tasks is not None and get_settings().AI_PLAN_NEXT_SESSION:
+            background_tasks.add_task(
+                planning_service.plan_next_session, workout_id, user_id, ai_provider
+            )
     return workout
 
 
@@ -142,6 +172,9 @@ async def update_workout(
     """
     Update a workout (e.g. name, notes). User can only update their own.
 
+    Changing ended_at rebuilds the user's stats rollup, since the workout
+    count and streak can no longer be adjusted incrementally.
+
     Args:
         workout_id: Workout UUID
         user_id: Current user UUID
@@ -170,6 +203,8 @@ async def update_workout(
     if not payload:
         return workout
     updated = await repo.update(workout_id, payload)
+    if "ended_at" in payload:
+        await UserStatsRollupRepository(db).rebuild(user_id)
     await db.commit()
     if updated:
         await db.refresh(updated)
@@ -0,0 +1,71 @@
+"""Add planned_targets table (next-session first-working-set targets).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: Add planned_targets table
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "planned_targets",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("exercise_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("source_workout_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("target_weight_kg", sa.Numeric(precision=6, scale=2), nullable=False),
+        sa.Column("target_reps", sa.Integer(), nullable=False),
+        sa.Column("explanation", sa.Text(), nullable=False),
+        sa.Column("confidence", sa.String(length=10), nullable=False),
+        sa.Column("ai_provider", sa.String(length=20), nullable=False),
+        sa.Column("model_used", sa.String(length=50), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            name="fk_planned_targets_user_id_users",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["exercise_id"],
+            ["exercises.id"],
+            name="fk_planned_targets_exercise_id_exercises",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["source_workout_id"],
+            ["workouts.id"],
+            name="fk_planned_targets_source_workout_id_workouts",
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "exercise_id", name="uq_planned_targets_user_id_exercise_id"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("planned_targets")
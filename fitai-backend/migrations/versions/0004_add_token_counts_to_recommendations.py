@@ -0,0 +1,27 @@
+"""Add prompt/completion token counts to recommendations.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: Add token accounting columns to recommendations table
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("recommendations", sa.Column("prompt_tokens", sa.Integer(), nullable=True))
+    op.add_column("recommendations", sa.Column("completion_tokens", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("recommendations", "completion_tokens")
+    op.drop_column("recommendations", "prompt_tokens")
@@ -0,0 +1,137 @@
+"""Add user_stats_rollup (incrementally maintained overview counters).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: Add per-user overview rollup table and backfill it from sets and workouts
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same computation as app.repositories.user_stats_rollup_repo.rollup_from_base,
+# frozen here so the migration does not depend on application code.
+BACKFILL = """
+INSERT INTO user_stats_rollup (
+    user_id, total_workouts, total_sets, total_volume_kg,
+    muscle_set_counts, exercise_set_counts, streak_start_date, last_active_date
+)
+WITH set_totals AS (
+    SELECT user_id, count(id) AS total_sets, sum(weight_kg * reps) AS total_volume_kg
+    FROM sets GROUP BY user_id
+),
+muscles AS (
+    SELECT user_id, jsonb_object_agg(key, n) AS counts
+    FROM (
+        SELECT sets.user_id, exercises.muscle_group AS key, count(sets.id) AS n
+        FROM sets JOIN exercises ON exercises.id = sets.exercise_id
+        GROUP BY sets.user_id, exercises.muscle_group
+    ) AS per_muscle
+    GROUP BY user_id
+),
+exercise_counts AS (
+    SELECT user_id, jsonb_object_agg(key, n) AS counts
+    FROM (
+        SELECT user_id, CAST(exercise_id AS TEXT) AS key, count(id) AS n
+        FROM sets GROUP BY user_id, exercise_id
+    ) AS per_exercise
+    GROUP BY user_id
+),
+workout_totals AS (
+    SELECT user_id, count(id) AS total_workouts
+    FROM workouts WHERE ended_at IS NOT NULL GROUP BY user_id
+),
+last_run AS (
+    SELECT DISTINCT ON (user_id) user_id, start_day, end_day
+    FROM (
+        SELECT user_id, min(day) AS start_day, max(day) AS end_day
+        FROM (
+            SELECT user_id, day,
+                   day - CAST(row_number() OVER (PARTITION BY user_id ORDER BY day) AS INTEGER) AS island
+            FROM (
+                SELECT DISTINCT user_id, CAST(ended_at AS DATE) AS day
+                FROM workouts WHERE ended_at IS NOT NULL
+            ) AS days
+        ) AS islands
+        GROUP BY user_id, island
+    ) AS runs
+    ORDER BY user_id, end_day DESC
+)
+SELECT
+    users.id,
+    coalesce(workout_totals.total_workouts, 0),
+    coalesce(set_totals.total_sets, 0),
+    coalesce(set_totals.total_volume_kg, 0),
+    coalesce(muscles.counts, '{}'::jsonb),
+    coalesce(exercise_counts.counts, '{}'::jsonb),
+    last_run.start_day,
+    last_run.end_day
+FROM users
+LEFT OUTER JOIN set_totals ON set_totals.user_id = users.id
+LEFT OUTER JOIN muscles ON muscles.user_id = users.id
+LEFT OUTER JOIN exercise_counts ON exercise_counts.user_id = users.id
+LEFT OUTER JOIN workout_totals ON workout_totals.user_id = users.id
+LEFT OUTER JOIN last_run ON last_run.user_id = users.id
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats_rollup",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("total_workouts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("total_sets", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "total_volume_kg",
+            sa.Numeric(14, 2),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.Column(
+            "muscle_set_counts",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column(
+            "exercise_set_counts",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("streak_start_date", sa.Date(), nullable=True),
+        sa.Column("last_active_date", sa.Date(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            name="fk_user_stats_rollup_user_id_users",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats_rollup")
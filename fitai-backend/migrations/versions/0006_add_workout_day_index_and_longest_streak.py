@@ -0,0 +1,72 @@
+"""Index workouts by UTC calendar day; add longest streak to user_stats_rollup.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: Add ix_workouts_user_id_ended_day and user_stats_rollup.longest_streak_days
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Streak days are UTC calendar days from here on (0005 used the session time
+# zone), so the current streak is recomputed along with the longest one.
+BACKFILL = """
+WITH runs AS (
+    SELECT user_id, min(day) AS start_day, max(day) AS end_day, count(*) AS length
+    FROM (
+        SELECT user_id, day,
+               day - CAST(row_number() OVER (PARTITION BY user_id ORDER BY day) AS INTEGER) AS island
+        FROM (
+            SELECT DISTINCT user_id, CAST(timezone('UTC', ended_at) AS DATE) AS day
+            FROM workouts WHERE ended_at IS NOT NULL
+        ) AS days
+    ) AS islands
+    GROUP BY user_id, island
+),
+last_run AS (
+    SELECT DISTINCT ON (user_id) user_id, start_day, end_day
+    FROM runs ORDER BY user_id, end_day DESC
+),
+longest_run AS (
+    SELECT user_id, max(length) AS length FROM runs GROUP BY user_id
+)
+UPDATE user_stats_rollup
+SET streak_start_date = last_run.start_day,
+    last_active_date = last_run.end_day,
+    longest_streak_days = longest_run.length
+FROM last_run JOIN longest_run ON longest_run.user_id = last_run.user_id
+WHERE user_stats_rollup.user_id = last_run.user_id
+"""
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_workouts_user_id_ended_day",
+        "workouts",
+        ["user_id", sa.text("CAST(timezone('UTC', ended_at) AS DATE)")],
+        postgresql_where=sa.text("ended_at IS NOT NULL"),
+    )
+    op.add_column(
+        "user_stats_rollup",
+        sa.Column(
+            "longest_streak_days",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_column("user_stats_rollup", "longest_streak_days")
+    op.drop_index("ix_workouts_user_id_ended_day", table_name="workouts")
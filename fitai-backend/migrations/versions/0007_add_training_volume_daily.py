@@ -0,0 +1,86 @@
+"""Add training_volume_daily (working sets, reps and volume per day and muscle group).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: Add training_volume_daily table and backfill it from sets
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL = """
+INSERT INTO training_volume_daily (user_id, day, muscle_group, sets, reps, volume_kg)
+SELECT sets.user_id,
+       CAST(timezone('UTC', sets.logged_at) AS DATE),
+       exercises.muscle_group,
+       count(*),
+       sum(sets.reps),
+       sum(sets.weight_kg * sets.reps)
+FROM sets JOIN exercises ON exercises.id = sets.exercise_id
+WHERE sets.is_warmup IS false
+GROUP BY 1, 2, 3
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "training_volume_daily",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("muscle_group", sa.String(length=50), nullable=False),
+        sa.Column("sets", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("reps", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "volume_kg",
+            sa.Numeric(14, 2),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            name="fk_training_volume_daily_user_id_users",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        # Also the index for a user's date-range reads.
+        sa.UniqueConstraint(
+            "user_id",
+            "day",
+            "muscle_group",
+            name="uq_training_volume_daily_user_id_day_muscle_group",
+        ),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table("training_volume_daily")
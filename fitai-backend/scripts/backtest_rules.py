@@ -0,0 +1,131 @@
+"""
+Backtest a rule engine change against every logged set.
+
+Streams all sets from Postgres (server-side cursor, ordered by user and
+logged_at), rebuilds the WorkoutContext each working set was recommended
+from, and runs two versions of app/services/rule_engine.py on it in a
+process pool. Reports:
+
+  - changed-recommendation rate (weight or reps), and per field
+  - distribution of weight deltas (kg) and reps deltas, new minus old
+  - the --examples cases with the largest changes, with both explanations
+
+--old is the baseline rule engine file (e.g. from git show), --new defaults to
+the working tree's app/services/rule_engine.py. Both must define
+get_rule_based_recommendation(ctx, last_weight_kg, last_reps, last_rpe).
+
+  From fitai-backend:
+    git show HEAD~1:fitai-backend/app/services/rule_engine.py > /tmp/rule_engine_old.py
+    PYTHONPATH=. python scripts/backtest_rules.py --old /tmp/rule_engine_old.py
+    PYTHONPATH=. python scripts/backtest_rules.py --old /tmp/rule_engine_old.py --limit 100000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.db.database import AsyncSessionLocal
+from app.repositories.set_repo import SetRepository
+from app.services.backtest import (
+    CURRENT_RULE_ENGINE,
+    BacktestCase,
+    BacktestSummary,
+    HistoryReplayer,
+    init_worker,
+    load_rule_engine,
+    run_chunk,
+)
+
+
+async def backtest(
+    old_path: str,
+    new_path: str,
+    workers: int,
+    chunk_size: int,
+    limit: int | None,
+    max_examples: int,
+) -> BacktestSummary:
+    loop = asyncio.get_running_loop()
+    summary = BacktestSummary(max_examples=max_examples)
+    replayer = HistoryReplayer()
+    pending: set[asyncio.Future] = set()
+    chunk: list[BacktestCase] = []
+
+    def collect(done: set[asyncio.Future]) -> None:
+        for future in done:
+            summary.merge(future.result())
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(old_path, new_path)
+    ) as pool:
+
+        async def submit(cases: list[BacktestCase]) -> None:
+            # At most two chunks per worker in flight, so the stream never outruns the pool.
+            if len(pending) >= 2 * workers:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                collect(done)
+            pending.add(loop.run_in_executor(pool, run_chunk, cases, max_examples))
+
+        async with AsyncSessionLocal() as db:
+            async for rows in SetRepository(db).stream_history(batch_size=chunk_size, limit=limit):
+                for row in rows:
+                    case = replayer.feed(row)
+                    if case is not None:
+                        chunk.append(case)
+                if len(chunk) >= chunk_size:
+                    await submit(chunk)
+                    chunk = []
+        if chunk:
+            await submit(chunk)
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            collect(done)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--old", required=True, help="baseline rule_engine.py")
+    parser.add_argument("--new", default=str(CURRENT_RULE_ENGINE), help="candidate rule_engine.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many sets (warmups included)")
+    parser.add_argument("--examples", type=int, default=20)
+    args = parser.parse_args()
+
+    # Fail fast here rather than with a BrokenProcessPool from every worker.
+    for path in (args.old, args.new):
+        try:
+            load_rule_engine(path, "_backtest_rules_check")
+        except Exception as e:
+            print(f"Cannot load {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    start = time.perf_counter()
+    summary = asyncio.run(
+        backtest(args.old, args.new, max(1, args.workers), max(1, args.chunk_size), args.limit, args.examples)
+    )
+    seconds = time.perf_counter() - start
+    report = {
+        "old": args.old,
+        "new": args.new,
+        "workers": args.workers,
+        "wall_seconds": round(seconds, 2),
+        "sets_per_second": int(summary.sets / seconds) if seconds > 0 else 0,
+        **summary.report(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
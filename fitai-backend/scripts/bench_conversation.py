@@ -0,0 +1,232 @@
+"""
+Benchmark: stateless prompts vs conversation mode over a simulated 20-set workout.
+
+Simulates one workout (--exercises exercises x --sets-per-exercise sets, each with
+three past sessions of history) and asks GeminiProvider for a recommendation
+after every set, once per mode. For each mode it reports:
+
+  - sent_tokens: tokens of the new user message per set (what the app builds)
+  - input_tokens: system prompt + every message in the request (what the model
+    reads; conversation mode replays earlier turns, so this grows per turn)
+  - reused_prefix_tokens: leading part identical to the previous request, which
+    provider prefix caching can bill at a discount (--prefix-discount); the
+    effective_input_tokens_total line applies that discount
+
+Offline, token counts are estimates (PromptBuilder.estimate_tokens) and replies are
+canned. With --live, both modes call the configured Gemini model and the report
+adds latency percentiles and the provider-reported prompt_token_count.
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/bench_conversation.py
+    PYTHONPATH=. python scripts/bench_conversation.py --format compact --max-turns 8
+    PYTHONPATH=. python scripts/bench_conversation.py --live
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.ai.base import WorkoutContext
+from app.ai.conversation import ConversationStore
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.prompt_builder import PROMPT_FORMATS, PROMPT_FORMAT_VERBOSE, PromptBuilder
+
+CANNED_REPLY = json.dumps(
+    {
+        "suggested_weight_kg": 82.5,
+        "suggested_reps": 8,
+        "explanation": "Last set at RPE 8 matches the target; keep the load.",
+        "confidence": "high",
+    }
+)
+
+
+def _text_of(contents: Any) -> list[str]:
+    if isinstance(contents, str):
+        return [contents]
+    return [part.text for content in contents for part in content.parts]
+
+
+class RecordingClient:
+    """Wraps a genai client (or a canned backend) and records each request's size."""
+
+    def __init__(self, client: Any | None) -> None:
+        self._client = client
+        self.calls: list[dict] = []
+        self._previous = ""
+        models = SimpleNamespace(generate_content=self._generate_content, get=self._get)
+        self.aio = SimpleNamespace(models=models)
+
+    async def _get(self, *, model: str) -> Any:
+        return SimpleNamespace(name=model)
+
+    async def _generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any:
+        texts = _text_of(contents)
+        system = getattr(config, "system_instruction", None) or ""
+        if self._client is None:
+            response = SimpleNamespace(text=CANNED_REPLY, usage_metadata=None)
+        else:
+            response = await self._client.aio.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        usage = getattr(response, "usage_metadata", None)
+        full = system + "".join(texts)
+        prefix = len(os.path.commonprefix([full, self._previous]))
+        self._previous = full
+        self.calls.append(
+            {
+                "sent_tokens": PromptBuilder.estimate_tokens(texts[-1]),
+                "input_tokens": PromptBuilder.estimate_tokens(full),
+                "reused_prefix_tokens": PromptBuilder.estimate_tokens(full[:prefix]),
+                "prompt_token_count": getattr(usage, "prompt_token_count", None),
+            }
+        )
+        return response
+
+
+def simulated_workout(exercises: int, sets_per_exercise: int) -> list[WorkoutContext]:
+    """One context per logged set, in logging order."""
+    contexts: list[WorkoutContext] = []
+    total = 0
+    for e in range(exercises):
+        base = 60.0 + 10 * e
+        history = [
+            {
+                "date": f"2026-01-{day:02d}",
+                "sets": [
+                    {"weight_kg": base - 2.5, "reps": 8, "rpe": 7.5 + 0.5 * i}
+                    for i in range(sets_per_exercise)
+                ],
+            }
+            for day in (12, 8, 5)
+        ]
+        sets: list[dict] = []
+        for n in range(sets_per_exercise):
+            total += 1
+            sets = sets + [
+                {"weight_kg": base, "reps": 8 - n // 2, "rpe": 7.0 + 0.5 * n, "set_number": n + 1}
+            ]
+            contexts.append(
+                WorkoutContext(
+                    exercise_name=f"Exercise {e + 1}",
+                    muscle_group="chest",
+                    equipment_type="barbell",
+                    is_compound=e % 2 == 0,
+                    current_session_sets=sets,
+                    recent_sessions=history,
+                    estimated_1rm=round(base * 1.27, 2),
+                    max_weight_ever=base + 5,
+                    total_sets_today=total,
+                    workout_duration_minutes=3 * total,
+                    seconds_since_last_set=150,
+                    workout_id="bench-workout",
+                    exercise_id=f"exercise-{e + 1}",
+                )
+            )
+    return contexts
+
+
+def _summary(calls: list[dict], latencies: list[int], live: bool, prefix_discount: float) -> dict:
+    sent = [c["sent_tokens"] for c in calls]
+    read = [c["input_tokens"] for c in calls]
+    reused = sum(c["reused_prefix_tokens"] for c in calls)
+    out: dict = {
+        "calls": len(calls),
+        "sent_tokens_total": sum(sent),
+        "sent_tokens_mean": round(statistics.mean(sent), 1),
+        "input_tokens_total": sum(read),
+        "input_tokens_mean": round(statistics.mean(read), 1),
+        "reused_prefix_tokens_total": reused,
+        "effective_input_tokens_total": round(sum(read) - prefix_discount * reused),
+    }
+    if live:
+        counts = [c["prompt_token_count"] for c in calls if c["prompt_token_count"] is not None]
+        out["prompt_token_count_total"] = sum(counts) if counts else None
+        out["latency_ms_p50"] = statistics.median(latencies)
+        out["latency_ms_p95"] = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+    return out
+
+
+async def run_mode(
+    contexts: list[WorkoutContext],
+    conversation: bool,
+    prompt_format: str,
+    max_turns: int,
+    live: bool,
+    prefix_discount: float,
+) -> dict:
+    client = None
+    model = "bench"
+    if live:
+        from google import genai
+
+        from app.config import get_settings
+
+        settings = get_settings()
+        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        model = settings.GEMINI_MODEL
+    recorder = RecordingClient(client)
+    provider = GeminiProvider(
+        api_key="",
+        model=model,
+        prompt_format=prompt_format,
+        conversations=ConversationStore(max_turns=max_turns) if conversation else None,
+        client=recorder,
+    )
+    latencies = [(await provider.get_recommendation(ctx)).latency_ms for ctx in contexts]
+    return _summary(recorder.calls, latencies, live, prefix_discount)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercises", type=int, default=4)
+    parser.add_argument("--sets-per-exercise", type=int, default=5)
+    parser.add_argument("--format", choices=sorted(PROMPT_FORMATS), default=PROMPT_FORMAT_VERBOSE)
+    parser.add_argument("--max-turns", type=int, default=12, help="AI_CONVERSATION_MAX_TURNS")
+    parser.add_argument(
+        "--prefix-discount", type=float, default=0.75, help="price cut on cached prefix tokens"
+    )
+    parser.add_argument("--live", action="store_true", help="call the configured Gemini model")
+    args = parser.parse_args()
+
+    contexts = simulated_workout(args.exercises, args.sets_per_exercise)
+    modes = {
+        mode: asyncio.run(
+            run_mode(
+                contexts, mode == "conversation", args.format, args.max_turns, args.live,
+                args.prefix_discount,
+            )
+        )
+        for mode in ("stateless", "conversation")
+    }
+    stateless, session = modes["stateless"], modes["conversation"]
+    report = {
+        "sets": len(contexts),
+        "format": args.format,
+        "stateless": stateless,
+        "conversation": session,
+        "sent_token_reduction": round(
+            1 - session["sent_tokens_total"] / stateless["sent_tokens_total"], 3
+        ),
+        "input_token_reduction": round(
+            1 - session["input_tokens_total"] / stateless["input_tokens_total"], 3
+        ),
+        "effective_input_token_reduction": round(
+            1 - session["effective_input_tokens_total"] / stateless["effective_input_tokens_total"], 3
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
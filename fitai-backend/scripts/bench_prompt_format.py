@@ -0,0 +1,124 @@
+"""
+Offline benchmark: verbose vs compact prompt format.
+
+Reads a corpus of recorded WorkoutContexts (JSON Lines, one context per line,
+either the bare WorkoutContext fields or {"context": {...}}) and reports prompt
+size for both formats. With --live, each context is also sent to the configured
+Gemini model in both formats and recommendation agreement is reported
+(reps equal and weight within --weight-tolerance kg).
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/bench_prompt_format.py --corpus contexts.jsonl
+    PYTHONPATH=. python scripts/bench_prompt_format.py --corpus contexts.jsonl --live --limit 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from pathlib import Path
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.ai.base import WorkoutContext
+from app.ai.prompt_builder import PROMPT_FORMAT_COMPACT, PROMPT_FORMAT_VERBOSE, PromptBuilder
+
+
+def load_corpus(path: Path, limit: int | None) -> list[WorkoutContext]:
+    contexts: list[WorkoutContext] = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            contexts.append(WorkoutContext(**obj.get("context", obj)))
+            if limit and len(contexts) >= limit:
+                break
+    return contexts
+
+
+def _size_report(label: str, system: str, prompts: list[str]) -> dict:
+    tokens = [PromptBuilder.estimate_tokens(p) for p in prompts]
+    system_tokens = PromptBuilder.estimate_tokens(system)
+    return {
+        "format": label,
+        "system_tokens": system_tokens,
+        "prompt_tokens_mean": round(statistics.mean(tokens), 1),
+        "prompt_tokens_p50": statistics.median(tokens),
+        "prompt_tokens_max": max(tokens),
+        "total_input_tokens_mean": round(statistics.mean(tokens) + system_tokens, 1),
+    }
+
+
+async def _agreement(contexts: list[WorkoutContext], budget: int | None, tolerance: float) -> dict:
+    from app.ai.gemini_provider import GeminiProvider
+    from app.config import get_settings
+
+    settings = get_settings()
+    verbose = GeminiProvider(settings.GEMINI_API_KEY or "", settings.GEMINI_MODEL, PROMPT_FORMAT_VERBOSE)
+    compact = GeminiProvider(
+        settings.GEMINI_API_KEY or "", settings.GEMINI_MODEL, PROMPT_FORMAT_COMPACT, budget
+    )
+    agree = failures = 0
+    latency_v: list[int] = []
+    latency_c: list[int] = []
+    for ctx in contexts:
+        try:
+            a, b = await asyncio.gather(verbose.get_recommendation(ctx), compact.get_recommendation(ctx))
+        except Exception as e:
+            failures += 1
+            print(f"  provider error: {e}", file=sys.stderr)
+            continue
+        latency_v.append(a.latency_ms)
+        latency_c.append(b.latency_ms)
+        if a.suggested_reps == b.suggested_reps and abs(a.suggested_weight_kg - b.suggested_weight_kg) <= tolerance:
+            agree += 1
+    compared = len(contexts) - failures
+    return {
+        "compared": compared,
+        "failures": failures,
+        "agreement": round(agree / compared, 3) if compared else None,
+        "latency_ms_p50_verbose": statistics.median(latency_v) if latency_v else None,
+        "latency_ms_p50_compact": statistics.median(latency_c) if latency_c else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, required=True, help="JSONL file of recorded WorkoutContexts")
+    parser.add_argument("--budget", type=int, default=400, help="compact token budget (0 = none)")
+    parser.add_argument("--limit", type=int, default=None, help="use at most N contexts")
+    parser.add_argument("--live", action="store_true", help="call the provider and report agreement")
+    parser.add_argument("--weight-tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    contexts = load_corpus(args.corpus, args.limit)
+    if not contexts:
+        print("Corpus is empty.", file=sys.stderr)
+        sys.exit(1)
+    budget = args.budget or None
+
+    verbose = [PromptBuilder.build_recommendation_prompt(c) for c in contexts]
+    compact = [PromptBuilder.build_compact_prompt(c, token_budget=budget) for c in contexts]
+    report: dict = {
+        "contexts": len(contexts),
+        "sizes": [
+            _size_report(PROMPT_FORMAT_VERBOSE, PromptBuilder.SYSTEM_PROMPT, verbose),
+            _size_report(PROMPT_FORMAT_COMPACT, PromptBuilder.COMPACT_SYSTEM_PROMPT, compact),
+        ],
+    }
+    v, c = report["sizes"]
+    report["input_token_reduction"] = round(
+        1 - c["total_input_tokens_mean"] / v["total_input_tokens_mean"], 3
+    )
+    if args.live:
+        report["agreement"] = asyncio.run(_agreement(contexts, budget, args.weight_tolerance))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: scalar rule engine vs the decision lattice and the NumPy batch engine, in sets per second.
+
+Generates --sets synthetic sets (random RPE, reps, weights, session shape,
+fatigue inputs and 1RM) and times:
+
+  - scalar: get_rule_based_recommendation per set in a Python loop
+    (on --scalar-sets of them; the rate is what matters)
+  - lattice: get_rule_decision per set (table lookup, no explanation text)
+  - batch_with_conversion: RuleBatchInputs.from_contexts + the batch engine
+  - batch_kernel: the batch engine alone on prebuilt arrays (backtests that
+    load columns straight from the database pay only this)
+
+and checks that all engines agree on every timed scalar set.
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/bench_rule_engine_batch.py
+    PYTHONPATH=. python scripts/bench_rule_engine_batch.py --sets 2000000 --scalar-sets 50000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+import numpy as np
+
+from app.ai.base import WorkoutContext
+from app.services.rule_engine import get_rule_based_recommendation
+from app.services.rule_engine_batch import RuleBatchInputs, get_rule_based_recommendations_batch
+from app.services.rule_lattice import get_lattice, get_rule_decision
+
+RPES = [None, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5, 10.0]
+
+
+def synthetic_sets(n: int, seed: int) -> list[tuple[WorkoutContext, float, int, float | None]]:
+    rng = random.Random(seed)
+    items = []
+    for _ in range(n):
+        weight = rng.choice([20.0, 40.0, 60.0, 62.5, 80.0, 100.0, 101.25])
+        reps = rng.randint(3, 12)
+        session = [
+            {"exercise_id": "ex-1", "weight_kg": weight, "reps": reps + rng.randint(-1, 4)}
+            for _ in range(rng.randint(0, 4))
+        ] + [{"exercise_id": "ex-1", "weight_kg": weight, "reps": reps}]
+        prior = [{"sets": [{"exercise_id": "ex-1", "weight_kg": weight + rng.choice([-10, 0, 10])}]}]
+        ctx = WorkoutContext(
+            exercise_name="Bench Press",
+            muscle_group="chest",
+            equipment_type="barbell",
+            is_compound=rng.random() < 0.6,
+            current_session_sets=session,
+            recent_sessions=prior if rng.random() < 0.7 else [],
+            estimated_1rm=rng.choice([None, weight * 1.1, weight * 1.4]),
+            max_weight_ever=None,
+            total_sets_today=rng.randint(1, 24),
+            workout_duration_minutes=rng.randint(10, 150),
+        )
+        items.append((ctx, weight, reps, rng.choice(RPES)))
+    return items
+
+
+def _rate(n: int, seconds: float) -> int:
+    return int(n / seconds) if seconds > 0 else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=200_000)
+    parser.add_argument("--scalar-sets", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    base = synthetic_sets(min(args.sets, 50_000), args.seed)
+    items = (base * (args.sets // len(base) + 1))[: args.sets]
+    scalar_items = items[: args.scalar_sets]
+
+    start = time.perf_counter()
+    scalar = [get_rule_based_recommendation(*item) for item in scalar_items]
+    scalar_s = time.perf_counter() - start
+
+    get_lattice()
+    start = time.perf_counter()
+    lattice = [get_rule_decision(*item) for item in scalar_items]
+    lattice_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    inputs = RuleBatchInputs.from_contexts(items)
+    convert_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = get_rule_based_recommendations_batch(inputs)
+    kernel_s = time.perf_counter() - start
+
+    n = len(scalar_items)
+    agree = bool(
+        np.array_equal(result.weight_kg[:n], np.array([s[0] for s in scalar]))
+        and np.array_equal(result.reps[:n], np.array([s[1] for s in scalar]))
+        and all(a[:2] == b[:2] for a, b in zip(lattice, scalar))
+    )
+    report = {
+        "sets": len(items),
+        "scalar_sets_per_second": _rate(n, scalar_s),
+        "lattice_sets_per_second": _rate(n, lattice_s),
+        "batch_with_conversion_sets_per_second": _rate(len(items), convert_s + kernel_s),
+        "batch_kernel_sets_per_second": _rate(len(items), kernel_s),
+        "kernel_speedup_vs_scalar": round(_rate(len(items), kernel_s) / max(1, _rate(n, scalar_s)), 1),
+        "agrees_with_scalar": agree,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Benchmark the user overview queries on a seeded user with a long history.
+
+Seeds one throwaway user (default 50k sets over 2500 workouts on consecutive
+days, ending today, across 8 exercises), then times against Postgres:
+
+  six_queries     the previous get_user_overview: six round trips (frozen copy below)
+  single_query    stats_service.compute_user_overview: one CTE statement
+  rollup          stats_service.get_user_overview: primary-key read of user_stats_rollup
+
+and reports p50 / p99 / mean latency per variant, and whether the three agree.
+The seeded user, their workouts, sets and exercises are deleted afterwards
+unless --keep is given.
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/bench_user_overview.py
+    PYTHONPATH=. python scripts/bench_user_overview.py --sets 200000 --iterations 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import Date, cast, delete, func, insert, select
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.db.database import AsyncSessionLocal
+from app.models.exercise import Exercise
+from app.models.set import Set
+from app.models.user import User
+from app.models.workout import Workout
+from app.repositories.user_stats_rollup_repo import UserStatsRollupRepository
+from app.services.stats_service import compute_user_overview, get_user_overview
+
+MUSCLES = ["chest", "back", "legs", "shoulders"]
+BATCH = 5000
+
+
+async def six_queries(user_id, db) -> dict:
+    """get_user_overview before the single-statement rewrite (kept for comparison)."""
+    total_workouts = (
+        await db.execute(
+            select(func.count(Workout.id)).where(Workout.user_id == user_id, Workout.ended_at.isnot(None))
+        )
+    ).scalar()
+    sets_row = (
+        await db.execute(
+            select(
+                func.count(Set.id).label("total_sets"),
+                func.coalesce(func.sum(Set.weight_kg * Set.reps), 0).label("total_volume_kg"),
+            ).where(Set.user_id == user_id)
+        )
+    ).one()
+    muscle_row = (
+        await db.execute(
+            select(Exercise.muscle_group)
+            .select_from(Set)
+            .join(Exercise, Set.exercise_id == Exercise.id)
+            .where(Set.user_id == user_id)
+            .group_by(Exercise.muscle_group)
+            .order_by(func.count(Set.id).desc(), Exercise.muscle_group)
+            .limit(1)
+        )
+    ).one_or_none()
+    fav_row = (
+        await db.execute(
+            select(Exercise.name)
+            .select_from(Set)
+            .join(Exercise, Set.exercise_id == Exercise.id)
+            .where(Set.user_id == user_id)
+            .group_by(Exercise.id, Exercise.name)
+            .order_by(func.count(Set.id).desc(), Exercise.name)
+            .limit(1)
+        )
+    ).one_or_none()
+    dates = await db.execute(
+        select(cast(Workout.ended_at, Date)).where(Workout.user_id == user_id, Workout.ended_at.isnot(None))
+    )
+    workout_dates = {r[0] for r in dates.all() if r[0] is not None}
+    streak = 0
+    d = date.today()
+    while d in workout_dates:
+        streak += 1
+        d -= timedelta(days=1)
+    return {
+        "total_workouts": int(total_workouts or 0),
+        "total_sets": int(sets_row.total_sets or 0),
+        "total_volume_kg": float(sets_row.total_volume_kg or 0),
+        "most_trained_muscle": muscle_row[0] if muscle_row else None,
+        "favourite_exercise": fav_row[0] if fav_row else None,
+        "active_streak_days": streak,
+    }
+
+
+async def seed(n_sets: int, sets_per_workout: int, rng: random.Random) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    tag = uuid.uuid4().hex[:12]
+    user_id = uuid.uuid4()
+    exercise_ids = [uuid.uuid4() for _ in range(8)]
+    n_workouts = max(1, n_sets // sets_per_workout)
+    today = datetime.now(timezone.utc).date()
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User).values(
+                id=user_id, email=f"bench_{tag}@fitai-bench.local", username=f"bench_{tag}", hashed_pw="x"
+            )
+        )
+        await db.execute(
+            insert(Exercise),
+            [
+                {
+                    "id": eid,
+                    "name": f"Bench exercise {i}",
+                    "muscle_group": MUSCLES[i % len(MUSCLES)],
+                    "created_by": user_id,
+                    "is_global": False,
+                }
+                for i, eid in enumerate(exercise_ids)
+            ],
+        )
+        workouts = []
+        for w in range(n_workouts):
+            started = datetime.combine(today - timedelta(days=n_workouts - 1 - w), dt_time(12), timezone.utc)
+            workouts.append(
+                {"id": uuid.uuid4(), "user_id": user_id, "started_at": started, "ended_at": started + timedelta(hours=1)}
+            )
+        for i in range(0, len(workouts), BATCH):
+            await db.execute(insert(Workout), workouts[i : i + BATCH])
+        rows = []
+        for i in range(n_sets):
+            workout = workouts[i // sets_per_workout % n_workouts]
+            rows.append(
+                {
+                    "workout_id": workout["id"],
+                    "exercise_id": rng.choice(exercise_ids),
+                    "user_id": user_id,
+                    "set_number": i % sets_per_workout + 1,
+                    "weight_kg": rng.choice([40, 60, 80, 100]) + rng.choice([0, 2.5]),
+                    "reps": rng.randint(3, 12),
+                    "logged_at": workout["started_at"] + timedelta(minutes=i % sets_per_workout * 3),
+                }
+            )
+            if len(rows) == BATCH:
+                await db.execute(insert(Set), rows)
+                rows = []
+        if rows:
+            await db.execute(insert(Set), rows)
+        await UserStatsRollupRepository(db).rebuild(user_id)
+        await db.commit()
+    return user_id, exercise_ids
+
+
+async def cleanup(user_id: uuid.UUID, exercise_ids: list[uuid.UUID]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.id == user_id))  # cascades to workouts, sets, rollup
+        await db.execute(delete(Exercise).where(Exercise.id.in_(exercise_ids)))
+        await db.commit()
+
+
+def _pct(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+
+
+async def time_variant(fn, user_id, iterations: int, warmup: int) -> tuple[dict, dict]:
+    latencies: list[float] = []
+    async with AsyncSessionLocal() as db:
+        for i in range(warmup + iterations):
+            start = time.perf_counter()
+            result = await fn(user_id, db)
+            elapsed = (time.perf_counter() - start) * 1000
+            if i >= warmup:
+                latencies.append(elapsed)
+    stats = {
+        "p50_ms": _pct(latencies, 50),
+        "p99_ms": _pct(latencies, 99),
+        "mean_ms": round(statistics.mean(latencies), 2),
+    }
+    return stats, result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    user_id, exercise_ids = await seed(args.sets, args.sets_per_workout, rng)
+    seed_seconds = time.perf_counter() - start
+    try:
+        report: dict = {"sets": args.sets, "iterations": args.iterations, "seed_seconds": round(seed_seconds, 1)}
+        results = {}
+        for name, fn in (
+            ("six_queries", six_queries),
+            ("single_query", compute_user_overview),
+            ("rollup", get_user_overview),
+        ):
+            report[name], results[name] = await time_variant(fn, user_id, args.iterations, args.warmup)
+        report["speedup_p50_single_vs_six"] = round(
+            report["six_queries"]["p50_ms"] / max(report["single_query"]["p50_ms"], 1e-9), 2
+        )
+        # The six-query version predates the longest streak and streak start date.
+        legacy = results["six_queries"]
+        report["agree"] = all(
+            {key: results[name][key] for key in legacy} == legacy for name in ("single_query", "rollup")
+        )
+        if not report["agree"]:
+            report["results"] = results
+    finally:
+        if not args.keep:
+            await cleanup(user_id, exercise_ids)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=50000)
+    parser.add_argument("--sets-per-workout", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded user")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Closed-loop load test of POST /api/v1/workouts/{id}/sets against a running API.
+
+Each virtual user registers, logs in, starts a workout and logs sets back to back
+(optionally with think time) for --duration seconds. Reports throughput, latency
+percentiles, HTTP errors and how many recommendations came from the AI provider
+versus the rule engine (fallback / shed).
+
+Run the API with the fake provider so the AI path is exercised without paid calls:
+
+  docker compose --profile loadtest up -d   # with AI_PROVIDER=fake, FAKE_LLM_URL=http://fake-llm:8100
+  # from fitai-backend
+  python scripts/load_test_log_set.py --users 50 --duration 60
+  python scripts/load_test_log_set.py --base-url http://127.0.0.1:8000 --users 200 --think-ms 500
+
+Increase --users until throughput stops growing and p99 climbs: that is the
+capacity of API + DB for AI-bound traffic with the configured provider latency.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+import httpx
+
+
+@dataclass
+class Results:
+    latencies_ms: list[float] = field(default_factory=list)
+    status: Counter = field(default_factory=Counter)
+    sources: Counter = field(default_factory=Counter)
+    setup_failures: int = 0
+
+
+def _pct(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1)
+
+
+async def _login(client: httpx.AsyncClient, api: str) -> dict[str, str]:
+    tag = uuid.uuid4().hex[:12]
+    email, password = f"load_{tag}@fitai-load.local", "LoadTest2025!"
+    r = await client.post(
+        f"{api}/auth/register",
+        json={"email": email, "username": f"load_{tag}", "password": password},
+    )
+    r.raise_for_status()
+    r = await client.post(f"{api}/auth/login", data={"email": email, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    api: str,
+    stop_at: float,
+    think_seconds: float,
+    results: Results,
+) -> None:
+    try:
+        headers = await _login(client, api)
+        r = await client.get(f"{api}/exercises", headers=headers)
+        r.raise_for_status()
+        exercises = r.json()
+        r = await client.post(f"{api}/workouts", headers=headers, json={"name": "Load test"})
+        r.raise_for_status()
+        workout_id = r.json()["id"]
+    except httpx.HTTPError as e:
+        results.setup_failures += 1
+        print(f"  setup failed: {e}", file=sys.stderr)
+        return
+    if not exercises:
+        results.setup_failures += 1
+        return
+
+    exercise = random.choice(exercises)
+    weight, reps = 60.0, 8
+    while time.monotonic() < stop_at:
+        body = {
+            "exercise_id": exercise["id"],
+            "weight_kg": weight,
+            "reps": reps,
+            "rpe": random.choice([6.5, 7.0, 7.5, 8.0, 8.5, 9.0]),
+            "is_warmup": False,
+        }
+        start = time.perf_counter()
+        try:
+            r = await client.post(f"{api}/workouts/{workout_id}/sets", headers=headers, json=body)
+        except httpx.HTTPError as e:
+            results.status[type(e).__name__] += 1
+            continue
+        results.latencies_ms.append((time.perf_counter() - start) * 1000)
+        results.status[r.status_code] += 1
+        if r.status_code == 201:
+            rec = r.json().get("recommendation")
+            if rec:
+                results.sources[rec["model_used"]] += 1
+                weight, reps = rec["suggested_weight_kg"] or weight, rec["suggested_reps"] or reps
+        if think_seconds:
+            await asyncio.sleep(think_seconds)
+
+
+async def run(base_url: str, users: int, duration: float, think_seconds: float) -> dict:
+    api = f"{base_url.rstrip('/')}/api/v1"
+    results = Results()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        stop_at = time.monotonic() + duration
+        started = time.monotonic()
+        await asyncio.gather(
+            *(_virtual_user(client, api, stop_at, think_seconds, results) for _ in range(users))
+        )
+        elapsed = time.monotonic() - started
+
+    lat = results.latencies_ms
+    return {
+        "users": users,
+        "duration_s": round(elapsed, 1),
+        "requests": len(lat),
+        "throughput_rps": round(len(lat) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": _pct(lat, 50),
+            "p95": _pct(lat, 95),
+            "p99": _pct(lat, 99),
+            "mean": round(statistics.mean(lat), 1),
+        } if lat else None,
+        "status": {str(k): v for k, v in results.status.items()},
+        "recommendation_model": dict(results.sources),
+        "setup_failures": results.setup_failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of set logging")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between sets per user")
+    args = parser.parse_args()
+    report = asyncio.run(run(args.base_url, args.users, args.duration, args.think_ms / 1000))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
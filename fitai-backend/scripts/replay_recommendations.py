@@ -0,0 +1,193 @@
+"""
+Replay recorded recommendation contexts against a provider or the rule engine.
+
+Reads one or more AI_RECORD_PATH files (see app/ai/recorder.py), runs every
+recorded WorkoutContext through --engine with --concurrency calls in flight and
+reports:
+
+  - latency percentiles (ms) of the replayed calls
+  - failure rate of the replay, next to the failure rate when recorded
+  - agreement with the recorded answer (reps equal, weight within 1.25 kg, the
+    distilled-model criterion), mean absolute weight difference and exact-reps
+    rate, overall and per recorded provider
+
+--engine rules runs the rule engine on each context's last logged set. Any other
+value is used as AI_PROVIDER and built with get_ai_provider, so the rest of the
+configured chain (retries, tiering, distilled routing) applies as in production;
+tiering only applies with AI_RULE_TIER_ENABLED=true.
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/replay_recommendations.py recordings/ai-*.rec --engine rules
+    PYTHONPATH=. python scripts/replay_recommendations.py recordings/ai-1.rec --engine gemini --concurrency 4 --limit 200
+    PYTHONPATH=. python scripts/replay_recommendations.py recordings/ai-1.rec --engine fake --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.ai.base import WorkoutContext
+from app.ai.distilled import agrees
+from app.ai.recorder import read_records
+from app.services.rule_engine import get_rule_based_recommendation
+
+
+def load_records(paths: list[str], limit: int | None) -> list[dict]:
+    records: list[dict] = []
+    for path in paths:
+        for record in read_records(path):
+            records.append(record)
+            if limit and len(records) >= limit:
+                return records
+    return records
+
+
+def _rules(ctx: WorkoutContext) -> tuple[float, int]:
+    if not ctx.current_session_sets:
+        raise ValueError("no logged set in context")
+    last = ctx.current_session_sets[-1]
+    rpe = last.get("rpe")
+    weight, reps, _ = get_rule_based_recommendation(
+        ctx, float(last["weight_kg"]), int(last["reps"]), float(rpe) if rpe is not None else None
+    )
+    return weight, reps
+
+
+async def replay(records: list[dict], engine: str, concurrency: int) -> list[dict]:
+    """One result per record: {"latency_ms", "weight", "reps", "error"}."""
+    if engine == "rules":
+
+        async def call(ctx: WorkoutContext) -> tuple[float, int]:
+            return _rules(ctx)
+    else:
+        from app.ai import get_ai_provider
+        from app.config import get_settings
+
+        provider = get_ai_provider(get_settings().model_copy(update={"AI_PROVIDER": engine}))
+
+        async def call(ctx: WorkoutContext) -> tuple[float, int]:
+            rec = await provider.get_recommendation(ctx)
+            return rec.suggested_weight_kg, rec.suggested_reps
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(record: dict) -> dict:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                weight, reps = await call(WorkoutContext(**record["context"]))
+                error = None
+            except Exception as e:
+                weight, reps, error = None, None, f"{type(e).__name__}: {e}"
+            return {
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "weight": weight,
+                "reps": reps,
+                "error": error,
+            }
+
+    try:
+        return await asyncio.gather(*(one(r) for r in records))
+    finally:
+        if engine != "rules":
+            await provider.aclose()
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 2)
+
+
+def _agreement(pairs: list[tuple[dict, dict]]) -> dict:
+    if not pairs:
+        return {"compared": 0}
+    return {
+        "compared": len(pairs),
+        "agreement": round(
+            sum(
+                agrees(r["suggested_weight_kg"], r["suggested_reps"], o["weight"], o["reps"])
+                for r, o in pairs
+            )
+            / len(pairs),
+            4,
+        ),
+        "weight_mae_kg": round(
+            statistics.mean(abs(r["suggested_weight_kg"] - o["weight"]) for r, o in pairs), 3
+        ),
+        "reps_exact": round(
+            sum(r["suggested_reps"] == o["reps"] for r, o in pairs) / len(pairs), 4
+        ),
+    }
+
+
+def summarize(records: list[dict], outcomes: list[dict]) -> dict:
+    latencies = sorted(o["latency_ms"] for o in outcomes if o["error"] is None)
+    failures = [o["error"] for o in outcomes if o["error"] is not None]
+    pairs = [
+        (r, o)
+        for r, o in zip(records, outcomes)
+        if r.get("error") is None and r.get("suggested_reps") is not None and o["error"] is None
+    ]
+    by_provider: dict[str, list[tuple[dict, dict]]] = defaultdict(list)
+    for r, o in pairs:
+        by_provider[r.get("provider") or r.get("model_used") or "unknown"].append((r, o))
+    error_kinds: dict[str, int] = defaultdict(int)
+    for error in failures:
+        error_kinds[error.split(":", 1)[0]] += 1
+    return {
+        "records": len(records),
+        "failure_rate": round(len(failures) / len(outcomes), 4) if outcomes else None,
+        "recorded_failure_rate": (
+            round(sum(r.get("error") is not None for r in records) / len(records), 4)
+            if records
+            else None
+        ),
+        "errors": dict(error_kinds),
+        "latency_ms": (
+            {
+                "p50": _percentile(latencies, 0.50),
+                "p90": _percentile(latencies, 0.90),
+                "p99": _percentile(latencies, 0.99),
+                "max": round(latencies[-1], 2),
+            }
+            if latencies
+            else None
+        ),
+        "vs_recorded": _agreement(pairs),
+        "vs_recorded_by_provider": {name: _agreement(p) for name, p in sorted(by_provider.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="+", help="recorder file(s) written via AI_RECORD_PATH")
+    parser.add_argument("--engine", default="rules", help="rules, or an AI_PROVIDER name (gemini, fake, distilled, ...)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    records = load_records(args.corpus, args.limit)
+    if not records:
+        print("No records in corpus", file=sys.stderr)
+        sys.exit(1)
+    start = time.perf_counter()
+    outcomes = asyncio.run(replay(records, args.engine, max(1, args.concurrency)))
+    report = {
+        "engine": args.engine,
+        "concurrency": args.concurrency,
+        "wall_seconds": round(time.perf_counter() - start, 2),
+        **summarize(records, outcomes),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
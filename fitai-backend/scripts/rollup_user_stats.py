@@ -0,0 +1,89 @@
+"""
+Backfill, check and repair the user_stats_rollup table.
+
+  backfill  recompute rollup rows from sets and workouts (all users, or --user)
+  check     compare each user's rollup with the base tables and with the
+            overview computed from them; --repair rebuilds mismatching users
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/rollup_user_stats.py backfill
+    PYTHONPATH=. python scripts/rollup_user_stats.py check --repair
+    PYTHONPATH=. python scripts/rollup_user_stats.py check --user 8d0c...
+
+check exits with status 1 when mismatches remain (none repaired).
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from uuid import UUID
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.db.database import AsyncSessionLocal
+from app.repositories.user_stats_rollup_repo import UserStatsRollupRepository
+from app.services.stats_service import check_user_rollup
+
+
+async def backfill(user_id: UUID | None) -> int:
+    async with AsyncSessionLocal() as db:
+        written = await UserStatsRollupRepository(db).rebuild(user_id)
+        await db.commit()
+    return written
+
+
+async def _user_pages(repo: UserStatsRollupRepository, user_id: UUID | None, page_size: int):
+    if user_id is not None:
+        yield [user_id]
+        return
+    after: UUID | None = None
+    while ids := await repo.get_user_ids(after=after, limit=page_size):
+        yield ids
+        after = ids[-1]
+
+
+async def check(user_id: UUID | None, repair: bool, page_size: int) -> dict:
+    checked = 0
+    repaired = 0
+    mismatched: dict[str, dict] = {}
+    async with AsyncSessionLocal() as db:
+        repo = UserStatsRollupRepository(db)
+        async for ids in _user_pages(repo, user_id, page_size):
+            for uid in ids:
+                checked += 1
+                mismatches = await check_user_rollup(uid, db)
+                if not mismatches:
+                    continue
+                mismatched[str(uid)] = {k: [str(v) for v in pair] for k, pair in mismatches.items()}
+                if repair:
+                    await repo.rebuild(uid)
+                    await db.commit()
+                    repaired += 1
+    return {"checked": checked, "mismatched": len(mismatched), "repaired": repaired, "users": mismatched}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--user", type=UUID, default=None, help="only this user id")
+    parser.add_argument("--repair", action="store_true", help="check: rebuild users that mismatch")
+    parser.add_argument("--page-size", type=int, default=1000, help="check: users per page")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        written = asyncio.run(backfill(args.user))
+        print(json.dumps({"rows_written": written}))
+        return
+
+    report = asyncio.run(check(args.user, args.repair, max(1, args.page_size)))
+    print(json.dumps(report, indent=2))
+    if report["mismatched"] and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Train the distilled local recommender from stored LLM recommendations.
+
+Reads recommendations with ai_provider in --providers (default: gemini) together
+with the set that triggered them, rebuilds the session context at that point,
+fits the ridge model (app.ai.distilled) and writes the .npz artifact. Held-out
+agreement with the LLM (reps equal, weight within 1.25 kg) is printed overall
+and per regime; the router only uses regimes that clear AI_DISTILLED_MIN_AGREEMENT.
+
+  From fitai-backend:
+    PYTHONPATH=. python scripts/train_distilled.py --out models/distilled.npz
+    PYTHONPATH=. python scripts/train_distilled.py --out models/distilled.npz --alpha 3 --limit 20000
+
+Then set AI_DISTILLED_MODEL_PATH=models/distilled.npz.
+
+Uses repository layer; requires DATABASE_URL.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections import defaultdict
+from datetime import timezone
+from pathlib import Path
+
+# Ensure app is on path when run as script
+root = Path(__file__).resolve().parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from app.ai.base import WorkoutContext
+from app.ai.distilled import TrainingExample, train_distilled
+from app.db.database import AsyncSessionLocal
+from app.models.set import Set
+from app.repositories.recommendation_repo import RecommendationRepository
+from app.repositories.set_repo import SetRepository
+
+
+def _set_dict(s: Set) -> dict:
+    return {
+        "weight_kg": float(s.weight_kg),
+        "reps": s.reps,
+        "rpe": float(s.rpe) if s.rpe is not None else None,
+        "set_number": s.set_number,
+    }
+
+
+async def load_examples(providers: list[str], limit: int | None) -> list[TrainingExample]:
+    async with AsyncSessionLocal() as db:
+        rows = await RecommendationRepository(db).get_distillation_rows(providers, limit)
+        workout_ids = list({s.workout_id for _, s, _, _ in rows})
+        all_sets = await SetRepository(db).get_sets_for_workouts(workout_ids)
+
+    sets_by_workout: dict = defaultdict(list)
+    for s in all_sets:
+        sets_by_workout[s.workout_id].append(s)
+
+    examples: list[TrainingExample] = []
+    for rec, trigger, started_at, is_compound in rows:
+        workout_sets = sets_by_workout[trigger.workout_id]
+        # Context as build_context saw it when the triggering set was logged.
+        session = [
+            _set_dict(s)
+            for s in workout_sets
+            if s.exercise_id == trigger.exercise_id and s.set_number <= trigger.set_number
+        ]
+        logged_at = trigger.logged_at
+        total_today = sum(1 for s in workout_sets if s.logged_at <= logged_at)
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        if logged_at.tzinfo is None:
+            logged_at = logged_at.replace(tzinfo=timezone.utc)
+        ctx = WorkoutContext(
+            exercise_name="",
+            muscle_group="",
+            equipment_type="",
+            is_compound=is_compound,
+            current_session_sets=session,
+            recent_sessions=[],
+            estimated_1rm=None,
+            max_weight_ever=None,
+            total_sets_today=total_today,
+            workout_duration_minutes=max(0, int((logged_at - started_at).total_seconds() / 60)),
+        )
+        examples.append(
+            TrainingExample(
+                context=ctx,
+                suggested_weight_kg=float(rec.recommended_weight),
+                suggested_reps=rec.recommended_reps,
+                group=str(trigger.workout_id),
+            )
+        )
+    return examples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, required=True, help="artifact path (.npz)")
+    parser.add_argument("--providers", default="gemini", help="comma-separated ai_provider values to learn from")
+    parser.add_argument("--alpha", type=float, default=1.0, help="ridge regularization")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of workouts held out")
+    parser.add_argument("--limit", type=int, default=None, help="use at most N most recent recommendations")
+    args = parser.parse_args()
+
+    examples = asyncio.run(load_examples(args.providers.split(","), args.limit))
+    if not examples:
+        print("No recommendations found for providers:", args.providers, file=sys.stderr)
+        sys.exit(1)
+    model = train_distilled(examples, alpha=args.alpha, holdout_fraction=args.holdout)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    model.save(args.out)
+    print(json.dumps({"artifact": str(args.out), **model.metadata}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
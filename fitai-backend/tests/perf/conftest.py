@@ -0,0 +1,37 @@
+"""Opt-in microbenchmarks: skipped unless FITAI_BENCH=1.
+
+  FITAI_BENCH=1 python -m pytest tests/perf -q
+  FITAI_BENCH=1 FITAI_BENCH_UPDATE=1 python -m pytest tests/perf -q   # rewrite baselines.json
+
+FITAI_BENCH_TOLERANCE (default 0.5) is the allowed slowdown against the
+baseline, relative to the calibration workload (0.5 = 50% slower fails).
+Shared CI runners need that much headroom; on a quiet machine 0.2 catches
+smaller regressions.
+"""
+
+import os
+
+import pytest
+
+from tests.perf.microbench import RESULTS
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    if os.environ.get("FITAI_BENCH") == "1":
+        return
+    skip = pytest.mark.skip(reason="microbenchmarks run only with FITAI_BENCH=1")
+    for item in items:
+        if "tests/perf" in str(item.fspath).replace(os.sep, "/"):
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not RESULTS:
+        return
+    terminalreporter.section("microbenchmarks (ns/op)")
+    for name, result in sorted(RESULTS.items()):
+        baseline = result.get("baseline_relative")
+        change = (
+            f"{result['relative'] / baseline - 1:+.1%} vs baseline" if baseline else "no baseline"
+        )
+        terminalreporter.write_line(f"{name:<48} {result['ns_per_op']:>10.0f}  {change}")
@@ -0,0 +1,102 @@
+"""Timing and baseline helpers for the opt-in microbenchmarks.
+
+A benchmark's cost is stored both as ns/op and relative to a fixed
+calibration workload timed in the same run. Regressions are judged on the
+relative cost, so baselines recorded on one machine stay usable on another
+(CI runners, laptops) as long as the Python version is comparable.
+"""
+
+import json
+import os
+import platform
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+RESULTS: dict[str, dict] = {}
+
+_REPEAT = 7
+_CONFIRM_ATTEMPTS = 3
+
+
+def _calibration_workload() -> float:
+    # Dict lookups, float arithmetic and rounding, like the rule engine's inner code.
+    row = {"weight_kg": 82.5, "reps": 8, "rpe": 8.0}
+    total = 0.0
+    for i in range(50):
+        total += round((row["weight_kg"] + i) / 2.5) * 2.5 * (10.0 - row["rpe"]) / row["reps"]
+    return total
+
+
+def ns_per_op(fn: Callable[[], object]) -> float:
+    """Best-of-_REPEAT nanoseconds per call, with the loop count picked by timeit.autorange."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=_REPEAT, number=number)) / number * 1e9
+
+
+def calibration_ns() -> float:
+    return ns_per_op(_calibration_workload)
+
+
+def load_baselines() -> dict:
+    if not BASELINES_PATH.exists():
+        return {"benchmarks": {}}
+    return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+
+
+def save_baselines() -> None:
+    data = load_baselines()
+    data["python"] = platform.python_version()
+    for name, result in RESULTS.items():
+        data["benchmarks"][name] = {
+            "ns_per_op": round(result["ns_per_op"], 1),
+            "calibration_ns": round(result["calibration_ns"], 1),
+            "relative": round(result["relative"], 4),
+        }
+    data["benchmarks"] = dict(sorted(data["benchmarks"].items()))
+    BASELINES_PATH.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def _measure(fn: Callable[[], object]) -> tuple[float, float]:
+    # Calibrate on both sides of the measurement so clock drift (turbo, thermal
+    # throttling, noisy neighbours) during the run affects both numbers alike.
+    before = calibration_ns()
+    ns = ns_per_op(fn)
+    return ns, min(before, calibration_ns())
+
+
+def check(name: str, fn: Callable[[], object]) -> None:
+    """
+    Time fn, record the result, and fail if it regressed beyond FITAI_BENCH_TOLERANCE.
+
+    A result over the limit is re-measured up to _CONFIRM_ATTEMPTS times and the
+    best attempt kept, so a single noisy sample does not fail the run. With
+    FITAI_BENCH_UPDATE=1 the baseline is rewritten instead of checked.
+    """
+    baseline = load_baselines()["benchmarks"].get(name)
+    update = os.environ.get("FITAI_BENCH_UPDATE") == "1"
+    tolerance = float(os.environ.get("FITAI_BENCH_TOLERANCE", "0.5"))
+    limit = baseline["relative"] * (1 + tolerance) if baseline and not update else None
+
+    ns, calibration = _measure(fn)
+    for _ in range(_CONFIRM_ATTEMPTS - 1):
+        if limit is None or ns / calibration <= limit:
+            break
+        ns, calibration = min((ns, calibration), _measure(fn), key=lambda m: m[0] / m[1])
+    relative = ns / calibration
+    RESULTS[name] = {
+        "ns_per_op": ns,
+        "calibration_ns": calibration,
+        "relative": relative,
+        "baseline_relative": baseline["relative"] if baseline else None,
+    }
+    if update:
+        save_baselines()
+        return
+    assert baseline is not None, f"No baseline for {name}; run with FITAI_BENCH_UPDATE=1"
+    assert relative <= limit, (
+        f"{name} regressed: {ns:.0f} ns/op, {relative:.3f}x calibration "
+        f"vs baseline {baseline['relative']:.3f}x (tolerance {tolerance:.0%})"
+    )
@@ -0,0 +1,84 @@
+"""Microbenchmarks for the rule engine and prompt building (FITAI_BENCH=1)."""
+
+import pytest
+
+from app.ai.prompt_builder import PromptBuilder
+from app.services.rule_engine import (
+    _apply_1rm_cap,
+    _round_training_weight,
+    get_rule_based_recommendation,
+)
+from app.services.rule_lattice import get_lattice, get_rule_decision
+from tests.perf.microbench import check
+from tests.services.test_rule_engine import build_mock_ctx
+
+
+def _session(*sets: tuple[float, int, float]) -> list[dict]:
+    return [
+        {"exercise_id": "ex-1", "weight_kg": w, "reps": r, "rpe": rpe, "set_number": i + 1}
+        for i, (w, r, rpe) in enumerate(sets)
+    ]
+
+
+HISTORY = [
+    {"date": f"2026-01-{d:02d}", "sets": _session((80.0, 8, 7.5), (82.5, 8, 8.0), (82.5, 7, 8.5))}
+    for d in (12, 8, 5)
+]
+
+# (name, ctx, last_weight_kg, last_reps, last_rpe)
+CASES = [
+    ("fresh", build_mock_ctx(current_session_sets=_session((60.0, 8, 7.0)), total_sets_today=1), 60.0, 8, 7.0),
+    (
+        "routine",
+        build_mock_ctx(
+            current_session_sets=_session((80.0, 8, 7.5), (82.5, 8, 8.0)),
+            recent_sessions=HISTORY,
+            estimated_1rm=110.0,
+        ),
+        82.5, 8, 8.0,
+    ),
+    (
+        "hard_fatigue",
+        build_mock_ctx(
+            current_session_sets=_session((82.5, 8, 8.5), (82.5, 4, 9.5)),
+            recent_sessions=HISTORY,
+            total_sets_today=20,
+        ),
+        82.5, 4, 9.5,
+    ),
+    (
+        "capped",
+        build_mock_ctx(
+            current_session_sets=_session((95.0, 5, 6.0), (95.0, 5, 5.5)),
+            recent_sessions=HISTORY,
+            estimated_1rm=100.0,
+        ),
+        95.0, 5, 5.5,
+    ),
+]
+IDS = [case[0] for case in CASES]
+
+
+@pytest.mark.parametrize("name,ctx,weight,reps,rpe", CASES, ids=IDS)
+def test_get_rule_based_recommendation(name, ctx, weight, reps, rpe) -> None:
+    check(f"get_rule_based_recommendation[{name}]", lambda: get_rule_based_recommendation(ctx, weight, reps, rpe))
+
+
+@pytest.mark.parametrize("name,ctx,weight,reps,rpe", CASES, ids=IDS)
+def test_get_rule_decision(name, ctx, weight, reps, rpe) -> None:
+    get_lattice()
+    check(f"get_rule_decision[{name}]", lambda: get_rule_decision(ctx, weight, reps, rpe))
+
+
+def test_round_training_weight() -> None:
+    check("_round_training_weight", lambda: _round_training_weight(83.7, True))
+
+
+def test_apply_1rm_cap() -> None:
+    ctx = CASES[3][1]
+    check("_apply_1rm_cap[capped]", lambda: _apply_1rm_cap(ctx, 100.0))
+
+
+@pytest.mark.parametrize("name,ctx,weight,reps,rpe", CASES[:2], ids=IDS[:2])
+def test_build_recommendation_prompt(name, ctx, weight, reps, rpe) -> None:
+    check(f"build_recommendation_prompt[{name}]", lambda: PromptBuilder.build_recommendation_prompt(ctx))
@@ -0,0 +1,117 @@
+"""Tests for the historical backtest: context replay and the old/new diff."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services import backtest
+from app.services.backtest import (
+    CURRENT_RULE_ENGINE,
+    BacktestSummary,
+    HistoryReplayer,
+    init_worker,
+    run_chunk,
+)
+
+T0 = datetime(2026, 3, 2, 18, 0, tzinfo=timezone.utc)
+
+
+def _row(user, workout, exercise, set_number, weight, reps, rpe=None, minutes=0, day=0, warmup=False):
+    started = T0 + timedelta(days=day)
+    return SimpleNamespace(
+        id=f"{workout}-{exercise}-{set_number}",
+        user_id=user,
+        workout_id=workout,
+        exercise_id=exercise,
+        set_number=set_number,
+        weight_kg=weight,
+        reps=reps,
+        rpe=rpe,
+        is_warmup=warmup,
+        logged_at=started + timedelta(minutes=minutes),
+        started_at=started,
+        exercise_name=f"Exercise {exercise}",
+        muscle_group="chest",
+        equipment_type=None,
+        is_compound=True,
+    )
+
+
+def _history() -> list[SimpleNamespace]:
+    return [
+        _row("u1", "w1", "bench", 1, 80, 8, 7.5, minutes=5),
+        _row("u1", "w1", "bench", 2, 82.5, 8, 8.0, minutes=8),
+        _row("u1", "w2", "bench", 1, 40, 10, warmup=True, minutes=3, day=3),
+        _row("u1", "w2", "row", 1, 60, 10, 7.0, minutes=6, day=3),
+        _row("u1", "w2", "bench", 2, 85, 6, 8.5, minutes=12, day=3),
+    ]
+
+
+def test_replayer_rebuilds_context_as_of_each_set() -> None:
+    replayer = HistoryReplayer()
+    cases = [replayer.feed(row) for row in _history()]
+
+    assert cases[2] is None  # warmups get no recommendation
+    set_id, ctx, weight, reps, rpe = cases[4]
+    assert (set_id, weight, reps, rpe) == ("w2-bench-2", 85.0, 6, 8.5)
+    assert ctx["equipment_type"] == ""
+    assert [s["weight_kg"] for s in ctx["current_session_sets"]] == [40.0, 85.0]
+    assert ctx["recent_sessions"] == [
+        {
+            "date": "2026-03-02",
+            "sets": [
+                {"weight_kg": 82.5, "reps": 8, "rpe": 8.0},
+                {"weight_kg": 80.0, "reps": 8, "rpe": 7.5},
+            ],
+        }
+    ]
+    assert ctx["estimated_1rm"] == round(82.5 * (1 + 8 / 30), 2)  # best set, not the last
+    assert ctx["max_weight_ever"] == 85.0
+    assert ctx["total_sets_today"] == 3  # all exercises, warmup included
+    assert ctx["workout_duration_minutes"] == 12
+
+    # The first set of w1 saw no history and only itself.
+    assert cases[0][1]["recent_sessions"] == []
+    assert cases[0][1]["total_sets_today"] == 1
+
+
+def test_replayer_resets_between_users() -> None:
+    replayer = HistoryReplayer()
+    for row in _history():
+        replayer.feed(row)
+    _, ctx, *_ = replayer.feed(_row("u2", "w9", "bench", 1, 50, 5, 6.0, minutes=1, day=4))
+    assert ctx["recent_sessions"] == []
+    assert ctx["max_weight_ever"] == 50.0
+    assert ctx["total_sets_today"] == 1
+
+
+def test_run_chunk_reports_no_change_for_identical_engines() -> None:
+    init_worker(str(CURRENT_RULE_ENGINE), str(CURRENT_RULE_ENGINE))
+    replayer = HistoryReplayer()
+    cases = [c for c in map(replayer.feed, _history()) if c is not None]
+    report = run_chunk(cases).report()
+    assert report["sets"] == 4
+    assert report["changed_rate"] == 0.0
+    assert report["examples"] == []
+
+
+def test_run_chunk_diffs_a_modified_engine(tmp_path) -> None:
+    source = CURRENT_RULE_ENGINE.read_text(encoding="utf-8")
+    assert "0.9 * ctx.estimated_1rm" in source
+    modified = tmp_path / "rule_engine_tight_cap.py"
+    modified.write_text(source.replace("0.9 * ctx.estimated_1rm", "0.6 * ctx.estimated_1rm"), encoding="utf-8")
+    init_worker(str(CURRENT_RULE_ENGINE), str(modified))
+
+    replayer = HistoryReplayer()
+    cases = [c for c in map(replayer.feed, _history()) if c is not None]
+    merged = BacktestSummary(max_examples=2)
+    for chunk in (cases[:2], cases[2:]):
+        merged.merge(run_chunk(chunk, max_examples=2))
+    report = merged.report()
+
+    assert report["sets"] == 4
+    assert report["weight_changed_rate"] > 0
+    assert report["weight_delta_kg"]["down"] == report["weight_delta_kg"]["changed"]
+    assert len(report["examples"]) <= 2
+    deltas = [abs(e["weight_delta_kg"]) for e in report["examples"]]
+    assert deltas == sorted(deltas, reverse=True)
+    backtest._engines = None
@@ -0,0 +1,125 @@
+"""Tests for next-session planning (repositories and context building stubbed out)."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.ai import BulkheadProvider, UsageTracker, gemini_provider, get_ai_provider
+from app.config import Settings
+from app.services import planning_service
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+class _Db:
+    commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def _set(exercise_id, set_number: int, weight: float, warmup: bool = False):
+    return SimpleNamespace(
+        exercise_id=exercise_id, set_number=set_number, weight_kg=weight, reps=8, rpe=7.0,
+        is_warmup=warmup,
+    )
+
+
+def _stub_repositories(monkeypatch, sets: list) -> list[dict]:
+    """Serve the workout's sets and next-session contexts; returns the upserted targets."""
+    stored: list[dict] = []
+
+    class _SetRepo:
+        def __init__(self, db) -> None: ...
+
+        async def get_sets_for_workout(self, workout_id):
+            return sets
+
+    class _TargetRepo:
+        def __init__(self, db) -> None: ...
+
+        async def upsert(self, obj_in: dict) -> None:
+            stored.append(obj_in)
+
+    async def _context(exercise_id, user_id, db):
+        return make_ctx(current_session_sets=[], total_sets_today=0, exercise_id=str(exercise_id))
+
+    monkeypatch.setattr(planning_service, "SetRepository", _SetRepo)
+    monkeypatch.setattr(planning_service, "PlannedTargetRepository", _TargetRepo)
+    monkeypatch.setattr(planning_service, "build_next_session_context", _context)
+    return stored
+
+
+@pytest.mark.asyncio
+async def test_one_batch_for_all_exercises_with_rule_fallback(monkeypatch) -> None:
+    bench, row = uuid4(), uuid4()
+    sets = [
+        _set(bench, 1, 40.0, warmup=True),
+        _set(bench, 2, 80.0),
+        _set(row, 3, 60.0),
+        _set(bench, 4, 85.0),
+    ]
+    stored = _stub_repositories(monkeypatch, sets)
+
+    provider = StubProvider(
+        fail={str(row)}, suggested_weight_kg=80.0, suggested_reps=6, model_used="gemini-test"
+    )
+    db = _Db()
+    n = await planning_service.compute_next_session_targets(uuid4(), uuid4(), provider, db)
+
+    assert n == 2
+    assert len(provider.batches) == 1 and set(provider.batches[0]) == {str(bench), str(row)}
+    assert db.commits == 1
+    by_exercise = {t["exercise_id"]: t for t in stored}
+    assert by_exercise[bench]["ai_provider"] == "gemini"
+    assert by_exercise[bench]["target_weight_kg"] == 80.0
+    assert by_exercise[row]["ai_provider"] == "fallback"
+    assert by_exercise[row]["model_used"] == "rule-based"
+    assert by_exercise[row]["explanation"].startswith("Based on last session's first working set.")
+
+
+@pytest.mark.asyncio
+async def test_full_chain_sends_one_request_outside_the_live_bulkhead(monkeypatch, tmp_path) -> None:
+    exercise_ids = [uuid4() for _ in range(5)]
+    stored = _stub_repositories(monkeypatch, [_set(e, i + 1, 80.0) for i, e in enumerate(exercise_ids)])
+    item = {"suggested_weight_kg": 82.5, "suggested_reps": 8, "explanation": "ok", "confidence": "high"}
+    client = FakeGenaiClient(
+        responses=[{"recommendations": [{"request_id": str(e), **item} for e in exercise_ids]}]
+    )
+    monkeypatch.setattr(gemini_provider.genai, "Client", lambda api_key: client)
+    settings = Settings(
+        AI_PROVIDER="gemini",
+        GEMINI_API_KEY="test-key",
+        AI_RULE_TIER_ENABLED=True,
+        AI_RECORD_PATH=str(tmp_path / "calls.rec"),
+        AI_MAX_CONCURRENT=1,
+        AI_MAX_QUEUE=0,
+    )
+    provider = get_ai_provider(settings, UsageTracker())
+    bulkhead = provider
+    while not isinstance(bulkhead, BulkheadProvider):
+        bulkhead = bulkhead.inner
+
+    async with bulkhead.bulkhead.slot():  # live traffic holds every slot, none queued
+        n = await planning_service.compute_next_session_targets(uuid4(), uuid4(), provider, _Db())
+
+    assert n == 5
+    assert len(client.requests) == 1
+    assert [t["ai_provider"] for t in stored] == ["gemini"] * 5
+
+
+@pytest.mark.asyncio
+async def test_no_provider_call_when_every_context_fails(monkeypatch) -> None:
+    _stub_repositories(monkeypatch, [_set(uuid4(), 1, 80.0)])
+
+    async def _missing(exercise_id, user_id, db):
+        raise ValueError("Exercise not found")
+
+    monkeypatch.setattr(planning_service, "build_next_session_context", _missing)
+    provider = StubProvider()
+    db = _Db()
+
+    assert await planning_service.compute_next_session_targets(uuid4(), uuid4(), provider, db) == 0
+    assert provider.batches == []
+    assert db.commits == 0
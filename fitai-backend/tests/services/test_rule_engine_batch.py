@@ -0,0 +1,78 @@
+"""Equivalence of the vectorized rule engine with the scalar one over a dense grid."""
+
+import itertools
+
+import numpy as np
+
+from app.services.rule_engine import RuleCode, get_rule_based_recommendation_traced
+from app.services.rule_engine_batch import RuleBatchInputs, get_rule_based_recommendations_batch
+from tests.services.test_rule_engine import build_mock_ctx
+
+RPES = [None, 4.0, 5.5, 6.0, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5, 10.0]
+LAST_REPS = [0, 1, 5, 8, 12]
+WEIGHTS = [0.0, 17.5, 59.9, 60.0, 101.3]
+ESTIMATED_1RM = [None, 60.0, 250.0]
+
+
+def _sessions(weight: float, reps: int) -> list[tuple[list[dict], list[dict]]]:
+    """(current_session_sets, recent_sessions) shapes that exercise every rule."""
+    last = {"exercise_id": "ex-1", "weight_kg": weight, "reps": reps}
+    prior = [{"date": "2026-01-01", "sets": [{"exercise_id": "ex-1", "weight_kg": weight + 20}]}]
+    return [
+        ([last], []),
+        ([{**last, "is_warmup": True}], []),
+        ([{"exercise_id": "ex-1", "weight_kg": weight, "reps": reps + 4}, last], []),
+        ([{"exercise_id": "ex-1", "weight_kg": weight, "reps": reps + 1}, last], prior),
+        ([{"exercise_id": "ex-2", "weight_kg": weight, "reps": reps + 1}, last], prior),
+        ([{"exercise_id": "ex-1", "weight_kg": weight + 5, "reps": reps}, last], []),
+    ]
+
+
+def _grid():
+    for rpe, reps, weight, compound, e1rm, total, duration in itertools.product(
+        RPES, LAST_REPS, WEIGHTS, (True, False), ESTIMATED_1RM, (1, 5, 18), (60, 130)
+    ):
+        for current, recent in _sessions(weight, reps):
+            ctx = build_mock_ctx(
+                is_compound=compound,
+                current_session_sets=current,
+                recent_sessions=recent,
+                estimated_1rm=e1rm,
+                total_sets_today=total,
+                workout_duration_minutes=duration,
+            )
+            yield ctx, weight, reps, rpe
+
+
+def test_batch_matches_scalar_on_dense_grid() -> None:
+    items = list(_grid())
+    result = get_rule_based_recommendations_batch(RuleBatchInputs.from_contexts(items))
+
+    expected = [get_rule_based_recommendation_traced(*item) for item in items]
+    expected_weight = np.array([e[0] for e in expected])
+    expected_reps = np.array([e[1] for e in expected])
+    expected_codes = np.array([int(e[3]) for e in expected])
+
+    mismatch = np.flatnonzero(
+        (result.weight_kg != expected_weight)
+        | (result.reps != expected_reps)
+        | (result.codes != expected_codes)
+    )
+    if mismatch.size:
+        i = int(mismatch[0])
+        ctx, weight, reps, rpe = items[i]
+        raise AssertionError(
+            f"{mismatch.size}/{len(items)} mismatches; first: weight={weight} reps={reps} rpe={rpe} "
+            f"sets={ctx.current_session_sets} -> batch ({result.weight_kg[i]}, {result.reps[i]}, "
+            f"{RuleCode(int(result.codes[i]))!r}) vs scalar ({expected[i][0]}, {expected[i][1]}, "
+            f"{expected[i][3]!r})"
+        )
+    # The grid reaches every rule except SOFT_FATIGUE_LIMIT, which needs RPE >= 8
+    # and a projected increase (RPE < 8) at once and so never fires.
+    fired = int(np.bitwise_or.reduce(result.codes))
+    assert [code for code in RuleCode if not code & fired] == [RuleCode.SOFT_FATIGUE_LIMIT]
+
+
+def test_empty_batch() -> None:
+    result = get_rule_based_recommendations_batch(RuleBatchInputs.from_contexts([]))
+    assert result.weight_kg.shape == (0,) and result.codes.shape == (0,)
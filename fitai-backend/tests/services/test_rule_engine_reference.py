@@ -0,0 +1,112 @@
+"""Generative equivalence: rule engine, lattice and batch engine vs the frozen reference.
+
+Random contexts come from a seeded generator (FITAI_RULE_FUZZ_SEED), so a
+failure is reproducible; FITAI_RULE_FUZZ_EXAMPLES raises the count for a
+longer local run.
+"""
+
+import os
+import random
+
+import numpy as np
+
+from app.ai.base import WorkoutContext
+from app.services.rule_engine import (
+    _apply_1rm_cap,
+    _round_training_weight,
+    get_rule_based_recommendation_traced,
+)
+from app.services.rule_engine_batch import RuleBatchInputs, get_rule_based_recommendations_batch
+from app.services.rule_lattice import get_rule_decision
+from tests.services import rule_engine_reference as reference
+
+SEED = int(os.environ.get("FITAI_RULE_FUZZ_SEED", "20260301"))
+EXAMPLES = int(os.environ.get("FITAI_RULE_FUZZ_EXAMPLES", "3000"))
+
+
+def random_case(rng: random.Random) -> tuple[WorkoutContext, float, int, float | None]:
+    """A random (ctx, last_weight_kg, last_reps, last_rpe), biased toward rule boundaries."""
+    weight = rng.choice(
+        [0.0, rng.choice([20.0, 60.0, 62.5, 100.0]), round(rng.uniform(0, 200), 2)]
+    )
+    reps = rng.choice([0, 1, rng.randint(1, 15), rng.randint(15, 60)])
+    rpe = rng.choice([None, rng.choice([6.0, 7.5, 8.0, 8.5, 9.0]), round(rng.uniform(1, 10), 1)])
+    exercise_ids = ["ex-1", "ex-2", None]
+    sets = [
+        {
+            "exercise_id": rng.choice(exercise_ids),
+            "weight_kg": rng.choice([weight, weight + 5, round(rng.uniform(0, 200), 2)]),
+            "reps": rng.choice([None, reps, reps + rng.randint(-2, 5)]),
+            "is_warmup": rng.random() < 0.05,
+        }
+        for _ in range(rng.randint(0, 5))
+    ]
+    sets.append(
+        {
+            "exercise_id": rng.choice(exercise_ids),
+            "weight_kg": weight,
+            "reps": reps,
+            "is_warmup": rng.random() < 0.1,
+        }
+    )
+    if rng.random() < 0.1:
+        sets = []
+    recent = [
+        {
+            "date": "2026-01-01",
+            "sets": [
+                {"exercise_id": rng.choice(exercise_ids), "weight_kg": round(rng.uniform(0, 220), 2)}
+                for _ in range(rng.randint(0, 4))
+            ],
+        }
+    ] if rng.random() < 0.6 else []
+    ctx = WorkoutContext(
+        exercise_name="Bench Press",
+        muscle_group="chest",
+        equipment_type="barbell",
+        is_compound=rng.random() < 0.5,
+        current_session_sets=sets,
+        recent_sessions=recent,
+        estimated_1rm=rng.choice([None, round(rng.uniform(10, 250), 2), weight * 1.05]),
+        max_weight_ever=None,
+        total_sets_today=rng.choice([1, rng.randint(1, 17), rng.randint(18, 30)]),
+        workout_duration_minutes=rng.choice([None, rng.randint(0, 120), rng.randint(121, 200)]),
+    )
+    return ctx, weight, reps, rpe
+
+
+def _cases() -> list[tuple[WorkoutContext, float, int, float | None]]:
+    rng = random.Random(SEED)
+    return [random_case(rng) for _ in range(EXAMPLES)]
+
+
+def test_engine_matches_frozen_reference() -> None:
+    for i, (ctx, weight, reps, rpe) in enumerate(_cases()):
+        expected = reference.reference_recommendation(ctx, weight, reps, rpe)
+        got = get_rule_based_recommendation_traced(ctx, weight, reps, rpe)
+        assert got == expected, f"case {i} (seed {SEED}): weight={weight} reps={reps} rpe={rpe}"
+
+
+def test_fast_paths_match_frozen_reference() -> None:
+    cases = _cases()
+    expected = [reference.reference_recommendation(*case) for case in cases]
+
+    for i, (case, exp) in enumerate(zip(cases, expected)):
+        assert get_rule_decision(*case) == (exp[0], exp[1], exp[3]), f"lattice, case {i}"
+
+    batch = get_rule_based_recommendations_batch(RuleBatchInputs.from_contexts(cases))
+    np.testing.assert_array_equal(batch.weight_kg, [e[0] for e in expected])
+    np.testing.assert_array_equal(batch.reps, [e[1] for e in expected])
+    np.testing.assert_array_equal(batch.codes, [int(e[3]) for e in expected])
+
+
+def test_helpers_match_frozen_reference() -> None:
+    rng = random.Random(SEED)
+    for _ in range(EXAMPLES):
+        weight = rng.uniform(-10, 300)
+        compound = rng.random() < 0.5
+        assert _round_training_weight(weight, compound) == reference._round_training_weight(
+            weight, compound
+        )
+        ctx, *_ = random_case(rng)
+        assert _apply_1rm_cap(ctx, weight) == reference._apply_1rm_cap(ctx, weight)
@@ -0,0 +1,70 @@
+"""Exhaustive check of the rule decision lattice against the scalar rule engine."""
+
+import itertools
+
+from app.services.rule_engine import RuleCode, get_rule_based_recommendation_traced
+from app.services.rule_lattice import (
+    CLAMP_EXACT,
+    MAX_REPS,
+    RPE_STEPS,
+    get_lattice,
+    get_rule_decision,
+)
+from tests.services.test_rule_engine import build_mock_ctx
+
+
+def _contexts(weight: float, reps: int):
+    """One context per fatigue level, plus trend, prior-best and 1RM-cap shapes."""
+    last = {"exercise_id": "ex-1", "weight_kg": weight, "reps": reps}
+    same = {"exercise_id": "ex-1", "weight_kg": weight, "reps": reps + 1}
+    prior = [{"sets": [{"exercise_id": "ex-1", "weight_kg": weight + 20}]}]
+    yield build_mock_ctx(current_session_sets=[last], total_sets_today=1)
+    yield build_mock_ctx(current_session_sets=[same, last], recent_sessions=prior)
+    yield build_mock_ctx(
+        is_compound=False, current_session_sets=[same, last], workout_duration_minutes=130
+    )
+    yield build_mock_ctx(
+        current_session_sets=[{**same, "reps": reps + 3}, last],
+        total_sets_today=18,
+        estimated_1rm=weight * 0.9,
+    )
+
+
+def test_lattice_matches_scalar_for_every_cell() -> None:
+    lattice = get_lattice()
+    assert len(lattice) == (RPE_STEPS + 1) * (MAX_REPS + 1) * 3
+
+    checked = 0
+    for rpe_idx, reps, weight in itertools.product(
+        range(RPE_STEPS + 1), range(MAX_REPS + 1), (0.0, 59.9, 101.3)
+    ):
+        rpe = rpe_idx / 10
+        for ctx in _contexts(weight, reps):
+            expected = get_rule_based_recommendation_traced(ctx, weight, reps, rpe)
+            got = get_rule_decision(ctx, weight, reps, rpe)
+            assert (got[0], got[1], int(got[2])) == (expected[0], expected[1], int(expected[3])), (
+                f"rpe={rpe} reps={reps} weight={weight} sets={ctx.current_session_sets}: "
+                f"lattice {got[0]}, {got[1]}, {RuleCode(int(got[2]))!r} vs "
+                f"scalar {expected[0]}, {expected[1]}, {expected[3]!r}"
+            )
+            checked += 1
+    assert checked == (RPE_STEPS + 1) * (MAX_REPS + 1) * 3 * 4
+
+
+def test_boundary_cells_compare_per_call() -> None:
+    # RPE 6.5 x 8 reps projects exactly +15%, the cap for a 1.5 RPE deficit.
+    cell = get_lattice().lookup(6.5, 8, 0)
+    assert cell is not None and cell.clamp == CLAMP_EXACT
+    for weight in (20.0, 42.5, 60.0, 77.5, 100.0, 142.5):
+        ctx = build_mock_ctx(current_session_sets=[{"weight_kg": weight, "reps": 8}])
+        expected = get_rule_based_recommendation_traced(ctx, weight, 8, 6.5)
+        assert get_rule_decision(ctx, weight, 8, 6.5) == (expected[0], expected[1], expected[3])
+
+
+def test_off_lattice_inputs_fall_back_to_scalar() -> None:
+    ctx = build_mock_ctx(current_session_sets=[{"weight_kg": 60.0, "reps": 8}] * 2)
+    assert get_lattice().lookup(7.25, 8, 0) is None
+    assert get_lattice().lookup(8.0, MAX_REPS + 1, 0) is None
+    for reps, rpe in ((8, 7.25), (MAX_REPS + 5, 8.0), (8, None)):
+        expected = get_rule_based_recommendation_traced(ctx, 60.0, reps, rpe)
+        assert get_rule_decision(ctx, 60.0, reps, rpe) == (expected[0], expected[1], expected[3])
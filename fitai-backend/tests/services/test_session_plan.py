@@ -0,0 +1,174 @@
+"""Tests for whole-session plans: projection, tolerance matching, eviction and log_set serving."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.ai.base import WorkoutContext
+from app.models.set import Set
+from app.schemas.set import SetCreate
+from app.services import set_service
+from app.services.session_plan import PlanTolerance, SessionPlanStore, build_session_plan
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+def _ctx(**overrides) -> WorkoutContext:
+    return make_ctx(**{
+        "current_session_sets": [{"weight_kg": 100.0, "reps": 8, "rpe": 7.0, "set_number": 1}],
+        "total_sets_today": 3,
+        "estimated_1rm": 140.0,
+        "workout_id": "w1",
+        "exercise_id": "bench",
+        **overrides,
+    })
+
+
+def test_plan_steps_loads_down_for_expected_fatigue() -> None:
+    plan = build_session_plan(_ctx(), 105.0, 8, "Push to RPE 8.")
+    assert [s.set_number for s in plan.sets] == [2, 3, 4]  # default 4 sets, 1 done
+    assert plan.sets[0].weight_kg == 105.0
+    weights = [s.weight_kg for s in plan.sets]
+    assert weights == sorted(weights, reverse=True) and weights[-1] < weights[0]
+    assert all(s.expected_rpe == 8.5 for s in plan.sets)
+    assert plan.total_sets == 4
+
+
+def test_plan_length_follows_last_session_and_respects_1rm_cap() -> None:
+    last = {"date": "2026-03-01", "sets": [{"weight_kg": 100.0, "reps": 8, "rpe": 8.0}] * 6}
+    plan = build_session_plan(_ctx(recent_sessions=[last], estimated_1rm=110.0), 97.5, 8, "")
+    assert len(plan.sets) == 5
+    assert all(s.weight_kg <= 0.9 * 110.0 for s in plan.sets[1:])
+
+    # More sets done than last time: only the recommended set is planned.
+    done = [{"weight_kg": 100.0, "reps": 8, "rpe": 8.0, "set_number": n} for n in range(1, 8)]
+    assert len(build_session_plan(_ctx(current_session_sets=done), 100.0, 8, "").sets) == 1
+
+
+def test_take_serves_next_set_within_tolerance_and_drops_on_deviation() -> None:
+    store = SessionPlanStore(tolerance=PlanTolerance(weight_kg=1.25, reps=1, rpe=0.5))
+    plan = store.plan(_ctx(), 105.0, 8, "")
+    taken = store.take("w1", "bench", 2, 105.0, 7, 8.0)
+    assert taken is not None and taken[0] is plan.sets[1]
+
+    third = plan.sets[1]
+    assert store.take("w1", "bench", 3, third.weight_kg + 5, third.reps, 8.5) is None  # deviated
+    assert len(store) == 0
+    assert store.take("w1", "bench", 4, 100.0, 8, 8.5) is None  # miss
+
+
+def test_take_drops_stale_exhausted_and_unrated_plans() -> None:
+    store = SessionPlanStore()
+    store.plan(_ctx(), 105.0, 8, "")
+    assert store.take("w1", "bench", 3, 105.0, 8, 8.5) is None  # set 2 was never logged
+    assert len(store) == 0
+
+    store.plan(_ctx(), 105.0, 8, "")
+    assert store.take("w1", "bench", 2, 105.0, 8, None) is None  # no RPE to compare
+    assert len(store) == 0
+
+    plan = store.plan(_ctx(), 105.0, 8, "")
+    for s in plan.sets[:-1]:
+        assert store.take("w1", "bench", s.set_number, s.weight_kg, s.reps, s.expected_rpe)
+    last = plan.sets[-1]
+    assert store.take("w1", "bench", last.set_number, last.weight_kg, last.reps, 8.5) is None
+    assert len(store) == 0
+
+
+def test_eviction_by_workout_ttl_and_lru() -> None:
+    now = [0.0]
+    store = SessionPlanStore(ttl_seconds=60, max_plans=2, clock=lambda: now[0])
+    store.plan(_ctx(workout_id="w1"), 105.0, 8, "")
+    store.plan(_ctx(workout_id="w2"), 105.0, 8, "")
+    store.plan(_ctx(workout_id="w3"), 105.0, 8, "")
+    assert len(store) == 2  # w1 evicted least-recently-used
+    assert store.evict_workout("w2") == 1
+    now[0] = 61.0
+    assert store.evict_expired() == 1
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_log_set_serves_planned_set_without_context_or_provider(monkeypatch) -> None:
+    user_id, workout_id, exercise_id = uuid4(), uuid4(), uuid4()
+    logged: list[Set] = []
+    stored: list[dict] = []
+    contexts_built: list[int] = []
+
+    class _WorkoutRepo:
+        def __init__(self, db) -> None: ...
+
+        async def get(self, wid):
+            return SimpleNamespace(id=wid, user_id=user_id, ended_at=None)
+
+    class _SetRepo:
+        def __init__(self, db) -> None: ...
+
+        async def get_sets_for_workout_and_exercise(self, wid, eid):
+            return list(logged)
+
+        async def create(self, data):
+            s = Set(id=uuid4(), **data)
+            logged.append(s)
+            return s
+
+    class _RecRepo:
+        def __init__(self, db) -> None: ...
+
+        async def create(self, data):
+            stored.append(data)
+
+    class _CounterRepo:
+        def __init__(self, db) -> None: ...
+
+        async def add_set(self, *args) -> None: ...
+
+    class _Db:
+        async def flush(self) -> None: ...
+
+        async def refresh(self, obj) -> None: ...
+
+        async def commit(self) -> None: ...
+
+    async def _build_context(wid, eid, uid, db):
+        contexts_built.append(1)
+        sets = [
+            {"weight_kg": float(s.weight_kg), "reps": s.reps, "rpe": s.rpe, "set_number": s.set_number}
+            for s in logged
+        ]
+        return _ctx(
+            current_session_sets=sets, workout_id=str(wid), exercise_id=str(eid),
+            total_sets_today=len(logged),
+        )
+
+    monkeypatch.setattr(set_service, "WorkoutRepository", _WorkoutRepo)
+    monkeypatch.setattr(set_service, "SetRepository", _SetRepo)
+    monkeypatch.setattr(set_service, "RecommendationRepository", _RecRepo)
+    monkeypatch.setattr(set_service, "UserStatsRollupRepository", _CounterRepo)
+    monkeypatch.setattr(set_service, "TrainingVolumeRepository", _CounterRepo)
+    monkeypatch.setattr(set_service, "build_context", _build_context)
+    monkeypatch.setattr(set_service.SetResponse, "model_validate", staticmethod(lambda s: s))
+    monkeypatch.setattr(set_service, "SetWithRecommendation", SimpleNamespace)
+
+    store = SessionPlanStore()
+    provider = StubProvider(
+        suggested_weight_kg=105.0, explanation="Push to RPE 8.", model_used="gemini-test"
+    )
+
+    async def log(weight: float, reps: int, rpe: float):
+        set_in = SetCreate(exercise_id=exercise_id, weight_kg=weight, reps=reps, rpe=rpe)
+        result = await set_service.log_set(
+            workout_id, set_in, user_id, _Db(), provider, plan_store=store
+        )
+        return result.recommendation
+
+    await log(100.0, 8, 7.0)
+    served = await log(105.0, 8, 8.5)
+    assert (provider.calls, len(contexts_built)) == (1, 1)
+    assert stored[-1]["ai_provider"] == "plan"
+    assert served.explanation.startswith("Session plan, set 3 of 4.")
+
+    # Far off the plan: back to the provider, which plans again.
+    await log(served.suggested_weight_kg + 10, served.suggested_reps, 9.5)
+    assert (provider.calls, len(contexts_built)) == (2, 2)
+    assert stored[-1]["ai_provider"] == "gemini"
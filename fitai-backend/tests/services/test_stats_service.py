@@ -1,5 +1,15 @@
 """Unit tests for stats service (Epley formula and response shape)."""
 
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.stats_service import compute_user_overview
+from tests.unit.fakes import SqlCaptureSession
+
 # Keys that get_exercise_stats and get_user_overview must return (for API contract)
 EXERCISE_STATS_KEYS = {
     "estimated_1rm",
@@ -16,6 +26,8 @@ USER_OVERVIEW_KEYS = {
     "most_trained_muscle",
     "favourite_exercise",
     "active_streak_days",
+    "longest_streak_days",
+    "streak_start_date",
 }
 
 
@@ -31,5 +43,24 @@ def test_exercise_stats_keys_defined() -> None:
 
 
 def test_user_overview_keys_defined() -> None:
-    """get_user_overview returns exactly these 6 keys."""
-    assert len(USER_OVERVIEW_KEYS) == 6
+    """get_user_overview returns exactly these 8 keys."""
+    assert len(USER_OVERVIEW_KEYS) == 8
+
+
+@pytest.mark.asyncio
+async def test_compute_user_overview_is_one_round_trip() -> None:
+    """The computed overview is a single statement, streak included."""
+    row = SimpleNamespace(
+        total_workouts=3, total_sets=Decimal("42"), total_volume_kg=Decimal("3150.00"),
+        most_trained_muscle="legs", favourite_exercise="Squat", active_streak_days=2,
+        longest_streak_days=9, streak_start_date=date(2026, 3, 9),
+    )
+    session = SqlCaptureSession(row)
+
+    overview = await compute_user_overview(uuid4(), session, today=date(2026, 3, 10))
+    (statement,) = session.sql
+    assert "FILTER (WHERE runs.end_day = " in statement
+    assert "CAST(timezone('UTC', workouts.ended_at) AS DATE)" in statement  # the indexed expression
+    assert set(overview) == USER_OVERVIEW_KEYS
+    assert overview["total_sets"] == 42 and overview["total_volume_kg"] == 3150.0
+    assert (overview["longest_streak_days"], overview["streak_start_date"]) == (9, "2026-03-09")
@@ -0,0 +1,77 @@
+"""Tests for daily training volume: maintenance SQL, bucketed reads and the volume series."""
+
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.users import router
+from app.repositories.training_volume_repo import TrainingVolumeRepository
+from app.services import stats_service
+from tests.unit.fakes import SqlCaptureSession
+
+
+@pytest.mark.asyncio
+async def test_set_writes_count_working_sets_in_their_utc_day() -> None:
+    session = SqlCaptureSession()
+    repo = TrainingVolumeRepository(session)
+    await repo.add_set(uuid4())
+    await repo.remove_set(uuid4())
+    add_sql, remove_sql = session.sql
+
+    assert add_sql.startswith("INSERT INTO training_volume_daily")
+    assert "CAST(timezone('UTC', sets.logged_at) AS DATE)" in add_sql
+    assert "sets.is_warmup IS false" in add_sql and "sets.is_warmup IS false" in remove_sql
+    assert "ON CONFLICT (user_id, day, muscle_group) DO UPDATE" in add_sql
+    assert remove_sql.startswith("UPDATE training_volume_daily SET sets=(training_volume_daily.sets -")
+    assert "FROM sets, exercises" in remove_sql
+
+
+@pytest.mark.asyncio
+async def test_buckets_group_by_truncated_day() -> None:
+    session = SqlCaptureSession()
+    repo = TrainingVolumeRepository(session)
+    await repo.get_buckets(uuid4(), "week", date(2025, 3, 10), date(2026, 3, 9))
+    await repo.get_buckets(uuid4(), "month", date(2025, 3, 10), date(2026, 3, 9), by_muscle_group=False)
+    weekly, monthly = session.sql
+
+    assert "GROUP BY CAST(date_trunc('week', training_volume_daily.day) AS DATE), training_volume_daily.muscle_group" in weekly
+    assert "NULL AS muscle_group" in monthly
+    assert monthly.split("GROUP BY")[1].count("muscle_group") == 0
+    with pytest.raises(ValueError):
+        await repo.get_buckets(uuid4(), "day", date(2025, 3, 10), date(2026, 3, 9))
+
+
+@pytest.mark.asyncio
+async def test_volume_series_defaults_and_shape(monkeypatch) -> None:
+    calls = []
+
+    class _Repo:
+        def __init__(self, db) -> None: ...
+
+        async def get_buckets(self, user_id, bucket, start, end, by_muscle_group):
+            calls.append((bucket, start, end, by_muscle_group))
+            return [(date(2026, 3, 2), "chest", 12, 96, Decimal("7680.00"))]
+
+    monkeypatch.setattr(stats_service, "TrainingVolumeRepository", _Repo)
+    monkeypatch.setattr(stats_service, "_utc_today", lambda: date(2026, 3, 9))
+
+    series = await stats_service.get_volume_series(uuid4(), "week", None, None, "muscle_group", None)
+    assert calls == [("week", date(2025, 3, 10), date(2026, 3, 9), True)]
+    assert (series["from"], series["to"]) == ("2025-03-10", "2026-03-09")
+    assert series["points"] == [
+        {"bucket_start": "2026-03-02", "muscle_group": "chest", "sets": 12, "reps": 96, "volume_kg": 7680.0}
+    ]
+
+    with pytest.raises(HTTPException) as exc:
+        await stats_service.get_volume_series(
+            uuid4(), "month", date(2026, 3, 9), date(2026, 1, 1), "total", None
+        )
+    assert exc.value.status_code == 400
+
+
+def test_volume_route_is_declared_before_exercise_stats() -> None:
+    paths = [route.path for route in router.routes]
+    assert paths.index("/me/stats/volume") < paths.index("/me/stats/{exercise_id}")
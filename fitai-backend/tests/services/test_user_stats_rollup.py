@@ -0,0 +1,99 @@
+"""Tests for the user stats rollup: maintenance SQL, rebuild query and the overview read."""
+
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.user_stats_rollup_repo import UserStatsRollupRepository, rollup_from_base
+from app.services import stats_service
+from app.services.stats_service import overview_from_rollup
+from tests.services.test_stats_service import USER_OVERVIEW_KEYS
+from tests.unit.fakes import SqlCaptureSession
+
+TODAY = date(2026, 3, 10)
+
+
+def _row(**overrides) -> SimpleNamespace:
+    row = {
+        "total_workouts": 12,
+        "total_sets": 140,
+        "total_volume_kg": Decimal("52310.50"),
+        "muscle_set_counts": {"chest": 60, "back": 60, "legs": 20},
+        "exercise_set_counts": {},
+        "streak_start_date": date(2026, 3, 8),
+        "last_active_date": TODAY,
+        "longest_streak_days": 21,
+        "favourite_exercise": "Bench Press",
+    }
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+def test_overview_from_rollup() -> None:
+    overview = overview_from_rollup(_row(), TODAY)
+    assert overview == {
+        "total_workouts": 12,
+        "total_sets": 140,
+        "total_volume_kg": 52310.5,
+        "most_trained_muscle": "back",  # tie with chest, first by name
+        "favourite_exercise": "Bench Press",
+        "active_streak_days": 3,
+        "longest_streak_days": 21,
+        "streak_start_date": "2026-03-08",
+    }
+    assert set(overview) == USER_OVERVIEW_KEYS
+
+
+def test_overview_streak_must_reach_today_and_empty_rollup() -> None:
+    lapsed = overview_from_rollup(_row(last_active_date=date(2026, 3, 9)), TODAY)
+    assert (lapsed["active_streak_days"], lapsed["streak_start_date"], lapsed["longest_streak_days"]) == (0, None, 21)
+    empty = overview_from_rollup(
+        _row(
+            total_workouts=0, total_sets=0, total_volume_kg=Decimal("0"), muscle_set_counts={},
+            streak_start_date=None, last_active_date=None, longest_streak_days=0, favourite_exercise=None,
+        ),
+        TODAY,
+    )
+    assert empty["most_trained_muscle"] is None
+    assert empty["active_streak_days"] == 0
+
+
+@pytest.mark.asyncio
+async def test_set_writes_upsert_and_decrement_counters() -> None:
+    session = SqlCaptureSession()
+    repo = UserStatsRollupRepository(session)
+    await repo.add_set(uuid4(), uuid4(), 82.5, 8)
+    await repo.remove_set(uuid4(), uuid4(), 82.5, 8)
+    await repo.add_workout_end(uuid4(), TODAY)
+    insert_sql, delete_sql, end_sql = session.sql
+
+    assert "ON CONFLICT (user_id) DO UPDATE" in insert_sql
+    assert "total_sets = (user_stats_rollup.total_sets +" in insert_sql
+    assert delete_sql.startswith("UPDATE user_stats_rollup")
+    # A counter that drops to zero removes its key.
+    assert "THEN user_stats_rollup.exercise_set_counts -" in delete_sql
+    assert "greatest(user_stats_rollup.last_active_date" in end_sql
+    assert "longest_streak_days = greatest(user_stats_rollup.longest_streak_days" in end_sql
+
+
+def test_rebuild_query_scopes_to_one_user() -> None:
+    user_id = uuid4()
+    sql = str(rollup_from_base(user_id).compile(dialect=postgresql.dialect()))
+    assert "row_number() OVER (PARTITION BY days.user_id ORDER BY days.day)" in sql
+    assert "DISTINCT ON (runs.user_id)" in sql
+    assert sql.count("user_id = %(user_id_") == 5  # every aggregate is scoped, not just the outer select
+    assert "WHERE users.id = " in sql
+    assert "WHERE" not in str(rollup_from_base().compile(dialect=postgresql.dialect())).split("FROM users")[-1]
+
+
+@pytest.mark.asyncio
+async def test_get_user_overview_falls_back_without_rollup(monkeypatch) -> None:
+    async def _compute(user_id, db):
+        return {"total_sets": 0}
+
+    monkeypatch.setattr(stats_service, "compute_user_overview", _compute)
+    assert await stats_service.get_user_overview(uuid4(), SqlCaptureSession(row=None)) == {"total_sets": 0}
@@ -0,0 +1,99 @@
+"""In-memory stand-in for google.genai.Client used by provider tests.
+
+Records every generate_content request so tests can assert on what was sent
+(e.g. whether the cached prefix was referenced) without network access.
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+DEFAULT_RESPONSE = {
+    "suggested_weight_kg": 62.5,
+    "suggested_reps": 8,
+    "explanation": "RPE 7 leaves room to add load.",
+    "confidence": "high",
+}
+
+
+@dataclass
+class RecordedRequest:
+    model: str
+    contents: Any
+    config: Any
+
+    @property
+    def cached_content(self) -> str | None:
+        return getattr(self.config, "cached_content", None)
+
+    @property
+    def system_instruction(self) -> Any:
+        return getattr(self.config, "system_instruction", None)
+
+
+@dataclass
+class FakeGenaiClient:
+    """Fake genai client exposing the .aio.models / .aio.caches surface we use."""
+
+    responses: list[Any] = field(default_factory=list)
+    cache_error: Exception | None = None
+    generate_error_for_cached: Exception | None = None
+    cache_ttl_seconds: int = 3600
+    stream_chunk_size: int = 7
+    usage: Any = None
+    requests: list[RecordedRequest] = field(default_factory=list)
+    caches_created: list[dict] = field(default_factory=list)
+    caches_deleted: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(
+                generate_content=self._generate_content,
+                generate_content_stream=self._generate_content_stream,
+                get=self._get_model,
+            ),
+            caches=SimpleNamespace(create=self._create_cache, delete=self._delete_cache),
+        )
+
+    async def _get_model(self, *, model: str) -> Any:
+        return SimpleNamespace(name=model)
+
+    async def _create_cache(self, *, model: str, config: Any) -> Any:
+        if self.cache_error is not None:
+            raise self.cache_error
+        name = f"cachedContents/{len(self.caches_created) + 1}"
+        self.caches_created.append({"name": name, "model": model, "config": config})
+        return SimpleNamespace(
+            name=name,
+            expire_time=datetime.now(timezone.utc) + timedelta(seconds=self.cache_ttl_seconds),
+        )
+
+    async def _delete_cache(self, *, name: str) -> None:
+        self.caches_deleted.append(name)
+
+    async def _generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any:
+        request = RecordedRequest(model=model, contents=contents, config=config)
+        self.requests.append(request)
+        if request.cached_content and self.generate_error_for_cached is not None:
+            error, self.generate_error_for_cached = self.generate_error_for_cached, None
+            raise error
+        payload = self.responses.pop(0) if self.responses else DEFAULT_RESPONSE
+        text = payload if isinstance(payload, str) else json.dumps(payload)
+        return SimpleNamespace(text=text, usage_metadata=self.usage)
+
+    async def _generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> Any:
+        response = await self._generate_content(model=model, contents=contents, config=config)
+        text, size = response.text, self.stream_chunk_size
+
+        async def chunks() -> Any:
+            for i in range(0, len(text), size):
+                last = i + size >= len(text)
+                yield SimpleNamespace(
+                    text=text[i : i + size], usage_metadata=self.usage if last else None
+                )
+
+        return chunks()
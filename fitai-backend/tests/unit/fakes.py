@@ -0,0 +1,122 @@
+"""Shared test doubles: a WorkoutContext factory, a stub AIProvider and a SQL-capturing session.
+
+make_ctx builds on tests.services.test_rule_engine.build_mock_ctx; StubProvider
+answers without network access and records what reached it; SqlCaptureSession
+records the Postgres SQL a repository would run.
+"""
+
+import asyncio
+from collections.abc import Collection
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Any
+
+from sqlalchemy.dialects import postgresql
+
+from app.ai.base import AIProvider, AIRecommendation, WorkoutContext
+from tests.services.test_rule_engine import build_mock_ctx
+
+DEFAULT_SET = {"weight_kg": 60.0, "reps": 8, "rpe": 7.0, "set_number": 1}
+
+
+def make_ctx(**overrides: Any) -> WorkoutContext:
+    """build_mock_ctx with one working set logged; any WorkoutContext field can be overridden."""
+    return replace(build_mock_ctx(current_session_sets=[dict(DEFAULT_SET)]), **overrides)
+
+
+def make_rec(**overrides: Any) -> AIRecommendation:
+    """A valid AIRecommendation; any field can be overridden."""
+    fields = {
+        "suggested_weight_kg": 60.0,
+        "suggested_reps": 8,
+        "explanation": "ok",
+        "confidence": "high",
+        "raw_response": "{}",
+        "latency_ms": 1,
+        "model_used": "stub",
+    }
+    return AIRecommendation(**{**fields, **overrides})
+
+
+class StubProvider(AIProvider):
+    """Answers every context with make_rec and records the calls and batches it received.
+
+    The explanation echoes the exercise name unless rec_fields sets one.
+    """
+
+    def __init__(
+        self,
+        errors: list[Exception] | None = None,
+        fail: Collection[str] = (),
+        delay: float = 0.0,
+        hold: bool = False,
+        **rec_fields: Any,
+    ) -> None:
+        """
+        Args:
+            errors: Raised in order by the first get_recommendation calls, then it answers
+            fail: Exercise names or ids answered with ValueError("provider error")
+            delay: Seconds each get_recommendation call sleeps
+            hold: Block get_recommendation until release is set (holds slots open)
+            rec_fields: make_rec overrides for every answer
+        """
+        self.errors = list(errors or [])
+        self.fail = set(fail)
+        self.delay = delay
+        self.release = asyncio.Event()
+        if not hold:
+            self.release.set()
+        self.rec_fields = rec_fields
+        self.calls = 0
+        self.batches: list[dict[str, WorkoutContext]] = []
+        self.closed = False
+
+    def _answer(self, context: WorkoutContext) -> AIRecommendation:
+        if context.exercise_name in self.fail or context.exercise_id in self.fail:
+            raise ValueError("provider error")
+        return make_rec(**{"explanation": context.exercise_name, **self.rec_fields})
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        self.calls += 1
+        await self.release.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return self._answer(context)
+
+    async def get_batch_recommendations(
+        self, contexts: dict[str, WorkoutContext]
+    ) -> dict[str, AIRecommendation | Exception]:
+        self.batches.append(contexts)
+        results: dict[str, AIRecommendation | Exception] = {}
+        for request_id, context in contexts.items():
+            try:
+                results[request_id] = self._answer(context)
+            except ValueError as e:
+                results[request_id] = e
+        return results
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class SqlCaptureSession:
+    """AsyncSession stand-in that records executed statements as Postgres SQL.
+
+    Every result reports one affected row, returns row from one()/one_or_none()
+    and no rows from all().
+    """
+
+    def __init__(self, row: Any = None) -> None:
+        self.sql: list[str] = []
+        self.row = row
+
+    async def execute(self, stmt: Any) -> Any:
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(
+            rowcount=1, one=lambda: self.row, one_or_none=lambda: self.row, all=list
+        )
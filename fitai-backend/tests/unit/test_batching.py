@@ -0,0 +1,79 @@
+"""Tests for micro-batched recommendation requests."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.ai.base import AIRecommendation
+from app.ai.batching import BatchingProvider
+from app.ai.gemini_provider import GeminiProvider
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+def _names(batches: list[dict]) -> list[list[str]]:
+    return [[c.exercise_name for c in batch.values()] for batch in batches]
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_full() -> None:
+    inner = StubProvider()
+    provider = BatchingProvider(inner, max_batch_size=3, max_wait_seconds=10)
+    results = await asyncio.gather(
+        *(provider.get_recommendation(make_ctx(exercise_name=f"ex{i}")) for i in range(3))
+    )
+    assert [r.explanation for r in results] == ["ex0", "ex1", "ex2"]
+    assert _names(inner.batches) == [["ex0", "ex1", "ex2"]]
+    assert inner.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_max_wait() -> None:
+    inner = StubProvider()
+    provider = BatchingProvider(inner, max_batch_size=10, max_wait_seconds=0.01)
+    results = await asyncio.gather(
+        provider.get_recommendation(make_ctx(exercise_name="a")),
+        provider.get_recommendation(make_ctx(exercise_name="b")),
+    )
+    assert [r.explanation for r in results] == ["a", "b"]
+    assert _names(inner.batches) == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_item_failure_only_affects_that_caller() -> None:
+    inner = StubProvider(fail={"bad"})
+    provider = BatchingProvider(inner, max_batch_size=2, max_wait_seconds=10)
+    good, bad = await asyncio.gather(
+        provider.get_recommendation(make_ctx(exercise_name="good")),
+        provider.get_recommendation(make_ctx(exercise_name="bad")),
+        return_exceptions=True,
+    )
+    assert isinstance(good, AIRecommendation)
+    assert isinstance(bad, ValueError)
+
+
+@pytest.mark.asyncio
+async def test_gemini_batch_validates_items_individually() -> None:
+    client = FakeGenaiClient(
+        responses=[
+            {
+                "recommendations": [
+                    {"request_id": "a", "suggested_weight_kg": 62.5, "suggested_reps": 8,
+                     "explanation": "ok", "confidence": "high"},
+                    {"request_id": "b", "suggested_weight_kg": 62.5, "suggested_reps": 8,
+                     "explanation": "ok", "confidence": "sure"},
+                ]
+            }
+        ]
+    )
+    provider = GeminiProvider("", "gemini-test", client=client)
+    results = await provider.get_batch_recommendations({"a": make_ctx(), "b": make_ctx(), "c": make_ctx()})
+
+    assert len(client.requests) == 1
+    prompt = client.requests[0].contents
+    assert "=== request_id: a ===" in prompt and "=== request_id: c ===" in prompt
+    assert isinstance(results["a"], AIRecommendation)
+    assert json.loads(results["a"].raw_response)["request_id"] == "a"
+    assert isinstance(results["b"], ValueError)  # invalid confidence
+    assert isinstance(results["c"], ValueError)  # missing from response
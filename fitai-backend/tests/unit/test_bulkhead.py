@@ -0,0 +1,69 @@
+"""Unit tests for AI bulkhead / admission control."""
+
+import asyncio
+
+import pytest
+
+from app.ai.bulkhead import (
+    REASON_QUEUE_FULL,
+    REASON_QUEUE_TIMEOUT,
+    Bulkhead,
+    BulkheadProvider,
+    BulkheadRejected,
+)
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+@pytest.mark.asyncio
+async def test_queue_full_rejects_immediately() -> None:
+    """With 1 slot busy and a queue of 1 occupied, the next call is shed as queue_full."""
+    inner = StubProvider(hold=True)
+    provider = BulkheadProvider(inner, Bulkhead(max_concurrent=1, max_queue=1, max_wait_seconds=5))
+
+    running = asyncio.create_task(provider.get_recommendation(make_ctx()))
+    queued = asyncio.create_task(provider.get_recommendation(make_ctx()))
+    await asyncio.sleep(0)
+    assert provider.bulkhead.inflight == 1
+    assert provider.bulkhead.waiting == 1
+
+    with pytest.raises(BulkheadRejected) as exc:
+        await provider.get_recommendation(make_ctx())
+    assert exc.value.reason == REASON_QUEUE_FULL
+
+    inner.release.set()
+    await asyncio.gather(running, queued)
+    assert inner.calls == 2
+    assert provider.bulkhead.inflight == 0
+    assert provider.bulkhead.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_rejects() -> None:
+    """A queued call that waits longer than max_wait_seconds is shed as queue_timeout."""
+    inner = StubProvider(hold=True)
+    provider = BulkheadProvider(inner, Bulkhead(max_concurrent=1, max_queue=4, max_wait_seconds=0.01))
+
+    running = asyncio.create_task(provider.get_recommendation(make_ctx()))
+    await asyncio.sleep(0)
+
+    with pytest.raises(BulkheadRejected) as exc:
+        await provider.get_recommendation(make_ctx())
+    assert exc.value.reason == REASON_QUEUE_TIMEOUT
+    assert provider.bulkhead.waiting == 0
+
+    inner.release.set()
+    await running
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_released_on_provider_error() -> None:
+    """A failing provider call still frees its slot."""
+
+    failing = StubProvider(errors=[RuntimeError("boom")] * 2)
+    provider = BulkheadProvider(failing, Bulkhead(max_concurrent=1, max_queue=0, max_wait_seconds=0.01))
+    with pytest.raises(RuntimeError):
+        await provider.get_recommendation(make_ctx())
+    assert provider.bulkhead.inflight == 0
+    with pytest.raises(RuntimeError):
+        await provider.get_recommendation(make_ctx())
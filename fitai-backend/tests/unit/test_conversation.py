@@ -0,0 +1,119 @@
+"""Tests for conversation mode: full prompt once per (workout, exercise), then deltas."""
+
+import pytest
+
+from app.ai.base import WorkoutContext
+from app.ai.bulkhead import Bulkhead, BulkheadProvider
+from app.ai.conversation import ConversationStore
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.prompt_builder import PromptBuilder
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import make_ctx
+
+
+def _ctx(n_sets: int, exercise_id: str = "ex-1", workout_id: str = "w-1") -> WorkoutContext:
+    return make_ctx(
+        current_session_sets=[
+            {"weight_kg": 80.0, "reps": 8, "rpe": 7.0 + i * 0.5, "set_number": i + 1}
+            for i in range(n_sets)
+        ],
+        recent_sessions=[
+            {"date": "2026-01-0%d" % d, "sets": [{"weight_kg": 77.5, "reps": 8, "rpe": 8.0}] * 4}
+            for d in (1, 4, 7)
+        ],
+        estimated_1rm=100.0,
+        max_weight_ever=90.0,
+        total_sets_today=n_sets,
+        workout_duration_minutes=5 * n_sets,
+        workout_id=workout_id,
+        exercise_id=exercise_id,
+    )
+
+
+def _last_user_text(client: FakeGenaiClient) -> str:
+    return client.requests[-1].contents[-1].parts[0].text
+
+
+def _provider(client: FakeGenaiClient, store: ConversationStore) -> GeminiProvider:
+    return GeminiProvider(api_key="", model="gemini-test", conversations=store, client=client)
+
+
+@pytest.mark.asyncio
+async def test_history_sent_once_then_only_deltas() -> None:
+    client = FakeGenaiClient()
+    provider = _provider(client, ConversationStore())
+
+    await provider.get_recommendation(_ctx(1))
+    intro = _last_user_text(client)
+    assert "Recent session history" in intro
+    assert PromptBuilder.SESSION_NOTE in intro
+
+    await provider.get_recommendation(_ctx(2))
+    delta = _last_user_text(client)
+    assert "Recent session history" not in delta
+    assert "Set 2: 80.0 kg x 8 reps RPE 7.5" in delta
+    assert "Set 1:" not in delta
+    roles = [c.role for c in client.requests[-1].contents]
+    assert roles == ["user", "model", "user"]
+    assert PromptBuilder.estimate_tokens(delta) * 4 < PromptBuilder.estimate_tokens(intro)
+
+
+@pytest.mark.asyncio
+async def test_session_restarts_when_sent_sets_change_or_turn_limit_reached() -> None:
+    client = FakeGenaiClient()
+    provider = _provider(client, ConversationStore(max_turns=2))
+
+    await provider.get_recommendation(_ctx(2))
+    edited = _ctx(3)
+    edited.current_session_sets[0]["reps"] = 6
+    await provider.get_recommendation(edited)
+    assert len(client.requests[-1].contents) == 1
+    assert "Recent session history" in _last_user_text(client)
+
+    for n in (4, 5, 6):
+        follow_up = _ctx(n)
+        follow_up.current_session_sets[0]["reps"] = 6
+        await provider.get_recommendation(follow_up)
+    assert [len(r.contents) for r in client.requests[-3:]] == [3, 5, 1]
+
+
+@pytest.mark.asyncio
+async def test_invalid_reply_is_not_added_to_history() -> None:
+    client = FakeGenaiClient(responses=["not json at all"])
+    provider = _provider(client, ConversationStore())
+    with pytest.raises(ValueError):
+        await provider.get_recommendation(_ctx(1))
+    await provider.get_recommendation(_ctx(1))
+    assert len(client.requests[-1].contents) == 1
+
+
+@pytest.mark.asyncio
+async def test_end_session_through_wrappers_and_ttl_eviction() -> None:
+    now = [0.0]
+    store = ConversationStore(ttl_seconds=60, clock=lambda: now[0])
+    client = FakeGenaiClient()
+    provider = BulkheadProvider(_provider(client, store), Bulkhead(2, 4, 1.0))
+
+    await provider.get_recommendation(_ctx(1, "ex-1"))
+    await provider.get_recommendation(_ctx(1, "ex-2"))
+    await provider.get_recommendation(_ctx(1, "ex-1", workout_id="w-2"))
+    assert len(store) == 3
+
+    provider.end_session("w-1")
+    assert len(store) == 1
+
+    now[0] = 61.0
+    assert store.evict_expired() == 1
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_contexts_without_ids_stay_stateless() -> None:
+    client = FakeGenaiClient()
+    store = ConversationStore()
+    provider = _provider(client, store)
+    ctx = _ctx(1)
+    ctx.workout_id = None
+    await provider.get_recommendation(ctx)
+    assert isinstance(client.requests[-1].contents, str)
+    assert len(store) == 0
@@ -0,0 +1,112 @@
+"""Tests for the distilled ridge recommender and regime routing."""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.ai.base import AIProvider, WorkoutContext
+from app.ai.distilled import (
+    FEATURE_NAMES,
+    DistilledModel,
+    DistilledProvider,
+    RegimeRouterProvider,
+    TrainingExample,
+    context_features,
+    regime_of,
+    train_distilled,
+)
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+def _ctx(weight: float, reps: int, rpe: float | None, compound: bool = True, n_sets: int = 2) -> WorkoutContext:
+    sets = [
+        {"weight_kg": weight, "reps": reps, "rpe": rpe, "set_number": i + 1}
+        for i in range(n_sets)
+    ]
+    return make_ctx(
+        is_compound=compound,
+        current_session_sets=sets,
+        total_sets_today=n_sets,
+        workout_duration_minutes=20,
+    )
+
+
+def _teacher_examples(n: int, seed: int = 0) -> list[TrainingExample]:
+    """A simple linear 'LLM': +2.5% load per RPE point below 8, same reps."""
+    rng = random.Random(seed)
+    examples = []
+    for i in range(n):
+        weight = rng.choice([40.0, 60.0, 80.0, 100.0])
+        reps = rng.choice([5, 8, 10])
+        rpe = rng.choice([6.0, 7.0, 8.0, 9.0])
+        ctx = _ctx(weight, reps, rpe, compound=rng.random() < 0.5)
+        target = round(weight * (1 + 0.025 * (8 - rpe)) / 1.25) * 1.25
+        examples.append(TrainingExample(ctx, target, reps, group=f"w{i // 4}"))
+    return examples
+
+
+def test_features_match_names() -> None:
+    assert len(context_features(_ctx(60, 8, 7.5))) == len(FEATURE_NAMES)
+    assert regime_of(_ctx(60, 8, 7.5)) == "compound:target"
+    assert regime_of(_ctx(60, 8, None, compound=False)) == "isolation:none"
+
+
+def test_training_reports_holdout_agreement_and_round_trips(tmp_path) -> None:
+    model = train_distilled(_teacher_examples(800), alpha=0.1)
+
+    meta = model.metadata
+    assert meta["n_train"] + meta["n_holdout"] == 800
+    assert meta["n_holdout"] > 0
+    assert meta["holdout_agreement"] > 0.8
+    assert set(meta["regimes"]) <= {
+        f"{k}:{b}" for k in ("compound", "isolation") for b in ("low", "target", "high")
+    }
+
+    path = tmp_path / "distilled.npz"
+    model.save(path)
+    loaded = DistilledModel.load(path)
+    np.testing.assert_allclose(loaded.coef, model.coef)
+    assert loaded.metadata["regimes"] == meta["regimes"]
+    ctx = _ctx(100.0, 5, 6.0)
+    assert loaded.predict(ctx) == model.predict(ctx)
+
+
+@pytest.mark.asyncio
+async def test_provider_returns_grid_weight() -> None:
+    provider = DistilledProvider(train_distilled(_teacher_examples(400)))
+    rec = await provider.get_recommendation(_ctx(80.0, 8, 7.0))
+    assert rec.model_used == "distilled-ridge"
+    assert rec.suggested_weight_kg % 1.25 == 0
+    assert 1 <= rec.suggested_reps <= 30
+
+
+def _router(primary: AIProvider) -> RegimeRouterProvider:
+    model = train_distilled(_teacher_examples(400))
+    model.metadata["regimes"] = {
+        "compound:target": {"n": 500, "agreement": 0.95},
+        "compound:high": {"n": 500, "agreement": 0.6},
+        "isolation:target": {"n": 10, "agreement": 1.0},
+    }
+    return RegimeRouterProvider(primary, DistilledProvider(model), min_agreement=0.9, min_samples=100)
+
+
+@pytest.mark.asyncio
+async def test_router_uses_distilled_only_for_trusted_regimes() -> None:
+    primary = StubProvider(model_used="gemini-test")
+    router = _router(primary)
+
+    assert (await router.get_recommendation(_ctx(60, 8, 8.0))).model_used == "distilled-ridge"
+    assert (await router.get_recommendation(_ctx(60, 8, 9.0))).model_used == "gemini-test"
+    assert (await router.get_recommendation(_ctx(60, 8, 8.0, compound=False))).model_used == "gemini-test"
+    assert primary.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_router_batch_sends_primary_items_as_one_batch() -> None:
+    primary = StubProvider(model_used="gemini-test")
+    results = await _router(primary).get_batch_recommendations(
+        {"a": _ctx(60, 8, 8.0), "b": _ctx(60, 8, 9.0), "c": _ctx(60, 8, 8.0, compound=False)}
+    )
+    assert [list(batch) for batch in primary.batches] == [["b", "c"]]
+    assert [results[k].model_used for k in "abc"] == ["distilled-ridge", "gemini-test", "gemini-test"]
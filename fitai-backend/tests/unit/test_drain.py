@@ -0,0 +1,70 @@
+"""Tests for startup warmup and shutdown draining of the provider chain."""
+
+import asyncio
+
+import pytest
+
+from app.ai.batching import BatchingProvider
+from app.ai.bulkhead import REASON_SHUTTING_DOWN, BulkheadRejected
+from app.ai.drain import DrainingProvider
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.retry import RetryingProvider
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_inflight_and_refuses_new_calls() -> None:
+    inner = StubProvider(hold=True)
+    provider = DrainingProvider(inner)
+    call = asyncio.create_task(provider.get_recommendation(make_ctx()))
+    await asyncio.sleep(0)
+    assert provider.inflight == 1
+
+    drain = asyncio.create_task(provider.drain(timeout_seconds=5))
+    await asyncio.sleep(0)
+    with pytest.raises(BulkheadRejected) as exc:
+        await provider.get_recommendation(make_ctx())
+    assert exc.value.reason == REASON_SHUTTING_DOWN
+    assert not drain.done()
+
+    inner.release.set()
+    assert (await call).explanation == "Bench Press"
+    assert await drain is True
+    assert provider.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_drain_times_out_with_calls_still_running() -> None:
+    provider = DrainingProvider(StubProvider(hold=True))
+    call = asyncio.create_task(provider.get_recommendation(make_ctx()))
+    await asyncio.sleep(0)
+    assert await provider.drain(timeout_seconds=0.01) is False
+    call.cancel()
+
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_pending_batch_through_the_chain() -> None:
+    inner = StubProvider(hold=True)
+    batching = BatchingProvider(inner, max_batch_size=10, max_wait_seconds=60)
+    provider = DrainingProvider(RetryingProvider(batching, provider_name="stub", max_attempts=1))
+    call = asyncio.create_task(provider.get_recommendation(make_ctx(exercise_name="Squat")))
+    await asyncio.sleep(0)
+    assert inner.batches == []
+
+    assert await provider.drain(timeout_seconds=0.01) is False
+    await provider.aclose()
+    assert (await call).explanation == "Squat"
+    assert len(inner.batches) == 1
+    assert inner.closed
+
+
+@pytest.mark.asyncio
+async def test_gemini_warmup_does_not_generate() -> None:
+    client = FakeGenaiClient()
+    provider = DrainingProvider(
+        GeminiProvider("", "gemini-test", prompt_cache=True, prompt_cache_min_tokens=0, client=client)
+    )
+    await provider.warmup()
+    assert client.requests == []
+    assert len(client.caches_created) == 1
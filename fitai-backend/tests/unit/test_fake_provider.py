@@ -0,0 +1,89 @@
+"""Tests for the fake LLM simulator, its ASGI server and FakeProvider."""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.ai.fake_llm import FakeLLM, FakeLLMConfig, FakeLLMError, create_app
+from app.ai.fake_provider import FakeProvider
+from app.ai.response_parser import parse_recommendation
+from app.ai.retry import is_retryable, retry_after_seconds
+from app.config import Settings
+from tests.unit.fakes import make_ctx
+
+
+def _fast(**kwargs) -> FakeLLMConfig:
+    return FakeLLMConfig(**{"p50_ms": 1.0, "p99_ms": 2.0, "seed": 1, **kwargs})
+
+
+def test_latency_distribution_matches_configured_percentiles() -> None:
+    llm = FakeLLM(FakeLLMConfig(p50_ms=500, p99_ms=2000, seed=42))
+    samples = sorted(llm.sample_latency_seconds() * 1000 for _ in range(20000))
+    assert statistics.median(samples) == pytest.approx(500, rel=0.05)
+    assert samples[int(0.99 * len(samples))] == pytest.approx(2000, rel=0.15)
+
+
+@pytest.mark.asyncio
+async def test_simulated_output_is_schema_valid() -> None:
+    text = await FakeLLM(_fast()).complete(make_ctx())
+    rec = parse_recommendation(text, 1, "fake-llm", "test")
+    assert rec.suggested_weight_kg > 0
+    assert rec.confidence in {"high", "medium", "low"}
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_and_errors_look_like_transient_provider_errors() -> None:
+    limited = FakeLLM(_fast(rate_limit_rps=0.001, rate_limit_burst=1))
+    await limited.complete(make_ctx())
+    with pytest.raises(FakeLLMError) as exc:
+        await limited.complete(make_ctx())
+    assert exc.value.status_code == 429
+    assert is_retryable(exc.value)
+    assert retry_after_seconds(exc.value) > 0
+
+    failing = FakeLLM(_fast(error_rate=1.0))
+    with pytest.raises(FakeLLMError) as exc:
+        await failing.complete(make_ctx())
+    assert exc.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_provider_over_http_server() -> None:
+    server = create_app(_fast(rate_limit_rps=0.001, rate_limit_burst=1))
+    provider = FakeProvider(base_url="http://fake-llm")
+    provider._client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=server), base_url="http://fake-llm"
+    )
+
+    assert await provider.health_check()
+    rec = await provider.get_recommendation(make_ctx())
+    assert rec.model_used == "fake-llm"
+    assert json.loads(rec.raw_response)["suggested_reps"] == rec.suggested_reps
+
+    with pytest.raises(httpx.HTTPStatusError) as exc:
+        await provider.get_recommendation(make_ctx())
+    assert exc.value.response.status_code == 429
+    assert retry_after_seconds(exc.value) > 0
+
+
+@pytest.mark.asyncio
+async def test_provider_in_process() -> None:
+    rec = await FakeProvider(config=_fast()).get_recommendation(make_ctx())
+    assert rec.model_used == "fake-llm"
+
+
+def test_config_comes_from_settings_and_production_import_skips_the_fake() -> None:
+    settings = Settings(FAKE_LLM_P50_MS=5.0, FAKE_LLM_P99_MS=9.0, FAKE_LLM_RATE_LIMIT_BURST=3)
+    config = FakeLLMConfig.from_settings(settings)
+    assert (config.p50_ms, config.p99_ms, config.rate_limit_burst) == (5.0, 9.0, 3)
+
+    # An invalid fake config must not break a non-fake start.
+    code = "import sys, app.ai; assert 'app.ai.fake_llm' not in sys.modules"
+    env = {"FAKE_LLM_P50_MS": "3000", "AI_PROVIDER": "gemini"}
+    result = subprocess.run([sys.executable, "-c", code], env={**os.environ, **env})
+    assert result.returncode == 0
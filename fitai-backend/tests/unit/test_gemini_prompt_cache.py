@@ -0,0 +1,231 @@
+"""Tests for provider-side caching of the static prompt prefix."""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from app.ai.base import STREAM_EVENT_FINAL
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.prompt_builder import PromptBuilder
+from app.ai.prompt_cache import min_cache_tokens
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import make_ctx
+
+
+async def cached_provider(client: FakeGenaiClient, **kwargs: Any) -> GeminiProvider:
+    """Provider with the prompt cache on (no size minimum), registered via warmup."""
+    provider = GeminiProvider(
+        "", "gemini-test", prompt_cache=True, prompt_cache_min_tokens=0, client=client, **kwargs
+    )
+    await provider.warmup()
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_prefix_registered_once_and_referenced() -> None:
+    client = FakeGenaiClient()
+    provider = await cached_provider(client)
+
+    for _ in range(3):
+        rec = await provider.get_recommendation(make_ctx())
+        assert rec.suggested_weight_kg == 62.5
+
+    assert len(client.caches_created) == 1
+    created = client.caches_created[0]
+    assert created["model"] == "gemini-test"
+    assert created["config"].system_instruction == PromptBuilder.cached_prefix("verbose")
+    assert all(r.cached_content == "cachedContents/1" for r in client.requests)
+    assert all(r.system_instruction is None for r in client.requests)
+    # Output format lives in the cached prefix, not in each request.
+    assert all("Respond with ONLY a JSON object" not in r.contents for r in client.requests)
+
+
+@pytest.mark.asyncio
+async def test_registration_happens_off_the_request_path() -> None:
+    client = FakeGenaiClient()
+    provider = GeminiProvider(
+        "", "gemini-test", prompt_cache=True, prompt_cache_min_tokens=0, client=client
+    )
+
+    await provider.get_recommendation(make_ctx())
+    # No handle yet: the first request went inline and started a background registration.
+    assert client.requests[0].cached_content is None
+    await provider._prompt_cache._refresh_task
+    await provider.get_recommendation(make_ctx())
+    assert len(client.caches_created) == 1
+    assert client.requests[1].cached_content == "cachedContents/1"
+
+
+@pytest.mark.asyncio
+async def test_refreshed_before_expiry_and_old_cache_deleted() -> None:
+    client = FakeGenaiClient()
+    provider = await cached_provider(client, prompt_cache_ttl_seconds=600)
+    # Move the handle inside the refresh margin.
+    provider._prompt_cache._expires_at = datetime.now(timezone.utc) + timedelta(seconds=10)
+
+    await provider.get_recommendation(make_ctx())
+    # The still-live handle serves the request while the refresh runs in the background.
+    assert client.requests[-1].cached_content == "cachedContents/1"
+    await provider._prompt_cache._refresh_task
+    await provider.get_recommendation(make_ctx())
+    assert len(client.caches_created) == 2
+    assert client.caches_deleted == ["cachedContents/1"]
+    assert client.requests[-1].cached_content == "cachedContents/2"
+
+
+@pytest.mark.asyncio
+async def test_aclose_deletes_the_cache() -> None:
+    client = FakeGenaiClient()
+    provider = await cached_provider(client)
+    await provider.aclose()
+    assert client.caches_deleted == ["cachedContents/1"]
+    assert provider._prompt_cache.name is None
+
+
+@pytest.mark.asyncio
+async def test_prefix_below_model_minimum_is_never_registered(caplog) -> None:
+    client = FakeGenaiClient()
+    assert PromptBuilder.estimate_tokens(PromptBuilder.cached_prefix("verbose")) < min_cache_tokens(
+        "gemini-2.5-flash"
+    )
+    with caplog.at_level(logging.INFO, logger="app.ai.prompt_cache"):
+        provider = GeminiProvider("", "gemini-2.5-flash", prompt_cache=True, client=client)
+        await provider.warmup()
+        await provider.get_recommendation(make_ctx())
+        await provider.get_recommendation(make_ctx())
+
+    assert client.caches_created == []
+    assert provider._prompt_cache._refresh_task is None
+    assert all(r.cached_content is None for r in client.requests)
+    assert len([r for r in caplog.records if "cache minimum" in r.getMessage()]) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_uses_cached_prefix() -> None:
+    client = FakeGenaiClient()
+    provider = await cached_provider(client)
+
+    events = [e async for e in provider.stream_recommendation(make_ctx())]
+    assert events[-1].kind == STREAM_EVENT_FINAL
+    assert events[-1].recommendation.suggested_weight_kg == 62.5
+    assert client.requests[0].cached_content == "cachedContents/1"
+    assert "Respond with ONLY a JSON object" not in client.requests[0].contents
+
+
+@pytest.mark.asyncio
+async def test_stream_cache_miss_falls_back_inline() -> None:
+    from types import SimpleNamespace
+
+    from google.genai import errors
+
+    not_found = errors.ClientError(
+        404, SimpleNamespace(body_segments=[{"error": {"message": "cache not found"}}])
+    )
+    client = FakeGenaiClient(generate_error_for_cached=not_found)
+    provider = await cached_provider(client)
+
+    events = [e async for e in provider.stream_recommendation(make_ctx())]
+    assert events[-1].recommendation.suggested_reps == 8
+    assert [r.cached_content for r in client.requests] == ["cachedContents/1", None]
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_cached_prefix() -> None:
+    item = {"suggested_reps": 8, "explanation": "x", "confidence": "high"}
+    client = FakeGenaiClient(
+        responses=[
+            {
+                "recommendations": [
+                    {**item, "request_id": "a", "suggested_weight_kg": 60},
+                    {**item, "request_id": "b", "suggested_weight_kg": 70},
+                ]
+            }
+        ]
+    )
+    provider = await cached_provider(client)
+
+    results = await provider.get_batch_recommendations({"a": make_ctx(), "b": make_ctx()})
+    assert results["b"].suggested_weight_kg == 70
+    (request,) = client.requests
+    assert request.cached_content == "cachedContents/1"
+    assert request.system_instruction is None
+    assert request.config.max_output_tokens == 1024
+
+
+@pytest.mark.asyncio
+async def test_fallback_inline_when_cache_unavailable() -> None:
+    client = FakeGenaiClient(cache_error=RuntimeError("content too small to cache"))
+    provider = await cached_provider(client)
+
+    await provider.get_recommendation(make_ctx())
+    await provider.get_recommendation(make_ctx())
+
+    assert client.caches_created == []
+    assert all(r.cached_content is None for r in client.requests)
+    assert all(r.system_instruction == PromptBuilder.SYSTEM_PROMPT for r in client.requests)
+    assert all("Respond with ONLY a JSON object" in r.contents for r in client.requests)
+
+
+@pytest.mark.asyncio
+async def test_evicted_cache_retried_inline() -> None:
+    from types import SimpleNamespace
+
+    from google.genai import errors
+
+    not_found = errors.ClientError(
+        404, SimpleNamespace(body_segments=[{"error": {"message": "cache not found"}}])
+    )
+    client = FakeGenaiClient(generate_error_for_cached=not_found)
+    provider = await cached_provider(client)
+
+    rec = await provider.get_recommendation(make_ctx())
+    assert rec.suggested_reps == 8
+    assert [r.cached_content for r in client.requests] == ["cachedContents/1", None]
+    assert provider._prompt_cache.name is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_cached_call_is_not_resent_inline() -> None:
+    from types import SimpleNamespace
+
+    from google.genai import errors
+
+    rate_limited = errors.ClientError(
+        429, SimpleNamespace(body_segments=[{"error": {"message": "resource exhausted"}}])
+    )
+    client = FakeGenaiClient(generate_error_for_cached=rate_limited)
+    provider = await cached_provider(client)
+
+    with pytest.raises(errors.ClientError):
+        await provider.get_recommendation(make_ctx())
+    assert [r.cached_content for r in client.requests] == ["cachedContents/1"]
+    assert provider._prompt_cache.name == "cachedContents/1"
+
+
+@pytest.mark.asyncio
+async def test_conversation_mode_shares_cache_miss_handling() -> None:
+    from types import SimpleNamespace
+
+    from google.genai import errors
+
+    from app.ai.conversation import ConversationStore
+
+    not_found = errors.ClientError(
+        404, SimpleNamespace(body_segments=[{"error": {"message": "cache not found"}}])
+    )
+    client = FakeGenaiClient(generate_error_for_cached=not_found)
+    provider = await cached_provider(client, conversations=ConversationStore())
+    await provider.get_recommendation(make_ctx(workout_id="w-1", exercise_id="ex-1"))
+    assert [r.cached_content for r in client.requests] == ["cachedContents/1", None]
+    assert client.requests[0].contents == client.requests[1].contents
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_by_default() -> None:
+    client = FakeGenaiClient()
+    provider = GeminiProvider("", "gemini-test", client=client)
+    await provider.get_recommendation(make_ctx())
+    assert client.caches_created == []
+    assert client.requests[0].cached_content is None
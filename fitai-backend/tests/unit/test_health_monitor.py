@@ -0,0 +1,86 @@
+"""Unit tests for the background AI provider health monitor."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.ai.base import AIProvider, AIRecommendation, WorkoutContext
+from app.ai.health_monitor import ProviderHealthMonitor
+
+
+class _StubProvider(AIProvider):
+    def __init__(self, result: bool = True, delay: float = 0.0, error: Exception | None = None) -> None:
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.probes = 0
+
+    async def get_recommendation(self, context: WorkoutContext) -> AIRecommendation:
+        raise AssertionError("health monitor must not request recommendations")
+
+    async def health_check(self) -> bool:
+        self.probes += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_state_unknown_before_first_probe() -> None:
+    monitor = ProviderHealthMonitor(_StubProvider(), interval_seconds=60, timeout_seconds=1)
+    assert monitor.state.ok is None
+    assert monitor.state.checked_at is None
+    assert monitor.is_stale()
+
+
+@pytest.mark.asyncio
+async def test_probe_caches_result_with_timestamp() -> None:
+    provider = _StubProvider(result=True)
+    monitor = ProviderHealthMonitor(provider, interval_seconds=60, timeout_seconds=1)
+    state = await monitor.probe_once()
+    assert state.ok is True
+    assert state.checked_at is not None
+    assert state.error is None
+    assert not monitor.is_stale()
+    # Reading state does not probe again.
+    _ = monitor.state
+    assert provider.probes == 1
+
+
+@pytest.mark.asyncio
+async def test_probe_timeout_and_error_mark_unhealthy() -> None:
+    slow = ProviderHealthMonitor(_StubProvider(delay=1.0), interval_seconds=60, timeout_seconds=0.01)
+    state = await slow.probe_once()
+    assert state.ok is False
+    assert "timed out" in (state.error or "")
+
+    failing = ProviderHealthMonitor(
+        _StubProvider(error=RuntimeError("unreachable")), interval_seconds=60, timeout_seconds=1
+    )
+    state = await failing.probe_once()
+    assert state.ok is False
+    assert state.error == "unreachable"
+
+
+@pytest.mark.asyncio
+async def test_stale_after_three_intervals() -> None:
+    monitor = ProviderHealthMonitor(_StubProvider(), interval_seconds=10, timeout_seconds=1)
+    await monitor.probe_once()
+    later = datetime.now(timezone.utc) + timedelta(seconds=31)
+    assert monitor.is_stale(now=later)
+
+
+@pytest.mark.asyncio
+async def test_background_loop_start_stop() -> None:
+    provider = _StubProvider()
+    monitor = ProviderHealthMonitor(provider, interval_seconds=0.01, timeout_seconds=1)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    assert provider.probes >= 2
+    count = provider.probes
+    await asyncio.sleep(0.03)
+    assert provider.probes == count
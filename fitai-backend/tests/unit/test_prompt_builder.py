@@ -0,0 +1,65 @@
+"""Unit tests for PromptBuilder prompt formats."""
+
+import pytest
+
+from app.ai.base import WorkoutContext
+from app.ai.prompt_builder import PROMPT_FORMAT_COMPACT, PromptBuilder
+from tests.unit.fakes import make_ctx
+
+
+def _ctx(sessions: int = 3, sets_per_session: int = 5) -> WorkoutContext:
+    return make_ctx(
+        current_session_sets=[
+            {"weight_kg": 60.0, "reps": 8, "rpe": 7.0, "set_number": 1},
+            {"weight_kg": 62.5, "reps": 8, "rpe": 8.5, "set_number": 2},
+        ],
+        recent_sessions=[
+            {
+                "date": f"2025-02-{20 - i:02d}",
+                "sets": [{"weight_kg": 60.0, "reps": 8, "rpe": 7.5}] * sets_per_session,
+            }
+            for i in range(sessions)
+        ],
+        estimated_1rm=100.0,
+        max_weight_ever=95.0,
+        total_sets_today=6,
+        workout_duration_minutes=35,
+    )
+
+
+def test_compact_prompt_is_smaller_and_keeps_sets() -> None:
+    ctx = _ctx()
+    verbose = PromptBuilder.build_recommendation_prompt(ctx)
+    compact = PromptBuilder.build_compact_prompt(ctx)
+    assert PromptBuilder.estimate_tokens(compact) < PromptBuilder.estimate_tokens(verbose) / 2
+    assert "1,60,8,7" in compact
+    assert "2,62.5,8,8.5" in compact
+    assert "2025-02-18 60x8@7.5" in compact
+    assert "suggested_weight_kg" in compact
+
+
+def test_budget_summarizes_oldest_sessions_first() -> None:
+    ctx = _ctx(sessions=3, sets_per_session=8)
+    full = PromptBuilder.build_compact_prompt(ctx)
+    budget = PromptBuilder.estimate_tokens(full) - 10
+    trimmed = PromptBuilder.build_compact_prompt(ctx, token_budget=budget)
+    assert PromptBuilder.estimate_tokens(trimmed) <= budget
+    assert "2025-02-18 sum n=8 top=60x8 rpe~7.5" in trimmed
+    assert "2025-02-20 60x8@7.5" in trimmed  # newest kept verbatim
+
+
+def test_budget_drops_sessions_but_keeps_current_sets() -> None:
+    ctx = _ctx(sessions=3)
+    trimmed = PromptBuilder.build_compact_prompt(ctx, token_budget=1)
+    assert "hist" not in trimmed
+    assert "2,62.5,8,8.5" in trimmed
+    assert "suggested_reps" in trimmed
+
+
+def test_build_prompt_dispatch() -> None:
+    ctx = _ctx()
+    assert PromptBuilder.build_prompt(ctx) == PromptBuilder.build_recommendation_prompt(ctx)
+    assert PromptBuilder.build_prompt(ctx, PROMPT_FORMAT_COMPACT) == PromptBuilder.build_compact_prompt(ctx)
+    assert PromptBuilder.system_prompt_for(PROMPT_FORMAT_COMPACT) == PromptBuilder.COMPACT_SYSTEM_PROMPT
+    with pytest.raises(ValueError):
+        PromptBuilder.build_prompt(ctx, "xml")
@@ -0,0 +1,58 @@
+"""Tests for the append-only recommendation context recorder."""
+
+import random
+
+import pytest
+
+from app.ai.base import WorkoutContext
+from app.ai.recorder import ContextRecorder, RecordingProvider, encode_record, read_records
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+@pytest.mark.asyncio
+async def test_records_answers_and_errors_and_round_trips(tmp_path) -> None:
+    recorder = ContextRecorder(tmp_path / "ai-{pid}.rec", flush_every=100)
+    provider = RecordingProvider(StubProvider(fail={"Broken"}), recorder)
+
+    await provider.get_recommendation(make_ctx(exercise_name="Bench Press"))
+    with pytest.raises(ValueError):
+        await provider.get_recommendation(make_ctx(exercise_name="Broken"))
+    async for _ in provider.stream_recommendation(make_ctx(exercise_name="Squat")):
+        pass
+    assert not recorder.path.exists()  # still buffered
+
+    await provider.aclose()
+    records = list(read_records(recorder.path))
+    assert [r["context"]["exercise_name"] for r in records] == ["Bench Press", "Broken", "Squat"]
+    assert records[0]["suggested_weight_kg"] == 60.0 and records[0]["error"] is None
+    assert records[1]["error"] == "ValueError: provider error"
+    assert WorkoutContext(**records[2]["context"]) == make_ctx(exercise_name="Squat")
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_buffer_is_full_and_appends(tmp_path) -> None:
+    path = tmp_path / "ai.rec"
+    for _ in range(2):
+        recorder = ContextRecorder(path, flush_every=2)
+        provider = RecordingProvider(StubProvider(), recorder)
+        await provider.get_recommendation(make_ctx())
+        await provider.get_recommendation(make_ctx())
+        await recorder.aclose()
+    assert len(list(read_records(path))) == 4
+    assert len(list(read_records(path, limit=3))) == 3
+
+
+def test_truncated_last_frame_is_skipped(tmp_path) -> None:
+    path = tmp_path / "ai.rec"
+    frame = encode_record({"context": {"exercise_name": "Row"}})
+    path.write_bytes(frame + frame[:-3])
+    assert [r["context"]["exercise_name"] for r in read_records(path)] == ["Row"]
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_zero_records_nothing(tmp_path) -> None:
+    recorder = ContextRecorder(tmp_path / "ai.rec", sample_rate=0.0, rng=random.Random(1))
+    provider = RecordingProvider(StubProvider(), recorder)
+    await provider.get_recommendation(make_ctx())
+    await provider.aclose()
+    assert not recorder.path.exists()
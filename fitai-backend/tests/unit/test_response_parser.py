@@ -0,0 +1,123 @@
+"""Tests for the shared tolerant recommendation parser."""
+
+import json
+
+import pytest
+
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.response_parser import (
+    BATCH_RECOMMENDATION_SCHEMA,
+    RECOMMENDATION_SCHEMA,
+    parse_batch_recommendations,
+    parse_recommendation,
+)
+from app.core.metrics import AI_RESPONSE_PARSE_TOTAL
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import make_ctx
+
+VALID = {
+    "suggested_weight_kg": 62.5,
+    "suggested_reps": 8,
+    "explanation": "RPE 7 leaves room to add load.",
+    "confidence": "high",
+}
+
+
+def _parse(text: str):
+    return parse_recommendation(text, 12, "gemini-test", "test")
+
+
+def _count(result: str) -> float:
+    return AI_RESPONSE_PARSE_TOTAL.labels(provider="test", result=result)._value.get()
+
+
+def test_valid_response_is_not_marked_repaired() -> None:
+    before = _count("ok")
+    rec = _parse(json.dumps(VALID))
+    assert (rec.suggested_weight_kg, rec.suggested_reps, rec.confidence) == (62.5, 8, "high")
+    assert rec.latency_ms == 12 and rec.model_used == "gemini-test"
+    assert _count("ok") == before + 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "```json\n" + json.dumps(VALID) + "\n```",
+        "Here you go: " + json.dumps(VALID) + " Good luck!",
+        json.dumps({**VALID, "suggested_weight_kg": "62.5 kg"}),
+        json.dumps({**VALID, "suggested_weight_kg": 62.0}),
+        json.dumps({**VALID, "suggested_reps": "8"}),
+        json.dumps({**VALID, "suggested_reps": 8.0}),
+        json.dumps({**VALID, "confidence": " High"}),
+    ],
+)
+def test_near_misses_are_repaired(text: str) -> None:
+    before = _count("repaired")
+    rec = _parse(text)
+    assert rec.suggested_weight_kg == 62.5
+    assert rec.suggested_reps == 8
+    assert rec.confidence == "high"
+    assert rec.raw_response == text
+    assert _count("repaired") == before + 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "not json",
+        json.dumps({**VALID, "suggested_weight_kg": -5}),
+        json.dumps({**VALID, "suggested_weight_kg": True}),
+        json.dumps({**VALID, "suggested_reps": 7.5}),
+        json.dumps({**VALID, "suggested_reps": 0}),
+        json.dumps({**VALID, "confidence": "sure"}),
+        json.dumps({k: v for k, v in VALID.items() if k != "explanation"}),
+        json.dumps([VALID]),
+    ],
+)
+def test_unrepairable_responses_are_rejected(text: str) -> None:
+    before = _count("rejected")
+    with pytest.raises(ValueError):
+        _parse(text)
+    assert _count("rejected") == before + 1
+
+
+def test_batch_items_validated_individually() -> None:
+    text = json.dumps(
+        {
+            "recommendations": [
+                {"request_id": "a", **VALID, "suggested_reps": "10"},
+                {"request_id": "b", **VALID, "confidence": "sure"},
+            ]
+        }
+    )
+    results = parse_batch_recommendations(text, ["a", "b", "c"], 5, "gemini-test", "test")
+    assert results["a"].suggested_reps == 10
+    assert isinstance(results["b"], ValueError)
+    assert isinstance(results["c"], ValueError)
+
+
+def test_batch_without_array_raises() -> None:
+    with pytest.raises(ValueError):
+        parse_batch_recommendations('{"items": []}', ["a"], 5, "gemini-test", "test")
+
+
+@pytest.mark.asyncio
+async def test_gemini_sends_response_schema() -> None:
+    ctx = make_ctx(exercise_name="Row", muscle_group="back", equipment_type="cable", is_compound=False)
+    client = FakeGenaiClient(
+        responses=[
+            "```json\n" + json.dumps(VALID) + "\n```",
+            {"recommendations": [{"request_id": rid, **VALID} for rid in ("a", "b")]},
+        ]
+    )
+    provider = GeminiProvider("", "gemini-test", client=client)
+
+    rec = await provider.get_recommendation(ctx)
+    assert rec.suggested_weight_kg == 62.5
+    schema = client.requests[0].config.response_schema
+    assert schema == RECOMMENDATION_SCHEMA
+
+    await provider.get_batch_recommendations({"a": ctx, "b": ctx})
+    batch_schema = client.requests[1].config.response_schema
+    assert batch_schema == BATCH_RECOMMENDATION_SCHEMA
@@ -0,0 +1,151 @@
+"""Tests for deadline-aware provider retries."""
+
+import email.utils
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.base import (
+    STREAM_EVENT_FINAL,
+    AIProvider,
+    RecommendationStreamEvent,
+    WorkoutContext,
+)
+from app.ai.retry import RetryingProvider, is_retryable, retry_after_seconds
+from app.core.metrics import AI_RETRIES_TOTAL, AI_RETRY_OUTCOMES_TOTAL
+from tests.unit.fakes import StubProvider, make_ctx, make_rec
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: int, headers: dict | None = None, details: dict | None = None) -> None:
+        super().__init__(f"{code}")
+        self.code = code
+        self.response = SimpleNamespace(headers=headers or {})
+        self.details = details or {}
+
+
+def _retrying(inner: AIProvider, name: str, **kwargs) -> RetryingProvider:
+    defaults = dict(
+        max_attempts=3,
+        deadline_seconds=1.0,
+        base_delay_seconds=0.01,
+        max_delay_seconds=0.02,
+        min_attempt_seconds=0.05,
+        rng=random.Random(0),
+    )
+    return RetryingProvider(inner, provider_name=name, **{**defaults, **kwargs})
+
+
+def _outcome(name: str, outcome: str) -> float:
+    return AI_RETRY_OUTCOMES_TOTAL.labels(provider=name, outcome=outcome)._value.get()
+
+
+def test_classification_and_retry_after() -> None:
+    assert is_retryable(FakeAPIError(429))
+    assert is_retryable(FakeAPIError(503))
+    assert is_retryable(ConnectionResetError())
+    assert not is_retryable(FakeAPIError(400))
+    assert not is_retryable(ValueError("bad json"))
+    assert retry_after_seconds(FakeAPIError(429, headers={"retry-after": "3"})) == 3.0
+    details = {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "7s"}]}
+    assert retry_after_seconds(FakeAPIError(429, details=details)) == 7.0
+    assert retry_after_seconds(FakeAPIError(429)) is None
+
+
+def test_retry_after_http_date_and_malformed_values() -> None:
+    # "-0000" dates parse as naive datetimes; they are still GMT, not local time.
+    future = email.utils.formatdate(time.time() + 30, usegmt=False).rsplit(" ", 1)[0] + " -0000"
+    assert 25 < retry_after_seconds(FakeAPIError(503, headers={"Retry-After": future})) <= 30
+    assert retry_after_seconds(FakeAPIError(503, headers={"Retry-After": "soon"})) is None
+
+
+@pytest.mark.asyncio
+async def test_malformed_retry_after_falls_back_to_backoff() -> None:
+    inner = StubProvider(errors=[FakeAPIError(503, headers={"Retry-After": "soon"})])
+    provider = _retrying(inner, "malformed")
+
+    rec = await provider.get_recommendation(make_ctx())
+
+    assert rec.suggested_reps == 8
+    assert inner.calls == 2
+    assert _outcome("malformed", "rescued") == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_error_is_rescued() -> None:
+    inner = StubProvider(errors=[FakeAPIError(429), FakeAPIError(503)])
+    provider = _retrying(inner, "rescue")
+
+    rec = await provider.get_recommendation(make_ctx())
+
+    assert rec.suggested_reps == 8
+    assert inner.calls == 3
+    assert AI_RETRIES_TOTAL.labels(provider="rescue")._value.get() == 2
+    assert _outcome("rescue", "rescued") == 1
+
+
+@pytest.mark.asyncio
+async def test_non_transient_error_is_not_retried() -> None:
+    inner = StubProvider(errors=[ValueError("invalid output")])
+    provider = _retrying(inner, "noretry")
+
+    with pytest.raises(ValueError):
+        await provider.get_recommendation(make_ctx())
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_attempts_exhausted() -> None:
+    inner = StubProvider(errors=[FakeAPIError(500)] * 5)
+    provider = _retrying(inner, "exhaust", max_attempts=2)
+
+    with pytest.raises(FakeAPIError):
+        await provider.get_recommendation(make_ctx())
+    assert inner.calls == 2
+    assert _outcome("exhaust", "exhausted") == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_beyond_deadline_gives_up_immediately() -> None:
+    inner = StubProvider(errors=[FakeAPIError(429, headers={"Retry-After": "5"})])
+    provider = _retrying(inner, "budget", deadline_seconds=0.5)
+
+    start = time.monotonic()
+    with pytest.raises(FakeAPIError):
+        await provider.get_recommendation(make_ctx())
+    assert time.monotonic() - start < 0.1
+    assert inner.calls == 1
+    assert _outcome("budget", "deadline") == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_is_cut_at_deadline() -> None:
+    inner = StubProvider(delay=5.0)
+    provider = _retrying(inner, "slow", deadline_seconds=0.1)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        await provider.get_recommendation(make_ctx())
+    assert time.monotonic() - start < 0.5
+    assert inner.calls == 1
+
+
+class FlakyStreamProvider(StubProvider):
+    async def stream_recommendation(self, context: WorkoutContext):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        yield RecommendationStreamEvent(STREAM_EVENT_FINAL, recommendation=make_rec())
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_event() -> None:
+    inner = FlakyStreamProvider(errors=[FakeAPIError(503)])
+    provider = _retrying(inner, "stream")
+
+    events = [e async for e in provider.stream_recommendation(make_ctx())]
+
+    assert [e.kind for e in events] == [STREAM_EVENT_FINAL]
+    assert inner.calls == 2
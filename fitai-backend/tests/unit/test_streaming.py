@@ -0,0 +1,83 @@
+"""Tests for incremental JSON decoding and streamed Gemini recommendations."""
+
+import json
+
+import pytest
+
+from app.ai.base import (
+    STREAM_EVENT_EXPLANATION_DELTA,
+    STREAM_EVENT_FIELD,
+    STREAM_EVENT_FINAL,
+)
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.json_stream import EVENT_STRING_DELTA, EVENT_VALUE, IncrementalJSONObjectParser
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import make_ctx
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_parser_matches_json_loads_for_any_chunking(chunk_size: int) -> None:
+    obj = {
+        "suggested_weight_kg": 62.5,
+        "suggested_reps": 8,
+        "explanation": 'Keep "tight" \\ form é\nnext set',
+        "confidence": "high",
+        "flag": None,
+    }
+    text = "```json\n" + json.dumps(obj) + "\n```"
+    parser = IncrementalJSONObjectParser()
+    deltas: list[str] = []
+    for i in range(0, len(text), chunk_size):
+        for kind, key, value in parser.feed(text[i : i + chunk_size]):
+            if kind == EVENT_STRING_DELTA and key == "explanation":
+                deltas.append(value)
+    assert parser.done
+    assert parser.values == obj
+    assert "".join(deltas) == obj["explanation"]
+
+
+def test_parser_reports_numbers_before_explanation_finishes() -> None:
+    parser = IncrementalJSONObjectParser()
+    events = parser.feed('{"suggested_weight_kg": 100, "suggested_reps": 5, "explanation": "Add')
+    assert (EVENT_VALUE, "suggested_weight_kg", 100) in events
+    assert (EVENT_VALUE, "suggested_reps", 5) in events
+    assert events[-1] == (EVENT_STRING_DELTA, "explanation", "Add")
+    assert not parser.done
+
+
+def test_parser_rejects_nested_values() -> None:
+    with pytest.raises(ValueError):
+        IncrementalJSONObjectParser().feed('{"a": [1, 2]}')
+
+
+@pytest.mark.asyncio
+async def test_gemini_stream_emits_fields_then_explanation_then_final() -> None:
+    client = FakeGenaiClient(stream_chunk_size=5)
+    provider = GeminiProvider("", "gemini-test", client=client)
+
+    events = [e async for e in provider.stream_recommendation(make_ctx())]
+
+    kinds = [e.kind for e in events]
+    assert kinds[0] == STREAM_EVENT_FIELD and kinds[1] == STREAM_EVENT_FIELD
+    assert {e.field: e.value for e in events[:2]} == {
+        "suggested_weight_kg": 62.5,
+        "suggested_reps": 8,
+    }
+    assert kinds[-1] == STREAM_EVENT_FINAL
+    explanation = "".join(e.value for e in events if e.kind == STREAM_EVENT_EXPLANATION_DELTA)
+    final = events[-1].recommendation
+    assert final is not None
+    assert explanation == final.explanation
+    assert final.suggested_reps == 8
+
+
+@pytest.mark.asyncio
+async def test_gemini_stream_invalid_output_raises_after_partial_events() -> None:
+    client = FakeGenaiClient(responses=[{"suggested_weight_kg": 50, "suggested_reps": 8}])
+    provider = GeminiProvider("", "gemini-test", client=client)
+
+    seen = []
+    with pytest.raises(ValueError):
+        async for event in provider.stream_recommendation(make_ctx()):
+            seen.append(event)
+    assert [e.kind for e in seen] == [STREAM_EVENT_FIELD, STREAM_EVENT_FIELD]
@@ -0,0 +1,103 @@
+"""Tests for rule traces, rule confidence and the rule-first tiered provider."""
+
+import pytest
+
+from app.ai.tiered import TieredProvider
+from app.services.rule_engine import (
+    RuleCode,
+    get_rule_based_recommendation,
+    get_rule_based_recommendation_traced,
+    rule_confidence,
+)
+from tests.services.test_rule_engine import build_mock_ctx
+from tests.unit.fakes import StubProvider
+
+
+def _sets(*rows: tuple[float, int, float | None]) -> list[dict]:
+    return [
+        {"weight_kg": w, "reps": r, "rpe": rpe, "set_number": i + 1}
+        for i, (w, r, rpe) in enumerate(rows)
+    ]
+
+
+def test_traced_matches_untraced() -> None:
+    for rpe in (None, 5.0, 6.5, 7.5, 8.0, 8.5, 9.0, 10.0):
+        for reps in (3, 8, 12):
+            ctx = build_mock_ctx(
+                current_session_sets=_sets((100.0, reps + 3, 8.0), (100.0, reps, rpe)),
+                estimated_1rm=120.0,
+                total_sets_today=20,
+            )
+            assert get_rule_based_recommendation_traced(ctx, 100.0, reps, rpe)[:3] == (
+                get_rule_based_recommendation(ctx, 100.0, reps, rpe)
+            )
+
+
+def test_routine_set_has_full_confidence() -> None:
+    ctx = build_mock_ctx(current_session_sets=_sets((100.0, 8, 8.0), (100.0, 8, 8.0)))
+    *_, codes = get_rule_based_recommendation_traced(ctx, 100.0, 8, 8.0)
+    assert codes == RuleCode(0)
+    assert rule_confidence(codes) == 1.0
+
+
+def test_fatigue_and_cap_lower_confidence() -> None:
+    ctx = build_mock_ctx(
+        current_session_sets=_sets((100.0, 8, 8.5), (100.0, 4, 9.5)),
+        total_sets_today=20,
+        estimated_1rm=100.0,
+    )
+    *_, codes = get_rule_based_recommendation_traced(ctx, 100.0, 4, 9.5)
+    assert RuleCode.FATIGUE_HARD in codes
+    assert RuleCode.RPE_OUT_OF_BAND in codes
+    assert rule_confidence(codes) < 0.5
+
+
+def test_no_rpe_is_flagged() -> None:
+    ctx = build_mock_ctx(current_session_sets=_sets((60.0, 10, None)))
+    *_, codes = get_rule_based_recommendation_traced(ctx, 60.0, 10, None)
+    assert RuleCode.NO_RPE in codes
+
+
+@pytest.mark.asyncio
+async def test_tiered_answers_routine_sets_without_llm() -> None:
+    llm = StubProvider(model_used="gemini-test")
+    provider = TieredProvider(llm, min_confidence=0.75)
+
+    routine = build_mock_ctx(current_session_sets=_sets((100.0, 8, 8.0), (100.0, 8, 8.0)))
+    rec = await provider.get_recommendation(routine)
+    assert rec.provider == "rules"
+    assert rec.model_used == "rule-based"
+    assert rec.confidence == "high"
+    assert llm.calls == 0
+
+    ambiguous = build_mock_ctx(
+        current_session_sets=_sets((100.0, 8, 8.5), (100.0, 4, 9.5)), total_sets_today=20
+    )
+    rec = await provider.get_recommendation(ambiguous)
+    assert rec.model_used == "gemini-test"
+    assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_stream_for_routine_set_ends_with_rule_recommendation() -> None:
+    provider = TieredProvider(StubProvider(model_used="gemini-test"))
+    routine = build_mock_ctx(current_session_sets=_sets((100.0, 8, 8.0), (100.0, 8, 8.0)))
+    events = [e async for e in provider.stream_recommendation(routine)]
+    assert events[-1].recommendation.provider == "rules"
+
+
+@pytest.mark.asyncio
+async def test_tiered_batch_sends_only_uncertain_items_on() -> None:
+    llm = StubProvider(model_used="gemini-test")
+    provider = TieredProvider(llm, min_confidence=0.75)
+    routine = build_mock_ctx(current_session_sets=_sets((100.0, 8, 8.0), (100.0, 8, 8.0)))
+    ambiguous = build_mock_ctx(
+        current_session_sets=_sets((100.0, 8, 8.5), (100.0, 4, 9.5)), total_sets_today=20
+    )
+    results = await provider.get_batch_recommendations(
+        {"a": routine, "b": ambiguous, "c": build_mock_ctx(current_session_sets=[]), "d": routine}
+    )
+    assert [list(batch) for batch in llm.batches] == [["b", "c"]]
+    assert {k: r.provider or r.model_used for k, r in sorted(results.items())} == {
+        "a": "rules", "b": "gemini-test", "c": "gemini-test", "d": "rules",
+    }
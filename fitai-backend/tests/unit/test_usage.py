@@ -0,0 +1,127 @@
+"""Tests for token accounting, daily quotas and provider usage capture."""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.base import AIRecommendation
+from app.ai.gemini_provider import GeminiProvider
+from app.ai.usage import (
+    SCOPE_GLOBAL,
+    SCOPE_USER,
+    QuotaExceeded,
+    UsageMeteringProvider,
+    UsageTracker,
+)
+from tests.unit.fake_genai import FakeGenaiClient
+from tests.unit.fakes import StubProvider, make_ctx
+
+
+def test_user_quota_and_day_rollover() -> None:
+    day = [date(2026, 3, 1)]
+    tracker = UsageTracker(user_daily_quota=1000, today=lambda: day[0])
+    tracker.record("u1", "gemini-test", 800, 100)
+    assert tracker.exceeded_scope("u1") is None
+    tracker.record("u1", "gemini-test", 90, 10)
+    assert tracker.exceeded_scope("u1") == SCOPE_USER
+    assert tracker.exceeded_scope("u2") is None
+
+    day[0] = date(2026, 3, 2)
+    assert tracker.exceeded_scope("u1") is None
+    assert tracker.snapshot()["total"]["calls"] == 0
+
+
+def test_global_quota_and_snapshot() -> None:
+    tracker = UsageTracker(global_daily_quota=500)
+    tracker.record("u1", "gemini-a", 200, 50)
+    tracker.record("u2", "gemini-b", 300, 0)
+    tracker.record(None, "gemini-b", 10, 0)
+    assert tracker.exceeded_scope("u3") == SCOPE_GLOBAL
+
+    snap = tracker.snapshot(top_users=1)
+    assert snap["total"] == {"calls": 3, "prompt_tokens": 510, "completion_tokens": 50}
+    assert snap["models"]["gemini-b"]["calls"] == 2
+    assert snap["top_users"] == [
+        {"user_id": "u2", "calls": 1, "prompt_tokens": 300, "completion_tokens": 0}
+    ]
+    assert snap["users_tracked"] == 2
+
+
+@pytest.mark.asyncio
+async def test_metering_records_and_then_rejects() -> None:
+    inner = StubProvider(prompt_tokens=400, completion_tokens=60)
+    tracker = UsageTracker(user_daily_quota=900)
+    provider = UsageMeteringProvider(inner, tracker)
+
+    await provider.get_recommendation(make_ctx(user_id="u1"))
+    await provider.get_recommendation(make_ctx(user_id="u1"))
+    assert tracker.user_usage("u1").total_tokens == 920
+    with pytest.raises(QuotaExceeded) as exc:
+        await provider.get_recommendation(make_ctx(user_id="u1"))
+    assert exc.value.scope == SCOPE_USER
+    assert inner.calls == 2
+
+    await provider.get_recommendation(make_ctx(user_id="u2"))
+    assert inner.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_metering_batch_rejects_items_over_quota_and_records_the_rest() -> None:
+    inner = StubProvider(prompt_tokens=400, completion_tokens=60)
+    tracker = UsageTracker(user_daily_quota=400)
+    tracker.record("u1", "gemini-test", 500, 0)
+    provider = UsageMeteringProvider(inner, tracker)
+
+    results = await provider.get_batch_recommendations(
+        {user_id: make_ctx(user_id=user_id) for user_id in ("u1", "u2", "u3")}
+    )
+    assert isinstance(results["u1"], QuotaExceeded)
+    assert isinstance(results["u2"], AIRecommendation) and isinstance(results["u3"], AIRecommendation)
+    assert [list(batch) for batch in inner.batches] == [["u2", "u3"]]
+    assert tracker.user_usage("u2").total_tokens == 460
+
+
+@pytest.mark.asyncio
+async def test_metering_ignores_calls_without_token_counts() -> None:
+    tracker = UsageTracker()
+    provider = UsageMeteringProvider(StubProvider(), tracker)
+    await provider.get_recommendation(make_ctx(user_id="u1"))
+    assert tracker.snapshot()["total"]["calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_gemini_reports_token_counts() -> None:
+    usage = SimpleNamespace(prompt_token_count=412, candidates_token_count=37)
+    provider = GeminiProvider("", "gemini-test", client=FakeGenaiClient(usage=usage))
+
+    rec = await provider.get_recommendation(make_ctx())
+    assert (rec.prompt_tokens, rec.completion_tokens) == (412, 37)
+
+    final = None
+    async for event in provider.stream_recommendation(make_ctx()):
+        final = event.recommendation or final
+    assert (final.prompt_tokens, final.completion_tokens) == (412, 37)
+
+
+@pytest.mark.asyncio
+async def test_gemini_without_usage_metadata_leaves_counts_unset() -> None:
+    provider = GeminiProvider("", "gemini-test", client=FakeGenaiClient())
+    rec = await provider.get_recommendation(make_ctx())
+    assert rec.prompt_tokens is None and rec.completion_tokens is None
+
+
+@pytest.mark.asyncio
+async def test_gemini_batch_counts_sum_to_billed_totals() -> None:
+    item = {"suggested_weight_kg": 62.5, "suggested_reps": 8, "explanation": "ok", "confidence": "high"}
+    usage = SimpleNamespace(prompt_token_count=1001, candidates_token_count=302)
+    client = FakeGenaiClient(
+        responses=[{"recommendations": [{"request_id": rid, **item} for rid in ("a", "b", "c")]}],
+        usage=usage,
+    )
+    provider = GeminiProvider("", "gemini-test", client=client)
+    results = await provider.get_batch_recommendations({"a": make_ctx(), "b": make_ctx(), "c": make_ctx()})
+
+    counts = [(results[rid].prompt_tokens, results[rid].completion_tokens) for rid in "abc"]
+    assert counts == [(335, 102), (333, 100), (333, 100)]
+    assert sum(p for p, _ in counts) == 1001 and sum(c for _, c in counts) == 302